@@ -0,0 +1,83 @@
+"""
+Microbenchmark for object catalog queries.
+
+Fills a catalog with synthetic upload keys and times the queries behind
+GET /media/files?sort=&q=&content_type=&modified_after=, which would need
+a full bucket listing without the catalog.
+
+Usage (from the backend directory):
+    python -m benchmarks.catalog_benchmark --objects 100000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.catalog import ObjectCatalog  # noqa: E402
+
+TYPES = [("jpg", "image/jpeg"), ("png", "image/png"), ("mp4", "video/mp4"), ("pdf", "application/pdf")]
+WORDS = ["holiday", "beach", "invoice", "birthday", "meeting", "sunset", "report", "party"]
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def fill(catalog: ObjectCatalog, count: int) -> float:
+    """Insert ``count`` objects in listing-sized batches; returns seconds."""
+    began = time.perf_counter()
+    for offset in range(0, count, 1000):
+        batch = []
+        for i in range(offset, min(offset + 1000, count)):
+            extension, content_type = TYPES[i % len(TYPES)]
+            modified = START + timedelta(minutes=i)
+            batch.append({
+                "key": f"uploads/{modified:%Y-%m-%d}/{uuid.uuid4()}-{WORDS[i % 8]}-{WORDS[i // 8 % 8]}-{i}.{extension}",
+                "size": (i * 7919) % 50_000_000,
+                "etag": f'"{i:032x}"',
+                "last_modified": modified,
+                "content_type": content_type,
+            })
+        catalog.record_present(batch)
+    return time.perf_counter() - began
+
+
+def measure(label: str, query, repeat: int) -> None:
+    """Run a query repeatedly and print the best time."""
+    best = float("inf")
+    for _ in range(repeat):
+        began = time.perf_counter()
+        result = query()
+        best = min(best, time.perf_counter() - began)
+    print(f"  {label:<44} {best * 1000:>8.2f} ms  {result['count']:>5} objects")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        catalog = ObjectCatalog(os.path.join(directory, "catalog.db"))
+        seconds = fill(catalog, args.objects)
+        print(f"{args.objects:,} objects inserted in {seconds:.2f} s (fts_enabled={catalog.fts_enabled})")
+
+        middle = START + timedelta(minutes=args.objects // 2)
+        measure("sort=size&order=desc", lambda: catalog.query(sort="size", descending=True, limit=100), args.repeat)
+        measure("sort=last_modified, 100 pages in", lambda: catalog.query(
+            sort="last_modified", limit=100, offset=10_000), args.repeat)
+        measure("q=sunset-party", lambda: catalog.query(q="sunset-party", limit=100), args.repeat)
+        measure("q=sunset-party&sort=size", lambda: catalog.query(q="sunset-party", sort="size", limit=100), args.repeat)
+        measure("content_type=video/&sort=last_modified", lambda: catalog.query(
+            content_type="video/", sort="last_modified", limit=100), args.repeat)
+        measure("modified_after..modified_before (1 day)", lambda: catalog.query(
+            modified_after=middle, modified_before=middle + timedelta(days=1), sort="last_modified", limit=100
+        ), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
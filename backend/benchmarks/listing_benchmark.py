@@ -0,0 +1,96 @@
+"""
+Microbenchmark for listing response serialization.
+
+Compares the previous path for GET /media/files (validate every object into
+a FileInfo model, then let FastAPI validate and serialize the response
+model) with the fast path (project the service's dicts and encode them with
+orjson), with and without ?fields= projection and gzip. Listings are built
+from synthetic S3 entries, so only serialization is measured.
+
+Usage (from the backend directory):
+    python -m benchmarks.listing_benchmark --sizes 1000 10000 50000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The benchmark never talks to AWS, so placeholder credentials are enough
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "AKIDEXAMPLE")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark-secret")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from routers.media import ListObjectsResponse  # noqa: E402
+from services.s3_service import S3Service  # noqa: E402
+from services.serialization import json_response, parse_fields, project  # noqa: E402
+
+LAST_MODIFIED = datetime(2024, 3, 9, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def build_listing(count: int) -> dict:
+    """A list_objects result with ``count`` objects."""
+    objects = [
+        S3Service._object_info({
+            "Key": f"uploads/2024-03-09/{i:08d}-a1b2c3d4-e5f6-photo.jpg",
+            "Size": 1024 * i,
+            "LastModified": LAST_MODIFIED,
+            "ETag": f'"{i:032x}"',
+        })
+        for i in range(count)
+    ]
+    return {"objects": objects, "count": count, "is_truncated": False, "next_continuation_token": None}
+
+
+def model_path(result: dict, field) -> bytes:
+    """The previous path: model construction plus response_model serialization."""
+    content = asyncio.run(serialize_response(
+        field=field, response_content=ListObjectsResponse(**result), is_coroutine=True
+    ))
+    return JSONResponse(content).body
+
+
+def fast_path(result: dict, fields: str = None, accept_encoding: str = None) -> bytes:
+    """The fast path used by GET /media/files."""
+    selected = parse_fields(fields)
+    return json_response({**result, "objects": project(result["objects"], selected)}, accept_encoding, 1024).body
+
+
+def measure(label: str, encode, repeat: int) -> float:
+    """Encode repeatedly and print the best time and body size; returns seconds."""
+    body = encode()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encode()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<30} {best * 1000:>9.2f} ms  {len(body) / 1024:>9,.0f} KiB")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    field = create_response_field(name="response", type_=ListObjectsResponse)
+    for size in args.sizes:
+        result = build_listing(size)
+        print(f"{size:,} objects")
+        baseline = measure("models + response_model", lambda: model_path(result, field), args.repeat)
+        fast = measure("orjson", lambda: fast_path(result), args.repeat)
+        measure("orjson ?fields=key,size", lambda: fast_path(result, "key,size"), args.repeat)
+        measure("orjson + gzip", lambda: fast_path(result, accept_encoding="gzip"), args.repeat)
+        print(f"  speedup: {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
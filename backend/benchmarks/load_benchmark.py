@@ -0,0 +1,303 @@
+"""
+Load and latency benchmark against a local S3 stand-in.
+
+Starts a moto S3 server (or uses an emulator given with --endpoint-url, e.g.
+MinIO or LocalStack), seeds it with objects, runs the app under uvicorn
+against it and drives the main endpoints over real HTTP at a configurable
+concurrency:
+
+    health          GET /health
+    upload_url      POST /media/upload-url
+    download_url    GET /media/download-url/{key}
+    list[N]         GET /media/files?prefix=...&limit=1000 with N objects under the prefix
+    list_all[N]     GET /media/files?prefix=...&stream=true (every object, NDJSON)
+    delete          DELETE /media/files/{key}
+
+Each scenario reports throughput and p50/p95/p99 latency. Results are saved
+as JSON together with the git commit, so runs can be compared between
+commits with --baseline.
+
+Usage (from the backend directory; needs ``pip install -r tests/requirements-test.txt``):
+    python -m benchmarks.load_benchmark --concurrency 32 --requests 2000
+    python -m benchmarks.load_benchmark --objects 10,10000 --output after.json --baseline before.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import boto3
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUCKET = "benchmark-bucket"
+REGION = "us-east-1"
+CREDENTIALS = {"AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing"}
+
+# A request factory returns (method, url) for the i-th request of a scenario
+RequestFactory = Callable[[int], Tuple[str, str]]
+
+
+def free_port() -> int:
+    """Ask the OS for an unused TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def start_moto() -> Tuple[Any, str]:
+    """Start an in-process moto S3 server and return it with its endpoint."""
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        sys.exit('moto is required: pip install "moto[server]" (or pass --endpoint-url)')
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    port = free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    return server, f"http://127.0.0.1:{port}"
+
+
+def seed_bucket(endpoint_url: str, object_counts: List[int], delete_count: int) -> None:
+    """Create the bucket and upload small objects under one prefix per object count."""
+    s3 = boto3.client("s3", endpoint_url=endpoint_url, region_name=REGION,
+                      aws_access_key_id=CREDENTIALS["AWS_ACCESS_KEY_ID"],
+                      aws_secret_access_key=CREDENTIALS["AWS_SECRET_ACCESS_KEY"])
+    try:
+        s3.create_bucket(Bucket=BUCKET)
+    except s3.exceptions.BucketAlreadyOwnedByYou:
+        pass
+
+    keys = [f"bench/{count}/object-{i:06d}.jpg" for count in object_counts for i in range(count)]
+    keys += [f"bench-delete/object-{i:06d}.jpg" for i in range(delete_count)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        for done, _ in enumerate(pool.map(lambda key: s3.put_object(Bucket=BUCKET, Key=key, Body=b"x"), keys), 1):
+            if done % 10000 == 0:
+                print(f"  seeded {done:,}/{len(keys):,} objects", flush=True)
+    print(f"Seeded {len(keys):,} objects in {time.perf_counter() - start:.1f}s")
+
+
+def start_app(endpoint_url: str, workers: int) -> Tuple[subprocess.Popen, str]:
+    """Run the API under uvicorn against the emulator and wait until it serves."""
+    port = free_port()
+    env = {
+        **os.environ,
+        **CREDENTIALS,
+        "AWS_REGION": REGION,
+        "S3_BUCKET_NAME": BUCKET,
+        "S3_ENDPOINT_URL": endpoint_url,
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit("uvicorn exited during startup")
+        try:
+            if httpx.get(f"{base_url}/live", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+
+    process.terminate()
+    sys.exit("uvicorn did not become ready within 30s")
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    factory: RequestFactory,
+    requests: int,
+    concurrency: int,
+    json_body: Optional[Callable[[int], Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """Issue ``requests`` requests with ``concurrency`` workers and summarize latency."""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            method, url = factory(i)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=json_body(i) if json_body else None)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    result = {
+        "scenario": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2),
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2),
+        },
+    }
+    print(f"{name:<20} {result['throughput_rps']:>9,.1f} req/s  "
+          f"p50 {result['latency_ms']['p50']:>8.2f} ms  p95 {result['latency_ms']['p95']:>8.2f} ms  "
+          f"p99 {result['latency_ms']['p99']:>8.2f} ms  errors {errors}", flush=True)
+    return result
+
+
+async def run_benchmarks(base_url: str, args: argparse.Namespace, object_counts: List[int]) -> List[Dict[str, Any]]:
+    """Run every scenario against the running app."""
+    download_keys = [f"bench/{object_counts[0]}/object-{i:06d}.jpg" for i in range(object_counts[0])]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = []
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        # Warm up connections and the app's lazy paths
+        await run_scenario(client, "warmup", lambda i: ("GET", "/live"), args.concurrency * 4, args.concurrency)
+
+        results.append(await run_scenario(
+            client, "health", lambda i: ("GET", "/health"), args.requests, args.concurrency
+        ))
+        results.append(await run_scenario(
+            client, "upload_url", lambda i: ("POST", "/media/upload-url"), args.requests, args.concurrency,
+            json_body=lambda i: {"filename": f"photo-{i}.jpg", "content_type": "image/jpeg"}
+        ))
+        results.append(await run_scenario(
+            client, "download_url",
+            lambda i: ("GET", f"/media/download-url/{random.choice(download_keys)}"),
+            args.requests, args.concurrency
+        ))
+        for count in object_counts:
+            results.append(await run_scenario(
+                client, f"list[{count}]",
+                lambda i, c=count: ("GET", f"/media/files?prefix=bench/{c}/&limit=1000"),
+                args.list_requests, args.concurrency
+            ))
+            results.append(await run_scenario(
+                client, f"list_all[{count}]",
+                lambda i, c=count: ("GET", f"/media/files?prefix=bench/{c}/&stream=true"),
+                args.list_all_requests, min(args.concurrency, args.list_all_requests)
+            ))
+        results.append(await run_scenario(
+            client, "delete",
+            lambda i: ("DELETE", f"/media/files/bench-delete/object-{i:06d}.jpg"),
+            args.delete_requests, args.concurrency
+        ))
+
+    return results
+
+
+def git_commit() -> Optional[str]:
+    """Current commit of the working tree, if available."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    """Print throughput and p95 changes relative to a saved run."""
+    with open(baseline_path) as f:
+        baseline = {r["scenario"]: r for r in json.load(f)["results"]}
+
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        before = baseline.get(result["scenario"])
+        if before is None:
+            continue
+        rps = (result["throughput_rps"] / before["throughput_rps"] - 1) * 100
+        p95 = (result["latency_ms"]["p95"] / before["latency_ms"]["p95"] - 1) * 100 if before["latency_ms"]["p95"] else 0
+        print(f"{result['scenario']:<20} throughput {rps:+7.1f}%   p95 {p95:+7.1f}%")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint-url", help="Use a running S3 emulator instead of starting moto")
+    parser.add_argument("--objects", default="10,10000,100000",
+                        help="Comma-separated object counts to list (default: 10,10000,100000)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per URL/health scenario")
+    parser.add_argument("--list-requests", type=int, default=200, help="Requests per single-page listing scenario")
+    parser.add_argument("--list-all-requests", type=int, default=5, help="Requests per full listing scenario")
+    parser.add_argument("--delete-requests", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    object_counts = [int(count) for count in args.objects.split(",")]
+    server = None
+    endpoint_url = args.endpoint_url
+    if endpoint_url is None:
+        server, endpoint_url = start_moto()
+
+    app = None
+    try:
+        print(f"S3 endpoint: {endpoint_url}")
+        seed_bucket(endpoint_url, object_counts, args.delete_requests)
+        app, base_url = start_app(endpoint_url, args.workers)
+        results = asyncio.run(run_benchmarks(base_url, args, object_counts))
+    finally:
+        if app is not None:
+            app.terminate()
+            app.wait(timeout=10)
+        if server is not None:
+            server.stop()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "endpoint": "moto" if server is not None else endpoint_url,
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved results to {args.output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmark for memory use of the streaming download proxy.
+
+Serves a synthetic multi-GB object through GET /media/stream/{key} on a real
+uvicorn server and downloads it over HTTP, sampling the process's resident
+memory while the bytes flow. The S3 body is generated on the fly, so any
+growth in memory comes from the proxy itself; it should stay flat no matter
+how large the object is. Ranged requests are also timed to show seeking
+costs no more than the range itself.
+
+Usage (from the backend directory):
+    python -m benchmarks.stream_benchmark --size-gb 4 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The S3 client is replaced below, so placeholder credentials are enough
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "AKIDEXAMPLE")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark-secret")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from main import app  # noqa: E402
+from services.s3_service import s3_service  # noqa: E402
+
+_BLOCK = os.urandom(1024 * 1024)
+
+
+class SyntheticBody:
+    """A StreamingBody stand-in that produces ``size`` bytes without storing them."""
+
+    def __init__(self, size: int):
+        self.remaining = size
+
+    def read(self, amt: int = None) -> bytes:
+        amt = min(self.remaining, amt or self.remaining, len(_BLOCK))
+        self.remaining -= amt
+        return _BLOCK[:amt]
+
+    def close(self) -> None:
+        self.remaining = 0
+
+
+def fake_get_object(size: int):
+    """Build a get_object replacement serving a synthetic object of ``size`` bytes."""
+    def get_object(Bucket, Key, Range=None, IfNoneMatch=None):
+        start, end = 0, size - 1
+        response = {"ContentType": "video/mp4", "ETag": '"synthetic"',
+                    "LastModified": datetime.now(timezone.utc)}
+        if Range:
+            first, last = Range[len("bytes="):].split("-")
+            start, end = int(first), min(int(last) if last else size - 1, size - 1)
+            response["ContentRange"] = f"bytes {start}-{end}/{size}"
+        response["ContentLength"] = end - start + 1
+        response["Body"] = SyntheticBody(end - start + 1)
+        return response
+    return get_object
+
+
+def rss_mb() -> float:
+    """Current resident set size in MiB (Linux), else peak RSS."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class MemorySampler(threading.Thread):
+    """Samples RSS every few milliseconds until stopped."""
+
+    def __init__(self, interval: float = 0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            self.samples.append(rss_mb())
+            time.sleep(self.interval)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+async def download(client: httpx.AsyncClient, headers: dict = None) -> int:
+    """Stream one response to nowhere and return the bytes received."""
+    received = 0
+    async with client.stream("GET", "/media/stream/synthetic.mp4", headers=headers) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_raw():
+            received += len(chunk)
+    return received
+
+
+async def run(base_url: str, size: int, concurrency: int) -> None:
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        await download(client, {"Range": "bytes=0-1048575"})  # warm up
+
+        baseline = rss_mb()
+        sampler = MemorySampler()
+        sampler.start()
+        start = time.perf_counter()
+        received = sum(await asyncio.gather(*(download(client) for _ in range(concurrency))))
+        elapsed = time.perf_counter() - start
+        sampler.stop()
+
+        print(f"Full downloads: {concurrency} x {size / 1024 ** 3:.1f} GiB in {elapsed:.1f}s "
+              f"({received / elapsed / 1024 ** 2:,.0f} MiB/s)")
+        print(f"RSS baseline {baseline:.1f} MiB, peak {max(sampler.samples):.1f} MiB, "
+              f"growth {max(sampler.samples) - baseline:+.1f} MiB over {len(sampler.samples)} samples")
+
+        offsets = [size // 2, size - 4 * 1024 * 1024]
+        for offset in offsets:
+            start = time.perf_counter()
+            await download(client, {"Range": f"bytes={offset}-{offset + 4 * 1024 * 1024 - 1}"})
+            print(f"Seek to {offset / 1024 ** 3:.2f} GiB and read 4 MiB: "
+                  f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-gb", type=float, default=2.0, help="Size of the synthetic object")
+    parser.add_argument("--concurrency", type=int, default=2, help="Parallel full downloads")
+    args = parser.parse_args()
+    size = int(args.size_gb * 1024 ** 3)
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, daemon=True)
+
+    with patch.object(s3_service, "client") as mock_client:
+        mock_client.get_object.side_effect = fake_get_object(size)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+        try:
+            asyncio.run(run(f"http://127.0.0.1:{port}", size, args.concurrency))
+        finally:
+            server.should_exit = True
+            thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark for issuing upload URLs for a multi-file drop.
+
+Compares N calls to POST /media/upload-url (one per file, as the dropzone
+used to do) with a single POST /media/upload-urls batch request. Requests go
+through the full ASGI app in-process, so routing, validation and
+serialization costs are included but network latency is not.
+
+Usage (from the backend directory):
+    python -m benchmarks.upload_url_benchmark --files 500 --rounds 5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Presigning is local, so placeholder credentials are enough
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "AKIDEXAMPLE")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark-secret")
+
+import httpx  # noqa: E402
+
+from main import app  # noqa: E402
+
+
+async def per_file(client: httpx.AsyncClient, files: list) -> None:
+    """Request one upload URL per file, sequentially."""
+    for file in files:
+        response = await client.post("/media/upload-url", json=file)
+        response.raise_for_status()
+
+
+async def batch(client: httpx.AsyncClient, files: list) -> None:
+    """Request every upload URL in a single batch call."""
+    response = await client.post("/media/upload-urls", json={"files": files})
+    response.raise_for_status()
+
+
+async def run(file_count: int, rounds: int) -> None:
+    files = [{"filename": f"photo-{i:05d}.jpg", "content_type": "image/jpeg"} for i in range(file_count)]
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results = {}
+        for label, strategy in (("per-file", per_file), ("batch", batch)):
+            await strategy(client, files[:10])  # warm up
+            start = time.perf_counter()
+            for _ in range(rounds):
+                await strategy(client, files)
+            elapsed = (time.perf_counter() - start) / rounds
+            results[label] = elapsed
+            print(f"{label:<10} {elapsed * 1000:>9.1f} ms per drop of {file_count} files "
+                  f"({file_count / elapsed:,.0f} URLs/s)")
+
+    print(f"\nSpeedup: {results['per-file'] / results['batch']:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.files, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
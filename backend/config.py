@@ -26,6 +26,19 @@ class Settings:
     AWS_SECRET_ACCESS_KEY: Optional[str] = os.getenv("AWS_SECRET_ACCESS_KEY")
     AWS_REGION: str = os.getenv("AWS_REGION", "us-east-1")
     S3_BUCKET_NAME: str = os.getenv("S3_BUCKET_NAME", "media-processing-app-bucket")
+    # Custom S3 endpoint, e.g. a local emulator (moto server, MinIO); unset for AWS
+    S3_ENDPOINT_URL: Optional[str] = os.getenv("S3_ENDPOINT_URL") or None
+
+    # Bucket Routing Configuration
+    # Comma-separated buckets to spread objects over by consistent hashing; defaults to S3_BUCKET_NAME.
+    # Keep the existing bucket in the list so its objects stay reachable
+    S3_BUCKET_NAMES: list = [name.strip() for name in os.getenv("S3_BUCKET_NAMES", "").split(",") if name.strip()]
+    # Virtual nodes per bucket on the hash ring
+    S3_BUCKET_VNODES: int = int(os.getenv("S3_BUCKET_VNODES", "128"))
+    # Database file pinning existing keys to their bucket, or ":memory:"
+    S3_ROUTING_TABLE_PATH: str = os.getenv("S3_ROUTING_TABLE_PATH", "bucket_routes.db")
+    # List every bucket at startup to pin keys that are not where the ring places them
+    S3_ROUTE_BACKFILL: bool = os.getenv("S3_ROUTE_BACKFILL", "true").lower() == "true"
 
     # API Configuration
     API_TITLE: str = "Media Processing API"
@@ -38,9 +51,154 @@ class Settings:
     # Presigned URL Configuration
     PRESIGNED_URL_EXPIRE: int = 3600  # 1 hour in seconds
 
-    def __init__(self):
+    # Download URL Cache Configuration
+    # Maximum number of cached download URLs (0 disables the cache)
+    DOWNLOAD_URL_CACHE_SIZE: int = int(os.getenv("DOWNLOAD_URL_CACHE_SIZE", "10000"))
+    # Fraction of PRESIGNED_URL_EXPIRE during which the same URL is handed out again
+    DOWNLOAD_URL_CACHE_REUSE_FRACTION: float = float(os.getenv("DOWNLOAD_URL_CACHE_REUSE_FRACTION", "0.5"))
+
+    # Object Metadata Cache Configuration
+    # Maximum number of cached HEAD results (0 disables the cache)
+    OBJECT_METADATA_CACHE_SIZE: int = int(os.getenv("OBJECT_METADATA_CACHE_SIZE", "10000"))
+    # Seconds metadata of an existing object is reused
+    OBJECT_METADATA_CACHE_TTL: float = float(os.getenv("OBJECT_METADATA_CACHE_TTL", "300"))
+    # Seconds a missing key is remembered
+    OBJECT_METADATA_NEGATIVE_TTL: float = float(os.getenv("OBJECT_METADATA_NEGATIVE_TTL", "30"))
+    # Whether GET /media/download-url checks the object exists (404 if not)
+    DOWNLOAD_URL_VERIFY_EXISTS: bool = os.getenv("DOWNLOAD_URL_VERIFY_EXISTS", "true").lower() == "true"
+
+    # Maximum number of keys or files accepted by a single batch presign request
+    PRESIGN_BATCH_MAX: int = int(os.getenv("PRESIGN_BATCH_MAX", "1000"))
+
+    # Multipart Upload Configuration
+    # Smallest part size handed to clients (S3 requires at least 5 MiB)
+    MULTIPART_MIN_PART_SIZE: int = max(int(os.getenv("MULTIPART_MIN_PART_SIZE", str(8 * 1024 * 1024))), 5 * 1024 * 1024)
+
+    # Server-side Upload Configuration
+    # Part size used when POST /media/upload streams a file to S3 (at least 5 MiB)
+    UPLOAD_PART_SIZE: int = max(int(os.getenv("UPLOAD_PART_SIZE", str(MULTIPART_MIN_PART_SIZE))), 5 * 1024 * 1024)
+    # Parts of one upload sent to S3 at the same time
+    UPLOAD_PART_CONCURRENCY: int = int(os.getenv("UPLOAD_PART_CONCURRENCY", "4"))
+
+    # S3 Execution Configuration
+    # Maximum number of blocking boto3 calls allowed to run at the same time
+    S3_MAX_CONCURRENCY: int = int(os.getenv("S3_MAX_CONCURRENCY", "16"))
+    # Let concurrent identical reads (listings, HEADs, bucket location) share one S3 call
+    S3_COALESCE_READS: bool = os.getenv("S3_COALESCE_READS", "true").lower() == "true"
+
+    # S3 Connection Management Configuration
+    # Size of the boto3 HTTP connection pool (defaults to S3_MAX_CONCURRENCY)
+    S3_MAX_POOL_CONNECTIONS: int = int(os.getenv("S3_MAX_POOL_CONNECTIONS", str(S3_MAX_CONCURRENCY)))
+    S3_CONNECT_TIMEOUT: float = float(os.getenv("S3_CONNECT_TIMEOUT", "5"))
+    S3_READ_TIMEOUT: float = float(os.getenv("S3_READ_TIMEOUT", "30"))
+    # botocore retry mode: "adaptive" adds client-side rate limiting on throttling
+    S3_RETRY_MODE: str = os.getenv("S3_RETRY_MODE", "adaptive")
+    # Total attempts per call, including the first one
+    S3_MAX_ATTEMPTS: int = int(os.getenv("S3_MAX_ATTEMPTS", "3"))
+    # Global retry budget: retries allowed per first attempt, plus a steady refill
+    S3_RETRY_BUDGET_RATIO: float = float(os.getenv("S3_RETRY_BUDGET_RATIO", "0.1"))
+    S3_RETRY_BUDGET_MIN_PER_SECOND: float = float(os.getenv("S3_RETRY_BUDGET_MIN_PER_SECOND", "5"))
+    S3_RETRY_BUDGET_CAPACITY: float = float(os.getenv("S3_RETRY_BUDGET_CAPACITY", "100"))
+    # Circuit breaker: consecutive degraded responses that open it, and seconds it stays open
+    S3_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("S3_BREAKER_FAILURE_THRESHOLD", "5"))
+    S3_BREAKER_RESET_TIMEOUT: float = float(os.getenv("S3_BREAKER_RESET_TIMEOUT", "30"))
+
+    # Health Probe Configuration
+    # Seconds between background S3 connectivity probes
+    HEALTH_PROBE_INTERVAL: float = float(os.getenv("HEALTH_PROBE_INTERVAL", "15"))
+    # Seconds before a single probe is considered failed
+    HEALTH_PROBE_TIMEOUT: float = float(os.getenv("HEALTH_PROBE_TIMEOUT", "5"))
+    # Cached status older than this many seconds makes /ready report not ready
+    HEALTH_MAX_AGE: float = float(os.getenv("HEALTH_MAX_AGE", "60"))
+
+    # Streaming Download Configuration
+    # Bytes read from S3 and sent to the client per chunk (default: 1 MiB)
+    STREAM_CHUNK_SIZE: int = int(os.getenv("STREAM_CHUNK_SIZE", str(1024 * 1024)))
+    # Maximum concurrent /media/stream responses per worker
+    STREAM_MAX_CONCURRENT: int = int(os.getenv("STREAM_MAX_CONCURRENT", "32"))
+
+    # Media Processing Configuration
+    # Worker processes for image jobs (defaults to one per CPU core)
+    PROCESSING_WORKERS: int = int(os.getenv("PROCESSING_WORKERS", str(os.cpu_count() or 1)))
+    # Largest source object a job will download, in bytes
+    PROCESSING_MAX_SOURCE_BYTES: int = int(os.getenv("PROCESSING_MAX_SOURCE_BYTES", str(50 * 1024 * 1024)))
+    # Finished jobs whose status is kept for polling
+    PROCESSING_JOB_HISTORY: int = int(os.getenv("PROCESSING_JOB_HISTORY", "10000"))
+
+    # Derivative Cache Configuration
+    # Prefix under which thumbnails are stored, one folder per source object
+    DERIVATIVE_PREFIX: str = os.getenv("DERIVATIVE_PREFIX", "derivatives/")
+    # Thumbnail width used when ?w= is omitted
+    THUMBNAIL_DEFAULT_WIDTH: int = int(os.getenv("THUMBNAIL_DEFAULT_WIDTH", "256"))
+
+    # Listing Response Configuration
+    # Listing responses at least this large are gzipped for clients that accept it
+    LISTING_GZIP_MIN_BYTES: int = int(os.getenv("LISTING_GZIP_MIN_BYTES", "1024"))
+
+    # Object Catalog Configuration
+    # Keep a local SQLite index of the bucket for sorted, filtered and searched listings
+    CATALOG_ENABLED: bool = os.getenv("CATALOG_ENABLED", "true").lower() == "true"
+    # Database file (WAL mode; use a local disk), or ":memory:" for a per-process catalog
+    CATALOG_PATH: str = os.getenv("CATALOG_PATH", "media_catalog.db")
+    # Seconds between reconciliation runs against the bucket (0 runs it once at startup only)
+    CATALOG_RECONCILE_INTERVAL: float = float(os.getenv("CATALOG_RECONCILE_INTERVAL", "3600"))
+    # Seconds another worker waits before taking over a reconciliation run whose worker died
+    CATALOG_RECONCILE_LEASE: float = float(os.getenv("CATALOG_RECONCILE_LEASE", "600"))
+
+    # Change Feed Configuration
+    # Object change events kept in memory for GET /media/changes
+    CHANGE_FEED_CAPACITY: int = int(os.getenv("CHANGE_FEED_CAPACITY", "10000"))
+    # Longest long-poll wait a client may request, in seconds
+    CHANGE_FEED_MAX_WAIT: float = float(os.getenv("CHANGE_FEED_MAX_WAIT", "30"))
+    # Seconds between keep-alive comments on idle SSE streams
+    CHANGE_FEED_HEARTBEAT: float = float(os.getenv("CHANGE_FEED_HEARTBEAT", "15"))
+
+    # Key Layout Configuration
+    # Layout of new upload keys: 'date' (uploads/YYYY-MM-DD/...) or 'hashed' (uploads/<shard>/YYYY-MM-DD/...)
+    S3_KEY_LAYOUT: str = os.getenv("S3_KEY_LAYOUT", "date").lower()
+    # Number of shard prefixes for the hashed layout: 16, 256 or 4096
+    S3_KEY_SHARDS: int = int(os.getenv("S3_KEY_SHARDS", "16"))
+
+    # Admission Control Configuration (limits are per worker)
+    # Limit /media/* requests per client and per route, shedding load beyond the queue wait target
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    # Requests per second each client may sustain (0 disables per-client limits), and its burst size
+    ADMISSION_CLIENT_RATE: float = float(os.getenv("ADMISSION_CLIENT_RATE", "50"))
+    ADMISSION_CLIENT_BURST: float = float(os.getenv("ADMISSION_CLIENT_BURST", "100"))
+    # Header identifying the client (e.g. X-Forwarded-For or a gateway's tenant header); the peer address when unset
+    ADMISSION_CLIENT_HEADER: str = os.getenv("ADMISSION_CLIENT_HEADER", "")
+    # Number of client token buckets kept in memory
+    ADMISSION_MAX_CLIENTS: int = int(os.getenv("ADMISSION_MAX_CLIENTS", "10000"))
+    # Concurrent requests per route, with per-route overrides such as "/media/files=16,/media/upload=4"
+    ADMISSION_ROUTE_CONCURRENCY: int = int(os.getenv("ADMISSION_ROUTE_CONCURRENCY", "32"))
+    ADMISSION_ROUTE_LIMITS: dict = {
+        route.strip(): int(limit)
+        for route, _, limit in (item.rpartition("=") for item in os.getenv("ADMISSION_ROUTE_LIMITS", "").split(","))
+        if route.strip()
+    }
+    # Requests allowed to wait per route, and the queue wait target in seconds; later requests get 503
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+    ADMISSION_MAX_QUEUE_WAIT: float = float(os.getenv("ADMISSION_MAX_QUEUE_WAIT", "0.5"))
+    # Routes with their own limits or long-lived connections that are never admission controlled
+    ADMISSION_EXEMPT_ROUTES: list = [
+        route.strip() for route in os.getenv(
+            "ADMISSION_EXEMPT_ROUTES", "/media/changes,/media/changes/stream,/media/stream/{key:path}"
+        ).split(",") if route.strip()
+    ]
+
+    # Bulk Delete Configuration
+    # Number of DeleteObjects batches (up to 1000 keys each) allowed in flight at once
+    BULK_DELETE_CONCURRENCY: int = int(os.getenv("BULK_DELETE_CONCURRENCY", "4"))
+    # Maximum number of explicit keys accepted by a single bulk delete request
+    BULK_DELETE_MAX_KEYS: int = int(os.getenv("BULK_DELETE_MAX_KEYS", "10000"))
+
+    def validate(self) -> None:
         """
-        Initialize settings and validate required configuration.
+        Validate required configuration.
+
+        Called when the S3 client is first built rather than at import, so
+        the application can be imported (tests, CLI tools, worker start)
+        without credentials.
 
         Raises:
             ValueError: If required AWS credentials are not provided.
@@ -6,21 +6,83 @@ routers, and error handlers. It integrates the modular components built
 for Phase 2 and ensures readiness for Phase 3 frontend integration.
 """
 
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from datetime import datetime
 
 from config import settings
+from middleware.admission import AdmissionMiddleware
+from middleware.metrics import PrometheusMiddleware
+from routers.changes import router as changes_router
 from routers.media import router as media_router
+from routers.processing import router as processing_router
+from services.admission import admission_controller
+from services.derivatives import derivative_cache
+from services.health import health_prober
+from services.metrics import mark_process_dead, render_metrics
+from services.processing import processing_engine
+from services.reconciler import catalog_reconciler
+from services.resilience import S3UnavailableError
 from services.s3_service import s3_service
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan hook.
+
+    Starts the background S3 health prober on startup. It builds the S3
+    client off the event loop and probes the bucket, so the worker serves
+    /live at once and reports ready only after S3 was reached. The object
+    catalog reconciler starts alongside it, and with several buckets the
+    routing table backfill. On shutdown it stops them, the processing
+    workers, and retires this worker's live metrics.
+    """
+    health_prober.start()
+    if catalog_reconciler is not None:
+        catalog_reconciler.start()
+    route_backfill = None
+    if settings.S3_ROUTE_BACKFILL and s3_service.bucket_router.sharded:
+        route_backfill = asyncio.create_task(backfill_routes())
+    yield
+    if route_backfill is not None:
+        route_backfill.cancel()
+        with suppress(asyncio.CancelledError):
+            await route_backfill
+    await health_prober.stop()
+    if catalog_reconciler is not None:
+        await catalog_reconciler.stop()
+    await processing_engine.shutdown()
+    mark_process_dead()
+
+
+async def backfill_routes() -> None:
+    """
+    Pin existing keys to their bucket in the background, recording a
+    failure in the routing stats instead of losing it.
+    """
+    try:
+        await s3_service.backfill_routes()
+    except Exception as e:
+        s3_service.last_route_backfill = {"error": str(e)}
+
+
 # Initialize FastAPI with configuration
 app = FastAPI(
     title=settings.API_TITLE,
     description=settings.API_DESCRIPTION,
-    version=settings.API_VERSION
+    version=settings.API_VERSION,
+    lifespan=lifespan
 )
 
+# Per-client rate limits, per-route concurrency limits and load shedding for
+# /media routes; added before CORS so rejections still carry CORS headers
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware, controller=admission_controller)
+
 # CORS middleware for Phase 3 integration
 app.add_middleware(
     CORSMiddleware,
@@ -30,8 +92,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency and in-flight metrics per route
+app.add_middleware(PrometheusMiddleware)
+
 # Include modular routers
 app.include_router(media_router)  # Handles /media/* endpoints
+app.include_router(processing_router)  # Handles /media/jobs endpoints
+app.include_router(changes_router)  # Handles /media/changes endpoints
 
 
 @app.get("/")
@@ -52,31 +119,122 @@ async def root():
 @app.get("/health")
 async def health_check():
     """
-    Health check endpoint to verify the API and S3 connectivity.
+    Health check endpoint reporting API and S3 connectivity.
 
-    This endpoint performs basic connectivity tests to ensure the service
-    is operational and ready for Phase 3 integration.
+    The S3 status comes from the background health prober's cache, so this
+    endpoint answers instantly and generates no S3 traffic of its own. It
+    also reports connection pool utilization, circuit breaker state, the
+    retry budget, hit/miss counters of the download URL and metadata
+    caches, processing job counts, thumbnail cache counters, the size and
+    freshness of the object catalog, change feed buffer usage, the
+    bucket routing layout and admission control queues.
 
     Returns:
         dict: Health status with S3 connectivity information.
     """
-    try:
-        # Test S3 connectivity
-        bucket_location = s3_service.get_bucket_location()
+    status = await health_prober.status()
 
-        return {
+    if status["healthy"]:
+        health = {
             "status": "healthy",
             "message": "API is running and S3 connection is working",
-            "bucket_region": bucket_location,
-            "timestamp": datetime.now().isoformat()
+            "bucket_region": status["bucket_region"],
+            "probe_latency_ms": status["latency_ms"],
+            "checked_at": status["checked_at"]
         }
-
-    except Exception as e:
-        return {
+    else:
+        health = {
             "status": "unhealthy",
-            "message": f"S3 connection failed: {str(e)}",
-            "timestamp": datetime.now().isoformat()
+            "message": f"S3 connection failed: {status['error']}",
+            "checked_at": status["checked_at"]
+        }
+    return {**health, **service_stats(), "timestamp": datetime.now().isoformat()}
+
+
+def service_stats():
+    """
+    Statistics reported by /health regardless of the S3 status.
+    """
+    return {
+        "s3_connections": s3_service.connection_stats(),
+        "download_url_cache": s3_service.download_url_cache.stats(),
+        "metadata_cache": s3_service.metadata_cache.stats(),
+        "processing": processing_engine.stats(),
+        "derivative_cache": derivative_cache.stats(),
+        "catalog": catalog_stats(),
+        "change_feed": s3_service.change_feed.stats(),
+        "bucket_routing": s3_service.routing_stats(),
+        "admission": admission_stats()
+    }
+
+
+def admission_stats():
+    """
+    Admission control statistics with each route's queue depth, or None
+    when admission control is disabled.
+    """
+    if not settings.ADMISSION_ENABLED:
+        return None
+    return admission_controller.stats()
+
+
+def catalog_stats():
+    """
+    Object catalog statistics with the last reconciliation run, or None when
+    the catalog is disabled.
+    """
+    if s3_service.catalog is None:
+        return None
+    return {**s3_service.catalog.stats(), "last_reconciliation": catalog_reconciler.last_run}
+
+
+@app.get("/live")
+async def liveness_check():
+    """
+    Liveness endpoint that performs no I/O.
+
+    Returns:
+        dict: Confirmation that the process is serving requests.
+    """
+    return {"status": "alive"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness endpoint based on the cached S3 probe status.
+
+    Responds with 503 when the last probe failed or is older than
+    HEALTH_MAX_AGE, so load balancers stop routing to this instance.
+
+    Returns:
+        JSONResponse: Readiness, probe latency and the age of the status.
+    """
+    status = await health_prober.status()
+    ready = status["healthy"] and status["age_seconds"] <= settings.HEALTH_MAX_AGE
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "s3": status
         }
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus scrape endpoint.
+
+    Exposes request latency histograms and in-flight gauges per route, and
+    call counts, errors and latency for every S3Service method.
+
+    Returns:
+        Response: Metrics in the Prometheus text exposition format.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
 
 
 # Global error handlers for production readiness
@@ -85,10 +243,30 @@ async def http_exception_handler(request, exc):
     """
     Global handler for HTTP exceptions.
     """
-    return {
-        "error": exc.detail,
-        "status_code": exc.status_code
-    }
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={
+            "error": exc.detail,
+            "status_code": exc.status_code
+        },
+        headers=getattr(exc, "headers", None)
+    )
+
+
+@app.exception_handler(S3UnavailableError)
+async def s3_unavailable_handler(request, exc):
+    """
+    Global handler for calls refused by the circuit breaker or retry budget.
+    Responds with 503 and a Retry-After hint instead of waiting on a degraded S3.
+    """
+    return JSONResponse(
+        status_code=503,
+        content={
+            "error": str(exc),
+            "status_code": 503
+        },
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
 
 @app.exception_handler(Exception)
@@ -97,7 +275,10 @@ async def general_exception_handler(request, exc):
     Global handler for unexpected exceptions.
     Provides generic error responses while logging details internally.
     """
-    return {
-        "error": f"An unexpected error occurred: {str(exc)}",
-        "status_code": 500
-    }
+    return JSONResponse(
+        status_code=500,
+        content={
+            "error": f"An unexpected error occurred: {str(exc)}",
+            "status_code": 500
+        }
+    )
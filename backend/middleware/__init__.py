@@ -0,0 +1 @@
+# Middleware package for Media Processing API
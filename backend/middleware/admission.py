@@ -0,0 +1,77 @@
+"""
+Admission control middleware module.
+
+Applies the admission controller to every request before it reaches a
+route: requests over their client's rate are answered with 429, requests
+that would queue past the latency target with 503, both with Retry-After.
+Like the metrics middleware it is a plain ASGI middleware, so admitted
+streaming responses are not buffered and hold their slot until the last
+byte is sent.
+"""
+
+import time
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from middleware.metrics import route_template
+from services.admission import AdmissionController, LoadShedError
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware enforcing per-client rates and per-route concurrency.
+
+    Only routes the controller controls (S3-bound ``/media`` routes that are
+    not exempt) are checked; CORS preflights and everything else pass
+    straight through.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        """
+        Args:
+            app (ASGIApp): The wrapped application.
+            controller (AdmissionController): Limits and queues to apply.
+        """
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope)
+        if not self.controller.controls(route):
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = self.controller.rate_limited(self.controller.client_id(scope), route)
+        if retry_after is not None:
+            await _reject(429, "Too many requests from this client; slow down", retry_after, scope, receive, send)
+            return
+
+        limiter = self.controller.route(route)
+        try:
+            await limiter.acquire()
+        except LoadShedError as e:
+            await _reject(503, str(e), e.retry_after, scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - started)
+
+
+async def _reject(status_code: int, message: str, retry_after: int, scope: Scope, receive: Receive, send: Send) -> None:
+    """
+    Send an error response in the application's error format.
+    """
+    response = JSONResponse(
+        status_code=status_code,
+        content={"error": message, "status_code": status_code},
+        headers={"Retry-After": str(retry_after)}
+    )
+    await response(scope, receive, send)
@@ -0,0 +1,72 @@
+"""
+Metrics middleware module.
+
+Records Prometheus request latency and in-flight gauges for every HTTP
+request. It is a plain ASGI middleware rather than BaseHTTPMiddleware, so it
+adds no extra task per request and does not buffer streaming responses.
+"""
+
+import time
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from services.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_PROGRESS
+
+# Label for paths that match no route, so scans cannot explode label cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+
+class PrometheusMiddleware:
+    """
+    ASGI middleware labelling request metrics with the route template.
+
+    Routes are labelled by their template (e.g. ``/media/files/{key:path}``)
+    rather than the raw path, so each endpoint is one time series.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Args:
+            app (ASGIApp): The wrapped application.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        status = {"code": 500}
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method=method, route=route)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.labels(
+                method=method, route=route, status=str(status["code"])
+            ).observe(time.perf_counter() - start)
+            in_progress.dec()
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Resolve the template of the route that will handle this request.
+
+    Starlette stores the application in the scope before running the
+    middleware stack, so its routes can be matched here.
+    """
+    for route in getattr(scope.get("app"), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
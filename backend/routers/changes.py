@@ -0,0 +1,147 @@
+"""
+Changes router for the object change feed.
+
+Lets clients keep a listing current by applying object created/deleted
+events after a cursor, either by long-polling or over a Server-Sent Events
+stream, instead of re-fetching GET /media/files after every change.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import List, Optional
+from config import settings
+from services.change_feed import ChangeFeed
+from services.s3_service import s3_service
+
+
+class ChangeEvent(BaseModel):
+    """
+    Model for one object change.
+
+    Attributes:
+        cursor (str): Cursor positioned right after this event.
+        type (str): 'created' or 'deleted'.
+        at (str): ISO 8601 time the change was recorded.
+        key (str): S3 key of the object.
+        size (int, optional): Size in bytes, for created objects.
+        etag (str, optional): S3 ETag, for created objects.
+        last_modified (str, optional): ISO 8601 timestamp, for created objects.
+        content_type (str, optional): MIME type, for created objects when known.
+    """
+    cursor: str
+    type: str
+    at: str
+    key: str
+    size: Optional[int] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_type: Optional[str] = None
+
+
+class ChangesResponse(BaseModel):
+    """
+    Response model for a page of the change feed.
+
+    Attributes:
+        events (List[ChangeEvent]): Changes after the requested cursor, oldest first.
+        cursor (str): Cursor to pass as ``since`` on the next request.
+        has_more (bool): Whether more events are already available.
+        reset (bool): Whether events were missed; reload GET /media/files
+            and continue from ``cursor``.
+    """
+    events: List[ChangeEvent]
+    cursor: str
+    has_more: bool = False
+    reset: bool = False
+
+
+# Create the router
+router = APIRouter(
+    prefix="/media/changes",
+    tags=["media"],
+)
+
+
+def get_change_feed():
+    """
+    Dependency injection for the change feed.
+
+    Returns:
+        ChangeFeed: The S3 service's change feed.
+    """
+    return s3_service.change_feed
+
+
+@router.get("", response_model=ChangesResponse)
+async def get_changes(
+    since: Optional[str] = Query(None, description="Cursor from a previous response; omit to get the current cursor"),
+    wait: float = Query(0, ge=0, le=settings.CHANGE_FEED_MAX_WAIT, description="Seconds to wait for a change"),
+    limit: int = Query(1000, ge=1, le=1000, description="Maximum number of events"),
+    feed: ChangeFeed = Depends(get_change_feed)
+):
+    """
+    Get object changes after a cursor, optionally long-polling.
+
+    Clients load GET /media/files once, having fetched the current cursor
+    first, then apply the events returned here. With ``wait`` the request
+    is held until a change happens or the wait elapses, so an idle client
+    costs one request per wait period.
+
+    Args:
+        since (str, optional): Cursor from a previous response.
+        wait (float): Seconds to wait when no change is available yet.
+        limit (int): Maximum number of events to return (1-1000).
+        feed: Injected change feed.
+
+    Returns:
+        ChangesResponse: Events, the next cursor and the reset flag.
+
+    Raises:
+        HTTPException: 400 for a malformed cursor.
+    """
+    try:
+        result = await feed.wait(since, wait, limit)
+        return ChangesResponse(**result)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/stream")
+async def stream_changes(
+    since: Optional[str] = Query(None, description="Cursor to resume from; defaults to now"),
+    last_event_id: Optional[str] = Header(None),
+    feed: ChangeFeed = Depends(get_change_feed)
+):
+    """
+    Stream object changes as Server-Sent Events.
+
+    Each change is an SSE event named 'created' or 'deleted' with the
+    ChangeEvent as JSON data and its cursor as id, so browsers' EventSource
+    resumes automatically through the Last-Event-ID header after a
+    reconnect. A 'reset' event means events were missed and the listing
+    must be reloaded.
+
+    Args:
+        since (str, optional): Cursor to resume from.
+        last_event_id (str, optional): Sent by EventSource on reconnect;
+            takes precedence over since, which the reconnect repeats.
+        feed: Injected change feed.
+
+    Returns:
+        StreamingResponse: A text/event-stream response.
+
+    Raises:
+        HTTPException: 400 for a malformed cursor.
+    """
+    since = last_event_id or since
+    try:
+        feed.parse_cursor(since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        feed.sse(since, settings.CHANGE_FEED_HEARTBEAT, 1000),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -6,12 +6,30 @@ providing a clean separation of concerns and preparing for Phase 3 integration
 where the frontend will consume these endpoints.
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 from botocore.exceptions import ClientError
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
 from datetime import datetime
+from email.utils import format_datetime
+import asyncio
+import re
+from config import settings
+from services import image_ops
+from services.derivatives import derivative_cache
+from services.resilience import S3UnavailableError
+from services.catalog import SORT_COLUMNS
+from services.serialization import CATALOG_FIELDS, accepts_gzip, json_response, ndjson_pages, parse_fields, project
 from services.s3_service import s3_service
+from services.streaming_upload import UploadTooLargeError, upload_form_file
+
+# Single byte ranges S3 can serve, e.g. "bytes=0-1023", "bytes=1024-", "bytes=-500"
+_SINGLE_RANGE = re.compile(r"^bytes=(\d+-\d*|-\d+)$")
+
+# Limits concurrent /media/stream responses in this worker
+_stream_slots = asyncio.Semaphore(settings.STREAM_MAX_CONCURRENT)
 
 # Create the router
 router = APIRouter(
@@ -48,6 +66,46 @@ class UploadURLResponse(BaseModel):
     expires_in: int
 
 
+class UploadURLsRequest(BaseModel):
+    """
+    Request model for generating presigned upload URLs in bulk.
+
+    Attributes:
+        files (List[UploadURLRequest]): Filename and content type of each file.
+    """
+    files: List[UploadURLRequest]
+
+
+class UploadURLsResponse(BaseModel):
+    """
+    Response model for bulk presigned upload URLs.
+
+    Attributes:
+        uploads (List[UploadURLResponse]): One entry per requested file, in order.
+        count (int): Number of URLs generated.
+    """
+    uploads: List[UploadURLResponse]
+    count: int
+
+
+class UploadResponse(BaseModel):
+    """
+    Response model for a file uploaded through the server.
+
+    Attributes:
+        key (str): The S3 key the file was stored under.
+        size (int): File size in bytes.
+        etag (str): ETag of the stored object.
+        content_type (str): MIME type stored with the object.
+        parts (int): Number of parts the file was uploaded in.
+    """
+    key: str
+    size: int
+    etag: str
+    content_type: str
+    parts: int
+
+
 class DownloadURLResponse(BaseModel):
     """
     Response model for presigned download URL.
@@ -62,6 +120,46 @@ class DownloadURLResponse(BaseModel):
     expires_in: int
 
 
+class ThumbnailResponse(BaseModel):
+    """
+    Response model for a thumbnail's presigned URL.
+
+    Attributes:
+        download_url (str): The presigned URL of the thumbnail.
+        key (str): The S3 key of the thumbnail.
+        expires_in (int): Time in seconds until URL expires.
+        source_key (str): The S3 key of the original image.
+        generated (bool): Whether the thumbnail was rendered for this request.
+    """
+    download_url: str
+    key: str
+    expires_in: int
+    source_key: str
+    generated: bool
+
+
+class DownloadURLsRequest(BaseModel):
+    """
+    Request model for generating presigned download URLs in bulk.
+
+    Attributes:
+        keys (List[str]): S3 object keys to presign.
+    """
+    keys: List[str]
+
+
+class DownloadURLsResponse(BaseModel):
+    """
+    Response model for bulk presigned download URLs.
+
+    Attributes:
+        urls (List[DownloadURLResponse]): One entry per requested key, in order.
+        count (int): Number of URLs generated.
+    """
+    urls: List[DownloadURLResponse]
+    count: int
+
+
 class FileInfo(BaseModel):
     """
     Model representing file information from S3.
@@ -71,11 +169,15 @@ class FileInfo(BaseModel):
         size (int): Size in bytes.
         last_modified (str): ISO 8601 timestamp.
         etag (str): S3 ETag for version control.
+        content_type (str, optional): MIME type, in catalog query results.
+        download_url (str, optional): Presigned download URL, when requested.
     """
     key: str
     size: int
     last_modified: str
     etag: str
+    content_type: Optional[str] = None
+    download_url: Optional[str] = None
 
 
 class ListObjectsResponse(BaseModel):
@@ -85,9 +187,31 @@ class ListObjectsResponse(BaseModel):
     Attributes:
         objects (List[FileInfo]): List of files with metadata.
         count (int): Number of objects.
+        is_truncated (bool): Whether more objects are available.
+        next_continuation_token (str, optional): Cursor for the next page.
     """
     objects: List[FileInfo]
     count: int
+    is_truncated: bool = False
+    next_continuation_token: Optional[str] = None
+
+
+class ObjectMetadataResponse(BaseModel):
+    """
+    Response model for object metadata.
+
+    Attributes:
+        key (str): S3 key of the file.
+        size (int): Size in bytes.
+        content_type (str): MIME type stored with the object.
+        etag (str): S3 ETag for version control.
+        last_modified (str): ISO 8601 timestamp.
+    """
+    key: str
+    size: int
+    content_type: str
+    etag: str
+    last_modified: str
 
 
 class DeleteResponse(BaseModel):
@@ -102,6 +226,164 @@ class DeleteResponse(BaseModel):
     key: str
 
 
+class BulkDeleteRequest(BaseModel):
+    """
+    Request model for deleting many objects at once.
+
+    Exactly one of the attributes must be provided.
+
+    Attributes:
+        keys (List[str], optional): Explicit S3 object keys to delete.
+        prefix (str, optional): Delete every object under this prefix.
+    """
+    keys: Optional[List[str]] = None
+    prefix: Optional[str] = None
+
+
+class DeleteError(BaseModel):
+    """
+    Model describing a key that could not be deleted.
+
+    Attributes:
+        key (str): The S3 key that failed.
+        code (str): S3 error code.
+        message (str): S3 error message.
+    """
+    key: str
+    code: str
+    message: str
+
+
+class BulkDeleteResponse(BaseModel):
+    """
+    Response model for bulk delete operations.
+
+    Attributes:
+        deleted (int): Number of objects deleted.
+        errors (List[DeleteError]): Per-key failures.
+    """
+    deleted: int
+    errors: List[DeleteError]
+
+
+class MultipartUploadRequest(BaseModel):
+    """
+    Request model for starting a multipart upload.
+
+    Attributes:
+        filename (str): Name of the file to upload.
+        content_type (str): MIME type of the file. Defaults to binary.
+        file_size (int): Size of the file in bytes, used to plan the parts.
+    """
+    filename: str
+    content_type: str = "application/octet-stream"
+    file_size: int
+
+
+class MultipartUploadResponse(BaseModel):
+    """
+    Response model for a started multipart upload.
+
+    Attributes:
+        upload_id (str): The S3 multipart upload ID.
+        key (str): The S3 key where the file will be assembled.
+        part_size (int): Size of every part except the last, in bytes.
+        part_count (int): Number of parts to upload.
+    """
+    upload_id: str
+    key: str
+    part_size: int
+    part_count: int
+
+
+class PartURLsRequest(BaseModel):
+    """
+    Request model for presigning multipart upload parts.
+
+    Attributes:
+        key (str): The S3 key of the multipart upload.
+        upload_id (str): The S3 multipart upload ID.
+        part_numbers (List[int]): Part numbers to presign (1-10000).
+    """
+    key: str
+    upload_id: str
+    part_numbers: List[int]
+
+
+class PartURL(BaseModel):
+    """
+    Model for a single presigned part upload URL.
+
+    Attributes:
+        part_number (int): The part number.
+        upload_url (str): The presigned URL to PUT the part to.
+    """
+    part_number: int
+    upload_url: str
+
+
+class PartURLsResponse(BaseModel):
+    """
+    Response model for presigned part upload URLs.
+
+    Attributes:
+        parts (List[PartURL]): One URL per requested part, in order.
+        expires_in (int): Time in seconds until the URLs expire.
+    """
+    parts: List[PartURL]
+    expires_in: int
+
+
+class CompletedPart(BaseModel):
+    """
+    Model for an uploaded part.
+
+    Attributes:
+        part_number (int): The part number.
+        etag (str): ETag returned by S3 when the part was uploaded.
+    """
+    part_number: int
+    etag: str
+
+
+class CompleteMultipartRequest(BaseModel):
+    """
+    Request model for completing a multipart upload.
+
+    Attributes:
+        key (str): The S3 key of the multipart upload.
+        upload_id (str): The S3 multipart upload ID.
+        parts (List[CompletedPart]): Every uploaded part.
+    """
+    key: str
+    upload_id: str
+    parts: List[CompletedPart]
+
+
+class CompleteMultipartResponse(BaseModel):
+    """
+    Response model for a completed multipart upload.
+
+    Attributes:
+        key (str): The S3 key of the assembled object.
+        etag (str): ETag of the assembled object.
+    """
+    key: str
+    etag: str
+
+
+class AbortMultipartRequest(BaseModel):
+    """
+    Request model for aborting a multipart upload.
+
+    Attributes:
+        key (str): The S3 key of the multipart upload.
+        upload_id (str): The S3 multipart upload ID.
+    """
+    key: str
+    upload_id: str
+
+
 # Dependency function for S3 service (can be expanded for testing)
 def get_s3_service():
     """
@@ -135,13 +417,278 @@ async def generate_upload_url(
         HTTPException: For AWS errors or invalid requests.
     """
     try:
-        result = s3_svc.generate_upload_url(request.filename, request.content_type)
+        result = await s3_svc.run(s3_svc.generate_upload_url, request.filename, request.content_type)
         return UploadURLResponse(**result)
     except ClientError as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate upload URL: {str(e)}"
         )
+    except S3UnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
+@router.post("/upload-urls", response_model=UploadURLsResponse)
+async def generate_upload_urls(
+    request: UploadURLsRequest,
+    s3_svc = Depends(get_s3_service)
+):
+    """
+    Generate presigned upload URLs for many files in one request.
+
+    Lets a multi-file drop obtain every upload URL and key with a single
+    round trip instead of one request per file.
+
+    Args:
+        request (UploadURLsRequest): Filenames and content types.
+        s3_svc: Injected S3 service instance.
+
+    Returns:
+        UploadURLsResponse: Presigned upload URLs in request order.
+
+    Raises:
+        HTTPException: For empty or oversized batches and AWS errors.
+    """
+    if not request.files:
+        raise HTTPException(status_code=400, detail="Files are required")
+    if len(request.files) > settings.PRESIGN_BATCH_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.PRESIGN_BATCH_MAX} upload URLs can be generated per request"
+        )
+
+    try:
+        uploads = await s3_svc.run(
+            s3_svc.generate_upload_urls,
+            [(file.filename, file.content_type) for file in request.files]
+        )
+        return UploadURLsResponse(uploads=uploads, count=len(uploads))
+    except ClientError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate upload URLs: {str(e)}"
+        )
+    except S3UnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
+@router.post("/upload", response_model=UploadResponse)
+async def upload_file(
+    request: Request,
+    s3_svc = Depends(get_s3_service)
+):
+    """
+    Upload a file through the server as multipart/form-data.
+
+    The body is parsed as it arrives and the file (form field ``file``) is
+    sent to S3 in parts of UPLOAD_PART_SIZE bytes, UPLOAD_PART_CONCURRENCY
+    at a time. Nothing is buffered beyond the parts in flight, so files of
+    any size use bounded memory and no disk. The key follows the same
+    key layout as presigned uploads.
+
+    Args:
+        request (Request): The incoming request, read as a stream.
+        s3_svc: Injected S3 service instance.
+
+    Returns:
+        UploadResponse: Key, size, ETag, content type and part count.
+
+    Raises:
+        HTTPException: 400 for malformed forms, 413 for oversized files,
+            500 for AWS errors.
+    """
+    try:
+        result = await upload_form_file(
+            s3_svc,
+            request.stream(),
+            request.headers.get("content-type", ""),
+            field_name="file",
+            part_size=settings.UPLOAD_PART_SIZE,
+            concurrency=settings.UPLOAD_PART_CONCURRENCY
+        )
+        return UploadResponse(**result)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ClientError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to upload file: {str(e)}"
+        )
+    except S3UnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
+@router.post("/multipart-uploads", response_model=MultipartUploadResponse)
+async def create_multipart_upload(
+    request: MultipartUploadRequest,
+    s3_svc = Depends(get_s3_service)
+):
+    """
+    Start a multipart upload for a large file.
+
+    The part size is computed from the declared file size. The client then
+    presigns parts, uploads them in parallel (retrying only failed parts) and
+    completes or aborts the upload.
+
+    Args:
+        request (MultipartUploadRequest): Filename, content type and size.
+        s3_svc: Injected S3 service instance.
+
+    Returns:
+        MultipartUploadResponse: Upload ID, key and part plan.
+
+    Raises:
+        HTTPException: For invalid sizes or AWS errors.
+    """
+    try:
+        result = await s3_svc.run(
+            s3_svc.create_multipart_upload, request.filename, request.content_type, request.file_size
+        )
+        return MultipartUploadResponse(**result)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ClientError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to create multipart upload: {str(e)}"
+        )
+    except S3UnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
+@router.post("/multipart-uploads/parts", response_model=PartURLsResponse)
+async def generate_part_urls(
+    request: PartURLsRequest,
+    s3_svc = Depends(get_s3_service)
+):
+    """
+    Presign upload URLs for many parts of a multipart upload in one call.
+
+    Args:
+        request (PartURLsRequest): Key, upload ID and part numbers.
+        s3_svc: Injected S3 service instance.
+
+    Returns:
+        PartURLsResponse: One presigned PUT URL per part.
+
+    Raises:
+        HTTPException: For invalid part numbers or AWS errors.
+    """
+    if not request.part_numbers or any(not 1 <= number <= 10000 for number in request.part_numbers):
+        raise HTTPException(status_code=400, detail="Part numbers must be between 1 and 10000")
+    if len(request.part_numbers) > settings.PRESIGN_BATCH_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.PRESIGN_BATCH_MAX} parts can be presigned per request"
+        )
+
+    try:
+        parts = await s3_svc.run(s3_svc.generate_part_urls, request.key, request.upload_id, request.part_numbers)
+        return PartURLsResponse(parts=parts, expires_in=settings.PRESIGNED_URL_EXPIRE)
+    except S3UnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
+@router.post("/multipart-uploads/complete", response_model=CompleteMultipartResponse)
+async def complete_multipart_upload(
+    request: CompleteMultipartRequest,
+    s3_svc = Depends(get_s3_service)
+):
+    """
+    Complete a multipart upload once every part has been uploaded.
+
+    Args:
+        request (CompleteMultipartRequest): Key, upload ID and uploaded parts.
+        s3_svc: Injected S3 service instance.
+
+    Returns:
+        CompleteMultipartResponse: Key and ETag of the assembled object.
+
+    Raises:
+        HTTPException: For missing parts or AWS errors.
+    """
+    if not request.parts:
+        raise HTTPException(status_code=400, detail="Parts are required")
+
+    try:
+        result = await s3_svc.run(
+            s3_svc.complete_multipart_upload,
+            request.key,
+            request.upload_id,
+            [part.model_dump() for part in request.parts]
+        )
+        return CompleteMultipartResponse(**result)
+    except ClientError as e:
+        code = e.response.get('Error', {}).get('Code')
+        raise HTTPException(
+            status_code=400 if code in ("InvalidPart", "InvalidPartOrder", "NoSuchUpload", "EntityTooSmall") else 500,
+            detail=f"Failed to complete multipart upload: {str(e)}"
+        )
+    except S3UnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
+@router.post("/multipart-uploads/abort", response_model=DeleteResponse)
+async def abort_multipart_upload(
+    request: AbortMultipartRequest,
+    s3_svc = Depends(get_s3_service)
+):
+    """
+    Abort a multipart upload and discard any uploaded parts.
+
+    Args:
+        request (AbortMultipartRequest): Key and upload ID.
+        s3_svc: Injected S3 service instance.
+
+    Returns:
+        DeleteResponse: Confirmation of the abort.
+
+    Raises:
+        HTTPException: For AWS errors.
+    """
+    try:
+        result = await s3_svc.run(s3_svc.abort_multipart_upload, request.key, request.upload_id)
+        return DeleteResponse(**result)
+    except ClientError as e:
+        code = e.response.get('Error', {}).get('Code')
+        raise HTTPException(
+            status_code=404 if code == "NoSuchUpload" else 500,
+            detail=f"Failed to abort multipart upload: {str(e)}"
+        )
+    except S3UnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -157,6 +704,9 @@ async def generate_download_url(
     """
     Generate a presigned URL for downloading a file from S3.
 
+    Unless DOWNLOAD_URL_VERIFY_EXISTS is disabled, the object's existence is
+    checked through the metadata cache and missing keys return 404.
+
     Args:
         key (str): S3 object key (supports paths with slashes).
         s3_svc: Injected S3 service instance.
@@ -171,13 +721,222 @@ async def generate_download_url(
         raise HTTPException(status_code=400, detail="Key is required")
 
     try:
-        result = s3_svc.generate_download_url(key)
+        result = await s3_svc.run(
+            s3_svc.generate_download_url, key, verify_exists=settings.DOWNLOAD_URL_VERIFY_EXISTS
+        )
         return DownloadURLResponse(**result)
     except ClientError as e:
         raise HTTPException(
             status_code=404 if "NoSuchKey" in str(e) else 500,
             detail=f"Failed to generate download URL: {str(e)}"
         )
+    except S3UnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
+@router.post("/download-urls", response_model=DownloadURLsResponse)
+async def generate_download_urls(
+    request: DownloadURLsRequest,
+    s3_svc = Depends(get_s3_service)
+):
+    """
+    Generate presigned download URLs for many files in one request.
+
+    Lets the gallery presign a whole page of thumbnails with a single round
+    trip instead of one request per tile.
+
+    Args:
+        request (DownloadURLsRequest): Keys to presign.
+        s3_svc: Injected S3 service instance.
+
+    Returns:
+        DownloadURLsResponse: Presigned download URLs in request order.
+
+    Raises:
+        HTTPException: For empty or oversized batches and AWS errors.
+    """
+    if not request.keys or any(not key for key in request.keys):
+        raise HTTPException(status_code=400, detail="Keys are required")
+    if len(request.keys) > settings.PRESIGN_BATCH_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.PRESIGN_BATCH_MAX} keys can be presigned per request"
+        )
+
+    try:
+        urls = await s3_svc.run(s3_svc.generate_download_urls, request.keys)
+        return DownloadURLsResponse(urls=urls, count=len(urls))
+    except ClientError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate download URLs: {str(e)}"
+        )
+    except S3UnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
+def _stream_headers(response: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Build response headers for a proxied get_object response.
+    """
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(response['ContentLength'])
+    }
+    if response.get('ContentRange'):
+        headers["Content-Range"] = response['ContentRange']
+    if response.get('ETag'):
+        headers["ETag"] = response['ETag']
+    if response.get('LastModified'):
+        headers["Last-Modified"] = format_datetime(response['LastModified'], usegmt=True)
+    return headers
+
+
+@router.get("/stream/{key:path}")
+async def stream_file(
+    key: str,
+    range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    s3_svc = Depends(get_s3_service)
+):
+    """
+    Stream an object's bytes through the API.
+
+    For clients that cannot reach S3 directly. The body is relayed in
+    STREAM_CHUNK_SIZE chunks, so memory per request stays constant. A single
+    byte Range is forwarded to S3 and answered with 206, so video players
+    can seek; If-None-Match is answered with 304 when the ETag matches.
+
+    Args:
+        key (str): S3 object key (supports paths with slashes).
+        range (str, optional): HTTP Range header; multi-range requests are
+            served in full.
+        if_none_match (str, optional): HTTP If-None-Match header.
+        s3_svc: Injected S3 service instance.
+
+    Returns:
+        StreamingResponse: The object body with its content headers.
+
+    Raises:
+        HTTPException: 404 for missing keys, 416 for unsatisfiable ranges,
+            503 when STREAM_MAX_CONCURRENT streams are active, 500 for AWS errors.
+    """
+    if not key:
+        raise HTTPException(status_code=400, detail="Key is required")
+
+    if _stream_slots.locked():
+        raise HTTPException(
+            status_code=503,
+            detail="Too many concurrent streams",
+            headers={"Retry-After": "1"}
+        )
+    await _stream_slots.acquire()
+
+    byte_range = range if range and _SINGLE_RANGE.match(range.replace(" ", "")) else None
+
+    try:
+        response = await s3_svc.run(s3_svc.open_object, key, byte_range, if_none_match)
+    except ClientError as e:
+        _stream_slots.release()
+        code = e.response.get('Error', {}).get('Code')
+        if code in ("304", "NotModified"):
+            return Response(status_code=304, headers={"ETag": if_none_match} if if_none_match else None)
+        if code == "InvalidRange":
+            raise HTTPException(status_code=416, detail="Requested range not satisfiable")
+        raise HTTPException(
+            status_code=404 if code in ("NoSuchKey", "404") else 500,
+            detail=f"Failed to stream object: {str(e)}"
+        )
+    except S3UnavailableError:
+        _stream_slots.release()
+        raise
+    except Exception as e:
+        _stream_slots.release()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+    # The slot is released once the body is closed, which waits for a read
+    # in progress when the client disconnects mid-chunk
+    stream = s3_svc.stream_body(response['Body'], settings.STREAM_CHUNK_SIZE, on_close=_stream_slots.release)
+
+    return StreamingResponse(
+        stream.chunks(),
+        status_code=206 if response.get('ContentRange') else 200,
+        media_type=response.get('ContentType', 'application/octet-stream'),
+        headers=_stream_headers(response),
+        # Also covers clients that disconnect before the body is iterated
+        background=BackgroundTask(stream.close)
+    )
+
+
+@router.get("/thumbnail/{key:path}", response_model=ThumbnailResponse)
+async def get_thumbnail_url(
+    key: str,
+    w: Optional[int] = Query(None, description="Maximum thumbnail width"),
+    h: Optional[int] = Query(None, description="Maximum thumbnail height"),
+    format: Optional[str] = Query(None, description="Output format: jpeg, png or webp"),
+    s3_svc = Depends(get_s3_service)
+):
+    """
+    Get a presigned URL for a thumbnail of an image.
+
+    Thumbnails live under deterministic keys derived from the source key,
+    its ETag and the requested box, so repeated requests reuse the same
+    object. A missing thumbnail is rendered once, even when many requests
+    ask for it at the same time. Without ``w`` or ``h`` the width defaults
+    to THUMBNAIL_DEFAULT_WIDTH.
+
+    Args:
+        key (str): S3 key of the source image (supports paths with slashes).
+        w (int, optional): Maximum width in pixels.
+        h (int, optional): Maximum height in pixels.
+        format (str, optional): Output format.
+        s3_svc: Injected S3 service instance.
+
+    Returns:
+        ThumbnailResponse: Presigned URL and key of the thumbnail.
+
+    Raises:
+        HTTPException: 400 for invalid parameters, 404 if the source does
+            not exist, 422 if it cannot be turned into a thumbnail, 500 for
+            AWS errors.
+    """
+    if not key:
+        raise HTTPException(status_code=400, detail="Key is required")
+    if w is None and h is None:
+        w = settings.THUMBNAIL_DEFAULT_WIDTH
+
+    try:
+        image_ops.validate_params("thumbnail", {"width": w, "height": h, "format": format})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        result = await derivative_cache.get_thumbnail_url(key, w, h, format)
+        return ThumbnailResponse(**result)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Cannot create thumbnail: {str(e)}")
+    except ClientError as e:
+        if "NoSuchKey" in str(e):
+            raise HTTPException(status_code=404, detail=f"Object '{key}' not found")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get thumbnail: {str(e)}"
+        )
+    except S3UnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -186,30 +945,333 @@ async def generate_download_url(
 
 
 @router.get("/files", response_model=ListObjectsResponse)
-async def list_files(s3_svc = Depends(get_s3_service)):
+async def list_files(
+    prefix: Optional[str] = Query(None, description="Only list keys starting with this prefix"),
+    limit: int = Query(1000, ge=1, le=1000, description="Maximum number of objects per page"),
+    continuation_token: Optional[str] = Query(None, description="Cursor returned by the previous page"),
+    start_after: Optional[str] = Query(None, description="Only list keys after this key"),
+    stream: bool = Query(False, description="Stream every object as NDJSON instead of one page"),
+    include_urls: bool = Query(False, description="Embed a presigned download URL in every object"),
+    fields: Optional[str] = Query(None, description="Comma-separated object fields to return, e.g. key,size"),
+    sort: Optional[str] = Query(None, description="Catalog sort: key, size, last_modified or filename"),
+    order: str = Query("asc", pattern="^(asc|desc)$", description="Sort order for catalog queries"),
+    q: Optional[str] = Query(None, min_length=1, description="Search the original filenames in the catalog"),
+    content_type: Optional[str] = Query(None, description="Catalog filter: image/png, or a family such as image/"),
+    modified_after: Optional[datetime] = Query(None, description="Catalog filter: modified at or after (ISO 8601)"),
+    modified_before: Optional[datetime] = Query(None, description="Catalog filter: modified before (ISO 8601)"),
+    accept_encoding: Optional[str] = Header(None),
+    s3_svc = Depends(get_s3_service)
+):
     """
-    List all files in the configured S3 bucket.
+    List files in the configured S3 bucket.
+
+    By default a single page of up to ``limit`` objects is returned together
+    with a continuation token for the next page. With ``stream=true`` the whole
+    listing is walked page by page and sent as newline-delimited JSON, one
+    object per line, so memory stays flat regardless of bucket size.
+
+    Listings are encoded directly with orjson instead of being validated
+    into models, ``fields`` trims each object to the named fields, and
+    responses of at least LISTING_GZIP_MIN_BYTES (and every stream) are
+    gzipped when the client accepts it.
 
-    Returns a list of all objects with their metadata. Note: This implementation
-    returns the first 1000 objects; pagination can be added in Phase 3 if needed.
+    Any of ``sort``, ``q``, ``content_type``, ``modified_after`` or
+    ``modified_before`` turns the request into a catalog query: it is
+    answered from the local object catalog's indexes without calling S3,
+    objects include their content type, and ``continuation_token`` is the
+    keyset cursor returned by the previous page.
+
+    A date prefix such as ``uploads/2024-03-09/`` lists that day across
+    every shard of a sharded key layout, in key order.
 
     Args:
+        prefix (str, optional): Key prefix filter.
+        limit (int): Page size (1-1000). Ignored in stream mode.
+        continuation_token (str, optional): Cursor from a previous response.
+            Ignored in stream mode.
+        start_after (str, optional): Only list keys after this key.
+        stream (bool): Whether to stream the full listing as NDJSON.
+        include_urls (bool): Whether to embed presigned download URLs, saving
+            one download-url request per file.
+        fields (str, optional): Object fields to include; all when omitted.
+        sort (str, optional): Catalog sort field.
+        order (str): 'asc' or 'desc'.
+        q (str, optional): Case-insensitive substring of the original filename.
+        content_type (str, optional): Exact content type or family.
+        modified_after (datetime, optional): Inclusive lower time bound.
+        modified_before (datetime, optional): Exclusive upper time bound.
+        accept_encoding (str, optional): Accept-Encoding request header.
         s3_svc: Injected S3 service instance.
 
     Returns:
-        ListObjectsResponse: List of files with count.
+        Response | StreamingResponse: One page of files in the
+        ListObjectsResponse format, or the NDJSON stream of all files.
 
     Raises:
-        HTTPException: For AWS errors.
+        HTTPException: 400 for unknown fields or invalid catalog queries,
+            500 for AWS errors.
     """
+    if any(value is not None for value in (sort, q, content_type, modified_after, modified_before)):
+        return await _query_catalog(
+            s3_svc, prefix, limit, continuation_token, start_after, stream, include_urls, fields,
+            sort or "key", order == "desc", q, content_type, modified_after, modified_before, accept_encoding
+        )
+
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if stream:
+        compress = accepts_gzip(accept_encoding)
+        return StreamingResponse(
+            ndjson_pages(s3_svc.stream_object_pages(prefix, start_after, include_urls), selected, compress),
+            media_type="application/x-ndjson",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"} if compress else None
+        )
+
     try:
-        result = s3_svc.list_objects()
-        return ListObjectsResponse(**result)
+        result = await s3_svc.list_page(
+            prefix=prefix,
+            limit=limit,
+            continuation_token=continuation_token,
+            start_after=start_after,
+            include_urls=include_urls
+        )
+        return json_response(
+            {**result, "objects": project(result["objects"], selected)},
+            accept_encoding,
+            settings.LISTING_GZIP_MIN_BYTES
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except ClientError as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to list objects: {str(e)}"
         )
+    except S3UnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
+async def _query_catalog(
+    s3_svc,
+    prefix: Optional[str],
+    limit: int,
+    continuation_token: Optional[str],
+    start_after: Optional[str],
+    stream: bool,
+    include_urls: bool,
+    fields: Optional[str],
+    sort: str,
+    descending: bool,
+    q: Optional[str],
+    content_type: Optional[str],
+    modified_after: Optional[datetime],
+    modified_before: Optional[datetime],
+    accept_encoding: Optional[str]
+) -> Response:
+    """
+    Answer GET /media/files from the object catalog.
+
+    The query runs on a worker thread, not the S3 executor, so it never
+    waits behind S3 calls.
+
+    Raises:
+        HTTPException: 400 for invalid catalog queries or when the catalog
+            is disabled.
+    """
+    if s3_svc.catalog is None:
+        raise HTTPException(status_code=400, detail="The object catalog is disabled")
+    if stream or start_after:
+        raise HTTPException(
+            status_code=400,
+            detail="stream and start_after cannot be combined with catalog queries; use continuation_token"
+        )
+    if sort not in SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Unknown sort '{sort}'. Use one of: {', '.join(SORT_COLUMNS)}.")
+    try:
+        selected = parse_fields(fields, CATALOG_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        result = await asyncio.to_thread(
+            s3_svc.catalog.query,
+            prefix=s3_svc.key_layout.expand_prefix(prefix),
+            q=q,
+            content_type=content_type,
+            modified_after=modified_after,
+            modified_before=modified_before,
+            sort=sort,
+            descending=descending,
+            limit=limit,
+            cursor=continuation_token
+        )
+        objects = result["objects"]
+        if include_urls and objects:
+            urls = await s3_svc.run(s3_svc.generate_download_urls, [obj["key"] for obj in objects])
+            for obj, url in zip(objects, urls):
+                obj["download_url"] = url["download_url"]
+        return json_response(
+            {
+                "objects": project(objects, selected),
+                "count": result["count"],
+                "is_truncated": result["is_truncated"],
+                "next_continuation_token": result["next_cursor"]
+            },
+            accept_encoding,
+            settings.LISTING_GZIP_MIN_BYTES
+        )
+    except S3UnavailableError:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to query the catalog: {str(e)}"
+        )
+
+
+@router.post("/files/bulk-delete", response_model=BulkDeleteResponse)
+async def bulk_delete_files(
+    request: BulkDeleteRequest,
+    s3_svc = Depends(get_s3_service)
+):
+    """
+    Delete many files from the S3 bucket in one request.
+
+    Keys are grouped into DeleteObjects calls of up to 1000 keys that run
+    concurrently. In prefix mode the listing is streamed straight into
+    delete batches, e.g. ``{"prefix": "uploads/2024-01-01/"}`` removes a
+    day's uploads. Failures are reported per key rather than failing the
+    whole request.
+
+    Args:
+        request (BulkDeleteRequest): Keys or prefix to delete.
+        s3_svc: Injected S3 service instance.
+
+    Returns:
+        BulkDeleteResponse: Number of deleted objects and per-key errors.
+
+    Raises:
+        HTTPException: For invalid requests or AWS errors.
+    """
+    if (request.keys is None) == (request.prefix is None):
+        raise HTTPException(status_code=400, detail="Provide either keys or prefix")
+    if request.prefix is not None and not request.prefix:
+        raise HTTPException(status_code=400, detail="Prefix must not be empty")
+    if request.keys is not None:
+        if not request.keys or any(not key for key in request.keys):
+            raise HTTPException(status_code=400, detail="Keys are required")
+        if len(request.keys) > settings.BULK_DELETE_MAX_KEYS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {settings.BULK_DELETE_MAX_KEYS} keys can be deleted per request"
+            )
+
+    try:
+        if request.prefix is not None:
+            result = await s3_svc.delete_prefix(request.prefix)
+        else:
+            result = await s3_svc.bulk_delete(request.keys)
+        return BulkDeleteResponse(**result)
+    except ClientError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to delete objects: {str(e)}"
+        )
+    except S3UnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
+@router.get("/files/{key:path}/metadata", response_model=ObjectMetadataResponse)
+async def get_file_metadata(
+    key: str,
+    s3_svc = Depends(get_s3_service)
+):
+    """
+    Get an object's size, content type, ETag and last-modified time.
+
+    Backed by a HEAD request behind a TTL cache that also remembers missing
+    keys, so repeated lookups cost no S3 round trip.
+
+    Args:
+        key (str): S3 object key (supports paths with slashes).
+        s3_svc: Injected S3 service instance.
+
+    Returns:
+        ObjectMetadataResponse: The object's metadata.
+
+    Raises:
+        HTTPException: 404 if the object does not exist, 500 for AWS errors.
+    """
+    if not key:
+        raise HTTPException(status_code=400, detail="Key is required")
+
+    try:
+        result = await s3_svc.run(s3_svc.get_object_metadata, key)
+        return ObjectMetadataResponse(**result)
+    except ClientError as e:
+        raise HTTPException(
+            status_code=404 if "NoSuchKey" in str(e) else 500,
+            detail=f"Failed to get object metadata: {str(e)}"
+        )
+    except S3UnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
+@router.post("/files/{key:path}/confirm", response_model=ObjectMetadataResponse)
+async def confirm_upload(
+    key: str,
+    s3_svc = Depends(get_s3_service)
+):
+    """
+    Confirm that an upload through a presigned URL finished.
+
+    The object is looked up in S3 and recorded in the object catalog, so it
+    shows up in catalog queries at once instead of after the next
+    reconciliation run.
+
+    Args:
+        key (str): S3 object key (supports paths with slashes).
+        s3_svc: Injected S3 service instance.
+
+    Returns:
+        ObjectMetadataResponse: The uploaded object's metadata.
+
+    Raises:
+        HTTPException: 404 if the object does not exist, 500 for AWS errors.
+    """
+    if not key:
+        raise HTTPException(status_code=400, detail="Key is required")
+
+    try:
+        result = await s3_svc.run(s3_svc.confirm_upload, key)
+        return ObjectMetadataResponse(**result)
+    except ClientError as e:
+        raise HTTPException(
+            status_code=404 if "NoSuchKey" in str(e) else 500,
+            detail=f"Failed to confirm upload: {str(e)}"
+        )
+    except S3UnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -239,13 +1301,15 @@ async def delete_file(
         raise HTTPException(status_code=400, detail="Key is required")
 
     try:
-        result = s3_svc.delete_object(key)
+        result = await s3_svc.run(s3_svc.delete_object, key)
         return DeleteResponse(**result)
     except ClientError as e:
         raise HTTPException(
             status_code=404 if "NoSuchKey" in str(e) else 500,
             detail=f"Failed to delete object: {str(e)}"
         )
+    except S3UnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -0,0 +1,134 @@
+"""
+Processing router for server-side media jobs.
+
+Provides endpoints to queue image resize and thumbnail jobs and to poll
+their status. Jobs run on the processing engine's worker processes and
+write their derivative next to the source object.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from services.processing import processing_engine
+
+
+class ProcessingJobRequest(BaseModel):
+    """
+    Request model for queueing a processing job.
+
+    Attributes:
+        key (str): The S3 key of the source image.
+        operation (str): 'resize' or 'thumbnail'.
+        params (dict): Operation parameters. 'resize' takes 'width' and/or
+            'height' and 'keep_aspect'; 'thumbnail' takes 'size'. Both take
+            an optional output 'format' ('jpeg', 'png' or 'webp').
+    """
+    key: str
+    operation: str
+    params: Dict[str, Any] = {}
+
+
+class ProcessingJobResponse(BaseModel):
+    """
+    Response model describing a processing job.
+
+    Attributes:
+        job_id (str): The job ID used to poll its status.
+        key (str): The S3 key of the source image.
+        operation (str): The operation applied.
+        params (dict): The normalized operation parameters.
+        status (str): 'queued', 'running', 'succeeded' or 'failed'.
+        output_key (str): The S3 key the derivative is written to.
+        error (str, optional): Why the job failed.
+        created_at (str): ISO timestamp when the job was queued.
+        started_at (str, optional): ISO timestamp when processing started.
+        finished_at (str, optional): ISO timestamp when the job finished.
+    """
+    job_id: str
+    key: str
+    operation: str
+    params: Dict[str, Any]
+    status: str
+    output_key: str
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
+# Create the router
+router = APIRouter(
+    prefix="/media/jobs",
+    tags=["processing"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+def get_processing_engine():
+    """
+    Dependency injection for the processing engine.
+
+    Returns:
+        ProcessingEngine: The singleton processing engine.
+    """
+    return processing_engine
+
+
+@router.post("", response_model=ProcessingJobResponse, status_code=202)
+async def create_job(
+    request: ProcessingJobRequest,
+    engine = Depends(get_processing_engine)
+):
+    """
+    Queue a resize or thumbnail job for an image in S3.
+
+    The job runs in the background; poll GET /media/jobs/{job_id} until its
+    status is 'succeeded' or 'failed'.
+
+    Args:
+        request (ProcessingJobRequest): Source key, operation and parameters.
+        engine: Injected processing engine.
+
+    Returns:
+        ProcessingJobResponse: The queued job.
+
+    Raises:
+        HTTPException: 400 for an empty key or invalid operation parameters.
+    """
+    if not request.key:
+        raise HTTPException(status_code=400, detail="Key is required")
+
+    try:
+        job = engine.submit(request.key, request.operation, request.params)
+        return ProcessingJobResponse(**job)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
+@router.get("/{job_id}", response_model=ProcessingJobResponse)
+async def get_job(
+    job_id: str,
+    engine = Depends(get_processing_engine)
+):
+    """
+    Get the status of a processing job.
+
+    Args:
+        job_id (str): The job ID returned when the job was queued.
+        engine: Injected processing engine.
+
+    Returns:
+        ProcessingJobResponse: The job's current status.
+
+    Raises:
+        HTTPException: 404 if the job is unknown or has expired.
+    """
+    job = engine.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return ProcessingJobResponse(**job)
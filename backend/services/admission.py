@@ -0,0 +1,378 @@
+"""
+Admission control module for S3-bound endpoints.
+
+Without limits, a burst from one client queues unboundedly in front of the
+S3 executor and raises latency for everyone. Admission control answers
+such bursts early instead:
+
+- each client has a token bucket; requests beyond its rate get 429,
+- each route has a concurrency limit; further requests wait in a FIFO
+  queue, and
+- requests that would wait longer than the latency target are shed with
+  503, at once when the expected wait already exceeds it.
+
+Both refusals carry a Retry-After hint. Limits are per worker process.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+
+from config import settings
+from services.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_QUEUE_WAIT,
+    ADMISSION_REJECTIONS,
+)
+
+# Rejection reasons, used in metrics and stats
+RATE_LIMITED = "rate_limited"
+QUEUE_FULL = "queue_full"
+OVERLOADED = "overloaded"
+QUEUE_TIMEOUT = "queue_timeout"
+
+# Weight of the latest request in the smoothed service time
+_SERVICE_TIME_ALPHA = 0.2
+
+
+class LoadShedError(Exception):
+    """
+    Raised when a request is refused to protect the latency of others.
+
+    Attributes:
+        reason (str): QUEUE_FULL, OVERLOADED or QUEUE_TIMEOUT.
+        retry_after (int): Suggested seconds before the client retries.
+    """
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Server is overloaded ({reason.replace('_', ' ')}); retry later")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ClientRateLimiter:
+    """
+    Token bucket per client.
+
+    Each client may burst up to ``burst`` requests and then make ``rate``
+    requests per second. Only the most recently seen ``max_clients`` buckets
+    are kept; an evicted client simply starts again with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: float, max_clients: int):
+        """
+        Args:
+            rate (float): Tokens added per second; 0 disables rate limiting.
+            burst (float): Bucket capacity.
+            max_clients (int): Number of client buckets kept.
+        """
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.max_clients = max_clients
+        self.limited = 0
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def acquire(self, client: str) -> float:
+        """
+        Take one token from a client's bucket.
+
+        Args:
+            client (str): Client identity.
+
+        Returns:
+            float: 0 if the request may proceed, otherwise seconds until
+                   the next token is available.
+        """
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / self.rate
+            self.limited += 1
+        self._buckets[client] = (tokens, now)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the configured rate and how often clients were limited.
+        """
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "clients": len(self._buckets),
+            "limited": self.limited
+        }
+
+    def clear(self) -> None:
+        """
+        Forget every client's bucket.
+        """
+        self._buckets.clear()
+
+
+class RouteLimiter:
+    """
+    Concurrency limit with a bounded FIFO queue for one route.
+
+    The expected queue wait is estimated from the smoothed service time of
+    recent requests: with ``n`` requests queued ahead and ``limit`` slots,
+    a new request waits about ``(n + 1) * service_time / limit``. Requests
+    whose estimate exceeds ``max_wait`` are shed immediately; the others
+    wait at most ``max_wait``.
+    """
+
+    def __init__(self, route: str, limit: int, max_queue: int, max_wait: float):
+        """
+        Args:
+            route (str): Route template, used as the metric label.
+            limit (int): Requests served concurrently.
+            max_queue (int): Requests allowed to wait for a slot.
+            max_wait (float): Latency target for the queue wait, in seconds.
+        """
+        self.route = route
+        self.limit = max(limit, 1)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.peak_queued = 0
+        self.service_time: Optional[float] = None
+        self.shed: Dict[str, int] = {QUEUE_FULL: 0, OVERLOADED: 0, QUEUE_TIMEOUT: 0}
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._queue_depth = ADMISSION_QUEUE_DEPTH.labels(route=route)
+        self._in_flight = ADMISSION_IN_FLIGHT.labels(route=route)
+        self._queue_wait = ADMISSION_QUEUE_WAIT.labels(route=route)
+
+    @property
+    def queued(self) -> int:
+        """
+        Requests currently waiting for a slot.
+        """
+        return len(self._waiters)
+
+    def estimated_wait(self) -> float:
+        """
+        Expected queue wait of a request arriving now, in seconds.
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            return 0.0
+        return (len(self._waiters) + 1) * (self.service_time or 0.0) / self.limit
+
+    async def acquire(self) -> float:
+        """
+        Wait for a concurrency slot.
+
+        Returns:
+            float: Seconds spent waiting.
+
+        Raises:
+            LoadShedError: If the queue is full, the expected wait exceeds
+                the latency target, or no slot freed up within it.
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self._take()
+            self._queue_wait.observe(0.0)
+            return 0.0
+        if len(self._waiters) >= self.max_queue:
+            raise self._shed(QUEUE_FULL)
+        if self.estimated_wait() > self.max_wait:
+            raise self._shed(OVERLOADED)
+
+        started = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.peak_queued = max(self.peak_queued, len(self._waiters))
+        self._queue_depth.inc()
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            raise self._shed(QUEUE_TIMEOUT)
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the client went away
+                self.release(None)
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._queue_depth.dec()
+        waited = time.perf_counter() - started
+        self._queue_wait.observe(waited)
+        return waited
+
+    def release(self, service_time: Optional[float]) -> None:
+        """
+        Free a slot, handing it to the oldest waiting request if any.
+
+        Args:
+            service_time (float, optional): Seconds the finished request
+                held the slot; updates the smoothed service time.
+        """
+        if service_time is not None:
+            self.service_time = service_time if self.service_time is None else (
+                _SERVICE_TIME_ALPHA * service_time + (1 - _SERVICE_TIME_ALPHA) * self.service_time
+            )
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot passes to the waiter; in_flight stays the same
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+        self._in_flight.dec()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report slots, queue depth, service time and shed requests.
+        """
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "peak_queued": self.peak_queued,
+            "service_time_ms": round(self.service_time * 1000, 2) if self.service_time is not None else None,
+            "estimated_wait_ms": round(self.estimated_wait() * 1000, 2),
+            "shed": dict(self.shed)
+        }
+
+    def _take(self) -> None:
+        self.in_flight += 1
+        self._in_flight.inc()
+
+    def _shed(self, reason: str) -> LoadShedError:
+        self.shed[reason] += 1
+        ADMISSION_REJECTIONS.labels(route=self.route, reason=reason).inc()
+        return LoadShedError(reason, max(1, math.ceil(self.estimated_wait())))
+
+
+class AdmissionController:
+    """
+    Decides which requests are admission controlled and holds the client
+    rate limiter and one RouteLimiter per route template.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: ClientRateLimiter,
+        route_concurrency: int,
+        route_limits: Dict[str, int],
+        max_queue: int,
+        max_wait: float,
+        route_prefix: str,
+        exempt_routes: Iterable[str],
+        client_header: str = ""
+    ):
+        """
+        Args:
+            rate_limiter (ClientRateLimiter): Per-client token buckets.
+            route_concurrency (int): Default concurrency limit per route.
+            route_limits (dict): Concurrency limits of specific route
+                templates, e.g. ``{"/media/files": 16}``.
+            max_queue (int): Requests allowed to wait per route.
+            max_wait (float): Latency target for the queue wait, in seconds.
+            route_prefix (str): Only routes under this prefix are controlled.
+            exempt_routes (Iterable[str]): Route templates never controlled,
+                such as long-polls and streams that have their own limits.
+            client_header (str): Request header identifying the client, e.g.
+                set by an API gateway; the peer address is used without it.
+        """
+        self.rate_limiter = rate_limiter
+        self.route_concurrency = route_concurrency
+        self.route_limits = dict(route_limits)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.route_prefix = route_prefix
+        self.exempt_routes = frozenset(exempt_routes)
+        self.client_header = client_header.lower().encode("latin-1")
+        self._routes: Dict[str, RouteLimiter] = {}
+
+    def controls(self, route: str) -> bool:
+        """
+        Whether requests to a route template are admission controlled.
+        """
+        return route.startswith(self.route_prefix) and route not in self.exempt_routes
+
+    def client_id(self, scope: Dict[str, Any]) -> str:
+        """
+        Identify the client of a request.
+
+        The configured header wins; for lists such as X-Forwarded-For the
+        first entry is used. Otherwise the peer address identifies it.
+        """
+        if self.client_header:
+            for name, value in scope.get("headers", ()):
+                if name == self.client_header:
+                    client = value.decode("latin-1").split(",")[0].strip()
+                    if client:
+                        return client
+        peer = scope.get("client")
+        return peer[0] if peer else "unknown"
+
+    def route(self, route: str) -> RouteLimiter:
+        """
+        The limiter of a route template, created on first use.
+        """
+        limiter = self._routes.get(route)
+        if limiter is None:
+            limiter = self._routes[route] = RouteLimiter(
+                route, self.route_limits.get(route, self.route_concurrency), self.max_queue, self.max_wait
+            )
+        return limiter
+
+    def rate_limited(self, client: str, route: str) -> Optional[int]:
+        """
+        Charge one request to a client's token bucket.
+
+        Returns:
+            int: Seconds to wait before retrying when the client is over
+                 its rate, otherwise None.
+        """
+        wait = self.rate_limiter.acquire(client)
+        if not wait:
+            return None
+        ADMISSION_REJECTIONS.labels(route=route, reason=RATE_LIMITED).inc()
+        return max(1, math.ceil(wait))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the client rate limiter and every route's queue.
+
+        Returns:
+            dict: 'clients' (rate limiter stats), 'max_wait_ms',
+                  'max_queue' and 'routes' keyed by route template.
+        """
+        return {
+            "clients": self.rate_limiter.stats(),
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "max_queue": self.max_queue,
+            "routes": {route: limiter.stats() for route, limiter in self._routes.items()}
+        }
+
+    def reset(self) -> None:
+        """
+        Forget client buckets and the limiters of idle routes.
+        """
+        self.rate_limiter.clear()
+        self._routes = {route: limiter for route, limiter in self._routes.items() if limiter.in_flight}
+
+
+# Singleton controller used by the admission middleware
+admission_controller = AdmissionController(
+    ClientRateLimiter(settings.ADMISSION_CLIENT_RATE, settings.ADMISSION_CLIENT_BURST, settings.ADMISSION_MAX_CLIENTS),
+    settings.ADMISSION_ROUTE_CONCURRENCY,
+    settings.ADMISSION_ROUTE_LIMITS,
+    settings.ADMISSION_MAX_QUEUE,
+    settings.ADMISSION_MAX_QUEUE_WAIT,
+    "/media",
+    settings.ADMISSION_EXEMPT_ROUTES,
+    settings.ADMISSION_CLIENT_HEADER
+)
@@ -0,0 +1,278 @@
+"""
+Bucket routing module for spreading objects over several S3 buckets.
+
+One bucket caps request rates and puts every object behind the same
+operational blast radius. With several buckets configured, each key is
+placed on a bucket by a consistent-hash ring: adding a bucket moves only
+about 1/N of the key space, and no bookkeeping is needed for new keys.
+Keys that live somewhere else than the ring says, because they were written
+before a bucket was added (or before sharding at all), are pinned to their
+bucket in a SQLite routing table, which is consulted before the ring.
+"""
+
+import bisect
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS routes (
+    key TEXT PRIMARY KEY,
+    bucket TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS routing_meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Keys per SQL statement; stays below SQLite's bound parameter limit
+_BATCH = 500
+
+
+class HashRing:
+    """
+    Consistent-hash ring of bucket names.
+
+    Each bucket is placed on the ring at ``replicas`` points so keys spread
+    evenly; a key belongs to the first bucket point at or after its hash.
+    """
+
+    def __init__(self, buckets: Sequence[str], replicas: int):
+        """
+        Args:
+            buckets (Sequence[str]): Bucket names, at least one.
+            replicas (int): Virtual nodes per bucket.
+
+        Raises:
+            ValueError: If no buckets are given or replicas is below 1.
+        """
+        if not buckets:
+            raise ValueError("At least one bucket is required")
+        if replicas < 1:
+            raise ValueError("S3_BUCKET_VNODES must be at least 1")
+        self.buckets = list(dict.fromkeys(buckets))
+        self.replicas = replicas
+        points = sorted(
+            (self._hash(f"{bucket}#{replica}"), bucket)
+            for bucket in self.buckets
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [bucket for _, bucket in points]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Identifies the ring's layout; it changes whenever keys would move.
+        """
+        return hashlib.sha256(f"{self.replicas}:{','.join(sorted(self.buckets))}".encode()).hexdigest()[:16]
+
+    def get(self, placement_key: str) -> str:
+        """
+        The bucket owning a key.
+        """
+        index = bisect.bisect_left(self._hashes, self._hash(placement_key))
+        return self._owners[index % len(self._owners)]
+
+
+class RoutingTable:
+    """
+    SQLite table of keys pinned to a bucket other than their ring bucket.
+
+    One connection is shared by all threads behind a lock and opened on
+    first use; WAL mode lets several workers share the file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Database file, or ':memory:' for a private table.
+        """
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def lookup(self, keys: Sequence[str]) -> Dict[str, str]:
+        """
+        Return the pinned bucket of each pinned key among keys.
+        """
+        pinned: Dict[str, str] = {}
+        with self._lock:
+            conn = self._connection()
+            for start in range(0, len(keys), _BATCH):
+                batch = keys[start:start + _BATCH]
+                pinned.update(conn.execute(
+                    f"SELECT key, bucket FROM routes WHERE key IN ({', '.join('?' * len(batch))})", batch
+                ).fetchall())
+        return pinned
+
+    def pin(self, routes: Iterable[Tuple[str, str]]) -> None:
+        """
+        Pin keys to buckets, replacing earlier pins.
+
+        Args:
+            routes (Iterable[tuple]): (key, bucket) pairs.
+        """
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO routes (key, bucket) VALUES (?, ?)", routes)
+
+    def unpin(self, keys: Sequence[str]) -> None:
+        """
+        Remove the pins of keys, e.g. once the objects are deleted.
+        """
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                for start in range(0, len(keys), _BATCH):
+                    batch = keys[start:start + _BATCH]
+                    conn.execute(f"DELETE FROM routes WHERE key IN ({', '.join('?' * len(batch))})", batch)
+
+    def get_meta(self, name: str) -> Optional[str]:
+        """
+        Read a bookkeeping value, e.g. the ring fingerprint of the last backfill.
+        """
+        with self._lock:
+            row = self._connection().execute("SELECT value FROM routing_meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, name: str, value: str) -> None:
+        """
+        Store a bookkeeping value.
+        """
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO routing_meta (name, value) VALUES (?, ?)", (name, value))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the number of pinned keys per bucket.
+
+        Returns:
+            dict: 'pinned' keys in total and 'by_bucket'.
+        """
+        with self._lock:
+            by_bucket = dict(self._connection().execute(
+                "SELECT bucket, COUNT(*) FROM routes GROUP BY bucket"
+            ).fetchall())
+        return {"pinned": sum(by_bucket.values()), "by_bucket": by_bucket}
+
+    def clear(self) -> None:
+        """
+        Remove every pin and bookkeeping value.
+        """
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM routes")
+                conn.execute("DELETE FROM routing_meta")
+
+
+class BucketRouter:
+    """
+    Maps object keys to buckets: a pinned bucket from the routing table
+    wins, otherwise the hash ring decides.
+
+    Keys under a colocated prefix are placed by their first folder below
+    it, so for example all derivatives of one source object share a bucket
+    and can be found with a single listing.
+    """
+
+    def __init__(
+        self,
+        buckets: Sequence[str],
+        replicas: int,
+        table: Optional[RoutingTable] = None,
+        colocate: Sequence[str] = ()
+    ):
+        """
+        Args:
+            buckets (Sequence[str]): Bucket names; the first is the primary.
+            replicas (int): Virtual nodes per bucket on the hash ring.
+            table (RoutingTable, optional): Pinned keys; needed only with
+                more than one bucket.
+            colocate (Sequence[str]): Prefixes whose first sub-folder is
+                placed as a whole.
+
+        Raises:
+            ValueError: If no buckets are given or replicas is below 1.
+        """
+        self.ring = HashRing(buckets, replicas)
+        self.buckets = self.ring.buckets
+        self.table = table
+        self.colocate = tuple(colocate)
+
+    @property
+    def sharded(self) -> bool:
+        """
+        Whether keys are spread over more than one bucket.
+        """
+        return len(self.buckets) > 1
+
+    def placement_key(self, key: str) -> str:
+        """
+        The part of a key that is hashed to pick its bucket.
+        """
+        for prefix in self.colocate:
+            if key.startswith(prefix):
+                end = key.find("/", len(prefix))
+                return key[:end] if end != -1 else key
+        return key
+
+    def place(self, key: str) -> str:
+        """
+        The ring bucket of a key, ignoring pins; used for new keys.
+        """
+        if not self.sharded:
+            return self.buckets[0]
+        return self.ring.get(self.placement_key(key))
+
+    def route(self, key: str) -> str:
+        """
+        The bucket holding a key.
+        """
+        return self.route_many([key])[0]
+
+    def route_many(self, keys: Sequence[str]) -> List[str]:
+        """
+        The bucket holding each key, with one routing table query.
+        """
+        if not self.sharded:
+            return [self.buckets[0]] * len(keys)
+        pinned = self.table.lookup(keys) if self.table is not None else {}
+        return [pinned.get(key) or self.place(key) for key in keys]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the buckets, ring layout and pinned keys.
+
+        Returns:
+            dict: 'buckets', 'vnodes', 'ring' fingerprint and, with more
+                  than one bucket, 'routing_table' stats.
+        """
+        stats: Dict[str, Any] = {
+            "buckets": self.buckets,
+            "vnodes": self.ring.replicas,
+            "ring": self.ring.fingerprint
+        }
+        if self.sharded and self.table is not None:
+            stats["routing_table"] = self.table.stats()
+        return stats
@@ -0,0 +1,504 @@
+"""
+Catalog module for a local, queryable index of bucket objects.
+
+S3 can only list keys in lexicographic order, so sorting by size, searching
+by original filename or filtering by date or content type would need a full
+bucket scan. This module keeps a SQLite catalog (WAL mode, so readers never
+block the writer) that the S3 service updates when upload URLs are issued,
+uploads are confirmed and objects are deleted. A reconciliation job keeps it
+in line with the bucket. Filename search uses an FTS5 trigram index when the
+SQLite build provides one and falls back to a LIKE scan otherwise.
+"""
+
+import base64
+import json
+import mimetypes
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+# Upload keys end in /<uuid4>-<original filename>, whatever the key layout
+_UUID_PREFIX = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}-")
+
+PENDING = "pending"
+PRESENT = "present"
+
+# Sort name -> ORDER BY expression; every sort is backed by an index
+SORT_COLUMNS = {
+    "key": "key",
+    "size": "size",
+    "last_modified": "last_modified",
+    "filename": "filename COLLATE NOCASE",
+}
+
+# Marks a catalog page cursor, as "after:" marks a merged S3 listing cursor
+CURSOR_PREFIX = "after:"
+
+# Type family ('image/') of a content type, indexed for family filters
+_FAMILY = "substr(content_type, 1, instr(content_type, '/'))"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    key TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    size INTEGER,
+    content_type TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    status TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS objects_status_key ON objects (status, key);
+CREATE INDEX IF NOT EXISTS objects_status_size ON objects (status, size);
+CREATE INDEX IF NOT EXISTS objects_status_modified ON objects (status, last_modified);
+CREATE INDEX IF NOT EXISTS objects_status_filename ON objects (status, filename COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS objects_status_type ON objects (status, content_type, last_modified);
+CREATE INDEX IF NOT EXISTS objects_status_family ON objects (status, {family}, last_modified);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS objects_fts USING fts5(
+    filename, content='objects', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS objects_fts_insert AFTER INSERT ON objects BEGIN
+    INSERT INTO objects_fts (rowid, filename) VALUES (new.rowid, new.filename);
+END;
+CREATE TRIGGER IF NOT EXISTS objects_fts_delete AFTER DELETE ON objects BEGIN
+    INSERT INTO objects_fts (objects_fts, rowid, filename) VALUES ('delete', old.rowid, old.filename);
+END;
+CREATE TRIGGER IF NOT EXISTS objects_fts_update AFTER UPDATE OF filename ON objects BEGIN
+    INSERT INTO objects_fts (objects_fts, rowid, filename) VALUES ('delete', old.rowid, old.filename);
+    INSERT INTO objects_fts (rowid, filename) VALUES (new.rowid, new.filename);
+END;
+"""
+
+_UPSERT_PRESENT = """
+INSERT INTO objects (key, filename, size, content_type, etag, last_modified, status, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, 'present', ?)
+ON CONFLICT (key) DO UPDATE SET
+    size = excluded.size,
+    content_type = {content_type},
+    etag = excluded.etag,
+    last_modified = excluded.last_modified,
+    status = 'present',
+    updated_at = excluded.updated_at
+"""
+
+
+# Granted only when the lease is free or expired
+_CLAIM_LEASE = """
+INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?)
+ON CONFLICT (name) DO UPDATE SET
+    holder = excluded.holder,
+    expires_at = excluded.expires_at
+WHERE leases.expires_at <= ?
+"""
+
+
+def original_filename(key: str) -> str:
+    """
+    The filename a key was uploaded with: its last segment without the
+    ``<uuid>-`` prefix added by build_upload_key.
+    """
+    name = key.rsplit("/", 1)[-1]
+    return _UUID_PREFIX.sub("", name, count=1)
+
+
+def _utc_iso(value: Any) -> Optional[str]:
+    """
+    Normalize a datetime or ISO string to a UTC ISO string, so stored
+    timestamps compare correctly as text.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def _prefix_range(prefix: str) -> Tuple[str, str]:
+    """
+    Bounds [low, high) covering every string starting with prefix, so prefix
+    filters can use an index.
+    """
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _encode_cursor(sort: str, value: Any, key: str) -> str:
+    """
+    Encode the position after a row as an opaque page cursor.
+    """
+    payload = json.dumps([sort, value, key], separators=(",", ":")).encode()
+    return CURSOR_PREFIX + base64.urlsafe_b64encode(payload).decode()
+
+
+def _decode_cursor(cursor: str, sort: str) -> Tuple[Any, str]:
+    """
+    Decode a page cursor issued for the same sort into (sort value, key).
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort.
+    """
+    try:
+        if not cursor.startswith(CURSOR_PREFIX):
+            raise ValueError
+        issued_for, value, key = json.loads(base64.urlsafe_b64decode(cursor[len(CURSOR_PREFIX):]))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid continuation_token for a catalog query")
+    expected = int if sort == "size" else str
+    if issued_for != sort or not isinstance(key, str) or not (
+        value is None or (isinstance(value, expected) and not isinstance(value, bool))
+    ):
+        raise ValueError("Invalid continuation_token for a catalog query")
+    return value, key
+
+
+def _after_clause(column: str, descending: bool, value: Any, key: str) -> Tuple[str, List[Any]]:
+    """
+    A WHERE clause for the rows after (value, key) in ORDER BY column, key.
+
+    SQLite sorts NULLs first, so they lead an ascending listing and close a
+    descending one; row-value comparisons never match them.
+    """
+    if value is None:
+        if descending:
+            return f"({column} IS NULL AND key < ?)", [key]
+        return f"(({column} IS NULL AND key > ?) OR {column} IS NOT NULL)", [key]
+    if descending:
+        return f"(({column}, key) < (?, ?) OR {column} IS NULL)", [value, key]
+    return f"({column}, key) > (?, ?)", [value, key]
+
+
+class ObjectCatalog:
+    """
+    SQLite-backed catalog of bucket objects.
+
+    Rows are 'pending' from the moment an upload URL is issued and become
+    'present' once the upload is confirmed or seen by reconciliation; only
+    present rows are returned by queries. One connection is shared by all
+    threads behind a lock and opened on first use.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Database file, or ':memory:' for a private catalog.
+        """
+        self.path = path
+        self.fts_enabled = False
+        self.last_reconciled_at: Optional[str] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(_SCHEMA.format(family=_FAMILY))
+            try:
+                conn.executescript(_FTS_SCHEMA)
+                self.fts_enabled = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5 trigram support; q falls back to LIKE
+                self.fts_enabled = False
+            self._conn = conn
+        return self._conn
+
+    def record_pending(self, uploads: Iterable[Tuple[str, str]]) -> None:
+        """
+        Record keys that upload URLs were issued for.
+
+        Args:
+            uploads (Iterable[tuple]): (key, content_type) pairs.
+        """
+        now = time.time()
+        rows = [(key, original_filename(key), content_type, now) for key, content_type in uploads]
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO objects (key, filename, content_type, status, updated_at) "
+                    "VALUES (?, ?, ?, 'pending', ?) "
+                    "ON CONFLICT (key) DO UPDATE SET content_type = excluded.content_type, "
+                    "updated_at = excluded.updated_at WHERE status = 'pending'",
+                    rows
+                )
+
+    def record_present(
+        self,
+        objects: Iterable[Dict[str, Any]],
+        guess_content_type: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Record objects known to exist in the bucket.
+
+        Args:
+            objects (Iterable[dict]): Objects with 'key', 'size', 'etag',
+                'last_modified' and optionally 'content_type'.
+            guess_content_type (bool): Listings carry no content type; when
+                set, keep the recorded type and guess one from the file
+                extension only for objects without it.
+
+        Returns:
+            list: The objects that were not yet present with the same ETag,
+                  with 'key', 'size', 'etag', 'last_modified' and
+                  'content_type', so callers can report them as created.
+        """
+        now = time.time()
+        rows = []
+        for obj in objects:
+            content_type = obj.get("content_type")
+            if content_type is None and guess_content_type:
+                content_type = mimetypes.guess_type(obj["key"])[0]
+            rows.append((
+                obj["key"], original_filename(obj["key"]), obj.get("size"), content_type,
+                obj.get("etag"), _utc_iso(obj.get("last_modified")), now
+            ))
+        sql = _UPSERT_PRESENT.format(
+            content_type="COALESCE(objects.content_type, excluded.content_type)" if guess_content_type
+            else "COALESCE(excluded.content_type, objects.content_type)"
+        )
+        with self._lock:
+            conn = self._connection()
+            existing = {}
+            for start in range(0, len(rows), 500):
+                keys = [row[0] for row in rows[start:start + 500]]
+                for key, status, etag, content_type in conn.execute(
+                    f"SELECT key, status, etag, content_type FROM objects WHERE key IN ({', '.join('?' * len(keys))})",
+                    keys
+                ):
+                    existing[key] = (status, etag, content_type)
+            with conn:
+                conn.executemany(sql, rows)
+
+        changed = []
+        for key, _, size, content_type, etag, last_modified, _ in rows:
+            status, known_etag, known_type = existing.get(key, (None, None, None))
+            if status == PRESENT and known_etag == etag:
+                continue
+            if known_type is not None and (guess_content_type or content_type is None):
+                content_type = known_type
+            changed.append({
+                "key": key, "size": size, "etag": etag, "last_modified": last_modified, "content_type": content_type
+            })
+        return changed
+
+    def remove(self, keys: Iterable[str]) -> None:
+        """
+        Forget deleted objects or abandoned uploads.
+
+        Args:
+            keys (Iterable[str]): The keys to remove.
+        """
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("DELETE FROM objects WHERE key = ?", [(key,) for key in keys])
+
+    def prune(self, seen_since: float, pending_before: float) -> Dict[str, Any]:
+        """
+        Finish a reconciliation run.
+
+        Removes present rows not confirmed since ``seen_since`` (the run's
+        start) and pending rows whose upload URL expired before
+        ``pending_before``.
+
+        Returns:
+            dict: 'deleted' keys of objects that are gone from the bucket and
+                  the number of 'expired' pending uploads.
+        """
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                deleted = [key for (key,) in conn.execute(
+                    "SELECT key FROM objects WHERE status = 'present' AND updated_at < ?", (seen_since,)
+                )]
+                conn.execute("DELETE FROM objects WHERE status = 'present' AND updated_at < ?", (seen_since,))
+                expired = conn.execute(
+                    "DELETE FROM objects WHERE status = 'pending' AND updated_at < ?", (pending_before,)
+                ).rowcount
+        self.last_reconciled_at = datetime.now().isoformat()
+        return {"deleted": deleted, "expired": expired}
+
+    def claim_lease(self, name: str, holder: str, expires_at: float) -> bool:
+        """
+        Take a named lease, shared by every process using the database
+        file, if nobody holds it.
+
+        Args:
+            name (str): The lease, e.g. 'reconcile'.
+            holder (str): Identifies the claiming process.
+            expires_at (float): Epoch time until which the lease is held.
+
+        Returns:
+            bool: Whether holder now holds the lease, i.e. it was free or
+                  had expired.
+        """
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                return conn.execute(_CLAIM_LEASE, (name, holder, expires_at, time.time())).rowcount == 1
+
+    def extend_lease(self, name: str, holder: str, expires_at: float) -> bool:
+        """
+        Move the expiry of a lease holder still holds.
+
+        Returns:
+            bool: Whether holder still held the lease.
+        """
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                return conn.execute(
+                    "UPDATE leases SET expires_at = ? WHERE name = ? AND holder = ?", (expires_at, name, holder)
+                ).rowcount == 1
+
+    def query(
+        self,
+        prefix: Union[str, Sequence[Optional[str]], None] = None,
+        q: Optional[str] = None,
+        content_type: Optional[str] = None,
+        modified_after: Optional[datetime] = None,
+        modified_before: Optional[datetime] = None,
+        sort: str = "key",
+        descending: bool = False,
+        limit: int = 1000,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Query present objects.
+
+        Pages are keyset-paginated: a cursor holds the sort value and key of
+        the last returned row, so each page is an index range scan and rows
+        written between pages neither repeat nor shift later pages.
+
+        Args:
+            prefix (str | list, optional): Only keys starting with this
+                prefix, or with any of these prefixes (e.g. every shard of
+                a key layout).
+            q (str, optional): Case-insensitive substring of the original
+                filename.
+            content_type (str, optional): Exact type ('image/png'), or a
+                family ending in '/' or '/*' ('image/').
+            modified_after (datetime, optional): Inclusive lower bound on
+                last-modified time (naive values are UTC).
+            modified_before (datetime, optional): Exclusive upper bound.
+            sort (str): One of SORT_COLUMNS.
+            descending (bool): Sort in descending order.
+            limit (int): Maximum number of objects to return.
+            cursor (str, optional): 'next_cursor' of the previous page.
+
+        Returns:
+            dict: 'objects' (with 'key', 'size', 'last_modified', 'etag' and
+                  'content_type'), 'count', 'is_truncated' and 'next_cursor'.
+
+        Raises:
+            ValueError: If sort is unknown or cursor is invalid for it.
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort '{sort}'. Use one of: {', '.join(SORT_COLUMNS)}.")
+        after = _decode_cursor(cursor, sort) if cursor is not None else None
+
+        where = ["status = 'present'"]
+        params: List[Any] = []
+        prefixes = [prefix] if isinstance(prefix, str) else list(prefix or [])
+        if prefixes and all(prefixes):
+            where.append("(" + " OR ".join(["(key >= ? AND key < ?)"] * len(prefixes)) + ")")
+            for each in prefixes:
+                params.extend(_prefix_range(each))
+        if content_type:
+            family = content_type[:-1] if content_type.endswith("/*") else content_type
+            if family.endswith("/"):
+                where.append(f"{_FAMILY} = ?")
+                params.append(family)
+            else:
+                where.append("content_type = ?")
+                params.append(content_type)
+        if modified_after is not None:
+            where.append("last_modified >= ?")
+            params.append(_utc_iso(modified_after))
+        if modified_before is not None:
+            where.append("last_modified < ?")
+            params.append(_utc_iso(modified_before))
+        if after is not None:
+            clause, values = _after_clause(SORT_COLUMNS[sort], descending, *after)
+            where.append(clause)
+            params.extend(values)
+
+        with self._lock:
+            conn = self._connection()
+            if q:
+                if self.fts_enabled and len(q) >= 3:
+                    where.append("rowid IN (SELECT rowid FROM objects_fts WHERE objects_fts MATCH ?)")
+                    params.append('"' + q.replace('"', '""') + '"')
+                else:
+                    where.append("filename LIKE ? ESCAPE '\\'")
+                    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                    params.append(f"%{escaped}%")
+
+            direction = "DESC" if descending else "ASC"
+            rows = conn.execute(
+                f"SELECT key, size, last_modified, etag, content_type, filename FROM objects "
+                f"WHERE {' AND '.join(where)} "
+                f"ORDER BY {SORT_COLUMNS[sort]} {direction}, key {direction} LIMIT ?",
+                (*params, limit + 1)
+            ).fetchall()
+
+        is_truncated = len(rows) > limit
+        objects = [
+            {"key": key, "size": size, "last_modified": last_modified, "etag": etag, "content_type": ctype}
+            for key, size, last_modified, etag, ctype, _ in rows[:limit]
+        ]
+        next_cursor = None
+        if is_truncated and objects:
+            last = rows[limit - 1]
+            value = {"key": last[0], "size": last[1], "last_modified": last[2], "filename": last[5]}[sort]
+            next_cursor = _encode_cursor(sort, value, last[0])
+        return {
+            "objects": objects,
+            "count": len(objects),
+            "is_truncated": is_truncated,
+            "next_cursor": next_cursor
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report catalog size and freshness.
+
+        Returns:
+            dict: 'objects' present, 'pending' uploads, 'fts_enabled' and
+                  'last_reconciled_at'.
+        """
+        with self._lock:
+            counts = dict(self._connection().execute(
+                "SELECT status, COUNT(*) FROM objects GROUP BY status"
+            ).fetchall())
+        return {
+            "objects": counts.get(PRESENT, 0),
+            "pending": counts.get(PENDING, 0),
+            "fts_enabled": self.fts_enabled,
+            "last_reconciled_at": self.last_reconciled_at
+        }
+
+    def clear(self) -> None:
+        """
+        Remove every row.
+        """
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM objects")
+                conn.execute("DELETE FROM leases")
+        self.last_reconciled_at = None
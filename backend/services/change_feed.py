@@ -0,0 +1,250 @@
+"""
+Change feed module for incremental listing updates.
+
+Instead of re-fetching the whole listing after every upload or delete,
+clients keep a cursor and ask for the object created/deleted events that
+happened after it. Events are kept in a bounded in-memory ring buffer; a
+client whose cursor fell out of the buffer, or was issued by another
+process, is told to reset, i.e. reload the full listing once and continue
+from the returned cursor.
+"""
+
+import asyncio
+import threading
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+import orjson
+
+CREATED = "created"
+DELETED = "deleted"
+
+
+class ChangeFeed:
+    """
+    Thread-safe ring buffer of object change events.
+
+    Events are published from S3 executor threads and consumed by async
+    long-poll and SSE handlers, which are woken on their own event loop.
+    Cursors have the form ``<epoch>-<sequence>``; the epoch is random per
+    feed, so cursors from before a restart or from another worker are
+    recognized instead of silently skipping events.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity (int): Maximum number of events kept.
+        """
+        self.capacity = capacity
+        self.epoch = uuid.uuid4().hex[:12]
+        self._events: deque = deque(maxlen=capacity)
+        self._sequence = 0
+        self._resets = 0
+        self._lock = threading.Lock()
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = set()
+
+    def cursor(self) -> str:
+        """
+        The cursor after the latest event.
+        """
+        with self._lock:
+            return self._cursor(self._sequence)
+
+    def _cursor(self, sequence: int) -> str:
+        return f"{self.epoch}-{sequence}"
+
+    def publish(self, event_type: str, objects: Iterable[Dict[str, Any]]) -> None:
+        """
+        Append one event per object and wake waiting consumers.
+
+        Args:
+            event_type (str): CREATED or DELETED.
+            objects (Iterable[dict]): Objects with at least a 'key'; created
+                events also carry 'size', 'etag', 'last_modified' and
+                'content_type' when known.
+        """
+        at = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            published = False
+            for obj in objects:
+                self._sequence += 1
+                self._events.append((self._sequence, {
+                    "cursor": self._cursor(self._sequence),
+                    "type": event_type,
+                    "at": at,
+                    **obj
+                }))
+                published = True
+            if not published:
+                return
+            waiters, self._waiters = self._waiters, set()
+
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                # The waiter's event loop has already been closed
+                pass
+
+    def changes(self, since: Optional[str], limit: int) -> Dict[str, Any]:
+        """
+        Return the events after a cursor.
+
+        Args:
+            since (str, optional): A cursor from a previous response. When
+                omitted, no events are returned and the current cursor is
+                the starting point.
+            limit (int): Maximum number of events to return.
+
+        Returns:
+            dict: 'events' (oldest first), 'cursor' to pass as ``since``
+                  next, 'has_more' when more events are buffered, and
+                  'reset' when events were missed and the client must
+                  reload the full listing.
+
+        Raises:
+            ValueError: If since is not a cursor.
+        """
+        position = self.parse_cursor(since)
+        with self._lock:
+            if position is None:
+                return self._result([], self._sequence, False, reset=False)
+
+            epoch, sequence = position
+            oldest = self._events[0][0] if self._events else self._sequence + 1
+            if epoch != self.epoch or sequence > self._sequence or sequence < oldest - 1:
+                self._resets += 1
+                return self._result([], self._sequence, False, reset=True)
+
+            start = sequence - oldest + 1
+            buffered = list(islice(self._events, start, start + limit))
+            last = buffered[-1][0] if buffered else sequence
+            return self._result([event for _, event in buffered], last, last < self._sequence, reset=False)
+
+    async def wait(self, since: Optional[str], timeout: float, limit: int) -> Dict[str, Any]:
+        """
+        Long-poll for the events after a cursor.
+
+        Returns at once if events (or a reset) are available, otherwise when
+        the next event is published or after timeout seconds with no events.
+
+        Args:
+            since (str, optional): A cursor from a previous response.
+            timeout (float): Seconds to wait for an event.
+            limit (int): Maximum number of events to return.
+
+        Returns:
+            dict: The same shape as changes().
+
+        Raises:
+            ValueError: If since is not a cursor.
+        """
+        result = self.changes(since, limit)
+        if result["events"] or result["reset"] or timeout <= 0:
+            return result
+
+        since = result["cursor"]
+        loop = asyncio.get_running_loop()
+        waiter = (loop, loop.create_future())
+        with self._lock:
+            caught_up = self._cursor(self._sequence) == since
+            if caught_up:
+                self._waiters.add(waiter)
+        if caught_up:
+            try:
+                await asyncio.wait_for(waiter[1], timeout)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._lock:
+                    self._waiters.discard(waiter)
+        return self.changes(since, limit)
+
+    async def sse(self, since: Optional[str], heartbeat: float, limit: int) -> AsyncIterator[bytes]:
+        """
+        Encode the feed as a Server-Sent Events stream.
+
+        Each event is sent with its cursor as the SSE id, so a reconnecting
+        EventSource resumes through Last-Event-ID. A 'reset' event tells the
+        client to reload the listing; a comment line is sent every
+        heartbeat seconds without events to keep proxies from closing the
+        connection.
+
+        Args:
+            since (str, optional): Cursor to resume from; defaults to now.
+            heartbeat (float): Seconds between keep-alive comments.
+            limit (int): Maximum number of events per wake-up.
+
+        Yields:
+            bytes: SSE frames.
+
+        Raises:
+            ValueError: If since is not a cursor.
+        """
+        cursor = since if since is not None else self.cursor()
+        self.parse_cursor(cursor)
+        yield f"retry: 3000\nid: {cursor}\nevent: ready\ndata: {{}}\n\n".encode()
+        while True:
+            result = await self.wait(cursor, heartbeat, limit)
+            cursor = result["cursor"]
+            if result["reset"]:
+                yield f"id: {cursor}\nevent: reset\ndata: {{}}\n\n".encode()
+            elif not result["events"]:
+                yield b": keep-alive\n\n"
+            for event in result["events"]:
+                yield b"id: %s\nevent: %s\ndata: %s\n\n" % (
+                    event["cursor"].encode(), event["type"].encode(), orjson.dumps(event)
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report buffer usage for monitoring.
+
+        Returns:
+            dict: 'buffered' events, 'capacity', 'published' events in
+                  total, 'waiters' currently long-polling and 'resets'
+                  handed out.
+        """
+        with self._lock:
+            return {
+                "buffered": len(self._events),
+                "capacity": self.capacity,
+                "published": self._sequence,
+                "waiters": len(self._waiters),
+                "resets": self._resets
+            }
+
+    def _result(self, events: List[Dict[str, Any]], sequence: int, has_more: bool, reset: bool) -> Dict[str, Any]:
+        return {
+            "events": events,
+            "cursor": self._cursor(sequence),
+            "has_more": has_more,
+            "reset": reset
+        }
+
+    @staticmethod
+    def parse_cursor(cursor: Optional[str]) -> Optional[Tuple[str, int]]:
+        """
+        Split a cursor into its epoch and sequence number.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        if cursor is None:
+            return None
+        epoch, _, sequence = cursor.rpartition("-")
+        if not epoch or not sequence.isdigit():
+            raise ValueError(f"Invalid change cursor '{cursor}'")
+        return epoch, int(sequence)
+
+
+def _wake(future: asyncio.Future) -> None:
+    """
+    Resolve a waiter's future unless it already timed out.
+    """
+    if not future.done():
+        future.set_result(None)
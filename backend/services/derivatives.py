@@ -0,0 +1,148 @@
+"""
+Derivative cache module for thumbnails.
+
+Thumbnails are stored in S3 under deterministic keys built from the source
+key, the source's ETag and the transform parameters. A request for a
+thumbnail either finds the existing derivative (one cached HEAD) or renders
+it on the processing workers. Concurrent requests for the same missing
+derivative share a single render. Because the ETag is part of the key, a
+replaced source never serves an old thumbnail.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from botocore.exceptions import ClientError
+
+from services import image_ops
+from services.metrics import DERIVATIVE_REQUESTS
+from services.processing import ProcessingEngine, processing_engine
+from services.s3_service import S3Service, s3_service
+
+
+class DerivativeCache:
+    """
+    Serves presigned URLs for thumbnails, generating missing ones once.
+
+    Renders are keyed by derivative key; while one is running, further
+    requests for the same key wait for it instead of starting another.
+    """
+
+    def __init__(self, s3_svc: S3Service, engine: ProcessingEngine):
+        """
+        Args:
+            s3_svc (S3Service): Service used for lookups and presigning.
+            engine (ProcessingEngine): Engine that renders derivatives.
+        """
+        self.s3_svc = s3_svc
+        self.engine = engine
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def derivative_key(source_key: str, etag: str, operation: str, params: Dict[str, Any]) -> str:
+        """
+        Build the deterministic key of a derivative.
+
+        Args:
+            source_key (str): The source object key.
+            etag (str): The source object's ETag.
+            operation (str): 'resize' or 'thumbnail'.
+            params (dict): Parameters normalized by image_ops.validate_params.
+
+        Returns:
+            str: A key under the source's derivative folder, e.g.
+                 ``derivatives/<hash>/<etag>-thumbnail-256.jpg``.
+        """
+        if operation == "thumbnail":
+            transform = f"thumbnail-{image_ops.transform_suffix(params)}"
+        else:
+            transform = f"resize-{params['width'] or 'auto'}x{params['height'] or 'auto'}"
+            if not params["keep_aspect"]:
+                transform += "-exact"
+        extension = image_ops.OUTPUT_FORMATS[image_ops.output_format(source_key, params)][1]
+        version = etag.strip('"')
+        return f"{S3Service.derivative_prefix(source_key)}{version}-{transform}.{extension}"
+
+    async def get_thumbnail_url(
+        self,
+        key: str,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        output_format: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get a presigned URL for a thumbnail, rendering it if needed.
+
+        Args:
+            key (str): The source object key.
+            width (int, optional): Maximum thumbnail width.
+            height (int, optional): Maximum thumbnail height.
+            output_format (str, optional): 'jpeg' (default), 'png' or 'webp'.
+
+        Returns:
+            dict: Contains 'download_url', 'key' (the derivative's key),
+                  'expires_in', 'source_key' and 'generated' (whether this
+                  request waited for a render).
+
+        Raises:
+            ValueError: If the parameters are invalid, or the source is too
+                large or not a readable image.
+            ClientError: With code NoSuchKey if the source does not exist,
+                or if an S3 operation fails.
+        """
+        params = image_ops.validate_params("thumbnail", {
+            name: value for name, value in (("width", width), ("height", height), ("format", output_format))
+            if value is not None
+        })
+        source = await self.s3_svc.run(self.s3_svc.get_object_metadata, key)
+        derivative = self.derivative_key(key, source["etag"], "thumbnail", params)
+
+        generated = False
+        try:
+            result = await self.s3_svc.run(self.s3_svc.generate_download_url, derivative, True)
+            self.hits += 1
+            DERIVATIVE_REQUESTS.labels("hit").inc()
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "NoSuchKey":
+                raise
+            await self._render(key, params, derivative)
+            result = await self.s3_svc.run(self.s3_svc.generate_download_url, derivative)
+            generated = True
+
+        return {**result, "source_key": key, "generated": generated}
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report hit, render and coalescing counters.
+
+        Returns:
+            dict: 'hits', 'misses', 'coalesced' and 'in_flight' renders.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight)
+        }
+
+    async def _render(self, key: str, params: Dict[str, Any], derivative: str) -> None:
+        task = self._inflight.get(derivative)
+        if task is None:
+            self.misses += 1
+            DERIVATIVE_REQUESTS.labels("miss").inc()
+            # Thumbnails are cache entries, not files of their own
+            task = asyncio.create_task(self.engine.render(key, "thumbnail", params, derivative, publish=False))
+            self._inflight[derivative] = task
+            task.add_done_callback(lambda _: self._inflight.pop(derivative, None))
+        else:
+            self.coalesced += 1
+            DERIVATIVE_REQUESTS.labels("coalesced").inc()
+        # A disconnecting client must not cancel the render for the others
+        await asyncio.shield(task)
+
+
+# Singleton derivative cache for the application's S3 service
+derivative_cache = DerivativeCache(s3_service, processing_engine)
@@ -0,0 +1,63 @@
+"""
+Executor module for running blocking S3 calls off the event loop.
+
+boto3 is a synchronous SDK, so every S3 round trip blocks the calling thread.
+This module provides a bounded thread pool that the async FastAPI handlers use
+to offload those calls, keeping the event loop free to serve other requests.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class S3Executor:
+    """
+    Bounded thread pool for blocking S3 operations.
+
+    At most ``max_workers`` calls run at the same time; additional calls wait
+    in the pool queue without blocking the event loop.
+    """
+
+    def __init__(self, max_workers: int):
+        """
+        Create the worker pool.
+
+        Args:
+            max_workers (int): Maximum number of concurrent blocking calls.
+
+        Raises:
+            ValueError: If max_workers is not a positive integer.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-worker")
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking callable on the pool and await its result.
+
+        Args:
+            func (Callable): The blocking function to call.
+            *args: Positional arguments for func.
+            **kwargs: Keyword arguments for func.
+
+        Returns:
+            The return value of func. Exceptions raised by func propagate.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop accepting new work and release the worker threads.
+
+        Args:
+            wait (bool): Whether to wait for running calls to finish.
+        """
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,159 @@
+"""
+Health probing module for S3 connectivity.
+
+Instead of calling S3 on every health check request, a background task
+probes the bucket on a fixed interval and caches the outcome. Health and
+readiness endpoints read the cached status, so probes from Docker, load
+balancers and dashboards cost no S3 traffic and answer instantly.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from config import settings
+from services.s3_service import S3Service, s3_service
+
+
+class HealthProber:
+    """
+    Periodically checks S3 connectivity and caches the latest result.
+
+    The cached status records whether the last probe succeeded, the bucket
+    region or error message, the probe latency and when it was taken.
+    """
+
+    def __init__(self, s3_svc: S3Service, interval: float, timeout: float):
+        """
+        Configure the prober without starting it.
+
+        Args:
+            s3_svc (S3Service): The service whose bucket is probed.
+            interval (float): Seconds between probes.
+            timeout (float): Seconds before a probe is considered failed.
+        """
+        self.s3_svc = s3_svc
+        self.interval = interval
+        self.timeout = timeout
+        self._status: Optional[Dict[str, Any]] = None
+        self._checked_at: float = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the background probe loop is active.
+        """
+        return self._task is not None and not self._task.done()
+
+    async def probe(self) -> Dict[str, Any]:
+        """
+        Probe S3 once and cache the result.
+
+        Every configured bucket is probed concurrently; S3 is healthy only
+        when all of them answer, and the region reported is the primary
+        bucket's.
+
+        Returns:
+            dict: The new status with 'healthy', 'bucket_region', 'error',
+                  'latency_ms' and 'checked_at' fields.
+        """
+        start = time.perf_counter()
+        try:
+            regions = await asyncio.wait_for(
+                asyncio.gather(*(
+                    self.s3_svc.run(self.s3_svc.get_bucket_location, bucket) for bucket in self.s3_svc.buckets
+                )),
+                self.timeout
+            )
+            bucket_region = regions[0]
+            status = {"healthy": True, "bucket_region": bucket_region, "error": None}
+        except asyncio.TimeoutError:
+            status = {"healthy": False, "bucket_region": None, "error": f"S3 probe timed out after {self.timeout}s"}
+        except Exception as e:
+            status = {"healthy": False, "bucket_region": None, "error": str(e)}
+
+        status["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        status["checked_at"] = datetime.now().isoformat()
+        self._status = status
+        self._checked_at = time.monotonic()
+        return status
+
+    async def status(self) -> Dict[str, Any]:
+        """
+        Return the cached status with its age in seconds.
+
+        While the background loop is still warming up the S3 client, an
+        unhealthy "warming up" status is returned so the worker does not
+        report ready early. When the loop is not running (e.g. in tests or
+        scripts) and the cache is empty or older than one interval, a probe
+        is run inline so the result is never stale indefinitely.
+
+        Returns:
+            dict: The cached status plus an 'age_seconds' field.
+        """
+        if self._status is None and self.running:
+            return {
+                "healthy": False,
+                "bucket_region": None,
+                "error": "S3 client is warming up",
+                "latency_ms": None,
+                "checked_at": None,
+                "age_seconds": None
+            }
+        if self._status is None or (not self.running and self.age() > self.interval):
+            await self.probe()
+        return {**self._status, "age_seconds": round(self.age(), 3)}
+
+    def age(self) -> float:
+        """
+        Seconds since the last completed probe (infinite if none yet).
+        """
+        if self._status is None:
+            return float("inf")
+        return time.monotonic() - self._checked_at
+
+    def reset(self) -> None:
+        """
+        Forget the cached status.
+        """
+        self._status = None
+        self._checked_at = 0.0
+
+    def start(self) -> None:
+        """
+        Start the background probe loop on the running event loop.
+        """
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Cancel the background probe loop and wait for it to exit.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """
+        Warm up the S3 client, then probe forever, sleeping one interval
+        between probes. The first probe opens the first S3 connection.
+        """
+        try:
+            await self.s3_svc.run(self.s3_svc.warm_up)
+        except Exception:
+            # Reported by the probe below, which fails the same way
+            pass
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval)
+
+
+# Singleton prober for the application's S3 service
+health_prober = HealthProber(s3_service, settings.HEALTH_PROBE_INTERVAL, settings.HEALTH_PROBE_TIMEOUT)
@@ -0,0 +1,187 @@
+"""
+Image operations module for server-side media processing.
+
+Pure, CPU-bound transforms that run inside the processing worker processes.
+Functions here take and return bytes and import nothing from the rest of
+the application, so spawned workers start quickly and never touch the S3
+client, caches or settings of the API process.
+"""
+
+import io
+from typing import Any, Dict, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+SUPPORTED_OPERATIONS = ("resize", "thumbnail")
+
+# Output format name -> (Pillow format, file extension, content type)
+OUTPUT_FORMATS = {
+    "jpeg": ("JPEG", "jpg", "image/jpeg"),
+    "png": ("PNG", "png", "image/png"),
+    "webp": ("WEBP", "webp", "image/webp"),
+}
+
+DEFAULT_THUMBNAIL_SIZE = 256
+MAX_DIMENSION = 10000
+
+
+def _dimension(params: Dict[str, Any], name: str) -> Optional[int]:
+    value = params.get(name)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= MAX_DIMENSION:
+        raise ValueError(f"'{name}' must be an integer between 1 and {MAX_DIMENSION}.")
+    return value
+
+
+def validate_params(operation: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Check an operation's parameters and fill in defaults.
+
+    Args:
+        operation (str): 'resize' or 'thumbnail'.
+        params (dict): Operation parameters. 'resize' takes 'width' and/or
+            'height' and 'keep_aspect' (default True); 'thumbnail' takes
+            a square 'size' (default 256) or a 'width' and/or 'height'
+            box. Both take an optional output 'format' ('jpeg', 'png' or
+            'webp').
+
+    Returns:
+        dict: The normalized parameters.
+
+    Raises:
+        ValueError: If the operation or a parameter is invalid.
+    """
+    if operation not in SUPPORTED_OPERATIONS:
+        raise ValueError(f"Unsupported operation '{operation}'. Use one of: {', '.join(SUPPORTED_OPERATIONS)}.")
+
+    output_format = params.get("format")
+    if output_format is not None and output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}.")
+
+    if operation == "resize":
+        width, height = _dimension(params, "width"), _dimension(params, "height")
+        if width is None and height is None:
+            raise ValueError("Resize needs 'width', 'height' or both.")
+        return {
+            "width": width,
+            "height": height,
+            "keep_aspect": bool(params.get("keep_aspect", True)),
+            "format": output_format
+        }
+
+    size, width, height = _dimension(params, "size"), _dimension(params, "width"), _dimension(params, "height")
+    if size is not None and (width is not None or height is not None):
+        raise ValueError("Thumbnail takes 'size' or 'width'/'height', not both.")
+    if width is None and height is None:
+        width = height = size or DEFAULT_THUMBNAIL_SIZE
+    return {"width": width, "height": height, "format": output_format or "jpeg"}
+
+
+def output_format(source_key: str, params: Dict[str, Any]) -> str:
+    """
+    Pick the output format: the requested one, else the source's extension.
+
+    Args:
+        source_key (str): The source object key.
+        params (dict): Normalized operation parameters.
+
+    Returns:
+        str: A key of OUTPUT_FORMATS.
+    """
+    if params.get("format"):
+        return params["format"]
+    name = source_key.rsplit("/", 1)[-1]
+    extension = name.rsplit(".", 1)[-1].lower() if "." in name else ""
+    return {"jpg": "jpeg", "jpeg": "jpeg", "png": "png", "webp": "webp"}.get(extension, "jpeg")
+
+
+def transform_suffix(params: Dict[str, Any]) -> str:
+    """
+    Describe a thumbnail box for use in object keys, e.g. '256' or '320xauto'.
+
+    Args:
+        params (dict): Normalized thumbnail parameters.
+
+    Returns:
+        str: The box as text.
+    """
+    if params["width"] == params["height"]:
+        return str(params["width"])
+    return f"{params['width'] or 'auto'}x{params['height'] or 'auto'}"
+
+
+def derivative_key(source_key: str, operation: str, params: Dict[str, Any]) -> str:
+    """
+    Build the key a derivative is stored under, next to its source.
+
+    For example ``uploads/2024-03-09/abc-photo.jpg`` resized to 800 wide
+    becomes ``uploads/2024-03-09/abc-photo.resize-800xauto.jpg``.
+
+    Args:
+        source_key (str): The source object key.
+        operation (str): The operation name.
+        params (dict): Normalized operation parameters.
+
+    Returns:
+        str: The derivative's object key.
+    """
+    stem = source_key.rsplit(".", 1)[0] if "." in source_key.rsplit("/", 1)[-1] else source_key
+    if operation == "resize":
+        suffix = f"resize-{params['width'] or 'auto'}x{params['height'] or 'auto'}"
+        if not params["keep_aspect"]:
+            suffix += "-exact"
+    else:
+        suffix = f"thumbnail-{transform_suffix(params)}"
+    extension = OUTPUT_FORMATS[output_format(source_key, params)][1]
+    return f"{stem}.{suffix}.{extension}"
+
+
+def _target_size(image: Image.Image, params: Dict[str, Any]) -> Tuple[int, int]:
+    width, height = params["width"], params["height"]
+    if width and height and not params["keep_aspect"]:
+        return width, height
+    scale = min(
+        width / image.width if width else float("inf"),
+        height / image.height if height else float("inf")
+    )
+    return max(1, round(image.width * scale)), max(1, round(image.height * scale))
+
+
+def process_image(data: bytes, operation: str, params: Dict[str, Any], fmt: str) -> Tuple[bytes, str]:
+    """
+    Apply an operation to an encoded image.
+
+    EXIF orientation is applied first so output is upright. Thumbnails fit
+    inside their box and never upscale; resizes keep the
+    aspect ratio inside the given box unless ``keep_aspect`` is False.
+
+    Args:
+        data (bytes): The encoded source image.
+        operation (str): 'resize' or 'thumbnail'.
+        params (dict): Parameters normalized by validate_params.
+        fmt (str): Output format, a key of OUTPUT_FORMATS.
+
+    Returns:
+        tuple: The encoded derivative and its content type.
+
+    Raises:
+        ValueError: If the data is not a readable image.
+    """
+    try:
+        image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+        if operation == "thumbnail":
+            box = (params["width"] or MAX_DIMENSION, params["height"] or MAX_DIMENSION)
+            image.thumbnail(box, Image.Resampling.LANCZOS)
+        else:
+            image = image.resize(_target_size(image, params), Image.Resampling.LANCZOS)
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Source is not a readable image: {e}")
+
+    pil_format, _, content_type = OUTPUT_FORMATS[fmt]
+    if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    output = io.BytesIO()
+    image.save(output, pil_format, **({"quality": 85} if pil_format in ("JPEG", "WEBP") else {}))
+    return output.getvalue(), content_type
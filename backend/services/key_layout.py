@@ -0,0 +1,141 @@
+"""
+Key layout module for object key naming strategies.
+
+S3 scales request rates per key prefix. Writing every upload of a day under
+``uploads/YYYY-MM-DD/`` sends all PUT traffic to one partition, which is
+throttled at peak. A key layout decides where new uploads go and maps the
+logical prefixes clients list and delete by (``uploads/2024-03-09/``) to the
+physical prefixes they are stored under, so listings and deletes work the
+same for every layout, including keys written by an earlier layout.
+"""
+
+import re
+import uuid
+from typing import List, Optional
+
+UPLOAD_ROOT = "uploads/"
+
+
+class KeyLayout:
+    """
+    The date layout: ``uploads/YYYY-MM-DD/<uuid>-<filename>``.
+
+    Subclasses override ``shard`` to insert a shard folder after the upload
+    root, and ``shards`` to name every shard folder.
+    """
+
+    name = "date"
+
+    def build(self, filename: str, date_folder: str, unique_id: uuid.UUID) -> str:
+        """
+        Build the key of a new upload.
+
+        Args:
+            filename (str): Original name of the file.
+            date_folder (str): Day folder, YYYY-MM-DD.
+            unique_id (UUID): Unique prefix of the file name.
+
+        Returns:
+            str: The object key.
+        """
+        shard = self.shard(unique_id)
+        folder = f"{shard}/" if shard else ""
+        return f"{UPLOAD_ROOT}{folder}{date_folder}/{unique_id}-{filename}"
+
+    def shard(self, unique_id: uuid.UUID) -> Optional[str]:
+        """
+        Shard folder of a new upload, or None for unsharded layouts.
+        """
+        return None
+
+    def shards(self) -> List[str]:
+        """
+        Every shard folder, in key order.
+        """
+        return []
+
+    def expand_prefix(self, prefix: Optional[str]) -> List[str]:
+        """
+        Physical prefixes covering a logical listing prefix.
+
+        A prefix below the upload root that does not name a shard, such as
+        ``uploads/2024-03-09/``, is expanded to the same path in every shard
+        plus the unsharded path, where keys from the date layout live. Other
+        prefixes, including ones that name a shard or are too short to tell
+        (``uploads/2``), are returned as they are.
+
+        Args:
+            prefix (str, optional): The prefix requested by a client.
+
+        Returns:
+            list: Disjoint prefixes in key order, so listing them one after
+                  another yields keys in order.
+        """
+        shards = self.shards()
+        if not shards or not prefix or not prefix.startswith(UPLOAD_ROOT):
+            return [prefix]
+        rest = prefix[len(UPLOAD_ROOT):]
+        if not rest or self._is_physical(rest):
+            return [prefix]
+        return sorted([prefix] + [f"{UPLOAD_ROOT}{shard}/{rest}" for shard in shards])
+
+    def _is_physical(self, rest: str) -> bool:
+        return False
+
+
+class HashedKeyLayout(KeyLayout):
+    """
+    Hash-sharded layout: ``uploads/<shard>/YYYY-MM-DD/<uuid>-<filename>``.
+
+    The shard is the leading hex digits of the upload's random UUID, so
+    writes spread evenly over ``shard_count`` prefixes that S3 can partition
+    independently.
+    """
+
+    name = "hashed"
+
+    def __init__(self, shard_count: int):
+        """
+        Args:
+            shard_count (int): Number of shards; a power of 16 (16, 256 or 4096).
+
+        Raises:
+            ValueError: If shard_count is not a supported power of 16.
+        """
+        widths = {16: 1, 256: 2, 4096: 3}
+        if shard_count not in widths:
+            raise ValueError(f"S3_KEY_SHARDS must be 16, 256 or 4096, not {shard_count}")
+        self.shard_count = shard_count
+        self.width = widths[shard_count]
+        # A shard folder, or the start of one
+        self._shard_folder = re.compile(rf"^(?:[0-9a-f]{{{self.width}}}/|[0-9a-f]{{1,{self.width}}}$)")
+
+    def shard(self, unique_id: uuid.UUID) -> Optional[str]:
+        return unique_id.hex[:self.width]
+
+    def shards(self) -> List[str]:
+        return [f"{index:0{self.width}x}" for index in range(self.shard_count)]
+
+    def _is_physical(self, rest: str) -> bool:
+        return bool(self._shard_folder.match(rest))
+
+
+def create_key_layout(name: str, shard_count: int) -> KeyLayout:
+    """
+    Create the key layout selected in settings.
+
+    Args:
+        name (str): 'date' or 'hashed'.
+        shard_count (int): Number of shards for sharded layouts.
+
+    Returns:
+        KeyLayout: The layout.
+
+    Raises:
+        ValueError: If the layout name or shard count is unknown.
+    """
+    if name == KeyLayout.name:
+        return KeyLayout()
+    if name == HashedKeyLayout.name:
+        return HashedKeyLayout(shard_count)
+    raise ValueError(f"Unknown S3_KEY_LAYOUT '{name}'. Use 'date' or 'hashed'.")
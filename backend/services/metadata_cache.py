@@ -0,0 +1,120 @@
+"""
+Cache module for object metadata.
+
+HEAD requests are cheap but still cost an S3 round trip. This module keeps
+recent ``head_object`` results in a bounded LRU cache with a time-to-live,
+including negative entries for keys that do not exist, so existence checks
+and metadata lookups for hot keys are answered locally.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from services.metrics import OBJECT_METADATA_CACHE_HITS, OBJECT_METADATA_CACHE_MISSES
+
+
+class ObjectMetadataCache:
+    """
+    Bounded TTL cache of object metadata with negative caching.
+
+    Each entry holds either the object's metadata or None for a key known to
+    be missing. Missing keys use a shorter ``negative_ttl`` so newly uploaded
+    objects appear quickly. A ``max_entries`` of 0 disables caching.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, negative_ttl: float):
+        """
+        Args:
+            max_entries (int): Maximum number of cached keys.
+            ttl (float): Seconds an existing object's metadata is reused.
+            negative_ttl (float): Seconds a missing key is remembered.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[str, Tuple[Optional[Dict[str, Any]], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Look up a key.
+
+        Args:
+            key (str): The S3 object key.
+
+        Returns:
+            tuple: (cached, metadata). ``cached`` is False when S3 must be
+                   asked; otherwise metadata is the cached dict, or None if
+                   the key is known to be missing.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                metadata, expires_at = entry
+                if now < expires_at:
+                    self._entries.move_to_end(key)
+                    if metadata is None:
+                        self.negative_hits += 1
+                    else:
+                        self.hits += 1
+                    OBJECT_METADATA_CACHE_HITS.inc()
+                    return True, metadata
+                del self._entries[key]
+            self.misses += 1
+        OBJECT_METADATA_CACHE_MISSES.inc()
+        return False, None
+
+    def put(self, key: str, metadata: Optional[Dict[str, Any]]) -> None:
+        """
+        Cache metadata for a key, or None to record that it does not exist.
+
+        Args:
+            key (str): The S3 object key.
+            metadata (dict, optional): The object's metadata, None if missing.
+        """
+        if self.max_entries <= 0:
+            return
+        ttl = self.ttl if metadata is not None else self.negative_ttl
+        with self._lock:
+            self._entries[key] = (metadata, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        """
+        Drop cached entries, e.g. after objects were deleted or written.
+
+        Args:
+            keys (Iterable[str]): The S3 object keys to forget.
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Drop every cached entry and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.negative_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return cache size and hit/miss counters for monitoring.
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses
+            }
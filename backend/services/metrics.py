@@ -0,0 +1,222 @@
+"""
+Metrics module for Prometheus instrumentation.
+
+Defines the application's Prometheus metrics and helpers to record them:
+request latency and in-flight gauges per route (recorded by the metrics
+middleware), admission control queues and rejections, and call counts,
+errors and latency for every S3Service method.
+
+Metrics are plain in-process counters from prometheus_client. When several
+uvicorn workers run, set PROMETHEUS_MULTIPROC_DIR to an empty, writable
+directory before the server starts; each worker then writes its samples to
+memory-mapped files there and ``/metrics`` aggregates all workers.
+"""
+
+import asyncio
+import functools
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Tuple, TypeVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Spans in-process presigning (sub-millisecond) up to slow S3 round trips
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method", "route"],
+    multiprocess_mode="livesum"
+)
+
+S3_CALLS = Counter(
+    "s3_service_calls_total",
+    "S3Service method calls",
+    ["method"]
+)
+
+S3_CALL_ERRORS = Counter(
+    "s3_service_errors_total",
+    "S3Service method calls that raised, by exception type",
+    ["method", "error"]
+)
+
+S3_CALL_DURATION = Histogram(
+    "s3_service_call_duration_seconds",
+    "S3Service method latency",
+    ["method"],
+    buckets=LATENCY_BUCKETS
+)
+
+S3_CALLS_COALESCED = Counter(
+    "s3_service_calls_coalesced_total",
+    "S3Service read calls that shared an identical in-flight call instead of reaching S3",
+    ["method"]
+)
+
+DOWNLOAD_URL_CACHE_HITS = Counter(
+    "download_url_cache_hits_total",
+    "Download URL requests answered with a cached presigned URL"
+)
+
+DOWNLOAD_URL_CACHE_MISSES = Counter(
+    "download_url_cache_misses_total",
+    "Download URL requests that required a new signature"
+)
+
+OBJECT_METADATA_CACHE_HITS = Counter(
+    "object_metadata_cache_hits_total",
+    "Object metadata lookups answered from the HEAD cache, including missing keys"
+)
+
+OBJECT_METADATA_CACHE_MISSES = Counter(
+    "object_metadata_cache_misses_total",
+    "Object metadata lookups that required a HEAD request"
+)
+
+PROCESSING_JOBS = Counter(
+    "processing_jobs_total",
+    "Finished media processing jobs by operation and outcome",
+    ["operation", "status"]
+)
+
+PROCESSING_DURATION = Histogram(
+    "processing_job_duration_seconds",
+    "Media processing job latency from start to derivative written",
+    ["operation"],
+    buckets=LATENCY_BUCKETS
+)
+
+DERIVATIVE_REQUESTS = Counter(
+    "derivative_requests_total",
+    "Thumbnail requests by result: existing derivative, generated, or joined an in-flight generation",
+    ["result"]
+)
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth",
+    "Requests waiting for a concurrency slot, by route template",
+    ["route"],
+    multiprocess_mode="livesum"
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight",
+    "Admitted requests currently holding a concurrency slot, by route template",
+    ["route"],
+    multiprocess_mode="livesum"
+)
+
+ADMISSION_QUEUE_WAIT = Histogram(
+    "admission_queue_wait_seconds",
+    "Time admitted requests waited for a concurrency slot",
+    ["route"],
+    buckets=LATENCY_BUCKETS
+)
+
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections_total",
+    "Requests refused by admission control, by route template and reason",
+    ["route", "reason"]
+)
+
+
+def multiprocess_enabled() -> bool:
+    """
+    Whether metrics are shared across worker processes.
+    """
+    return bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text exposition format.
+
+    In multiprocess mode the samples of every worker are aggregated, so any
+    worker answering the scrape reports the whole server.
+
+    Returns:
+        tuple: The encoded metrics and their content type.
+    """
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """
+    Drop this worker's live gauges from the shared metrics directory.
+
+    Called on shutdown so in-flight gauges of exited workers are not summed.
+    """
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+@contextmanager
+def track_s3_call(method: str) -> Iterator[None]:
+    """
+    Count and time one S3Service call, recording the exception type on failure.
+
+    Args:
+        method (str): The S3Service method name used as the metric label.
+    """
+    S3_CALLS.labels(method=method).inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        if not isinstance(e, (GeneratorExit, asyncio.CancelledError)):
+            S3_CALL_ERRORS.labels(method=method, error=type(e).__name__).inc()
+        raise
+    finally:
+        S3_CALL_DURATION.labels(method=method).observe(time.perf_counter() - start)
+
+
+def instrumented(func: F) -> F:
+    """
+    Decorate an S3Service method so each call is counted and timed.
+
+    Works for both regular and ``async`` methods; the metric label is the
+    method name.
+    """
+    name = func.__name__
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with track_s3_call(name):
+                return await func(*args, **kwargs)
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with track_s3_call(name):
+            return func(*args, **kwargs)
+    return wrapper  # type: ignore[return-value]
@@ -0,0 +1,271 @@
+"""
+Processing module for server-side media jobs.
+
+Jobs name a source object and an operation (image resize or thumbnail).
+The API process downloads the source on the S3 executor, hands the CPU-bound
+transform to a pool of worker processes, and uploads the derivative next to
+the original. With one worker per core, throughput scales with the number of
+cores instead of being capped by the GIL or by a browser tab.
+"""
+
+import asyncio
+import multiprocessing
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+from botocore.exceptions import ClientError
+
+from config import settings
+from services import image_ops
+from services.metrics import PROCESSING_DURATION, PROCESSING_JOBS
+from services.s3_service import S3Service, s3_service
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class ProcessingEngine:
+    """
+    Runs media processing jobs on a process pool and tracks their status.
+
+    At most twice ``max_workers`` jobs hold their source in memory at once,
+    so downloads and uploads overlap with processing without letting a burst
+    of jobs read every source up front. The pool is started on the first
+    job, keeping application startup cheap.
+    """
+
+    def __init__(self, s3_svc: S3Service, max_workers: int, max_source_bytes: int, history: int):
+        """
+        Args:
+            s3_svc (S3Service): Service used to read sources and write derivatives.
+            max_workers (int): Number of worker processes.
+            max_source_bytes (int): Largest source object a job will download.
+            history (int): Finished jobs kept for status lookups.
+
+        Raises:
+            ValueError: If max_workers is not a positive integer.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+
+        self.s3_svc = s3_svc
+        self.max_workers = max_workers
+        self.max_source_bytes = max_source_bytes
+        self.history = history
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def submit(self, key: str, operation: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue a job on the running event loop.
+
+        Args:
+            key (str): The source object key.
+            operation (str): 'resize' or 'thumbnail'.
+            params (dict): Operation parameters, see image_ops.validate_params.
+
+        Returns:
+            dict: A copy of the new job's status.
+
+        Raises:
+            ValueError: If the operation or its parameters are invalid.
+        """
+        params = image_ops.validate_params(operation, params)
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "key": key,
+            "operation": operation,
+            "params": params,
+            "status": QUEUED,
+            "output_key": image_ops.derivative_key(key, operation, params),
+            "error": None,
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None
+        }
+        self._jobs[job["job_id"]] = job
+        self._trim_history()
+
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a job's status.
+
+        Args:
+            job_id (str): The job ID returned by submit.
+
+        Returns:
+            dict or None: A copy of the job, or None if unknown or expired.
+        """
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    async def wait(self) -> None:
+        """
+        Wait until every submitted job has finished.
+        """
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Count jobs by status.
+
+        Returns:
+            dict: 'workers' plus the number of known jobs in each status.
+        """
+        counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+        for job in self._jobs.values():
+            counts[job["status"]] += 1
+        return {"workers": self.max_workers, **counts}
+
+    async def shutdown(self) -> None:
+        """
+        Cancel unfinished jobs and stop the worker processes.
+        """
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._slots = None
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers * 2)
+        return self._slots
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Forking a process that runs boto3 and executor threads is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        """
+        Shut down a broken pool so its resources are reclaimed; the next
+        job starts a fresh one. A replacement started meanwhile is kept.
+        """
+        pool.shutdown(wait=False, cancel_futures=True)
+        if self._pool is pool:
+            self._pool = None
+
+    def _trim_history(self) -> None:
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in (SUCCEEDED, FAILED)
+        ]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        async with self._get_slots():
+            job["status"] = RUNNING
+            job["started_at"] = datetime.now().isoformat()
+            start = time.perf_counter()
+            try:
+                await self._render(job["key"], job["operation"], job["params"], job["output_key"])
+                job["status"] = SUCCEEDED
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code", "")
+                job["error"] = "Source object not found" if code in ("NoSuchKey", "404") else str(e)
+                job["status"] = FAILED
+            except BrokenProcessPool:
+                job["error"] = "Processing worker crashed"
+                job["status"] = FAILED
+            except asyncio.CancelledError:
+                job["error"] = "Cancelled at shutdown"
+                job["status"] = FAILED
+                raise
+            except Exception as e:
+                job["error"] = str(e)
+                job["status"] = FAILED
+            finally:
+                job["finished_at"] = datetime.now().isoformat()
+                PROCESSING_JOBS.labels(job["operation"], job["status"]).inc()
+                PROCESSING_DURATION.labels(job["operation"]).observe(time.perf_counter() - start)
+                self._trim_history()
+
+    async def render(
+        self,
+        key: str,
+        operation: str,
+        params: Dict[str, Any],
+        output_key: str,
+        publish: bool = True
+    ) -> None:
+        """
+        Create a derivative right away and wait for it, sharing the job slots.
+
+        Args:
+            key (str): The source object key.
+            operation (str): 'resize' or 'thumbnail'.
+            params (dict): Parameters normalized by image_ops.validate_params.
+            output_key (str): The key the derivative is written to.
+            publish (bool): Whether the result is a user file, recorded in
+                the catalog and published to the change feed.
+
+        Raises:
+            ValueError: If the source is too large or not a readable image.
+            ClientError: If reading the source or writing the result fails.
+        """
+        async with self._get_slots():
+            await self._render(key, operation, params, output_key, publish)
+
+    async def _render(
+        self,
+        key: str,
+        operation: str,
+        params: Dict[str, Any],
+        output_key: str,
+        publish: bool = True
+    ) -> None:
+        response = await self.s3_svc.run(self.s3_svc.open_object, key)
+        body = response["Body"]
+        try:
+            if response.get("ContentLength", 0) > self.max_source_bytes:
+                raise ValueError(f"Source is larger than {self.max_source_bytes} bytes.")
+            data = await self.s3_svc.run(body.read)
+        finally:
+            body.close()
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        try:
+            output, content_type = await loop.run_in_executor(
+                pool, image_ops.process_image, data, operation, params,
+                image_ops.output_format(key, params)
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory)
+            self._discard_pool(pool)
+            raise
+        del data
+
+        await self.s3_svc.run(self.s3_svc.put_object, output_key, output, content_type, publish)
+
+
+# Singleton engine for the application's S3 service
+processing_engine = ProcessingEngine(
+    s3_service,
+    settings.PROCESSING_WORKERS,
+    settings.PROCESSING_MAX_SOURCE_BYTES,
+    settings.PROCESSING_JOB_HISTORY
+)
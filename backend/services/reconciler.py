@@ -0,0 +1,191 @@
+"""
+Reconciliation module for the object catalog.
+
+Catalog writes happen next to the S3 calls that change the bucket, but
+clients may never confirm a presigned upload, objects can be changed by
+other tools and a catalog write can fail. A background job therefore walks
+the bucket listing on a fixed interval, records every object it sees and
+then removes rows for objects that are gone and uploads that never arrived.
+The differences it finds are published to the change feed, so clients see
+objects created or deleted outside the API. Workers sharing a catalog file
+take turns through a lease in the database, so each interval one of them
+lists the bucket rather than all of them.
+"""
+
+import asyncio
+import os
+import socket
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from config import settings
+from services.catalog import ObjectCatalog
+from services.change_feed import CREATED, DELETED
+from services.s3_service import S3Service, s3_service
+
+RECONCILE_LEASE = "reconcile"
+
+
+class CatalogReconciler:
+    """
+    Periodically brings the object catalog in line with the bucket.
+
+    Each run lists the whole bucket page by page, so memory use stays at one
+    page regardless of bucket size, and keeps a summary of the last run.
+    """
+
+    def __init__(
+        self,
+        s3_svc: S3Service,
+        catalog: ObjectCatalog,
+        interval: float,
+        pending_ttl: float,
+        lease_ttl: float = 600.0
+    ):
+        """
+        Configure the reconciler without starting it.
+
+        Args:
+            s3_svc (S3Service): The service whose bucket is listed.
+            catalog (ObjectCatalog): The catalog to update.
+            interval (float): Seconds between runs; 0 runs once at startup.
+            pending_ttl (float): Seconds after which a pending upload that
+                was never listed is dropped (the upload URL lifetime).
+            lease_ttl (float): Longest time a run keeps other workers from
+                reconciling, should its worker die before finishing.
+        """
+        self.s3_svc = s3_svc
+        self.catalog = catalog
+        self.interval = interval
+        self.pending_ttl = pending_ttl
+        self.lease_ttl = lease_ttl
+        self.holder = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.last_run: Optional[Dict[str, Any]] = None
+        self.skipped = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the background reconciliation loop is active.
+        """
+        return self._task is not None and not self._task.done()
+
+    async def reconcile(self) -> Dict[str, Any]:
+        """
+        Run one reconciliation pass.
+
+        Rows confirmed by events while the pass runs are newer than its
+        start time, so they are never removed by it. New, changed and
+        vanished objects are published to the change feed, except when the
+        catalog started out empty: a first full load is not a change anyone
+        has observed.
+
+        Returns:
+            dict: 'listed' objects, 'created' and 'deleted' objects found by
+                  the listing diff, 'expired' pending uploads and
+                  'duration_ms'.
+
+        Raises:
+            ClientError: If listing the bucket fails; the catalog is then
+                left unpruned.
+        """
+        started = time.time()
+        feed = self.s3_svc.change_feed
+        publish = (await asyncio.to_thread(self.catalog.stats))["objects"] > 0
+        listed = created = 0
+        async for page in self.s3_svc.stream_object_pages():
+            if page:
+                changed = await asyncio.to_thread(self.catalog.record_present, page, True)
+                listed += len(page)
+                created += len(changed)
+                if publish:
+                    feed.publish(CREATED, changed)
+        pruned = await asyncio.to_thread(self.catalog.prune, started, started - self.pending_ttl)
+        if publish:
+            feed.publish(DELETED, [{"key": key} for key in pruned["deleted"]])
+
+        self.last_run = {
+            "listed": listed,
+            "created": created,
+            "deleted": len(pruned["deleted"]),
+            "expired": pruned["expired"],
+            "duration_ms": round((time.time() - started) * 1000, 2)
+        }
+        return self.last_run
+
+    async def reconcile_if_due(self) -> Optional[Dict[str, Any]]:
+        """
+        Run a pass unless another worker sharing the catalog is running one
+        or finished one less than an interval ago.
+
+        The pass holds the catalog's reconcile lease while it runs and for
+        one interval after it, so the other workers skip their turns.
+
+        Returns:
+            dict: The summary of the pass, or None when it was left to
+                  another worker.
+
+        Raises:
+            ClientError: If listing the bucket fails.
+        """
+        claimed = await asyncio.to_thread(
+            self.catalog.claim_lease, RECONCILE_LEASE, self.holder, time.time() + self.lease_ttl
+        )
+        if not claimed:
+            self.skipped += 1
+            return None
+        try:
+            return await self.reconcile()
+        finally:
+            await asyncio.to_thread(
+                self.catalog.extend_lease, RECONCILE_LEASE, self.holder, time.time() + self.interval
+            )
+
+    def start(self) -> None:
+        """
+        Start the background reconciliation loop on the running event loop.
+        """
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Cancel the background loop and wait for it to exit.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """
+        Reconcile at startup, then once per interval, whenever no other
+        worker has. A failed run is retried on the next interval.
+        """
+        while True:
+            try:
+                await self.reconcile_if_due()
+            except Exception:
+                # Listing errors are tracked by the S3 metrics and health probe
+                pass
+            if self.interval <= 0:
+                return
+            await asyncio.sleep(self.interval)
+
+
+# Singleton reconciler for the application's catalog (None when the catalog is disabled)
+catalog_reconciler = (
+    CatalogReconciler(
+        s3_service,
+        s3_service.catalog,
+        settings.CATALOG_RECONCILE_INTERVAL,
+        settings.PRESIGNED_URL_EXPIRE,
+        settings.CATALOG_RECONCILE_LEASE
+    )
+    if s3_service.catalog is not None else None
+)
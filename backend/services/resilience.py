@@ -0,0 +1,290 @@
+"""
+Resilience module for S3 connection management.
+
+This module provides a global retry budget and a circuit breaker for the
+shared boto3 client. Both hook into botocore's event system, so they apply to
+every S3 API call (and every retry attempt botocore makes) without changing
+how the service methods call the client. Presigning never goes through these
+hooks because it performs no S3 requests.
+"""
+
+import threading
+import time
+from typing import Any, Dict
+
+# HTTP statuses that indicate S3 itself is degraded rather than a bad request
+_DEGRADED_STATUSES = {429, 500, 502, 503, 504}
+
+
+class S3UnavailableError(Exception):
+    """
+    Raised when an S3 call is refused locally to protect a degraded S3.
+
+    Attributes:
+        retry_after (int): Suggested seconds before the client retries.
+    """
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(S3UnavailableError):
+    """
+    Raised when the circuit breaker is open and calls fail fast.
+    """
+
+
+class RetryBudgetExhaustedError(S3UnavailableError):
+    """
+    Raised instead of a retry attempt when the global retry budget is spent.
+    """
+
+    def __init__(self, message: str = "S3 retry budget exhausted; not retrying", retry_after: int = 1):
+        super().__init__(message, retry_after)
+
+
+class RetryBudget:
+    """
+    Token bucket that caps retries to a fraction of overall S3 traffic.
+
+    Every first attempt deposits ``ratio`` tokens and the bucket also refills
+    at ``min_per_second`` so low-traffic periods can still retry. Each retry
+    spends one token; when none are left the retry is refused, which stops
+    retry storms from amplifying S3 throttling.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, capacity: float):
+        """
+        Args:
+            ratio (float): Tokens earned per first attempt (e.g. 0.1 = 10%).
+            min_per_second (float): Tokens refilled per second regardless of traffic.
+            capacity (float): Maximum number of stored tokens.
+        """
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.retries_allowed = 0
+        self.retries_denied = 0
+
+    def record_request(self) -> None:
+        """
+        Deposit tokens for a first attempt.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """
+        Spend one token for a retry.
+
+        Returns:
+            bool: True if the retry may proceed.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.retries_allowed += 1
+                return True
+            self.retries_denied += 1
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the current budget state for monitoring.
+        """
+        with self._lock:
+            self._refill()
+            return {
+                "available": round(self._tokens, 2),
+                "capacity": self.capacity,
+                "retries_allowed": self.retries_allowed,
+                "retries_denied": self.retries_denied
+            }
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+
+class CircuitBreaker:
+    """
+    Fails S3 calls fast after repeated failures.
+
+    States:
+        closed: calls flow normally; consecutive failures are counted.
+        open: calls fail immediately with CircuitOpenError until
+            ``reset_timeout`` has passed.
+        half_open: a single trial call is let through; success closes the
+            circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit.
+            reset_timeout (float): Seconds to stay open before a trial call.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """
+        Current state, moving from open to half-open once the timeout passed.
+        """
+        with self._lock:
+            return self._current_state()
+
+    def before_call(self) -> None:
+        """
+        Admit or reject a call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or a trial is in flight.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self.rejected += 1
+            retry_after = max(1, int(self._opened_at + self.reset_timeout - time.monotonic()) + 1)
+        raise CircuitOpenError("S3 circuit breaker is open; failing fast", retry_after=retry_after)
+
+    def record_success(self) -> None:
+        """
+        Record a healthy S3 response and close the circuit.
+        """
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        """
+        Record a degraded S3 response, opening the circuit when needed.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the breaker state for monitoring.
+        """
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "rejected": self.rejected
+            }
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+
+class S3ConnectionGuard:
+    """
+    Attaches the retry budget and circuit breaker to a boto3 client and
+    tracks connection pool utilization.
+
+    Each in-flight API call holds one pooled connection, so the number of
+    calls between before-call and after-call is the number of connections
+    in use.
+    """
+
+    def __init__(self, budget: RetryBudget, breaker: CircuitBreaker, pool_size: int):
+        """
+        Args:
+            budget (RetryBudget): Global retry budget.
+            breaker (CircuitBreaker): Circuit breaker for S3 calls.
+            pool_size (int): The client's max_pool_connections.
+        """
+        self.budget = budget
+        self.breaker = breaker
+        self.pool_size = pool_size
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def attach(self, client: Any) -> None:
+        """
+        Register the guard's handlers on a boto3 S3 client.
+        """
+        events = client.meta.events
+        # Registered first on the most specific event level so an open circuit
+        # fails fast before any other handler (e.g. a stubbed response) runs
+        events.register_first('before-call.*.*', self._before_call, unique_id='s3-guard-before-call')
+        events.register('after-call.s3', self._after_call, unique_id='s3-guard-after-call')
+        events.register('after-call-error.s3', self._after_call_error, unique_id='s3-guard-after-call-error')
+        events.register('request-created.s3', self._request_created, unique_id='s3-guard-request-created')
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return pool utilization, breaker state and retry budget.
+        """
+        with self._lock:
+            in_flight = self._in_flight
+            peak = self._peak_in_flight
+        return {
+            "pool": {
+                "size": self.pool_size,
+                "in_use": in_flight,
+                "peak_in_use": peak,
+                "utilization": round(in_flight / self.pool_size, 3)
+            },
+            "circuit_breaker": self.breaker.stats(),
+            "retry_budget": self.budget.stats()
+        }
+
+    def _before_call(self, **kwargs) -> None:
+        self.breaker.before_call()
+        with self._lock:
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+    def _after_call(self, http_response=None, **kwargs) -> None:
+        self._release()
+        if http_response is not None and http_response.status_code in _DEGRADED_STATUSES:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _after_call_error(self, **kwargs) -> None:
+        self._release()
+        self.breaker.record_failure()
+
+    def _request_created(self, request=None, **kwargs) -> None:
+        attempt = request.context.get('retries', {}).get('attempt', 1) if request is not None else 1
+        if attempt <= 1:
+            self.budget.record_request()
+        elif not self.budget.try_acquire():
+            raise RetryBudgetExhaustedError()
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
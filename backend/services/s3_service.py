@@ -6,12 +6,373 @@ generating presigned URLs, listing objects, and deleting objects. It's designed
 to be reusable and testable, supporting Phase 3 integration requirements.
 """
 
-import boto3
+import asyncio
+import bisect
 from botocore.exceptions import ClientError, NoCredentialsError
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import cached_property
+import hashlib
+import heapq
+import hmac
+import os
+import sqlite3
+import threading
+import time
 import uuid
-from typing import List, Dict, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+from urllib.parse import parse_qs, quote, urlsplit
 from config import settings
+from services.bucket_router import BucketRouter, RoutingTable
+from services.catalog import ObjectCatalog
+from services.change_feed import CREATED, DELETED, ChangeFeed
+from services.executor import S3Executor
+from services.key_layout import create_key_layout
+from services.metadata_cache import ObjectMetadataCache
+from services.metrics import instrumented, track_s3_call
+from services.resilience import CircuitBreaker, RetryBudget, S3ConnectionGuard, S3UnavailableError
+from services.single_flight import SingleFlight, coalesced, run_coalesced
+from services.url_cache import PresignedURLCache
+
+T = TypeVar("T")
+
+# Key used to discover the presigned URL layout botocore produces for a bucket
+_PROBE_KEY = "presign-probe"
+
+# Error codes S3 returns for a missing object (HEAD responses carry no body)
+_NOT_FOUND_CODES = {"404", "NoSuchKey", "NotFound"}
+
+# Maximum number of keys S3 accepts in a single DeleteObjects call
+DELETE_BATCH_SIZE = 1000
+
+# S3 multipart upload limits
+MULTIPART_MAX_PARTS = 10000
+MULTIPART_MAX_PART_SIZE = 5 * 1024 ** 3  # 5 GiB
+MULTIPART_MAX_OBJECT_SIZE = 5 * 1024 ** 4  # 5 TiB
+
+# Marks continuation tokens of listings merged across key layout shards
+SHARDED_CONTINUATION_PREFIX = "after:"
+
+
+def _precedes(prefix: str, key: Optional[str]) -> bool:
+    """
+    Whether every key under prefix sorts before key, so that listing the
+    prefix after key would return nothing.
+    """
+    return bool(key) and bool(prefix) and key > prefix and not key.startswith(prefix)
+
+
+def _hides_derivatives(prefix: Optional[str]) -> bool:
+    """
+    Whether a listing under prefix must leave out the derivative cache:
+    unprefixed listings are of user files, while thumbnails share the bucket.
+    """
+    return not prefix and bool(settings.DERIVATIVE_PREFIX)
+
+
+def _past_derivatives() -> str:
+    """
+    A StartAfter value sorting after every key under DERIVATIVE_PREFIX.
+    """
+    return f"{settings.DERIVATIVE_PREFIX}\U0010ffff"
+
+
+def _unique_keys(objects: Iterator[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Drop repeated keys from objects in key order, keeping the first; a key
+    stored in two buckets is listed once.
+    """
+    unique: List[Dict[str, Any]] = []
+    for obj in objects:
+        if not unique or unique[-1]['key'] != obj['key']:
+            unique.append(obj)
+    return unique
+
+
+async def _next_page(pages: AsyncIterator[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+    """
+    The next page of a stream, or None once it is exhausted.
+    """
+    try:
+        return await pages.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def _merge_pages(streams: List[AsyncIterator[List[Dict[str, Any]]]]) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Merge page streams that are each in key order into one in key order.
+
+    Objects are released up to the smallest last buffered key among the
+    streams still running, since no stream can produce a smaller key later.
+    Streams whose buffer ran dry are refilled concurrently.
+    """
+    buffers: List[List[Dict[str, Any]]] = [[] for _ in streams]
+    active = set(range(len(streams)))
+    try:
+        while True:
+            empty = [index for index in active if not buffers[index]]
+            if empty:
+                for index, page in zip(empty, await asyncio.gather(*(_next_page(streams[i]) for i in empty))):
+                    if page is None:
+                        active.discard(index)
+                    else:
+                        buffers[index] = page
+                continue
+            if not any(buffers):
+                return
+
+            bound = min((buffers[index][-1]['key'] for index in active), default=None)
+            released = []
+            for index, buffer in enumerate(buffers):
+                cut = len(buffer) if bound is None else bisect.bisect_right([obj['key'] for obj in buffer], bound)
+                released.append(buffer[:cut])
+                buffers[index] = buffer[cut:]
+            yield _unique_keys(heapq.merge(*released, key=lambda obj: obj['key']))
+    finally:
+        for stream in streams:
+            await stream.aclose()
+
+
+def plan_multipart_parts(file_size: int, min_part_size: int) -> Tuple[int, int]:
+    """
+    Choose the part size and count for a multipart upload.
+
+    Uses the configured minimum part size unless the file is so large that it
+    would need more than 10000 parts, in which case the part size grows (in
+    whole MiB) just enough to fit.
+
+    Args:
+        file_size (int): Declared size of the file in bytes.
+        min_part_size (int): Smallest part size to use, in bytes.
+
+    Returns:
+        tuple: (part_size, part_count).
+
+    Raises:
+        ValueError: If the file is empty or exceeds the S3 object size limit.
+    """
+    if file_size <= 0:
+        raise ValueError("File size must be positive.")
+    if file_size > MULTIPART_MAX_OBJECT_SIZE:
+        raise ValueError("File size exceeds the 5 TiB S3 object limit.")
+
+    mib = 1024 ** 2
+    part_size = max(min_part_size, -(-file_size // MULTIPART_MAX_PARTS))
+    part_size = min(-(-part_size // mib) * mib, MULTIPART_MAX_PART_SIZE)
+    return part_size, -(-file_size // part_size)
+
+
+class SigV4Presigner:
+    """
+    Fast SigV4 query-string presigner for a single bucket.
+
+    botocore's generate_presigned_url rebuilds the request model, resolves the
+    endpoint and derives the HMAC signing key on every call. This presigner
+    resolves the endpoint once, precomputes the parts of the canonical request
+    that never change, and caches the derived signing key per day. Its output
+    is byte-for-byte identical to botocore's S3 SigV4 presigned URLs.
+    """
+
+    _ALGORITHM = "AWS4-HMAC-SHA256"
+    _UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+    _QUERY_SAFE = "-_.~"
+
+    def __init__(self, access_key: str, secret_key: str, region: str, bucket_url: str):
+        """
+        Precompute the static parts of every presigned URL.
+
+        Args:
+            access_key (str): AWS access key ID.
+            secret_key (str): AWS secret access key.
+            region (str): Region used in the credential scope.
+            bucket_url (str): URL of the bucket root, e.g.
+                ``https://bucket.s3.amazonaws.com`` (virtual-hosted) or
+                ``https://s3.amazonaws.com/my.bucket`` (path-style).
+        """
+        parts = urlsplit(bucket_url)
+        self.region = region
+        self._secret = ("AWS4" + secret_key).encode("utf-8")
+        self._url_prefix = f"{parts.scheme}://{parts.netloc}"
+        self._path_prefix = parts.path.rstrip("/")
+        self._host_header = f"host:{parts.netloc}\n"
+        self._scope_suffix = f"/{region}/s3/aws4_request"
+        self._quoted_access_key = quote(access_key + "/", safe=self._QUERY_SAFE)
+        self._quoted_scope_suffix = quote(self._scope_suffix, safe=self._QUERY_SAFE)
+        self._signing_key: Tuple[str, bytes] = ("", b"")
+
+    @classmethod
+    def from_client(cls, client: Any, bucket: str, access_key: str, secret_key: str) -> "SigV4Presigner":
+        """
+        Build a presigner that matches the given boto3 client's URL layout.
+
+        botocore is asked for one probe URL so that endpoint resolution,
+        addressing style and signing region come from the SDK itself.
+
+        Args:
+            client: A boto3 S3 client configured for SigV4.
+            bucket (str): The bucket to presign for.
+            access_key (str): AWS access key ID used by the client.
+            secret_key (str): AWS secret access key used by the client.
+
+        Returns:
+            SigV4Presigner: A presigner for the bucket.
+        """
+        probe_url = client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': bucket, 'Key': _PROBE_KEY},
+            ExpiresIn=60
+        )
+        parts = urlsplit(probe_url)
+        credential = parse_qs(parts.query)['X-Amz-Credential'][0]
+        region = credential.split('/')[2]
+        bucket_path = parts.path[:-len(_PROBE_KEY) - 1]
+        return cls(access_key, secret_key, region, f"{parts.scheme}://{parts.netloc}{bucket_path}")
+
+    def presign(
+        self,
+        method: str,
+        key: str,
+        expires_in: int,
+        content_type: Optional[str] = None,
+        now: Optional[datetime] = None,
+        params: Optional[List[Tuple[str, str]]] = None
+    ) -> str:
+        """
+        Create a presigned URL for an object.
+
+        Args:
+            method (str): HTTP method, e.g. ``GET`` or ``PUT``.
+            key (str): The S3 object key.
+            expires_in (int): URL lifetime in seconds.
+            content_type (str, optional): Content-Type the client must send;
+                signed as a header, as botocore does for put_object.
+            now (datetime, optional): Signing time in UTC. Defaults to now.
+            params (list, optional): Operation query parameters such as
+                ``uploadId`` and ``partNumber``, in botocore's URL order.
+
+        Returns:
+            str: The presigned URL.
+        """
+        amz_date = (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+        datestamp = amz_date[:8]
+        path = self._path_prefix + "/" + quote(key, safe="/~")
+
+        if content_type is None:
+            signed_headers = "host"
+            quoted_signed_headers = "host"
+            canonical_headers = self._host_header
+        else:
+            signed_headers = "content-type;host"
+            quoted_signed_headers = "content-type%3Bhost"
+            canonical_headers = f"content-type:{' '.join(content_type.split())}\n{self._host_header}"
+
+        query = (
+            f"X-Amz-Algorithm={self._ALGORITHM}"
+            f"&X-Amz-Credential={self._quoted_access_key}{datestamp}{self._quoted_scope_suffix}"
+            f"&X-Amz-Date={amz_date}"
+            f"&X-Amz-Expires={expires_in}"
+            f"&X-Amz-SignedHeaders={quoted_signed_headers}"
+        )
+        canonical_query = query
+        if params:
+            encoded_params = [
+                (quote(name, safe=self._QUERY_SAFE), quote(str(value), safe=self._QUERY_SAFE))
+                for name, value in params
+            ]
+            amz_pairs = [tuple(pair.split("=", 1)) for pair in query.split("&")]
+            canonical_query = "&".join(f"{name}={value}" for name, value in sorted(amz_pairs + encoded_params))
+            query = "&".join(f"{name}={value}" for name, value in encoded_params) + "&" + query
+
+        canonical_request = (
+            f"{method}\n{path}\n{canonical_query}\n{canonical_headers}\n{signed_headers}\n{self._UNSIGNED_PAYLOAD}"
+        )
+        string_to_sign = (
+            f"{self._ALGORITHM}\n{amz_date}\n{datestamp}{self._scope_suffix}\n"
+            f"{hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()}"
+        )
+        signature = hmac.new(
+            self._derive_signing_key(datestamp), string_to_sign.encode("utf-8"), hashlib.sha256
+        ).hexdigest()
+
+        return f"{self._url_prefix}{path}?{query}&X-Amz-Signature={signature}"
+
+    def _derive_signing_key(self, datestamp: str) -> bytes:
+        """
+        Return the SigV4 signing key for a day, deriving it only once per day.
+        """
+        cached_datestamp, signing_key = self._signing_key
+        if cached_datestamp == datestamp:
+            return signing_key
+
+        signing_key = hmac.new(self._secret, datestamp.encode("utf-8"), hashlib.sha256).digest()
+        for part in (self.region, "s3", "aws4_request"):
+            signing_key = hmac.new(signing_key, part.encode("utf-8"), hashlib.sha256).digest()
+        self._signing_key = (datestamp, signing_key)
+        return signing_key
+
+
+class BodyStream:
+    """
+    Reads an object body in chunks on the S3 executor and closes it once.
+
+    A read cannot be interrupted, so when the stream is closed during one,
+    for example because the client disconnected mid-chunk, the body is
+    closed (and on_close called) when that read returns instead of while a
+    worker thread is still reading it.
+    """
+
+    def __init__(self, s3_svc: "S3Service", body: Any, chunk_size: int, on_close: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            s3_svc (S3Service): Service whose executor runs the reads.
+            body: The botocore StreamingBody from open_object.
+            chunk_size (int): Bytes read per chunk.
+            on_close (Callable, optional): Called once the body is closed,
+                e.g. to release a stream slot.
+        """
+        self.s3_svc = s3_svc
+        self.body = body
+        self.chunk_size = chunk_size
+        self.on_close = on_close
+        self.closed = False
+        self._reading: Optional[asyncio.Future] = None
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """
+        Yield the body chunk by chunk, closing it when the stream ends or is
+        abandoned.
+        """
+        try:
+            while not self.closed:
+                self._reading = asyncio.ensure_future(self.s3_svc.run(self.body.read, self.chunk_size))
+                # Cancelling the consumer must not cancel the read under the body
+                chunk = await asyncio.shield(self._reading)
+                self._reading = None
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """
+        Close the body now, or as soon as a read in progress returns.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if self._reading is None:
+            self._finish()
+        else:
+            self._reading.add_done_callback(self._finish)
+
+    def _finish(self, read: Optional[asyncio.Future] = None) -> None:
+        if read is not None and not read.cancelled():
+            # The stream was abandoned, so a failed read has no one to report to
+            read.exception()
+        self.body.close()
+        if self.on_close is not None:
+            self.on_close()
 
 
 class S3Service:
@@ -25,22 +386,321 @@ class S3Service:
 
     def __init__(self):
         """
-        Initialize S3 client with AWS credentials from settings.
+        Configure the service without connecting to S3.
+
+        Creating the service is cheap: boto3 is imported and the client is
+        built on first use (or by warm_up), so importing the application,
+        collecting tests and running CLI tools never pay for it. Connection
+        pool size, timeouts and retry mode come from settings. A connection
+        guard adds a global retry budget and a circuit breaker on top of
+        botocore's retries, and concurrent identical reads share one S3
+        call through a single-flight group. Uploads and deletes are recorded
+        in the object catalog when it is enabled and published to the
+        change feed. New upload keys follow the configured key layout.
+
+        Keys are spread over S3_BUCKET_NAMES by a bucket router. Every
+        bucket gets its own client, connection pool and circuit breaker; the
+        retry budget is shared.
 
         Raises:
+            ValueError: If S3_KEY_LAYOUT, S3_KEY_SHARDS or S3_BUCKET_VNODES
+                is invalid.
+        """
+        buckets = settings.S3_BUCKET_NAMES or [settings.S3_BUCKET_NAME]
+        self.bucket_router = BucketRouter(
+            buckets,
+            settings.S3_BUCKET_VNODES,
+            RoutingTable(settings.S3_ROUTING_TABLE_PATH) if len(set(buckets)) > 1 else None,
+            colocate=(settings.DERIVATIVE_PREFIX,)
+        )
+        self.buckets = self.bucket_router.buckets
+        self.bucket_name = self.buckets[0]
+        self.key_layout = create_key_layout(settings.S3_KEY_LAYOUT, settings.S3_KEY_SHARDS)
+        retry_budget = RetryBudget(
+            settings.S3_RETRY_BUDGET_RATIO,
+            settings.S3_RETRY_BUDGET_MIN_PER_SECOND,
+            settings.S3_RETRY_BUDGET_CAPACITY
+        )
+        self.connection_guards = {
+            bucket: S3ConnectionGuard(
+                retry_budget,
+                CircuitBreaker(settings.S3_BREAKER_FAILURE_THRESHOLD, settings.S3_BREAKER_RESET_TIMEOUT),
+                settings.S3_MAX_POOL_CONNECTIONS
+            )
+            for bucket in self.buckets
+        }
+        self.connection_guard = self.connection_guards[self.bucket_name]
+        self.last_route_backfill: Optional[Dict[str, Any]] = None
+        self.executor = S3Executor(settings.S3_MAX_CONCURRENCY)
+        self.download_url_cache = PresignedURLCache(
+            settings.DOWNLOAD_URL_CACHE_SIZE,
+            settings.PRESIGNED_URL_EXPIRE,
+            settings.DOWNLOAD_URL_CACHE_REUSE_FRACTION
+        )
+        self.metadata_cache = ObjectMetadataCache(
+            settings.OBJECT_METADATA_CACHE_SIZE,
+            settings.OBJECT_METADATA_CACHE_TTL,
+            settings.OBJECT_METADATA_NEGATIVE_TTL
+        )
+        self.single_flight = SingleFlight(settings.S3_READ_TIMEOUT) if settings.S3_COALESCE_READS else None
+        self.catalog = ObjectCatalog(settings.CATALOG_PATH) if settings.CATALOG_ENABLED else None
+        self.change_feed = ChangeFeed(settings.CHANGE_FEED_CAPACITY)
+        self._init_lock = threading.Lock()
+        self._bucket_clients: Dict[str, Any] = {}
+        self._bucket_presigners: Dict[str, SigV4Presigner] = {}
+
+    @cached_property
+    def client(self) -> Any:
+        """
+        The boto3 S3 client of the primary bucket, built on first access.
+
+        The client signs with SigV4, which the fast presigner reproduces
+        exactly, and has the connection guard attached.
+
+        Raises:
+            ValueError: If AWS credentials or the bucket name are missing.
             NoCredentialsError: If AWS credentials are not available.
         """
+        with self._init_lock:
+            if 'client' in self.__dict__:
+                return self.__dict__['client']
+            return self._build_client(self.connection_guard)
+
+    def _build_client(self, guard: S3ConnectionGuard) -> Any:
+        """
+        Build a boto3 S3 client with its own connection pool and attach a
+        connection guard to it.
+        """
+        settings.validate()
+        import boto3
+        from botocore.config import Config
+
         try:
-            self.client = boto3.client(
+            client = boto3.client(
                 's3',
                 aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
                 aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_REGION
+                region_name=settings.AWS_REGION,
+                endpoint_url=settings.S3_ENDPOINT_URL,
+                config=Config(
+                    max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                    connect_timeout=settings.S3_CONNECT_TIMEOUT,
+                    read_timeout=settings.S3_READ_TIMEOUT,
+                    retries={
+                        'mode': settings.S3_RETRY_MODE,
+                        'total_max_attempts': settings.S3_MAX_ATTEMPTS
+                    },
+                    signature_version='s3v4'
+                )
             )
-            self.bucket_name = settings.S3_BUCKET_NAME
         except NoCredentialsError:
             raise NoCredentialsError("AWS credentials not found. Please check your configuration.")
+        guard.attach(client)
+        return client
+
+    def client_for(self, bucket: str) -> Any:
+        """
+        The boto3 S3 client of a bucket, built on first use.
+
+        Args:
+            bucket (str): One of the configured buckets.
+
+        Raises:
+            KeyError: If the bucket is not configured.
+        """
+        if bucket == self.bucket_name:
+            return self.client
+        client = self._bucket_clients.get(bucket)
+        if client is None:
+            guard = self.connection_guards[bucket]
+            with self._init_lock:
+                client = self._bucket_clients.get(bucket)
+                if client is None:
+                    client = self._bucket_clients[bucket] = self._build_client(guard)
+        return client
 
+    @cached_property
+    def presigner(self) -> "SigV4Presigner":
+        """
+        The fast presigner of the primary bucket, derived from the client on
+        first access.
+        """
+        return SigV4Presigner.from_client(
+            self.client,
+            self.bucket_name,
+            settings.AWS_ACCESS_KEY_ID,
+            settings.AWS_SECRET_ACCESS_KEY
+        )
+
+    def presigner_for(self, bucket: str) -> "SigV4Presigner":
+        """
+        The fast presigner of a bucket, derived from its client on first use.
+        """
+        if bucket == self.bucket_name:
+            return self.presigner
+        presigner = self._bucket_presigners.get(bucket)
+        if presigner is None:
+            presigner = self._bucket_presigners[bucket] = SigV4Presigner.from_client(
+                self.client_for(bucket),
+                bucket,
+                settings.AWS_ACCESS_KEY_ID,
+                settings.AWS_SECRET_ACCESS_KEY
+            )
+        return presigner
+
+    def bucket_for(self, key: str) -> str:
+        """
+        The bucket holding a key, per the bucket router.
+        """
+        return self.bucket_router.route(key)
+
+    def warm_up(self) -> None:
+        """
+        Build the clients and presigners ahead of the first request.
+
+        Loads boto3, resolves the endpoint and learns the presigned URL
+        layout of every bucket. The health prober calls this on the S3
+        executor at startup; its first probe then opens the first pooled
+        (TLS) connection to each bucket.
+        """
+        for bucket in self.buckets:
+            self.presigner_for(bucket)
+
+    def connection_stats(self) -> Dict[str, Any]:
+        """
+        Report connection pool utilization, circuit breaker state, retry
+        budget and read coalescing for monitoring.
+
+        Returns:
+            dict: Contains 'pool' and 'circuit_breaker' of the primary
+                  bucket, 'retry_budget', 'buckets' with the pool and
+                  breaker of each bucket when there are several, and, when
+                  enabled, 'coalescing'.
+        """
+        stats = self.connection_guard.stats()
+        if self.bucket_router.sharded:
+            stats["buckets"] = {}
+            for bucket, guard in self.connection_guards.items():
+                bucket_stats = guard.stats()
+                del bucket_stats["retry_budget"]
+                stats["buckets"][bucket] = bucket_stats
+        if self.single_flight is not None:
+            stats["coalescing"] = self.single_flight.stats()
+        return stats
+
+    def _forget_routes(self, keys: List[str]) -> None:
+        """
+        Drop the routing table pins of deleted keys, if any.
+
+        A leftover pin only points a deleted key at its old bucket, so a
+        failed write is not worth failing the delete for.
+        """
+        table = self.bucket_router.table
+        if table is None or not keys:
+            return
+        try:
+            table.unpin(keys)
+        except sqlite3.Error:
+            pass
+
+    async def backfill_routes(self) -> Optional[Dict[str, Any]]:
+        """
+        Pin existing keys that are stored outside their ring bucket.
+
+        Every bucket is listed concurrently and each key that the hash ring
+        places on another bucket, such as the keys of the original bucket
+        after buckets were added, is pinned to the bucket holding it. The
+        routing table remembers the ring it was filled for, so the listing
+        is skipped until the set of buckets changes. Until it completes,
+        misplaced keys that are not pinned yet cannot be found.
+
+        Returns:
+            dict: 'scanned' and 'pinned' key counts, 'skipped' and
+                  'duration_ms'; None with a single bucket.
+
+        Raises:
+            ClientError: If listing a bucket fails.
+            sqlite3.Error: If the routing table cannot be written.
+        """
+        table = self.bucket_router.table
+        if table is None:
+            return None
+
+        started = time.perf_counter()
+        fingerprint = self.bucket_router.ring.fingerprint
+        if await asyncio.to_thread(table.get_meta, "backfilled_ring") == fingerprint:
+            self.last_route_backfill = {"scanned": 0, "pinned": 0, "skipped": True, "duration_ms": 0.0}
+            return self.last_route_backfill
+
+        async def backfill(bucket: str) -> Tuple[int, int]:
+            scanned = pinned = 0
+            async for page in self._bucket_object_pages(bucket, None, None):
+                misplaced = [(obj['key'], bucket) for obj in page if self.bucket_router.place(obj['key']) != bucket]
+                if misplaced:
+                    await asyncio.to_thread(table.pin, misplaced)
+                scanned += len(page)
+                pinned += len(misplaced)
+            return scanned, pinned
+
+        counts = await asyncio.gather(*(backfill(bucket) for bucket in self.buckets))
+        await asyncio.to_thread(table.set_meta, "backfilled_ring", fingerprint)
+        self.last_route_backfill = {
+            "scanned": sum(scanned for scanned, _ in counts),
+            "pinned": sum(pinned for _, pinned in counts),
+            "skipped": False,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+        return self.last_route_backfill
+
+    def routing_stats(self) -> Dict[str, Any]:
+        """
+        Report the bucket router's layout, pinned keys and the last
+        routing table backfill.
+
+        Returns:
+            dict: The router's stats plus 'last_backfill'.
+        """
+        return {**self.bucket_router.stats(), "last_backfill": self.last_route_backfill}
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking service method on the S3 executor.
+
+        All async callers (routers, health checks) should go through this
+        method instead of calling the synchronous methods directly, so that
+        S3 round trips never block the event loop. Callers of a coalesced
+        method join an identical call in flight here, on the event loop,
+        rather than each taking an executor thread to wait for it.
+
+        Args:
+            func (Callable): A method of this service, e.g. ``self.list_objects``.
+            *args: Positional arguments for func.
+            **kwargs: Keyword arguments for func.
+
+        Returns:
+            The return value of func.
+
+        Raises:
+            ClientError: If the underlying S3 operation fails.
+        """
+        return await run_coalesced(self.executor.run, func, *args, **kwargs)
+
+    def _update_catalog(self, update: Callable[[ObjectCatalog], None]) -> None:
+        """
+        Apply an update to the object catalog, if enabled.
+
+        The catalog is an index, not the source of truth: a failed write must
+        not fail an S3 operation that already succeeded, and the next
+        reconciliation run repairs the drift.
+        """
+        if self.catalog is None:
+            return
+        try:
+            update(self.catalog)
+        except sqlite3.Error:
+            pass
+
+    @instrumented
     def generate_upload_url(self, filename: str, content_type: str = "application/octet-stream") -> Dict[str, str]:
         """
         Generate a presigned URL for uploading a file to S3.
@@ -58,98 +718,551 @@ class S3Service:
         Raises:
             ClientError: If S3 operation fails.
         """
-        # Create organized key structure: uploads/YYYY-MM-DD/uuid-filename
-        date_folder = datetime.now().strftime('%Y-%m-%d')
-        unique_id = uuid.uuid4()
-        key = f"uploads/{date_folder}/{unique_id}-{filename}"
+        key = self.build_upload_key(filename)
 
-        try:
-            upload_url = self.client.generate_presigned_url(
-                'put_object',
-                Params={
-                    'Bucket': self.bucket_name,
-                    'Key': key,
-                    'ContentType': content_type
-                },
-                ExpiresIn=settings.PRESIGNED_URL_EXPIRE
-            )
+        upload_url = self.presigner_for(self.bucket_router.place(key)).presign(
+            'PUT', key, settings.PRESIGNED_URL_EXPIRE, content_type=content_type
+        )
+        self._update_catalog(lambda catalog: catalog.record_pending([(key, content_type)]))
+
+        return {
+            "upload_url": upload_url,
+            "key": key,
+            "expires_in": settings.PRESIGNED_URL_EXPIRE
+        }
+
+    @instrumented
+    def generate_upload_urls(self, files: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Generate presigned upload URLs for many files in one call.
+
+        The date folder and signing time are computed once for the whole
+        batch and the random bytes for every key's UUID are drawn in a single
+        call, so the per-file cost is just key formatting and signing.
+
+        Args:
+            files (List[Tuple[str, str]]): (filename, content_type) pairs.
+
+        Returns:
+            list: One dict per file, in input order, with 'upload_url', 'key',
+                  and 'expires_in' fields.
+
+        Raises:
+            ClientError: If S3 operation fails.
+        """
+        now = datetime.now(timezone.utc)
+        date_folder = datetime.now().strftime('%Y-%m-%d')
+        expires_in = settings.PRESIGNED_URL_EXPIRE
+        random_bytes = os.urandom(16 * len(files))
 
-            return {
-                "upload_url": upload_url,
+        uploads = []
+        pending = []
+        for index, (filename, content_type) in enumerate(files):
+            unique_id = uuid.UUID(bytes=random_bytes[16 * index:16 * (index + 1)], version=4)
+            key = self.build_upload_key(filename, date_folder, unique_id)
+            uploads.append({
+                "upload_url": self.presigner_for(self.bucket_router.place(key)).presign(
+                    'PUT', key, expires_in, content_type=content_type, now=now
+                ),
                 "key": key,
-                "expires_in": settings.PRESIGNED_URL_EXPIRE
-            }
-        except ClientError as e:
-            raise ClientError(f"Failed to generate upload URL: {e}")
+                "expires_in": expires_in
+            })
+            pending.append((key, content_type))
+        self._update_catalog(lambda catalog: catalog.record_pending(pending))
+        return uploads
+
+    def build_upload_key(
+        self,
+        filename: str,
+        date_folder: Optional[str] = None,
+        unique_id: Optional[uuid.UUID] = None
+    ) -> str:
+        """
+        Build the S3 key for a new upload.
+
+        Keys follow the configured key layout, by default
+        ``uploads/YYYY-MM-DD/uuid-filename``, so that uploads are grouped by
+        day and never collide. The hashed layout adds a shard folder after
+        ``uploads/`` to spread writes over several S3 partitions.
 
-    def generate_download_url(self, key: str) -> Dict[str, str]:
+        Args:
+            filename (str): Original name of the file.
+            date_folder (str, optional): Day folder; defaults to today.
+            unique_id (UUID, optional): Unique prefix; defaults to a new uuid4.
+
+        Returns:
+            str: The object key.
+        """
+        date_folder = date_folder or datetime.now().strftime('%Y-%m-%d')
+        unique_id = unique_id or uuid.uuid4()
+        return self.key_layout.build(filename, date_folder, unique_id)
+
+    @instrumented
+    def generate_download_url(self, key: str, verify_exists: bool = False) -> Dict[str, str]:
         """
         Generate a presigned URL for downloading a file from S3.
 
+        Recently issued URLs are served from the download URL cache, so the
+        same key keeps the same URL (and stays cacheable for browsers and
+        CDNs) until part of its lifetime has passed.
+
         Args:
             key (str): The S3 object key to download.
+            verify_exists (bool): Check the object exists first, using the
+                metadata cache so repeated checks cost no S3 round trip.
 
         Returns:
-            dict: Contains 'download_url', 'key', and 'expires_in' fields.
+            dict: Contains 'download_url', 'key', and 'expires_in' fields;
+                  'expires_in' is the remaining lifetime of the URL.
 
         Raises:
-            ClientError: If S3 operation fails or object does not exist.
+            ClientError: With code NoSuchKey if verify_exists is set and the
+                object does not exist, or if the S3 operation fails.
         """
-        try:
-            download_url = self.client.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': self.bucket_name,
-                    'Key': key
-                },
-                ExpiresIn=settings.PRESIGNED_URL_EXPIRE
-            )
+        if verify_exists:
+            self.get_object_metadata(key)
+        return self._presign_downloads([key])[0]
 
-            return {
-                "download_url": download_url,
-                "key": key,
-                "expires_in": settings.PRESIGNED_URL_EXPIRE
-            }
-        except ClientError as e:
-            raise ClientError(f"Failed to generate download URL for key '{key}': {e}")
+    @instrumented
+    def generate_download_urls(self, keys: List[str]) -> List[Dict[str, Any]]:
+        """
+        Generate presigned download URLs for many keys in one call.
+
+        Cached URLs are reused; the rest are signed back to back with the
+        same presigner and signing time, so a whole page of keys costs a
+        single executor hop and a single signing-key derivation instead of
+        one per key.
+
+        Args:
+            keys (List[str]): The S3 object keys to presign.
+
+        Returns:
+            list: One dict per key, in input order, with 'download_url', 'key',
+                  and 'expires_in' fields.
 
-    def list_objects(self) -> Dict[str, int]:
+        Raises:
+            ClientError: If S3 operation fails.
+        """
+        return self._presign_downloads(keys)
+
+    def _presign_downloads(self, keys: List[str]) -> List[Dict[str, Any]]:
         """
-        List all objects in the configured S3 bucket.
+        Presign download URLs without recording an S3 service call, so
+        instrumented callers are counted once.
+        """
+        # X-Amz-Date has whole-second precision, so remaining lifetimes are
+        # measured from the truncated signing time
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        expires_in = settings.PRESIGNED_URL_EXPIRE
+        cache = self.download_url_cache
+        cached_urls = [cache.get(key, now) for key in keys]
+        missing = [key for key, cached in zip(keys, cached_urls) if cached is None]
+        buckets = dict(zip(missing, self.bucket_router.route_many(missing))) if missing else {}
+        urls = []
+        for key, cached in zip(keys, cached_urls):
+            if cached is None:
+                url = self.presigner_for(buckets[key]).presign('GET', key, expires_in, now=now)
+                cache.put(key, url, now)
+                cached = (url, expires_in)
+            urls.append({"download_url": cached[0], "key": key, "expires_in": cached[1]})
+        return urls
+
+    @coalesced
+    @instrumented
+    def list_objects(
+        self,
+        prefix: Optional[str] = None,
+        limit: int = 1000,
+        continuation_token: Optional[str] = None,
+        start_after: Optional[str] = None,
+        include_urls: bool = False,
+        bucket: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        List one page of objects in one S3 bucket.
+
+        S3 returns at most 1000 keys per call. When more keys are available the
+        response includes a continuation token that can be passed back to fetch
+        the next page.
 
-        Returns paginated results with basic metadata for each object.
+        Without a prefix, thumbnails under DERIVATIVE_PREFIX are left out and
+        the listing continues until the page holds ``limit`` objects or the
+        bucket is exhausted, so a truncated page is always full. A page that
+        runs into the derivative folder continues after it.
+
+        Args:
+            prefix (str, optional): Only return keys starting with this prefix.
+            limit (int): Maximum number of objects to return (1-1000).
+            continuation_token (str, optional): Token from a previous page.
+            start_after (str, optional): Only return keys after this key. Ignored
+                by S3 when continuation_token is provided.
+            include_urls (bool): Whether to embed a presigned 'download_url' in
+                each object.
+            bucket (str, optional): The bucket to list; defaults to the
+                primary bucket.
 
         Returns:
-            dict: Contains 'objects' list and 'count' field.
+            dict: Contains 'objects' list, 'count', 'is_truncated' and
+                  'next_continuation_token' fields.
                   Each object in the list has 'key', 'size', 'last_modified', and 'etag'.
 
         Raises:
             ClientError: If S3 operation fails.
         """
-        try:
-            response = self.client.list_objects_v2(Bucket=self.bucket_name)
-            objects = []
-
-            if 'Contents' in response:
-                for obj in response['Contents']:
-                    objects.append({
-                        'key': obj['Key'],
-                        'size': obj['Size'],
-                        'last_modified': obj['LastModified'].isoformat(),
-                        'etag': obj['ETag']
-                    })
-
-            return {
-                "objects": objects,
-                "count": len(objects)
-            }
-        except ClientError as e:
-            raise ClientError(f"Failed to list objects in bucket '{self.bucket_name}': {e}")
+        bucket = bucket or self.bucket_name
+        client = self.client_for(bucket)
+        params = self._list_params(prefix, start_after, bucket)
+        params['MaxKeys'] = limit
+        if continuation_token:
+            params['ContinuationToken'] = continuation_token
+
+        objects: List[Dict[str, Any]] = []
+        while True:
+            response = client.list_objects_v2(**params)
+            contents = response.get('Contents', [])
+            if not _hides_derivatives(prefix):
+                objects.extend(self._object_info(obj) for obj in contents)
+                break
+            objects.extend(self._object_info(obj) for obj in contents if not self.is_derivative(obj['Key']))
+            if not response.get('IsTruncated') or len(objects) >= limit:
+                break
+            if contents and self.is_derivative(contents[-1]['Key']):
+                # The rest of the page lies past the derivative folder
+                params = self._list_params(prefix, _past_derivatives(), bucket)
+            else:
+                params['ContinuationToken'] = response['NextContinuationToken']
+            params['MaxKeys'] = limit - len(objects)
+
+        if include_urls:
+            self._attach_download_urls(objects)
+
+        return {
+            "objects": objects,
+            "count": len(objects),
+            "is_truncated": response.get('IsTruncated', False),
+            "next_continuation_token": response.get('NextContinuationToken')
+        }
+
+    async def list_page(
+        self,
+        prefix: Optional[str] = None,
+        limit: int = 1000,
+        continuation_token: Optional[str] = None,
+        start_after: Optional[str] = None,
+        include_urls: bool = False
+    ) -> Dict[str, Any]:
+        """
+        List one page of objects under a logical prefix, across buckets.
+
+        When a single bucket stores the prefix under a single physical
+        prefix this is one list_objects call. Otherwise every bucket, and
+        under a sharded key layout every shard of a date prefix, is listed
+        concurrently from the same position and the pages are merged into
+        key order. The continuation token is then the last returned key,
+        marked with SHARDED_CONTINUATION_PREFIX.
+
+        Args:
+            prefix (str, optional): Only return keys starting with this prefix.
+            limit (int): Maximum number of objects to return (1-1000).
+            continuation_token (str, optional): Token from a previous page.
+            start_after (str, optional): Only return keys after this key.
+            include_urls (bool): Whether to embed a presigned 'download_url' in
+                each object.
+
+        Returns:
+            dict: The same fields as list_objects.
+
+        Raises:
+            ValueError: If continuation_token was not issued for a sharded listing.
+            ClientError: If S3 operation fails.
+        """
+        sources = [
+            (bucket, shard_prefix)
+            for bucket in self.buckets
+            for shard_prefix in self.key_layout.expand_prefix(prefix)
+        ]
+        if len(sources) == 1:
+            return await self.run(
+                self.list_objects,
+                prefix=prefix,
+                limit=limit,
+                continuation_token=continuation_token,
+                start_after=start_after,
+                include_urls=include_urls
+            )
+
+        after = start_after
+        if continuation_token:
+            if not continuation_token.startswith(SHARDED_CONTINUATION_PREFIX):
+                raise ValueError("Invalid continuation_token for a sharded listing")
+            after = continuation_token[len(SHARDED_CONTINUATION_PREFIX):]
+        pages = await asyncio.gather(*(
+            self.run(self.list_objects, prefix=shard_prefix, limit=limit, start_after=after, bucket=bucket)
+            for bucket, shard_prefix in sources
+            if not _precedes(shard_prefix, after)
+        ))
+
+        # Every truncated source returned ``limit`` keys, so the first
+        # ``limit`` merged keys cannot skip any key a source has not sent yet
+        merged = _unique_keys(heapq.merge(*(page['objects'] for page in pages), key=lambda obj: obj['key']))
+        # Listing results may be shared with coalesced callers, so copy before adding URLs
+        objects = [dict(obj) for obj in merged[:limit]]
+        if include_urls and objects:
+            await self.run(self._attach_download_urls, objects)
+        is_truncated = len(merged) > limit or any(page['is_truncated'] for page in pages)
 
+        return {
+            "objects": objects,
+            "count": len(objects),
+            "is_truncated": is_truncated,
+            "next_continuation_token": (
+                f"{SHARDED_CONTINUATION_PREFIX}{objects[-1]['key']}" if is_truncated and objects else None
+            )
+        }
+
+    def iter_object_pages(
+        self,
+        prefix: Optional[str] = None,
+        start_after: Optional[str] = None,
+        include_urls: bool = False,
+        bucket: Optional[str] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Lazily walk every page of one bucket's listing.
+
+        Each iteration performs one blocking list_objects_v2 call through the
+        boto3 paginator, so only a single page is held in memory at a time.
+        Without a prefix, thumbnails under DERIVATIVE_PREFIX are left out and
+        their folder is skipped rather than walked.
+
+        Args:
+            prefix (str, optional): Only return keys starting with this prefix.
+            start_after (str, optional): Only return keys after this key.
+            include_urls (bool): Whether to embed a presigned 'download_url' in
+                each object.
+            bucket (str, optional): The bucket to list; defaults to the
+                primary bucket.
+
+        Yields:
+            list: The objects of one page, in the same format as list_objects.
+
+        Raises:
+            ClientError: If S3 operation fails.
+        """
+        bucket = bucket or self.bucket_name
+        paginator = self.client_for(bucket).get_paginator('list_objects_v2')
+        pages = iter(paginator.paginate(**self._list_params(prefix, start_after, bucket)))
+        while True:
+            with track_s3_call("iter_object_pages"):
+                page = next(pages, None)
+            if page is None:
+                return
+            contents = page.get('Contents', [])
+            if _hides_derivatives(prefix) and contents:
+                if page.get('IsTruncated') and self.is_derivative(contents[-1]['Key']):
+                    pages = iter(paginator.paginate(**self._list_params(prefix, _past_derivatives(), bucket)))
+                contents = [obj for obj in contents if not self.is_derivative(obj['Key'])]
+            objects = [self._object_info(obj) for obj in contents]
+            if include_urls:
+                self._attach_download_urls(objects)
+            yield objects
+
+    async def stream_objects(
+        self,
+        prefix: Optional[str] = None,
+        start_after: Optional[str] = None,
+        include_urls: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Asynchronously yield every object in the bucket, page by page.
+
+        Each page is fetched on the S3 executor, so the event loop is never
+        blocked and memory use stays constant regardless of bucket size.
+
+        Args:
+            prefix (str, optional): Only return keys starting with this prefix.
+            start_after (str, optional): Only return keys after this key.
+            include_urls (bool): Whether to embed a presigned 'download_url' in
+                each object.
+
+        Yields:
+            dict: One object with 'key', 'size', 'last_modified', and 'etag'.
+
+        Raises:
+            ClientError: If S3 operation fails.
+        """
+        async for page in self.stream_object_pages(prefix, start_after, include_urls):
+            for obj in page:
+                yield obj
+
+    async def stream_object_pages(
+        self,
+        prefix: Optional[str] = None,
+        start_after: Optional[str] = None,
+        include_urls: bool = False
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Asynchronously yield every page of the bucket listing.
+
+        Like stream_objects, but yields whole pages so callers can encode
+        and send up to 1000 objects at a time. A date prefix under a sharded
+        key layout is walked shard by shard; shards are disjoint key ranges
+        in order, so the stream stays in key order. With several buckets,
+        all buckets are walked concurrently and their pages merged into key
+        order.
+
+        Args:
+            prefix (str, optional): Only return keys starting with this prefix.
+            start_after (str, optional): Only return keys after this key.
+            include_urls (bool): Whether to embed a presigned 'download_url' in
+                each object.
+
+        Yields:
+            list: The objects of one page, in the same format as list_objects.
+
+        Raises:
+            ClientError: If S3 operation fails.
+        """
+        if not self.bucket_router.sharded:
+            async for page in self._bucket_object_pages(self.bucket_name, prefix, start_after, include_urls):
+                yield page
+            return
+
+        streams = [self._bucket_object_pages(bucket, prefix, start_after) for bucket in self.buckets]
+        async for page in _merge_pages(streams):
+            if include_urls:
+                await self.run(self._attach_download_urls, page)
+            yield page
+
+    async def _bucket_object_pages(
+        self,
+        bucket: str,
+        prefix: Optional[str],
+        start_after: Optional[str],
+        include_urls: bool = False
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield every page of one bucket's listing, shard by shard.
+        """
+        for shard_prefix in self.key_layout.expand_prefix(prefix):
+            if _precedes(shard_prefix, start_after):
+                continue
+            pages = self.iter_object_pages(shard_prefix, start_after, include_urls, bucket)
+            while True:
+                page = await self.run(next, pages, None)
+                if page is None:
+                    break
+                yield page
+
+    def _attach_download_urls(self, objects: List[Dict[str, Any]]) -> None:
+        """
+        Add a presigned 'download_url' to each listed object in place.
+        """
+        for obj, url in zip(objects, self._presign_downloads([obj['key'] for obj in objects])):
+            obj['download_url'] = url['download_url']
+
+    def _list_params(self, prefix: Optional[str], start_after: Optional[str], bucket: str) -> Dict[str, Any]:
+        """
+        Build the common list_objects_v2 parameters.
+        """
+        params = {'Bucket': bucket}
+        if prefix:
+            params['Prefix'] = prefix
+        if start_after:
+            params['StartAfter'] = start_after
+        return params
+
+    @staticmethod
+    def _object_info(obj: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a raw S3 listing entry into the API's file info format.
+        """
+        return {
+            'key': obj['Key'],
+            'size': obj['Size'],
+            'last_modified': obj['LastModified'].isoformat(),
+            'etag': obj['ETag']
+        }
+
+    @coalesced
+    @instrumented
+    def get_object_metadata(self, key: str) -> Dict[str, Any]:
+        """
+        Return an object's metadata from a HEAD request.
+
+        Results are kept in the metadata cache, including missing keys, so
+        repeated lookups of the same key are answered without S3.
+
+        Args:
+            key (str): The S3 object key.
+
+        Returns:
+            dict: Contains 'key', 'size', 'content_type', 'etag' and
+                  'last_modified' fields.
+
+        Raises:
+            ClientError: With code NoSuchKey if the object does not exist, or
+                if the S3 operation fails.
+        """
+        cached, metadata = self.metadata_cache.get(key)
+        if not cached:
+            try:
+                bucket = self.bucket_for(key)
+                response = self.client_for(bucket).head_object(Bucket=bucket, Key=key)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in _NOT_FOUND_CODES:
+                    raise
+                metadata = None
+            else:
+                metadata = {
+                    'key': key,
+                    'size': response['ContentLength'],
+                    'content_type': response.get('ContentType', 'application/octet-stream'),
+                    'etag': response['ETag'],
+                    'last_modified': response['LastModified'].isoformat()
+                }
+            self.metadata_cache.put(key, metadata)
+
+        if metadata is None:
+            raise ClientError(
+                {'Error': {'Code': 'NoSuchKey', 'Message': f"Object '{key}' does not exist"}},
+                'HeadObject'
+            )
+        return metadata
+
+    @instrumented
+    def confirm_upload(self, key: str) -> Dict[str, Any]:
+        """
+        Confirm that an upload finished, record the object in the catalog
+        and publish it to the change feed.
+
+        Clients uploading through a presigned URL call this once their PUT
+        succeeded. The object is looked up with a fresh HEAD request, so a
+        cached "missing" answer from before the upload is not reused.
+
+        Args:
+            key (str): The S3 object key.
+
+        Returns:
+            dict: The object's metadata, as returned by get_object_metadata.
+
+        Raises:
+            ClientError: With code NoSuchKey if the object does not exist, or
+                if the S3 operation fails.
+        """
+        self.metadata_cache.invalidate([key])
+        metadata = self.get_object_metadata(key)
+        self._update_catalog(lambda catalog: catalog.record_present([metadata]))
+        self.change_feed.publish(CREATED, [metadata])
+        return metadata
+
+    @instrumented
     def delete_object(self, key: str) -> Dict[str, str]:
         """
         Delete a specific object from the S3 bucket.
 
+        Thumbnails and other derivatives of the object are deleted with it.
+
         Args:
             key (str): The S3 object key to delete.
 
@@ -159,34 +1272,550 @@ class S3Service:
         Raises:
             ClientError: If S3 operation fails or object does not exist.
         """
-        try:
-            self.client.delete_object(Bucket=self.bucket_name, Key=key)
+        bucket = self.bucket_for(key)
+        self.client_for(bucket).delete_object(Bucket=bucket, Key=key)
+        self._forget_routes([key])
+        self.download_url_cache.invalidate([key])
+        self.metadata_cache.put(key, None)
+
+        # Derivatives are neither catalogued nor published
+        if not self.is_derivative(key):
+            self._update_catalog(lambda catalog: catalog.remove([key]))
+            self.change_feed.publish(DELETED, [{'key': key}])
+            try:
+                self.delete_derivatives(key)
+            except ClientError:
+                # The source is gone regardless; leftover derivatives embed its
+                # ETag, so they can never be served for different content
+                pass
+
+        return {
+            "message": "Object deleted successfully",
+            "key": key
+        }
+
+    @staticmethod
+    def derivative_prefix(key: str) -> str:
+        """
+        Folder holding every derivative of a source object.
+
+        The source key is hashed so the folder has a fixed length and all
+        derivatives of one source can be found with a single listing.
+
+        Args:
+            key (str): The source object key.
+
+        Returns:
+            str: The prefix, ending in a slash.
+        """
+        digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return f"{settings.DERIVATIVE_PREFIX}{digest}/"
+
+    @staticmethod
+    def is_derivative(key: str) -> bool:
+        """
+        Whether a key is a derivative in the thumbnail cache rather than a
+        user's file.
+        """
+        return bool(settings.DERIVATIVE_PREFIX) and key.startswith(settings.DERIVATIVE_PREFIX)
+
+    @instrumented
+    def delete_derivatives(self, key: str) -> int:
+        """
+        Delete all derivatives of a source object.
+
+        Args:
+            key (str): The source object key.
+
+        Returns:
+            int: Number of derivatives deleted.
+
+        Raises:
+            ClientError: If S3 operation fails.
+        """
+        keys = self._list_derivatives(key)
+        if not keys:
+            return 0
+        return len(self.delete_objects(keys)['deleted'])
+
+    def _list_derivatives(self, key: str) -> List[str]:
+        """
+        List the keys in a source object's derivative folder.
+        """
+        prefix = self.derivative_prefix(key)
+        # Derivatives of one source are colocated, so one bucket holds them all
+        bucket = self.bucket_router.place(prefix)
+        response = self.client_for(bucket).list_objects_v2(
+            Bucket=bucket,
+            Prefix=prefix,
+            MaxKeys=DELETE_BATCH_SIZE
+        )
+        return [obj['Key'] for obj in response.get('Contents', [])]
+
+    def _delete_derivatives_of(self, keys: List[str]) -> int:
+        """
+        Delete the derivatives of deleted source objects.
+
+        Derivative folders are named by a hash of the source key, so they
+        cannot be found once the source is gone; each source's folder is
+        listed here and all derivatives found go out in shared
+        DeleteObjects calls. Failures are ignored as in delete_object:
+        leftovers embed their source's ETag and are never served for other
+        content.
+
+        Returns:
+            int: Number of derivatives deleted.
+        """
+        derivatives: List[str] = []
+        for key in keys:
+            if self.is_derivative(key):
+                continue
+            try:
+                derivatives.extend(self._list_derivatives(key))
+            except (ClientError, S3UnavailableError):
+                pass
+        deleted = 0
+        for start in range(0, len(derivatives), DELETE_BATCH_SIZE):
+            try:
+                deleted += len(self.delete_objects(derivatives[start:start + DELETE_BATCH_SIZE])['deleted'])
+            except (ClientError, S3UnavailableError):
+                pass
+        return deleted
+
+    @instrumented
+    def create_multipart_upload(
+        self,
+        filename: str,
+        content_type: str,
+        file_size: int
+    ) -> Dict[str, Any]:
+        """
+        Start a multipart upload and plan its parts.
+
+        The key uses the same layout as generate_upload_url. The part size is
+        derived from the declared file size so the client can upload parts in
+        parallel and retry individual parts.
+
+        Args:
+            filename (str): Original name of the file to upload.
+            content_type (str): MIME type of the file.
+            file_size (int): Declared size of the file in bytes.
+
+        Returns:
+            dict: Contains 'upload_id', 'key', 'part_size' and 'part_count'.
+
+        Raises:
+            ValueError: If the file size is invalid.
+            ClientError: If S3 operation fails.
+        """
+        part_size, part_count = plan_multipart_parts(file_size, settings.MULTIPART_MIN_PART_SIZE)
+        key = self.build_upload_key(filename)
+        upload_id = self.start_multipart_upload(key, content_type)
+
+        return {
+            "upload_id": upload_id,
+            "key": key,
+            "part_size": part_size,
+            "part_count": part_count
+        }
+
+    @instrumented
+    def start_multipart_upload(self, key: str, content_type: str) -> str:
+        """
+        Start a multipart upload for a known key.
 
-            return {
-                "message": "Object deleted successfully",
-                "key": key
+        Args:
+            key (str): The S3 object key.
+            content_type (str): MIME type stored with the object.
+
+        Returns:
+            str: The upload ID.
+
+        Raises:
+            ClientError: If S3 operation fails.
+        """
+        bucket = self.bucket_for(key)
+        response = self.client_for(bucket).create_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            ContentType=content_type
+        )
+        self._update_catalog(lambda catalog: catalog.record_pending([(key, content_type)]))
+        return response['UploadId']
+
+    @instrumented
+    def upload_part(self, key: str, upload_id: str, part_number: int, body: bytes) -> str:
+        """
+        Upload one part of a multipart upload from the server.
+
+        Args:
+            key (str): The S3 object key.
+            upload_id (str): The multipart upload ID.
+            part_number (int): Part number, starting at 1.
+            body (bytes): The part's data.
+
+        Returns:
+            str: The part's ETag.
+
+        Raises:
+            ClientError: If S3 operation fails.
+        """
+        bucket = self.bucket_for(key)
+        response = self.client_for(bucket).upload_part(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body
+        )
+        return response['ETag']
+
+    @instrumented
+    def put_object(self, key: str, body: bytes, content_type: str, publish: bool = True) -> str:
+        """
+        Upload a small object in a single request.
+
+        Args:
+            key (str): The S3 object key.
+            body (bytes): The object's data.
+            content_type (str): MIME type stored with the object.
+            publish (bool): Record the object in the catalog and publish it
+                to the change feed; off for internal objects such as cached
+                thumbnails, which are not user files.
+
+        Returns:
+            str: The object's ETag.
+
+        Raises:
+            ClientError: If S3 operation fails.
+        """
+        bucket = self.bucket_for(key)
+        response = self.client_for(bucket).put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=body,
+            ContentType=content_type
+        )
+        self.metadata_cache.invalidate([key])
+        if not publish:
+            return response['ETag']
+        created = {
+            'key': key,
+            'size': len(body),
+            'etag': response['ETag'],
+            'last_modified': datetime.now(timezone.utc).isoformat(),
+            'content_type': content_type
+        }
+        self._update_catalog(lambda catalog: catalog.record_present([created]))
+        self.change_feed.publish(CREATED, [created])
+        return response['ETag']
+
+    @instrumented
+    def generate_part_urls(self, key: str, upload_id: str, part_numbers: List[int]) -> List[Dict[str, Any]]:
+        """
+        Generate presigned upload URLs for parts of a multipart upload.
+
+        Args:
+            key (str): The key of the multipart upload.
+            upload_id (str): The multipart upload ID.
+            part_numbers (List[int]): Part numbers (1-10000) to presign.
+
+        Returns:
+            list: One dict per part with 'part_number' and 'upload_url'.
+        """
+        now = datetime.now(timezone.utc)
+        expires_in = settings.PRESIGNED_URL_EXPIRE
+        presigner = self.presigner_for(self.bucket_for(key))
+        return [
+            {
+                "part_number": part_number,
+                "upload_url": presigner.presign(
+                    'PUT', key, expires_in, now=now,
+                    params=[('uploadId', upload_id), ('partNumber', str(part_number))]
+                )
+            }
+            for part_number in part_numbers
+        ]
+
+    @instrumented
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Assemble uploaded parts into the final object.
+
+        Args:
+            key (str): The key of the multipart upload.
+            upload_id (str): The multipart upload ID.
+            parts (List[dict]): Uploaded parts with 'part_number' and 'etag'.
+
+        Returns:
+            dict: Contains 'key' and the final object's 'etag'.
+
+        Raises:
+            ClientError: If S3 operation fails, e.g. a part is missing.
+        """
+        bucket = self.bucket_for(key)
+        response = self.client_for(bucket).complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={
+                'Parts': [
+                    {'PartNumber': part['part_number'], 'ETag': part['etag']}
+                    for part in sorted(parts, key=lambda part: part['part_number'])
+                ]
             }
-        except ClientError as e:
-            raise ClientError(f"Failed to delete object with key '{key}': {e}")
+        )
+
+        self.metadata_cache.invalidate([key])
+        try:
+            self.confirm_upload(key)
+        except ClientError:
+            # Reconciliation records and announces the object once it is listed
+            pass
+
+        return {
+            "key": key,
+            "etag": response.get('ETag', '')
+        }
+
+    @instrumented
+    def abort_multipart_upload(self, key: str, upload_id: str) -> Dict[str, str]:
+        """
+        Abort a multipart upload and discard its uploaded parts.
+
+        Args:
+            key (str): The key of the multipart upload.
+            upload_id (str): The multipart upload ID.
+
+        Returns:
+            dict: Confirmation with 'message' and 'key' fields.
+
+        Raises:
+            ClientError: If S3 operation fails.
+        """
+        bucket = self.bucket_for(key)
+        self.client_for(bucket).abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        self._update_catalog(lambda catalog: catalog.remove([key]))
 
-    def get_bucket_location(self) -> str:
+        return {
+            "message": "Multipart upload aborted",
+            "key": key
+        }
+
+    @instrumented
+    def delete_objects(self, keys: List[str]) -> Dict[str, List]:
+        """
+        Delete up to 1000 objects with a single DeleteObjects call.
+
+        Quiet mode is used so S3 only reports failures; every key that is not
+        listed as an error was deleted. Keys on different buckets are sent as
+        one call per bucket.
+
+        Args:
+            keys (List[str]): The S3 object keys to delete (at most 1000).
+
+        Returns:
+            dict: 'deleted' list of keys and 'errors' list of dicts with
+                  'key', 'code' and 'message' fields.
+
+        Raises:
+            ClientError: If the whole request fails; with several buckets, a
+                failed call is reported as an error for each of its keys.
+        """
+        groups: Dict[str, List[str]] = {}
+        for key, bucket in zip(keys, self.bucket_router.route_many(keys)):
+            groups.setdefault(bucket, []).append(key)
+
+        errors = []
+        for bucket, group in groups.items():
+            try:
+                response = self.client_for(bucket).delete_objects(
+                    Bucket=bucket,
+                    Delete={'Objects': [{'Key': key} for key in group], 'Quiet': True}
+                )
+            except ClientError as e:
+                if len(groups) == 1:
+                    raise
+                error = e.response.get('Error', {})
+                errors.extend(
+                    {'key': key, 'code': error.get('Code', 'Unknown'), 'message': error.get('Message', str(e))}
+                    for key in group
+                )
+                continue
+            errors.extend(
+                {'key': error['Key'], 'code': error.get('Code', 'Unknown'), 'message': error.get('Message', '')}
+                for error in response.get('Errors', [])
+            )
+        failed = {error['key'] for error in errors}
+        deleted = [key for key in keys if key not in failed]
+        self._forget_routes(deleted)
+        self.download_url_cache.invalidate(deleted)
+        for key in deleted:
+            self.metadata_cache.put(key, None)
+        # Derivatives are neither catalogued nor published
+        files = [key for key in deleted if not self.is_derivative(key)]
+        self._update_catalog(lambda catalog: catalog.remove(files))
+        self.change_feed.publish(DELETED, [{'key': key} for key in files])
+
+        return {
+            "deleted": deleted,
+            "errors": errors
+        }
+
+    @instrumented
+    async def bulk_delete(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Delete many objects, grouping them into concurrent DeleteObjects calls.
+
+        Args:
+            keys (List[str]): The S3 object keys to delete.
+
+        Returns:
+            dict: 'deleted' count and per-key 'errors' list.
+        """
+        async def batches() -> AsyncIterator[List[str]]:
+            for start in range(0, len(keys), DELETE_BATCH_SIZE):
+                yield keys[start:start + DELETE_BATCH_SIZE]
+
+        return await self._delete_in_batches(batches())
+
+    @instrumented
+    async def delete_prefix(self, prefix: str) -> Dict[str, Any]:
+        """
+        Delete every object under a prefix.
+
+        Each listing page (up to 1000 keys) becomes one DeleteObjects batch as
+        soon as it arrives, so the full key list is never held in memory. A
+        date prefix covers that day in every shard of the key layout.
+
+        Args:
+            prefix (str): Key prefix to delete, e.g. ``uploads/2024-01-01/``.
+
+        Returns:
+            dict: 'deleted' count and per-key 'errors' list.
+        """
+        async def batches() -> AsyncIterator[List[str]]:
+            async for page in self.stream_object_pages(prefix):
+                if page:
+                    yield [obj['key'] for obj in page]
+
+        return await self._delete_in_batches(batches())
+
+    async def _delete_in_batches(self, batches: AsyncIterator[List[str]]) -> Dict[str, Any]:
+        """
+        Run DeleteObjects for each batch with bounded concurrency.
+
+        A batch that fails as a whole is reported as an error for each of its
+        keys instead of aborting the remaining batches. The derivatives of
+        the deleted keys are removed while the batch still holds its slot.
         """
-        Get the region of the configured S3 bucket.
+        summary = {"deleted": 0, "errors": []}
+        slots = asyncio.Semaphore(settings.BULK_DELETE_CONCURRENCY)
+        tasks = set()
+
+        async def delete_batch(keys: List[str]) -> None:
+            try:
+                outcome = await self.run(self.delete_objects, keys)
+            except ClientError as e:
+                error = e.response.get('Error', {})
+                outcome = {
+                    "deleted": [],
+                    "errors": [
+                        {'key': key, 'code': error.get('Code', 'Unknown'), 'message': error.get('Message', str(e))}
+                        for key in keys
+                    ]
+                }
+            else:
+                await self.run(self._delete_derivatives_of, outcome["deleted"])
+            finally:
+                slots.release()
+            summary["deleted"] += len(outcome["deleted"])
+            summary["errors"].extend(outcome["errors"])
+
+        try:
+            async for keys in batches:
+                await slots.acquire()
+                task = asyncio.create_task(delete_batch(keys))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            # Let batches already sent finish even if the listing failed
+            await asyncio.gather(*tasks)
+        return summary
+
+    @instrumented
+    def open_object(
+        self,
+        key: str,
+        byte_range: Optional[str] = None,
+        if_none_match: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Start a GET request for an object without reading its body.
+
+        Args:
+            key (str): The S3 object key.
+            byte_range (str, optional): An HTTP Range header value such as
+                'bytes=0-1023'.
+            if_none_match (str, optional): An ETag; S3 answers 304 if it
+                still matches.
+
+        Returns:
+            dict: The get_object response, with the unread 'Body' stream.
+
+        Raises:
+            ClientError: With code NoSuchKey, InvalidRange or 304, or if the
+                S3 operation fails.
+        """
+        bucket = self.bucket_for(key)
+        params: Dict[str, Any] = {'Bucket': bucket, 'Key': key}
+        if byte_range:
+            params['Range'] = byte_range
+        if if_none_match:
+            params['IfNoneMatch'] = if_none_match
+        return self.client_for(bucket).get_object(**params)
+
+    def stream_body(self, body: Any, chunk_size: int, on_close: Optional[Callable[[], None]] = None) -> BodyStream:
+        """
+        Read an object body in fixed-size chunks on the S3 executor.
+
+        Only one chunk is held at a time, so memory use per stream stays
+        constant regardless of object size. The body is closed when the
+        stream ends, is abandoned by the client or is closed explicitly,
+        but never during a read.
+
+        Args:
+            body: The botocore StreamingBody from open_object.
+            chunk_size (int): Bytes read per chunk.
+            on_close (Callable, optional): Called once the body is closed.
+
+        Returns:
+            BodyStream: Iterate its chunks(); close() it if they may never
+                be iterated.
+        """
+        return BodyStream(self, body, chunk_size, on_close)
+
+    @coalesced
+    @instrumented
+    def get_bucket_location(self, bucket: Optional[str] = None) -> str:
+        """
+        Get the region of a configured S3 bucket.
 
         This can be used for health checks or debugging.
 
+        Args:
+            bucket (str, optional): The bucket; defaults to the primary bucket.
+
         Returns:
             str: The region where the bucket is located.
 
         Raises:
             ClientError: If S3 operation fails.
         """
-        try:
-            response = self.client.get_bucket_location(Bucket=self.bucket_name)
-            # For buckets in us-east-1, 'Location' might be None
-            return response.get('LocationConstraint') or 'us-east-1'
-        except ClientError as e:
-            raise ClientError(f"Failed to get bucket location: {e}")
+        bucket = bucket or self.bucket_name
+        response = self.client_for(bucket).get_bucket_location(Bucket=bucket)
+        # For buckets in us-east-1, 'Location' might be None
+        return response.get('LocationConstraint') or 'us-east-1'
 
 
 # Singleton instance for dependency injection (can be replaced with dependency injection container in Phase 3)
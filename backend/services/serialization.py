@@ -0,0 +1,124 @@
+"""
+Serialization module for large JSON responses.
+
+Listing pages can hold thousands of objects. Validating each one into a
+Pydantic model and serializing it again through ``response_model`` costs
+more than the S3 call itself, so listings are encoded straight from the
+service's plain dicts with orjson. Responses can be narrowed to selected
+fields and are gzip-compressed above a size threshold when the client
+accepts it.
+"""
+
+import gzip
+import zlib
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+from fastapi.responses import Response
+
+# Fields of a listed object, in output order
+LISTING_FIELDS = ("key", "size", "last_modified", "etag", "download_url")
+
+# Catalog queries also know each object's content type
+CATALOG_FIELDS = ("key", "size", "last_modified", "etag", "content_type", "download_url")
+
+# Repetitive JSON listings compress almost as well at level 1 as at 6, in half the time
+GZIP_LEVEL = 1
+
+
+def parse_fields(fields: Optional[str], available: Tuple[str, ...] = LISTING_FIELDS) -> Tuple[str, ...]:
+    """
+    Parse a ``fields`` query parameter such as 'key,size'.
+
+    Args:
+        fields (str, optional): Comma-separated field names; all fields when
+            empty or None.
+        available (tuple): The fields that can be selected, in output order.
+
+    Returns:
+        tuple: The selected field names, in ``available`` order.
+
+    Raises:
+        ValueError: If a field name is unknown.
+    """
+    if not fields:
+        return available
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(available)
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. Use any of: {', '.join(available)}."
+        )
+    return tuple(name for name in available if name in requested)
+
+
+def project(objects: Iterable[Dict[str, Any]], fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """
+    Copy objects keeping only the selected fields; missing fields are None.
+
+    The service's dicts may be shared between coalesced requests, so they
+    are never modified.
+    """
+    return [{name: obj.get(name) for name in fields} for obj in objects]
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """
+    Whether an Accept-Encoding header allows gzip.
+    """
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() == "gzip":
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def json_response(content: Any, accept_encoding: Optional[str], gzip_min_bytes: int) -> Response:
+    """
+    Encode content with orjson, gzipping bodies of at least gzip_min_bytes.
+
+    Args:
+        content: JSON-serializable content.
+        accept_encoding (str, optional): The request's Accept-Encoding header.
+        gzip_min_bytes (int): Smallest body that is compressed.
+
+    Returns:
+        Response: An application/json response.
+    """
+    body = orjson.dumps(content)
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= gzip_min_bytes and accepts_gzip(accept_encoding):
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def ndjson_pages(
+    pages: AsyncIterator[List[Dict[str, Any]]],
+    fields: Tuple[str, ...],
+    compress: bool
+) -> AsyncIterator[bytes]:
+    """
+    Encode pages of objects as newline-delimited JSON, one chunk per page.
+
+    With compress set the stream is gzip-encoded, flushed after every page
+    so clients receive each page as soon as it is listed.
+
+    Args:
+        pages (AsyncIterator[list]): Pages of listed objects.
+        fields (tuple): Fields to include per object.
+        compress (bool): Whether to gzip the stream.
+
+    Yields:
+        bytes: The encoded lines of one page.
+    """
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+    async for page in pages:
+        if not page:
+            continue
+        chunk = b"\n".join(orjson.dumps(obj) for obj in project(page, fields)) + b"\n"
+        if compressor:
+            chunk = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield chunk
+    if compressor:
+        yield compressor.flush()
@@ -0,0 +1,261 @@
+"""
+Single-flight module for coalescing identical S3 reads.
+
+When many requests arrive at once (a dashboard loading for many users),
+identical read calls would each make their own S3 round trip. A single-flight
+group lets the first caller make the call while concurrent callers with the
+same key wait for it and share its result or error. Callers on the event
+loop (S3Service.run) join a call before it is handed to the S3 executor and
+wait on an asyncio future, so a burst of identical requests occupies one
+executor thread, not one per request. Nested calls made on executor threads
+wait on a thread event, for at most a bounded time.
+"""
+
+import asyncio
+import functools
+import inspect
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+from services.metrics import S3_CALLS_COALESCED
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _Call:
+    """An in-flight call and, once done, its outcome."""
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+
+def _settle(waiter: asyncio.Future, call: _Call) -> None:
+    """Pass a finished call's outcome to a follower on the event loop."""
+    if waiter.done():
+        # The follower was cancelled
+        return
+    if call.error is not None:
+        waiter.set_exception(call.error)
+    else:
+        waiter.set_result(call.result)
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key.
+
+    Only calls that overlap in time are coalesced; nothing is cached after
+    a call returns. Results are shared between callers and must be treated
+    as read-only.
+    """
+
+    def __init__(self, wait_timeout: Optional[float] = None):
+        """
+        Args:
+            wait_timeout (float, optional): Longest time a follower on an
+                executor thread waits before making its own call; unbounded
+                when None.
+        """
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def _join(self, key: Hashable, waiter: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = None) -> Tuple[_Call, bool]:
+        """
+        Start a call for key, or join the one in flight.
+
+        Returns:
+            tuple: The call and whether this caller leads it.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                return call, True
+            self.coalesced += 1
+            if waiter is not None:
+                call.waiters.append(waiter)
+            return call, False
+
+    def _finish(self, key: Hashable, call: _Call) -> None:
+        """
+        Retire a call whose outcome is set and wake every follower.
+        """
+        with self._lock:
+            del self._calls[key]
+            waiters, call.waiters = call.waiters, []
+        call.done.set()
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_settle, waiter, call)
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, bool]:
+        """
+        Call func, or wait for an identical call already in flight.
+
+        Args:
+            key (Hashable): Identifies identical calls.
+            func (Callable): The function to call.
+            *args: Positional arguments for func.
+            **kwargs: Keyword arguments for func.
+
+        Returns:
+            tuple: The result and whether it was shared from another call.
+
+        Raises:
+            Exception: Whatever the shared call raised.
+        """
+        call, leader = self._join(key)
+
+        if not leader:
+            if not call.done.wait(self.wait_timeout):
+                # Stop holding an executor thread behind a slow call
+                return func(*args, **kwargs), False
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result, False
+
+    async def do_async(self, key: Hashable, start: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Like do, for callers on the event loop.
+
+        Followers await the call on the loop instead of occupying executor
+        threads. The leader's call runs as its own task, so a leader that is
+        cancelled (e.g. its client disconnected) does not fail the others.
+
+        Args:
+            key (Hashable): Identifies identical calls.
+            start (Callable): Starts the call, e.g. on the S3 executor, and
+                returns an awaitable of its result.
+
+        Returns:
+            tuple: The result and whether it was shared from another call.
+
+        Raises:
+            Exception: Whatever the shared call raised.
+        """
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        call, leader = self._join(key, (loop, waiter))
+
+        if not leader:
+            return await waiter, True
+
+        task = asyncio.ensure_future(start())
+        task.add_done_callback(functools.partial(self._task_done, key, call))
+        return await asyncio.shield(task), False
+
+    def _task_done(self, key: Hashable, call: _Call, task: asyncio.Future) -> None:
+        if task.cancelled():
+            call.error = asyncio.CancelledError()
+        elif task.exception() is not None:
+            call.error = task.exception()
+        else:
+            call.result = task.result()
+        self._finish(key, call)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report coalescing counters.
+
+        Returns:
+            dict: 'calls' made, 'coalesced' callers that shared a call,
+                  'in_flight' calls and the 'coalesced_ratio'.
+        """
+        with self._lock:
+            in_flight = len(self._calls)
+        total = self.calls + self.coalesced
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": in_flight,
+            "coalesced_ratio": round(self.coalesced / total, 3) if total else 0.0
+        }
+
+
+def coalesced(func: F) -> F:
+    """
+    Decorate a read-only S3Service method so identical concurrent calls
+    share one S3 request.
+
+    Calls are identical when the method, bucket and bound arguments match.
+    The service's ``single_flight`` group is used; when it is None, or the
+    arguments are not hashable, the method is called directly.
+    """
+    name = func.__name__
+    signature = inspect.signature(func)
+
+    def coalesce_key(self: Any, *args: Any, **kwargs: Any) -> Optional[Hashable]:
+        if self.single_flight is None:
+            return None
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (name, self.bucket_name, tuple(bound.arguments.items())[1:])
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    @functools.wraps(func)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        key = coalesce_key(self, *args, **kwargs)
+        if key is None:
+            return func(self, *args, **kwargs)
+
+        result, shared = self.single_flight.do(key, func, self, *args, **kwargs)
+        if shared:
+            S3_CALLS_COALESCED.labels(name).inc()
+        return result
+
+    wrapper.coalesce_key = coalesce_key  # type: ignore[attr-defined]
+    return wrapper  # type: ignore[return-value]
+
+
+async def run_coalesced(
+    run: Callable[..., Awaitable[Any]],
+    func: Callable[..., Any],
+    *args: Any,
+    **kwargs: Any
+) -> Any:
+    """
+    Run a service method through run (e.g. on the S3 executor), joining an
+    identical call in flight on the event loop when the method is coalesced.
+
+    Args:
+        run (Callable): Awaits a blocking call, e.g. ``S3Executor.run``.
+        func (Callable): A bound service method.
+        *args: Positional arguments for func.
+        **kwargs: Keyword arguments for func.
+
+    Returns:
+        The return value of func, possibly shared with other callers.
+    """
+    coalesce_key = getattr(func, "coalesce_key", None) if inspect.ismethod(func) else None
+    key = coalesce_key(func.__self__, *args, **kwargs) if coalesce_key is not None else None
+    if key is None:
+        return await run(func, *args, **kwargs)
+
+    # The leader calls the undecorated method, which would otherwise find
+    # its own call in flight and wait for itself
+    direct = functools.partial(func.__func__.__wrapped__, func.__self__)
+    result, shared = await func.__self__.single_flight.do_async(key, lambda: run(direct, *args, **kwargs))
+    if shared:
+        S3_CALLS_COALESCED.labels(func.__name__).inc()
+    return result
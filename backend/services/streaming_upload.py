@@ -0,0 +1,244 @@
+"""
+Streaming upload module for server-side uploads.
+
+Parses a ``multipart/form-data`` request body as it arrives and pushes the
+file to S3 as multipart upload parts, several at a time. Nothing is spooled
+to memory or disk beyond the parts in flight, so memory per upload is
+bounded by part size x (concurrency + 1).
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from services.s3_service import MULTIPART_MAX_PARTS, S3Service
+
+
+class UploadTooLargeError(ValueError):
+    """
+    Raised when a streamed file needs more than S3's maximum number of parts.
+    """
+
+
+class StreamingUpload:
+    """
+    Uploads a byte stream of unknown length to S3.
+
+    Data is cut into ``part_size`` parts that are uploaded concurrently, at
+    most ``concurrency`` at a time. When all slots are busy ``write`` waits,
+    which in turn stops reading the request body. Files smaller than one part
+    are stored with a single PUT instead of a multipart upload.
+    """
+
+    def __init__(self, s3_svc: S3Service, key: str, content_type: str, part_size: int, concurrency: int):
+        """
+        Args:
+            s3_svc (S3Service): Service used for the S3 calls.
+            key (str): Destination object key.
+            content_type (str): MIME type stored with the object.
+            part_size (int): Bytes per part (at least 5 MiB for S3).
+            concurrency (int): Maximum parts uploading at once.
+        """
+        self.s3_svc = s3_svc
+        self.key = key
+        self.content_type = content_type
+        self.part_size = part_size
+        self.size = 0
+        self.upload_id: Optional[str] = None
+        self._buffer = bytearray()
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tasks: List[asyncio.Task] = []
+        self._part_count = 0
+        self._parts: List[Dict[str, Any]] = []
+        self._error: Optional[BaseException] = None
+
+    async def write(self, data: bytes) -> None:
+        """
+        Append data, uploading every part that is complete.
+
+        Raises:
+            UploadTooLargeError: If the file exceeds S3's part limit.
+            ClientError: If an earlier part failed to upload.
+        """
+        self._buffer += data
+        self.size += len(data)
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[:self.part_size])
+            del self._buffer[:self.part_size]
+            await self._submit(part)
+
+    async def finish(self) -> Dict[str, Any]:
+        """
+        Upload the remaining data and assemble the object.
+
+        Returns:
+            dict: Contains 'key', 'size', 'etag', 'content_type' and 'parts'.
+
+        Raises:
+            ClientError: If any part or the completion fails.
+        """
+        if self.upload_id is None:
+            etag = await self.s3_svc.run(
+                self.s3_svc.put_object, self.key, bytes(self._buffer), self.content_type
+            )
+            self._buffer.clear()
+            return self._result(etag, parts=1)
+
+        if self._buffer:
+            await self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        await asyncio.gather(*self._tasks)
+        result = await self.s3_svc.run(
+            self.s3_svc.complete_multipart_upload, self.key, self.upload_id, self._parts
+        )
+        return self._result(result['etag'], parts=len(self._parts))
+
+    async def abort(self) -> None:
+        """
+        Wait for in-flight parts and abort the multipart upload, if any.
+        """
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.upload_id is not None:
+            await self.s3_svc.run(self.s3_svc.abort_multipart_upload, self.key, self.upload_id)
+
+    async def _submit(self, part: bytes) -> None:
+        """
+        Start uploading one part once a concurrency slot is free.
+        """
+        if self.upload_id is None:
+            self.upload_id = await self.s3_svc.run(
+                self.s3_svc.start_multipart_upload, self.key, self.content_type
+            )
+        if self._part_count == MULTIPART_MAX_PARTS:
+            raise UploadTooLargeError(
+                f"File exceeds {MULTIPART_MAX_PARTS} parts of {self.part_size} bytes."
+            )
+
+        await self._slots.acquire()
+        if self._error is not None:
+            self._slots.release()
+            raise self._error
+        self._part_count += 1
+        self._tasks.append(asyncio.create_task(self._upload_part(self._part_count, part)))
+
+    async def _upload_part(self, part_number: int, part: bytes) -> None:
+        try:
+            etag = await self.s3_svc.run(self.s3_svc.upload_part, self.key, self.upload_id, part_number, part)
+            self._parts.append({"part_number": part_number, "etag": etag})
+        except BaseException as e:
+            self._error = e
+            raise
+        finally:
+            self._slots.release()
+
+    def _result(self, etag: str, parts: int) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "size": self.size,
+            "etag": etag,
+            "content_type": self.content_type,
+            "parts": parts
+        }
+
+
+async def upload_form_file(
+    s3_svc: S3Service,
+    body: AsyncIterator[bytes],
+    content_type_header: str,
+    field_name: str,
+    part_size: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    """
+    Stream the file field of a multipart/form-data body to S3.
+
+    The object key follows the key layout used by presigned uploads. The first file part named ``field_name`` is
+    uploaded; other fields are ignored.
+
+    Args:
+        s3_svc (S3Service): Service used for the S3 calls.
+        body (AsyncIterator[bytes]): The raw request body stream.
+        content_type_header (str): The request's Content-Type header.
+        field_name (str): Name of the form field holding the file.
+        part_size (int): Bytes per multipart part.
+        concurrency (int): Maximum parts uploading at once.
+
+    Returns:
+        dict: Contains 'key', 'size', 'etag', 'content_type' and 'parts'.
+
+    Raises:
+        ValueError: If the body is not multipart/form-data or has no file.
+        UploadTooLargeError: If the file exceeds S3's part limit.
+        ClientError: If an S3 operation fails. The multipart upload is
+            aborted on any failure, including client disconnects.
+    """
+    mime_type, options = parse_options_header(content_type_header)
+    if mime_type != b"multipart/form-data" or b"boundary" not in options:
+        raise ValueError("Request must be multipart/form-data with a boundary.")
+
+    upload: Optional[StreamingUpload] = None
+    headers: Dict[bytes, bytes] = {}
+    header_field = bytearray()
+    header_value = bytearray()
+    current = {"is_file": False}
+    pending: List[bytes] = []
+
+    def on_part_begin() -> None:
+        headers.clear()
+        current["is_file"] = False
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header_value.extend(data[start:end])
+
+    def on_header_end() -> None:
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished() -> None:
+        nonlocal upload
+        _, disposition = parse_options_header(headers.get(b"content-disposition", b""))
+        filename = disposition.get(b"filename")
+        if upload is not None or filename is None or disposition.get(b"name") != field_name.encode():
+            return
+        # Browsers may send a full client path; keep only the file name
+        name = filename.decode("utf-8", "replace").replace("\\", "/").rsplit("/", 1)[-1]
+        content_type = headers.get(b"content-type", b"application/octet-stream").decode("latin-1")
+        upload = StreamingUpload(s3_svc, s3_svc.build_upload_key(name), content_type, part_size, concurrency)
+        current["is_file"] = True
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        if current["is_file"]:
+            pending.append(data[start:end])
+
+    def on_part_end() -> None:
+        current["is_file"] = False
+
+    parser = MultipartParser(options[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    try:
+        async for chunk in body:
+            parser.write(chunk)
+            for data in pending:
+                await upload.write(data)
+            pending.clear()
+        parser.finalize()
+        if upload is None:
+            raise ValueError(f"No file found in form field '{field_name}'.")
+        return await upload.finish()
+    except BaseException:
+        if upload is not None:
+            await asyncio.shield(upload.abort())
+        raise
@@ -0,0 +1,125 @@
+"""
+Cache module for presigned download URLs.
+
+Presigning the same key twice yields two different URLs, which defeats
+browser and CDN caching of the media behind them. This module keeps recently
+issued download URLs in a bounded LRU cache and hands out the same URL until
+a configurable fraction of its lifetime has passed, reporting the lifetime
+that remains.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from services.metrics import DOWNLOAD_URL_CACHE_HITS, DOWNLOAD_URL_CACHE_MISSES
+
+
+class PresignedURLCache:
+    """
+    Bounded, expiry-aware LRU cache of presigned URLs keyed by object key.
+
+    An entry is reused while less than ``reuse_fraction`` of ``expires_in``
+    has passed since it was signed, so callers always receive a URL that is
+    valid for at least the rest of its lifetime. A ``max_entries`` of 0
+    disables caching.
+    """
+
+    def __init__(self, max_entries: int, expires_in: int, reuse_fraction: float):
+        """
+        Args:
+            max_entries (int): Maximum number of cached URLs.
+            expires_in (int): Lifetime of each presigned URL in seconds.
+            reuse_fraction (float): Fraction of the lifetime (0-1) during which
+                a URL is handed out again.
+        """
+        self.max_entries = max_entries
+        self.expires_in = expires_in
+        self.reuse_window = timedelta(seconds=expires_in * min(max(reuse_fraction, 0.0), 1.0))
+        self._entries: "OrderedDict[str, Tuple[str, datetime]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, now: datetime) -> Optional[Tuple[str, int]]:
+        """
+        Look up a reusable URL for a key.
+
+        Args:
+            key (str): The S3 object key.
+            now (datetime): Current UTC time.
+
+        Returns:
+            tuple: The URL and its remaining lifetime in whole seconds, or
+                   None if no reusable URL is cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                url, signed_at = entry
+                age = now - signed_at
+                if age < self.reuse_window:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    DOWNLOAD_URL_CACHE_HITS.inc()
+                    return url, int(self.expires_in - age.total_seconds())
+                del self._entries[key]
+            self.misses += 1
+        DOWNLOAD_URL_CACHE_MISSES.inc()
+        return None
+
+    def put(self, key: str, url: str, signed_at: datetime) -> None:
+        """
+        Store a freshly signed URL, evicting the least recently used entry
+        when the cache is full.
+
+        Args:
+            key (str): The S3 object key.
+            url (str): The presigned URL.
+            signed_at (datetime): The signing time embedded in the URL
+                (X-Amz-Date, whole seconds).
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (url, signed_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        """
+        Drop cached URLs, e.g. for deleted objects.
+
+        Args:
+            keys (Iterable[str]): The S3 object keys to forget.
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Drop every cached URL and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return cache size and hit/miss counters for monitoring.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0
+            }
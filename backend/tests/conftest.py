@@ -0,0 +1,51 @@
+"""
+Shared pytest configuration for backend tests.
+"""
+import logging
+import os
+import socket
+import sys
+
+import pytest
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# Dummy credentials so the settings module can be imported without a real AWS account
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("S3_BUCKET_NAME", "test-bucket")
+# Each test process gets its own in-memory object catalog
+os.environ.setdefault("CATALOG_PATH", ":memory:")
+
+
+@pytest.fixture(scope="module")
+def endpoint_url():
+    """A moto S3 server on a free local port"""
+    server_module = pytest.importorskip("moto.server")
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = server_module.ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    yield f"http://127.0.0.1:{port}"
+    server.stop()
+
+
+@pytest.fixture(autouse=True)
+def clear_service_caches():
+    """Start every test without cached download URLs, object metadata, catalog rows or client rate limits"""
+    from services.admission import admission_controller
+    from services.s3_service import s3_service
+    admission_controller.reset()
+    s3_service.download_url_cache.clear()
+    s3_service.metadata_cache.clear()
+    if s3_service.catalog is not None:
+        s3_service.catalog.clear()
+    yield
+    s3_service.download_url_cache.clear()
+    s3_service.metadata_cache.clear()
+    if s3_service.catalog is not None:
+        s3_service.catalog.clear()
@@ -0,0 +1,257 @@
+"""
+Tests for admission control: client rate limits, route concurrency and load shedding
+"""
+import asyncio
+import time
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from main import app
+from middleware.admission import AdmissionMiddleware
+from services.admission import (
+    OVERLOADED,
+    QUEUE_FULL,
+    QUEUE_TIMEOUT,
+    AdmissionController,
+    ClientRateLimiter,
+    LoadShedError,
+    RouteLimiter,
+)
+from services.s3_service import s3_service
+
+
+def limited_app(controller, gate=None):
+    """An app with a slow /media/slow route, a /media/fast route and an exempt /media/free route"""
+    inner = FastAPI()
+
+    @inner.get("/media/slow")
+    async def slow():
+        await gate.wait()
+        return {"ok": True}
+
+    @inner.get("/media/fast")
+    async def fast():
+        return {"ok": True}
+
+    @inner.get("/media/free")
+    async def free():
+        return {"ok": True}
+
+    inner.add_middleware(AdmissionMiddleware, controller=controller)
+    return inner
+
+
+def controller(rate=0, burst=1, concurrency=1, max_queue=10, max_wait=1.0, header="X-Client-ID"):
+    """A controller for /media routes, exempting /media/free"""
+    return AdmissionController(
+        ClientRateLimiter(rate, burst, 100), concurrency, {}, max_queue, max_wait, "/media", ["/media/free"], header
+    )
+
+
+class TestClientRateLimiter:
+    """Test the per-client token buckets"""
+
+    def test_burst_then_limited(self):
+        """A client gets its burst, then waits for the next token"""
+        limiter = ClientRateLimiter(rate=10, burst=3, max_clients=10)
+
+        assert [limiter.acquire("a") for _ in range(3)] == [0, 0, 0]
+        assert 0 < limiter.acquire("a") <= 0.1
+        assert limiter.acquire("b") == 0
+
+    def test_tokens_refill_over_time(self):
+        """Tokens come back at the configured rate"""
+        limiter = ClientRateLimiter(rate=50, burst=1, max_clients=10)
+        limiter.acquire("a")
+
+        time.sleep(0.03)
+
+        assert limiter.acquire("a") == 0
+
+    def test_least_recent_clients_are_evicted(self):
+        """Only max_clients buckets are kept"""
+        limiter = ClientRateLimiter(rate=1, burst=1, max_clients=2)
+        for client in ("a", "b", "c"):
+            limiter.acquire(client)
+
+        assert limiter.stats()["clients"] == 2
+        assert limiter.acquire("a") == 0
+
+
+class TestRouteLimiter:
+    """Test concurrency slots, the FIFO queue and shedding"""
+
+    def test_slots_pass_to_waiters_in_order(self):
+        """Queued requests are admitted first in, first out as slots free up"""
+        limiter = RouteLimiter("/media/x", limit=1, max_queue=10, max_wait=1.0)
+
+        async def run():
+            await limiter.acquire()
+            order = []
+
+            async def wait(name):
+                await limiter.acquire()
+                order.append(name)
+
+            waiters = [asyncio.ensure_future(wait(name)) for name in ("first", "second")]
+            await asyncio.sleep(0.01)
+            depth = limiter.stats()["queued"]
+            limiter.release(0.01)
+            await asyncio.sleep(0.01)
+            limiter.release(0.01)
+            await asyncio.gather(*waiters)
+            return order, depth
+
+        order, depth = asyncio.run(run())
+
+        assert order == ["first", "second"] and depth == 2
+        assert limiter.stats()["in_flight"] == 1 and limiter.stats()["queued"] == 0
+
+    def test_queue_timeout_sheds(self):
+        """A request still queued after max_wait is refused"""
+        limiter = RouteLimiter("/media/x", limit=1, max_queue=10, max_wait=0.05)
+
+        async def run():
+            await limiter.acquire()
+            with pytest.raises(LoadShedError) as shed:
+                await limiter.acquire()
+            return shed.value
+
+        assert asyncio.run(run()).reason == QUEUE_TIMEOUT
+        assert limiter.stats()["queued"] == 0 and limiter.shed[QUEUE_TIMEOUT] == 1
+
+    def test_expected_wait_over_target_sheds_at_once(self):
+        """Slow recent requests make new ones fail fast instead of waiting"""
+        limiter = RouteLimiter("/media/x", limit=1, max_queue=10, max_wait=0.5)
+        limiter.service_time = 2.0
+
+        async def run():
+            await limiter.acquire()
+            started = time.perf_counter()
+            with pytest.raises(LoadShedError) as shed:
+                await limiter.acquire()
+            return shed.value, time.perf_counter() - started
+
+        shed, elapsed = asyncio.run(run())
+
+        assert shed.reason == OVERLOADED and shed.retry_after == 2 and elapsed < 0.1
+
+    def test_full_queue_sheds(self):
+        """No more than max_queue requests wait"""
+        limiter = RouteLimiter("/media/x", limit=1, max_queue=0, max_wait=1.0)
+
+        async def run():
+            await limiter.acquire()
+            with pytest.raises(LoadShedError) as shed:
+                await limiter.acquire()
+            return shed.value
+
+        assert asyncio.run(run()).reason == QUEUE_FULL
+
+    def test_cancelled_waiter_leaves_the_queue(self):
+        """A client that disconnects while queued does not keep a place or a slot"""
+        limiter = RouteLimiter("/media/x", limit=1, max_queue=10, max_wait=1.0)
+
+        async def run():
+            await limiter.acquire()
+            waiter = asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            await asyncio.sleep(0.01)
+            limiter.release(0.01)
+
+        asyncio.run(run())
+
+        assert limiter.stats()["queued"] == 0 and limiter.stats()["in_flight"] == 0
+
+
+class TestAdmissionMiddleware:
+    """Test the middleware's responses"""
+
+    def test_rate_limited_client_gets_429(self):
+        """A client over its rate gets 429 with Retry-After; other clients are unaffected"""
+        client = TestClient(limited_app(controller(rate=1, burst=2)))
+
+        statuses = [client.get("/media/fast", headers={"X-Client-ID": "noisy"}).status_code for _ in range(3)]
+        limited = client.get("/media/fast", headers={"X-Client-ID": "noisy"})
+        other = client.get("/media/fast", headers={"X-Client-ID": "quiet"})
+
+        assert statuses == [200, 200, 429]
+        assert limited.status_code == 429 and limited.headers["Retry-After"] == "1"
+        assert limited.json()["status_code"] == 429
+        assert other.status_code == 200
+
+    def test_exempt_routes_are_not_limited(self):
+        """Exempt routes skip both the rate limit and concurrency limits"""
+        client = TestClient(limited_app(controller(rate=1, burst=1)))
+
+        assert [client.get("/media/free").status_code for _ in range(3)] == [200, 200, 200]
+
+    def test_queued_request_is_served_and_overflow_is_shed(self):
+        """Beyond the concurrency limit requests queue, and are shed with 503 past the wait target"""
+        control = controller(concurrency=1, max_wait=0.2)
+
+        async def run():
+            gate = asyncio.Event()
+            transport = httpx.ASGITransport(app=limited_app(control, gate))
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                first = asyncio.ensure_future(http.get("/media/slow"))
+                await asyncio.sleep(0.02)
+                queued = asyncio.ensure_future(http.get("/media/slow"))
+                await asyncio.sleep(0.02)
+                depth = control.stats()["routes"]["/media/slow"]["queued"]
+                gate.set()
+                served = [await first, await queued]
+
+                gate.clear()
+                blocked = asyncio.ensure_future(http.get("/media/slow"))
+                await asyncio.sleep(0.02)
+                shed = await http.get("/media/slow")
+                gate.set()
+                await blocked
+                return depth, served, shed
+
+        depth, served, shed = asyncio.run(run())
+
+        assert depth == 1 and [response.status_code for response in served] == [200, 200]
+        assert shed.status_code == 503 and int(shed.headers["Retry-After"]) >= 1
+        assert control.stats()["routes"]["/media/slow"]["shed"][QUEUE_TIMEOUT] == 1
+
+    def test_other_routes_have_their_own_slots(self):
+        """A saturated route does not block other routes"""
+        control = controller(concurrency=1, max_wait=0.05)
+
+        async def run():
+            gate = asyncio.Event()
+            transport = httpx.ASGITransport(app=limited_app(control, gate))
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                blocked = asyncio.ensure_future(http.get("/media/slow"))
+                await asyncio.sleep(0.02)
+                fast = await http.get("/media/fast")
+                gate.set()
+                await blocked
+                return fast
+
+        assert asyncio.run(run()).status_code == 200
+
+
+class TestAdmissionObservability:
+    """Test that queues are reported by the application"""
+
+    def test_health_and_metrics_report_admission(self):
+        """/health lists route queues and /metrics exposes queue depth"""
+        client = TestClient(app)
+        s3_service.warm_up()
+        with patch.object(s3_service, "client") as mock_client:
+            mock_client.list_objects_v2.return_value = {"Contents": []}
+            assert client.get("/media/files").status_code == 200
+
+        health = client.get("/health").json()
+        metrics = client.get("/metrics").text
+
+        assert health["admission"]["routes"]["/media/files"]["in_flight"] == 0
+        assert 'admission_queue_depth{route="/media/files"} 0.0' in metrics
+        assert 'admission_queue_wait_seconds_count{route="/media/files"}' in metrics
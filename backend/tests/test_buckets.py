@@ -0,0 +1,234 @@
+"""
+Tests for multi-bucket routing, run end-to-end against a local moto S3 server
+"""
+import asyncio
+import uuid
+import boto3
+import httpx
+import pytest
+from collections import Counter
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from config import settings
+from main import app
+from routers.media import get_s3_service
+from services.bucket_router import BucketRouter, HashRing, RoutingTable
+from services.s3_service import S3Service
+
+BUCKETS = ["media-a", "media-b", "media-c"]
+DAY = "uploads/2024-03-09/"
+
+
+@pytest.fixture
+def emulator(endpoint_url):
+    """A raw client for the emulator, with empty buckets for every test"""
+    s3 = boto3.client(
+        "s3", endpoint_url=endpoint_url, region_name="us-east-1",
+        aws_access_key_id="testing", aws_secret_access_key="testing"
+    )
+    for bucket in BUCKETS + ["legacy"]:
+        s3.create_bucket(Bucket=bucket)
+        for obj in s3.list_objects_v2(Bucket=bucket).get("Contents", []):
+            s3.delete_object(Bucket=bucket, Key=obj["Key"])
+    return s3
+
+
+@pytest.fixture
+def make_service(endpoint_url):
+    """Build S3 services spread over the given buckets on the emulator"""
+    services = []
+
+    def make(buckets):
+        with patch.object(settings, "S3_BUCKET_NAMES", buckets), \
+                patch.object(settings, "S3_ROUTING_TABLE_PATH", ":memory:"), \
+                patch.object(settings, "S3_ENDPOINT_URL", endpoint_url):
+            service = S3Service()
+            service.warm_up()
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        service.executor.shutdown()
+
+
+def keys_in(s3, bucket):
+    """Every key stored in a bucket"""
+    return [obj["Key"] for obj in s3.list_objects_v2(Bucket=bucket).get("Contents", [])]
+
+
+def upload(service, count, content_type="image/jpeg"):
+    """Upload files through presigned URLs and confirm them; returns their keys"""
+    uploads = service.generate_upload_urls([(f"photo-{i}.jpg", content_type) for i in range(count)])
+    for item in uploads:
+        response = httpx.put(item["upload_url"], content=item["key"].encode(), headers={"Content-Type": content_type})
+        assert response.status_code == 200
+        service.confirm_upload(item["key"])
+    return [item["key"] for item in uploads]
+
+
+class TestHashRing:
+    """Test key placement on the consistent-hash ring"""
+
+    def test_keys_spread_over_buckets(self):
+        """Every bucket owns a fair share of the key space"""
+        ring = HashRing(BUCKETS, 128)
+
+        counts = Counter(ring.get(f"{DAY}{uuid.uuid4()}-photo.jpg") for _ in range(6000))
+
+        assert set(counts) == set(BUCKETS)
+        assert min(counts.values()) > 1400
+
+    def test_adding_a_bucket_moves_few_keys(self):
+        """Only keys taken over by the new bucket change owner"""
+        keys = [f"{DAY}{uuid.uuid4()}-photo.jpg" for _ in range(4000)]
+        before = HashRing(BUCKETS, 128)
+        after = HashRing(BUCKETS + ["media-d"], 128)
+
+        moved = [key for key in keys if before.get(key) != after.get(key)]
+
+        assert all(after.get(key) == "media-d" for key in moved)
+        assert 0.15 < len(moved) / len(keys) < 0.35
+
+    def test_fingerprint_ignores_bucket_order(self):
+        """Placement depends on the set of buckets, not their order"""
+        assert HashRing(BUCKETS, 128).fingerprint == HashRing(BUCKETS[::-1], 128).fingerprint
+        assert HashRing(BUCKETS, 128).fingerprint != HashRing(BUCKETS[:2], 128).fingerprint
+
+
+class TestBucketRouter:
+    """Test pins, colocation and the single-bucket fast path"""
+
+    def test_pinned_keys_override_the_ring(self):
+        """A pinned key is routed to its bucket until it is unpinned"""
+        table = RoutingTable(":memory:")
+        router = BucketRouter(BUCKETS, 128, table)
+        key = f"{DAY}{uuid.uuid4()}-photo.jpg"
+        other = next(bucket for bucket in BUCKETS if bucket != router.place(key))
+
+        table.pin([(key, other)])
+        assert router.route(key) == other and router.stats()["routing_table"]["pinned"] == 1
+
+        table.unpin([key])
+        assert router.route(key) == router.place(key)
+
+    def test_derivatives_of_a_source_share_a_bucket(self):
+        """Keys below a colocated prefix are placed by their first folder"""
+        router = BucketRouter(BUCKETS, 128, colocate=("derivatives/",))
+        folders = [f"derivatives/{uuid.uuid4().hex}/" for _ in range(50)]
+
+        for folder in folders:
+            assert len({router.place(f"{folder}{name}") for name in ("a.webp", "b.jpg", "c.png")} | {
+                router.place(folder)
+            }) == 1
+        assert len({router.place(folder) for folder in folders}) > 1
+
+    def test_single_bucket_needs_no_table(self):
+        """With one bucket every key goes there without a lookup"""
+        router = BucketRouter(["only"], 128)
+
+        assert router.route_many(["a", "b"]) == ["only", "only"] and "routing_table" not in router.stats()
+
+
+class TestMultiBucketEmulator:
+    """Test uploads, listings, deletes and backfill against moto buckets"""
+
+    def test_uploads_land_on_their_ring_bucket(self, emulator, make_service):
+        """Presigned uploads spread over the buckets and download from the right one"""
+        service = make_service(BUCKETS)
+
+        keys = upload(service, 30)
+
+        for bucket in BUCKETS:
+            stored = keys_in(emulator, bucket)
+            assert stored and all(service.bucket_router.place(key) == bucket for key in stored)
+        assert sorted(key for bucket in BUCKETS for key in keys_in(emulator, bucket)) == sorted(keys)
+        for key in keys[:5]:
+            assert httpx.get(service.generate_download_url(key)["download_url"]).content == key.encode()
+        assert set(service.connection_stats()["buckets"]) == set(BUCKETS)
+
+    def test_listing_merges_buckets_in_key_order(self, emulator, make_service):
+        """Paged and streamed listings cover every bucket exactly once, in key order"""
+        service = make_service(BUCKETS)
+        keys = sorted(upload(service, 25))
+
+        async def walk():
+            listed, token = [], None
+            while True:
+                page = await service.list_page(DAY.split("/")[0] + "/", 4, token, include_urls=True)
+                assert all("download_url" in obj for obj in page["objects"])
+                listed.extend(obj["key"] for obj in page["objects"])
+                token = page["next_continuation_token"]
+                if not page["is_truncated"]:
+                    return listed
+
+        async def stream():
+            return [obj["key"] async for obj in service.stream_objects()]
+
+        assert asyncio.run(walk()) == keys
+        assert asyncio.run(stream()) == keys
+
+    def test_paging_past_thumbnails_mid_page_skips_no_keys(self, emulator, make_service):
+        """Thumbnails sorting inside a bucket's page do not let the cursor pass its unsent keys"""
+        service = make_service(BUCKETS)
+        stored = {
+            "media-a": ["a-1.jpg", "derivatives/a-1.jpg/t.jpg", "m-1.jpg", "m-2.jpg", "m-3.jpg"],
+            "media-b": ["n-1.jpg", "n-2.jpg", "n-3.jpg", "n-4.jpg"],
+            "media-c": ["derivatives/o-1.jpg/t-1.jpg", "derivatives/o-1.jpg/t-2.jpg", "o-1.jpg", "o-2.jpg"],
+        }
+        for bucket, keys in stored.items():
+            for key in keys:
+                emulator.put_object(Bucket=bucket, Key=key, Body=b"x")
+
+        async def walk():
+            listed, token = [], None
+            while True:
+                page = await service.list_page(limit=3, continuation_token=token)
+                listed.extend(obj["key"] for obj in page["objects"])
+                token = page["next_continuation_token"]
+                if not page["is_truncated"]:
+                    return listed
+
+        listed = asyncio.run(walk())
+
+        assert listed == sorted(key for keys in stored.values() for key in keys if not key.startswith("derivatives/"))
+
+    def test_api_listing_and_bulk_delete_span_buckets(self, emulator, make_service):
+        """GET /media/files and prefix deletes go through every bucket"""
+        service = make_service(BUCKETS)
+        keys = upload(service, 12)
+        prefix = keys[0].rsplit("/", 1)[0] + "/"
+        app.dependency_overrides[get_s3_service] = lambda: service
+        try:
+            client = TestClient(app)
+            listed = client.get(f"/media/files?prefix={prefix}&limit=5")
+            deleted = client.post("/media/files/bulk-delete", json={"prefix": prefix})
+        finally:
+            app.dependency_overrides.clear()
+
+        assert listed.status_code == 200 and listed.json()["count"] == 5
+        assert listed.json()["next_continuation_token"].startswith("after:")
+        assert deleted.json()["deleted"] == 12
+        assert all(keys_in(emulator, bucket) == [] for bucket in BUCKETS)
+
+    def test_backfill_keeps_existing_keys_reachable(self, emulator, make_service):
+        """Keys from the original bucket are pinned once buckets are added"""
+        existing = [f"{DAY}{uuid.uuid4()}-old-{i}.jpg" for i in range(30)]
+        for key in existing:
+            emulator.put_object(Bucket="legacy", Key=key, Body=key.encode())
+        service = make_service(["legacy"] + BUCKETS)
+        misplaced = [key for key in existing if service.bucket_router.place(key) != "legacy"]
+        assert misplaced
+
+        result = asyncio.run(service.backfill_routes())
+
+        assert result["scanned"] == 30 and result["pinned"] == len(misplaced)
+        for key in existing:
+            assert service.get_object_metadata(key)["size"] == len(key.encode())
+        assert httpx.get(service.generate_download_url(misplaced[0])["download_url"]).content == misplaced[0].encode()
+        assert asyncio.run(service.backfill_routes())["skipped"]
+
+        service.delete_objects(misplaced)
+        assert service.routing_stats()["routing_table"]["pinned"] == 0
+        assert sorted(keys_in(emulator, "legacy")) == sorted(set(existing) - set(misplaced))
@@ -0,0 +1,308 @@
+"""
+Tests for the SQLite object catalog, its reconciliation and catalog queries
+"""
+import asyncio
+import sqlite3
+import time
+import pytest
+from botocore.exceptions import ClientError
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from main import app
+from services.catalog import ObjectCatalog, original_filename
+from services.reconciler import CatalogReconciler
+from services.s3_service import s3_service
+
+UUID = "0f8fad5b-d9cb-469f-a165-70867728950e"
+
+
+def obj(name, size=1, day=1, content_type=None):
+    """An object as recorded in the catalog"""
+    return {
+        "key": f"uploads/2024-03-{day:02d}/{UUID}-{name}",
+        "size": size,
+        "etag": f'"{name}"',
+        "last_modified": datetime(2024, 3, day, 12, 0, tzinfo=timezone.utc).isoformat(),
+        "content_type": content_type,
+    }
+
+
+@pytest.fixture
+def catalog():
+    """A private in-memory catalog with a few objects"""
+    catalog = ObjectCatalog(":memory:")
+    catalog.record_present([
+        obj("Holiday Beach.jpg", size=300, day=1, content_type="image/jpeg"),
+        obj("beach-party.png", size=100, day=2, content_type="image/png"),
+        obj("report.pdf", size=200, day=3, content_type="application/pdf"),
+        obj("clip.mp4", size=400, day=4, content_type="video/mp4"),
+    ])
+    return catalog
+
+
+@pytest.fixture
+def client():
+    """Create test client for FastAPI app"""
+    return TestClient(app)
+
+
+@pytest.fixture
+def mock_s3_client():
+    """Mock S3 client for testing"""
+    s3_service.warm_up()
+    with patch.object(s3_service, "client") as mock_client:
+        mock_client.put_object.return_value = {"ETag": '"put"'}
+        mock_client.delete_objects.return_value = {}
+        yield mock_client
+
+
+def names(result):
+    """Original filenames of a query result, in order"""
+    return [original_filename(item["key"]) for item in result["objects"]]
+
+
+class TestObjectCatalog:
+    """Test catalog writes and indexed queries"""
+
+    def test_original_filename_strips_uuid(self):
+        """The UUID added to upload keys is not part of the searchable name"""
+        assert original_filename(f"uploads/2024-03-01/{UUID}-my-photo.jpg") == "my-photo.jpg"
+        assert original_filename("photos/cat.png") == "cat.png"
+
+    def test_sort_by_size_descending(self, catalog):
+        """Sorting does not depend on key order"""
+        result = catalog.query(sort="size", descending=True)
+
+        assert names(result) == ["clip.mp4", "Holiday Beach.jpg", "report.pdf", "beach-party.png"]
+
+    def test_filename_search_is_case_insensitive(self, catalog):
+        """q matches any part of the original filename, trigram or LIKE"""
+        assert names(catalog.query(q="BEACH", sort="filename")) == ["beach-party.png", "Holiday Beach.jpg"]
+        assert names(catalog.query(q="mp")) == ["clip.mp4"]
+        assert catalog.query(q=UUID[:8])["count"] == 0
+
+    def test_like_wildcards_are_literal(self, catalog):
+        """% and _ in short searches do not act as wildcards"""
+        assert catalog.query(q="%")["count"] == 0
+
+    def test_content_type_family(self, catalog):
+        """A type ending in / or /* matches the whole family"""
+        assert names(catalog.query(content_type="image/", sort="size")) == ["beach-party.png", "Holiday Beach.jpg"]
+        assert catalog.query(content_type="image/*")["count"] == 2
+        assert names(catalog.query(content_type="video/mp4")) == ["clip.mp4"]
+
+    def test_date_range(self, catalog):
+        """modified_after is inclusive and modified_before exclusive"""
+        result = catalog.query(
+            modified_after=datetime(2024, 3, 2, 12, 0),
+            modified_before=datetime(2024, 3, 4, 12, 0),
+            sort="last_modified"
+        )
+
+        assert names(result) == ["beach-party.png", "report.pdf"]
+
+    def test_pagination(self, catalog):
+        """Pages are contiguous and report the next cursor"""
+        first = catalog.query(sort="size", limit=3)
+        second = catalog.query(sort="size", limit=3, cursor=first["next_cursor"])
+
+        assert first["is_truncated"] and first["next_cursor"].startswith("after:")
+        assert names(second) == ["clip.mp4"]
+        assert not second["is_truncated"] and second["next_cursor"] is None
+
+    @pytest.mark.parametrize("sort", ["key", "size", "last_modified", "filename"])
+    @pytest.mark.parametrize("descending", [False, True])
+    def test_cursor_walks_every_sort(self, catalog, sort, descending):
+        """Paging one row at a time returns the same rows as one page, ties and NULLs included"""
+        catalog.record_present([
+            {"key": f"uploads/2024-03-06/{UUID}-Beach.jpg", "size": 100, "etag": '"t"', "last_modified": None},
+            {"key": f"uploads/2024-03-07/{UUID}-unsized.bin", "size": None, "etag": '"u"', "last_modified": None},
+        ])
+        expected = [obj["key"] for obj in catalog.query(sort=sort, descending=descending)["objects"]]
+
+        walked, cursor = [], None
+        while True:
+            page = catalog.query(sort=sort, descending=descending, limit=1, cursor=cursor)
+            walked.extend(obj["key"] for obj in page["objects"])
+            cursor = page["next_cursor"]
+            if not page["is_truncated"]:
+                break
+
+        assert walked == expected and len(expected) == 6
+
+    def test_pages_do_not_shift_when_rows_are_added(self, catalog):
+        """Rows sorting before the cursor do not repeat rows on the next page"""
+        first = catalog.query(sort="size", limit=2)
+        catalog.record_present([{"key": f"uploads/2024-03-06/{UUID}-tiny.txt", "size": 1, "etag": '"t"'}])
+        second = catalog.query(sort="size", limit=2, cursor=first["next_cursor"])
+
+        assert not set(names(first)) & set(names(second))
+
+    @pytest.mark.parametrize("cursor", ["3", "after:???", "after:" + "WyJrZXkiLDEsImEiXQ=="])
+    def test_invalid_cursor_is_rejected(self, catalog, cursor):
+        """Offsets, garbage and cursors issued for another sort are refused"""
+        with pytest.raises(ValueError):
+            catalog.query(sort="size", cursor=cursor)
+
+    def test_pending_uploads_are_hidden(self, catalog):
+        """Keys with only an issued upload URL are not listed"""
+        catalog.record_pending([(f"uploads/2024-03-05/{UUID}-new.jpg", "image/jpeg")])
+
+        assert catalog.query(q="new")["count"] == 0
+        assert catalog.stats()["pending"] == 1
+
+    def test_listing_does_not_override_known_content_type(self, catalog):
+        """Reconciliation guesses content types only for objects without one"""
+        listed = [{**obj("report.pdf", day=3), "content_type": None},
+                  {**obj("notes.txt", day=5), "content_type": None}]
+        catalog.record_present(listed, guess_content_type=True)
+
+        assert catalog.query(content_type="application/pdf")["count"] == 1
+        assert names(catalog.query(content_type="text/plain")) == ["notes.txt"]
+
+    def test_prune(self, catalog):
+        """Unseen objects and expired pending uploads are removed"""
+        catalog.record_pending([("uploads/expired.jpg", "image/jpeg")])
+        run_started = time.time() + 1
+        catalog.record_pending([("uploads/fresh.jpg", "image/jpeg")])
+
+        pruned = catalog.prune(seen_since=run_started, pending_before=run_started - 1)
+
+        assert len(pruned["deleted"]) == 4 and pruned["expired"] == 1
+        assert catalog.stats()["objects"] == 0
+        assert catalog.stats()["pending"] == 1
+
+
+class TestCatalogUpdates:
+    """Test that S3 operations keep the catalog current"""
+
+    def test_upload_urls_record_pending_keys(self, mock_s3_client):
+        """Issuing upload URLs records pending rows"""
+        s3_service.generate_upload_urls([("a.jpg", "image/jpeg"), ("b.png", "image/png")])
+
+        assert s3_service.catalog.stats()["pending"] == 2
+
+    def test_put_and_delete(self, mock_s3_client):
+        """Server-side uploads are listed at once and deletes remove them"""
+        s3_service.put_object("photos/cat.png", b"meow", "image/png")
+        assert s3_service.catalog.query(q="cat")["objects"][0]["content_type"] == "image/png"
+
+        s3_service.delete_objects(["photos/cat.png"])
+        assert s3_service.catalog.query(q="cat")["count"] == 0
+
+    def test_catalog_errors_do_not_fail_s3_operations(self, mock_s3_client):
+        """A failed catalog write is left for reconciliation to repair"""
+        with patch.object(s3_service.catalog, "record_present", side_effect=sqlite3.OperationalError("locked")):
+            assert s3_service.put_object("photos/cat.png", b"meow", "image/png") == '"put"'
+
+    def test_reconcile(self, mock_s3_client):
+        """Reconciliation records listed objects and drops the rest"""
+        s3_service.catalog.record_present([obj("gone.jpg")])
+        listed = {"Key": "photos/dog.jpg", "Size": 5, "ETag": '"d"',
+                  "LastModified": datetime(2024, 3, 1, tzinfo=timezone.utc)}
+        mock_s3_client.get_paginator.return_value.paginate.return_value = [{"Contents": [listed]}]
+        reconciler = CatalogReconciler(s3_service, s3_service.catalog, interval=0, pending_ttl=3600)
+
+        summary = asyncio.run(reconciler.reconcile())
+
+        assert summary["listed"] == 1 and summary["created"] == 1 and summary["deleted"] == 1
+        assert s3_service.catalog.query()["objects"] == [{
+            "key": "photos/dog.jpg", "size": 5, "last_modified": "2024-03-01T00:00:00+00:00",
+            "etag": '"d"', "content_type": "image/jpeg"
+        }]
+
+
+    def test_lease_is_held_by_one_holder(self):
+        """A lease goes to one holder until it expires, and only its holder can extend it"""
+        catalog = ObjectCatalog(":memory:")
+        now = time.time()
+
+        assert catalog.claim_lease("reconcile", "a", now + 60)
+        assert not catalog.claim_lease("reconcile", "b", now + 60)
+        assert not catalog.extend_lease("reconcile", "b", now - 1)
+        assert catalog.extend_lease("reconcile", "a", now - 1)
+        assert catalog.claim_lease("reconcile", "b", now + 60)
+        assert not catalog.claim_lease("reconcile", "a", now + 60)
+
+    def test_workers_sharing_a_catalog_reconcile_once(self, mock_s3_client, tmp_path):
+        """Of several workers on one catalog file, one lists the bucket per interval"""
+        mock_s3_client.get_paginator.return_value.paginate.return_value = [{"Contents": []}]
+        path = str(tmp_path / "catalog.db")
+        workers = [CatalogReconciler(s3_service, ObjectCatalog(path), interval=3600, pending_ttl=3600) for _ in range(3)]
+
+        async def run():
+            return await asyncio.gather(*(worker.reconcile_if_due() for worker in workers))
+
+        summaries = asyncio.run(run())
+        again = asyncio.run(run())
+
+        assert sum(summary is not None for summary in summaries) == 1
+        assert again == [None, None, None]
+        assert mock_s3_client.get_paginator.return_value.paginate.call_count == 1
+        assert sum(worker.skipped for worker in workers) == 5
+
+
+class TestCatalogQueries:
+    """Test catalog queries through GET /media/files"""
+
+    @pytest.fixture(autouse=True)
+    def populated(self, mock_s3_client):
+        """Fill the service catalog"""
+        s3_service.catalog.record_present([
+            obj("beach.jpg", size=300, day=1, content_type="image/jpeg"),
+            obj("report.pdf", size=200, day=3, content_type="application/pdf"),
+        ])
+
+    def test_query_never_calls_s3(self, client, mock_s3_client):
+        """Sorted, filtered listings are answered from the catalog"""
+        response = client.get("/media/files?sort=size&content_type=image/&fields=key,size,content_type")
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "objects": [{"key": f"uploads/2024-03-01/{UUID}-beach.jpg", "size": 300, "content_type": "image/jpeg"}],
+            "count": 1, "is_truncated": False, "next_continuation_token": None
+        }
+        mock_s3_client.list_objects_v2.assert_not_called()
+        mock_s3_client.get_paginator.assert_not_called()
+
+    def test_continuation_token_is_a_cursor(self, client):
+        """Catalog pages chain through continuation_token"""
+        first = client.get("/media/files?sort=size&order=desc&limit=1").json()
+        second = client.get(f"/media/files?sort=size&order=desc&limit=1&continuation_token={first['next_continuation_token']}").json()
+
+        assert [o["size"] for o in first["objects"] + second["objects"]] == [300, 200]
+        assert second["next_continuation_token"] is None
+
+    @pytest.mark.parametrize("query", [
+        "sort=owner", "q=beach&stream=true", "q=beach&start_after=a", "q=beach&continuation_token=abc",
+        "q=beach&fields=owner",
+    ])
+    def test_invalid_queries_return_400(self, client, query):
+        """Unsupported sorts and combinations are rejected"""
+        assert client.get(f"/media/files?{query}").status_code == 400
+
+    def test_content_type_field_requires_catalog_query(self, client):
+        """Plain S3 listings carry no content type"""
+        assert client.get("/media/files?fields=content_type").status_code == 400
+
+    def test_confirm_upload(self, client, mock_s3_client):
+        """Confirming an upload lists it immediately"""
+        mock_s3_client.head_object.return_value = {
+            "ContentLength": 7, "ContentType": "text/plain", "ETag": '"n"',
+            "LastModified": datetime(2024, 3, 9, tzinfo=timezone.utc)
+        }
+
+        response = client.post("/media/files/notes/todo.txt/confirm")
+
+        assert response.status_code == 200
+        assert client.get("/media/files?q=todo").json()["objects"][0]["key"] == "notes/todo.txt"
+
+    def test_confirm_missing_upload_returns_404(self, client, mock_s3_client):
+        """Uploads that never arrived cannot be confirmed"""
+        mock_s3_client.head_object.side_effect = ClientError(
+            {"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject"
+        )
+
+        assert client.post("/media/files/notes/todo.txt/confirm").status_code == 404
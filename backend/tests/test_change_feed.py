@@ -0,0 +1,254 @@
+"""
+Tests for the object change feed, long-polling and SSE
+"""
+import asyncio
+import threading
+import httpx
+import pytest
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from main import app
+from services.change_feed import CREATED, DELETED, ChangeFeed
+from routers.changes import stream_changes
+from services.reconciler import CatalogReconciler
+from services.s3_service import s3_service
+
+
+@pytest.fixture
+def client():
+    """Create test client for FastAPI app"""
+    return TestClient(app)
+
+
+@pytest.fixture
+def feed():
+    """A fresh change feed on the service"""
+    with patch.object(s3_service, "change_feed", ChangeFeed(100)) as change_feed:
+        yield change_feed
+
+
+@pytest.fixture
+def mock_s3_client():
+    """Mock S3 client for testing"""
+    s3_service.warm_up()
+    with patch.object(s3_service, "client") as mock_client:
+        mock_client.put_object.return_value = {"ETag": '"put"'}
+        mock_client.delete_objects.return_value = {}
+        yield mock_client
+
+
+def keys(result):
+    """(type, key) of each event in a result"""
+    return [(event["type"], event["key"]) for event in result["events"]]
+
+
+def listing(*entries):
+    """A listing page of (key, etag) entries"""
+    return {"Contents": [
+        {"Key": key, "Size": 1, "ETag": etag, "LastModified": datetime(2024, 3, 1, tzinfo=timezone.utc)}
+        for key, etag in entries
+    ]}
+
+
+class TestChangeFeed:
+    """Test the ring buffer and cursors"""
+
+    def test_events_after_cursor(self):
+        """Only events after the cursor are returned, oldest first"""
+        feed = ChangeFeed(10)
+        feed.publish(CREATED, [{"key": "a"}])
+        cursor = feed.cursor()
+        feed.publish(CREATED, [{"key": "b"}])
+        feed.publish(DELETED, [{"key": "a"}])
+
+        result = feed.changes(cursor, 100)
+
+        assert keys(result) == [("created", "b"), ("deleted", "a")]
+        assert result["cursor"] == feed.cursor() and not result["reset"]
+        assert feed.changes(result["cursor"], 100)["events"] == []
+
+    def test_without_cursor_returns_current_position(self):
+        """Omitting since yields no events and a starting cursor"""
+        feed = ChangeFeed(10)
+        feed.publish(CREATED, [{"key": "a"}])
+
+        result = feed.changes(None, 100)
+
+        assert result == {"events": [], "cursor": feed.cursor(), "has_more": False, "reset": False}
+
+    def test_limit_pages_through_events(self):
+        """has_more is set while buffered events remain"""
+        feed = ChangeFeed(10)
+        start = feed.cursor()
+        feed.publish(CREATED, [{"key": str(i)} for i in range(5)])
+
+        first = feed.changes(start, 3)
+        second = feed.changes(first["cursor"], 3)
+
+        assert [e["key"] for e in first["events"] + second["events"]] == ["0", "1", "2", "3", "4"]
+        assert first["has_more"] and not second["has_more"]
+
+    def test_evicted_cursor_resets(self):
+        """A cursor older than the buffer asks the client to reload"""
+        feed = ChangeFeed(3)
+        start = feed.cursor()
+        feed.publish(CREATED, [{"key": str(i)} for i in range(4)])
+
+        result = feed.changes(start, 100)
+
+        assert result["reset"] and result["events"] == [] and result["cursor"] == feed.cursor()
+        assert feed.stats()["resets"] == 1
+
+    def test_cursor_from_another_feed_resets(self):
+        """Cursors survive neither restarts nor a switch to another worker"""
+        assert ChangeFeed(10).changes(ChangeFeed(10).cursor(), 100)["reset"]
+
+    def test_malformed_cursor_raises(self):
+        """Cursors that were never issued are rejected"""
+        with pytest.raises(ValueError):
+            ChangeFeed(10).changes("garbage", 100)
+
+    def test_wait_wakes_on_publish_from_another_thread(self):
+        """A long-poll returns as soon as an executor thread publishes"""
+        feed = ChangeFeed(10)
+
+        async def run():
+            cursor = feed.cursor()
+            waiting = asyncio.ensure_future(feed.wait(cursor, 5, 100))
+            await asyncio.sleep(0.05)
+            threading.Thread(target=feed.publish, args=(CREATED, [{"key": "a"}])).start()
+            return await asyncio.wait_for(waiting, 2)
+
+        assert keys(asyncio.run(run())) == [("created", "a")]
+        assert feed.stats()["waiters"] == 0
+
+    def test_wait_times_out_without_events(self):
+        """An idle long-poll returns no events and the same cursor"""
+        feed = ChangeFeed(10)
+        cursor = feed.cursor()
+
+        result = asyncio.run(feed.wait(cursor, 0.05, 100))
+
+        assert result["events"] == [] and result["cursor"] == cursor
+
+    def test_sse_frames(self):
+        """Events are framed with their cursor as id; idle periods send keep-alives"""
+        feed = ChangeFeed(10)
+        start = feed.cursor()
+        feed.publish(CREATED, [{"key": "a"}])
+
+        async def run():
+            stream = feed.sse(start, 0.05, 100)
+            frames = [await stream.__anext__() for _ in range(3)]
+            await stream.aclose()
+            return frames
+
+        ready, created, keep_alive = asyncio.run(run())
+
+        assert ready.startswith(b"retry: 3000\nid: " + start.encode())
+        assert created.startswith(b"id: " + feed.cursor().encode() + b"\nevent: created\ndata: {")
+        assert b'"key":"a"' in created
+        assert keep_alive == b": keep-alive\n\n"
+
+
+class TestChangeSources:
+    """Test that uploads, deletes and listing diffs are published"""
+
+    def test_put_and_delete_are_published(self, feed, mock_s3_client):
+        """Server-side uploads and deletes emit created and deleted events"""
+        start = feed.cursor()
+
+        s3_service.put_object("photos/cat.png", b"meow", "image/png")
+        s3_service.delete_objects(["photos/cat.png"])
+
+        events = feed.changes(start, 100)["events"]
+        assert keys({"events": events}) == [("created", "photos/cat.png"), ("deleted", "photos/cat.png")]
+        assert events[0]["size"] == 4 and events[0]["content_type"] == "image/png"
+
+    def test_listing_diff_is_published(self, feed, mock_s3_client):
+        """Reconciliation announces objects created, changed or deleted outside the API"""
+        s3_service.catalog.record_present([
+            {"key": "same.jpg", "size": 1, "etag": '"1"', "last_modified": "2024-03-01T00:00:00+00:00"},
+            {"key": "changed.jpg", "size": 1, "etag": '"1"', "last_modified": "2024-03-01T00:00:00+00:00"},
+            {"key": "gone.jpg", "size": 1, "etag": '"1"', "last_modified": "2024-03-01T00:00:00+00:00"},
+        ])
+        mock_s3_client.get_paginator.return_value.paginate.return_value = [
+            listing(("same.jpg", '"1"'), ("changed.jpg", '"2"'), ("new.jpg", '"1"'))
+        ]
+        start = feed.cursor()
+
+        asyncio.run(CatalogReconciler(s3_service, s3_service.catalog, 0, 3600).reconcile())
+
+        result = feed.changes(start, 100)
+        assert keys(result) == [("created", "changed.jpg"), ("created", "new.jpg"), ("deleted", "gone.jpg")]
+        assert result["events"][1]["content_type"] == "image/jpeg"
+
+    def test_first_load_is_not_published(self, feed, mock_s3_client):
+        """Filling an empty catalog emits no events"""
+        mock_s3_client.get_paginator.return_value.paginate.return_value = [listing(("a.jpg", '"1"'))]
+        start = feed.cursor()
+
+        asyncio.run(CatalogReconciler(s3_service, s3_service.catalog, 0, 3600).reconcile())
+
+        assert feed.changes(start, 100)["events"] == []
+
+
+class TestChangesEndpoints:
+    """Test GET /media/changes and GET /media/changes/stream"""
+
+    def test_delete_through_api_is_returned(self, client, feed, mock_s3_client):
+        """Clients apply deletes made through the API"""
+        mock_s3_client.list_objects_v2.return_value = {"Contents": []}
+        cursor = client.get("/media/changes").json()["cursor"]
+
+        assert client.delete("/media/files/photos/cat.png").status_code == 200
+        response = client.get(f"/media/changes?since={cursor}")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [(e["type"], e["key"]) for e in body["events"]] == [("deleted", "photos/cat.png")]
+        assert body["cursor"] == feed.cursor() and body["reset"] is False
+
+    def test_long_poll_returns_on_change(self, feed):
+        """A waiting request completes when an event is published"""
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                cursor = (await http.get("/media/changes")).json()["cursor"]
+                request = asyncio.ensure_future(http.get(f"/media/changes?since={cursor}&wait=5"))
+                await asyncio.sleep(0.05)
+                feed.publish(CREATED, [{"key": "late.jpg"}])
+                return await asyncio.wait_for(request, 2)
+
+        response = asyncio.run(run())
+
+        assert [e["key"] for e in response.json()["events"]] == ["late.jpg"]
+
+    def test_wait_is_capped(self, client, feed):
+        """Waits longer than CHANGE_FEED_MAX_WAIT are rejected"""
+        assert client.get("/media/changes?wait=3600").status_code == 422
+
+    def test_stream_reconnect_resumes_from_last_event_id(self, feed):
+        """A reconnect repeating the original since resumes after the last event received"""
+        start = feed.cursor()
+        feed.publish(CREATED, [{"key": "seen.jpg"}])
+        received = feed.cursor()
+        feed.publish(CREATED, [{"key": "missed.jpg"}])
+
+        async def run():
+            response = await stream_changes(since=start, last_event_id=received, feed=feed)
+            frames = [await response.body_iterator.__anext__() for _ in range(2)]
+            await response.body_iterator.aclose()
+            return frames
+
+        ready, created = asyncio.run(run())
+
+        assert ready.startswith(b"retry: 3000\nid: " + received.encode())
+        assert b'"key":"missed.jpg"' in created
+
+    @pytest.mark.parametrize("path", ["/media/changes?since=garbage", "/media/changes/stream?since=garbage"])
+    def test_malformed_cursor_returns_400(self, client, feed, path):
+        """Malformed cursors are rejected before waiting or streaming"""
+        assert client.get(path).status_code == 400
@@ -0,0 +1,297 @@
+"""
+Tests for the thumbnail derivative cache
+"""
+import asyncio
+import io
+import uuid
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from PIL import Image
+from unittest.mock import patch
+
+from config import settings
+from main import app
+from services import image_ops
+from services.derivatives import DerivativeCache
+from services.processing import ProcessingEngine, processing_engine
+from services.reconciler import CatalogReconciler
+from services.s3_service import S3Service, s3_service
+
+LAST_MODIFIED = datetime(2024, 3, 9, 12, 0, 0, tzinfo=timezone.utc)
+SOURCES = ["photos/a.png", "photos/b.png", "photos/c.png"]
+
+
+def encode_image(width, height):
+    """Encode a solid PNG of the given size"""
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), "blue").save(output, "PNG")
+    return output.getvalue()
+
+
+class FakeBody:
+    """In-memory stand-in for botocore's StreamingBody"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def read(self, amt=None):
+        return self.data
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def client():
+    """Create test client for FastAPI app"""
+    return TestClient(app)
+
+
+@pytest.fixture
+def mock_s3_client():
+    """Mock S3 bucket holding 'photos/cat.png', 'notes.txt' and any objects put during the test"""
+    s3_service.warm_up()
+    objects = {
+        "photos/cat.png": (encode_image(400, 200), "image/png"),
+        "notes.txt": (b"not an image", "text/plain"),
+    }
+
+    def head_object(Bucket, Key):
+        if Key not in objects:
+            raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+        data, content_type = objects[Key]
+        return {"ContentLength": len(data), "ContentType": content_type,
+                "ETag": '"etag-v1"', "LastModified": LAST_MODIFIED}
+
+    def get_object(Bucket, Key):
+        data, _ = objects[Key]
+        return {"Body": FakeBody(data), "ContentLength": len(data)}
+
+    def put_object(Bucket, Key, Body, ContentType):
+        objects[Key] = (Body, ContentType)
+        return {"ETag": '"derivative"'}
+
+    with patch.object(s3_service, "client") as mock_client:
+        mock_client.head_object.side_effect = head_object
+        mock_client.get_object.side_effect = get_object
+        mock_client.put_object.side_effect = put_object
+        mock_client.objects = objects
+        yield mock_client
+    asyncio.run(processing_engine.shutdown())
+
+
+def thumbnail_params(**params):
+    """Normalized thumbnail parameters"""
+    return image_ops.validate_params("thumbnail", params)
+
+
+@pytest.fixture
+def emulated():
+    """Build services on a fresh moto bucket holding the SOURCES images"""
+    engines = []
+
+    def make(endpoint_url):
+        bucket = f"media-{uuid.uuid4().hex[:8]}"
+        boto3.client(
+            "s3", endpoint_url=endpoint_url, region_name="us-east-1",
+            aws_access_key_id="testing", aws_secret_access_key="testing"
+        ).create_bucket(Bucket=bucket)
+        with patch.object(settings, "S3_BUCKET_NAMES", [bucket]), \
+                patch.object(settings, "S3_ENDPOINT_URL", endpoint_url):
+            service = S3Service()
+            service.warm_up()
+        for key in SOURCES:
+            service.put_object(key, encode_image(40, 20), "image/png")
+        engine = ProcessingEngine(service, 1, 10 * 1024 * 1024, 10)
+        engines.append(engine)
+        return service, DerivativeCache(service, engine)
+
+    yield make
+    for engine in engines:
+        asyncio.run(engine.shutdown())
+
+
+class TestDerivativeKeys:
+    """Test deterministic derivative keys"""
+
+    def test_key_is_deterministic(self):
+        """The same source, ETag and parameters always give the same key"""
+        first = DerivativeCache.derivative_key("photos/cat.png", '"abc"', "thumbnail", thumbnail_params(width=320))
+        second = DerivativeCache.derivative_key("photos/cat.png", '"abc"', "thumbnail", thumbnail_params(width=320))
+
+        assert first == second
+        assert first.startswith(S3Service.derivative_prefix("photos/cat.png"))
+        assert first.endswith("/abc-thumbnail-320xauto.jpg")
+
+    def test_key_changes_with_etag_and_params(self):
+        """New source content or another size gets a new key"""
+        base = DerivativeCache.derivative_key("photos/cat.png", '"abc"', "thumbnail", thumbnail_params(width=320))
+
+        assert DerivativeCache.derivative_key("photos/cat.png", '"def"', "thumbnail", thumbnail_params(width=320)) != base
+        assert DerivativeCache.derivative_key("photos/cat.png", '"abc"', "thumbnail", thumbnail_params(width=640)) != base
+        assert DerivativeCache.derivative_key(
+            "photos/cat.png", '"abc"', "thumbnail", thumbnail_params(width=320, format="webp")
+        ) != base
+
+    def test_sources_get_separate_folders(self):
+        """Each source has its own fixed-length derivative folder"""
+        assert S3Service.derivative_prefix("a.png") != S3Service.derivative_prefix("b.png")
+        assert len(S3Service.derivative_prefix("a" * 900 + ".png")) == len(S3Service.derivative_prefix("a.png"))
+
+
+class TestThumbnailEndpoint:
+    """Test GET /media/thumbnail/{key}"""
+
+    def test_missing_thumbnail_is_generated_then_reused(self, client, mock_s3_client):
+        """The first request renders the thumbnail; later requests reuse it"""
+        first = client.get("/media/thumbnail/photos/cat.png?w=100")
+        second = client.get("/media/thumbnail/photos/cat.png?w=100")
+
+        assert first.status_code == 200
+        assert first.json()["generated"] is True
+        assert second.json()["generated"] is False
+        assert first.json()["key"] == second.json()["key"]
+        assert first.json()["source_key"] == "photos/cat.png"
+        assert mock_s3_client.put_object.call_count == 1
+        data, content_type = mock_s3_client.objects[first.json()["key"]]
+        assert Image.open(io.BytesIO(data)).size == (100, 50)
+        assert content_type == "image/jpeg"
+
+    def test_missing_source_returns_404(self, client, mock_s3_client):
+        """Thumbnails of missing objects return 404"""
+        assert client.get("/media/thumbnail/photos/missing.png").status_code == 404
+
+    def test_non_image_source_returns_422(self, client, mock_s3_client):
+        """Sources that are not images cannot be thumbnailed"""
+        assert client.get("/media/thumbnail/notes.txt?w=100").status_code == 422
+
+    def test_invalid_size_returns_400(self, client, mock_s3_client):
+        """Out-of-range sizes are rejected before any S3 call"""
+        response = client.get("/media/thumbnail/photos/cat.png?w=0")
+
+        assert response.status_code == 400
+        mock_s3_client.head_object.assert_not_called()
+
+
+class TestSingleFlight:
+    """Test deduplication of concurrent renders"""
+
+    def test_concurrent_misses_share_one_render(self, mock_s3_client):
+        """Many requests for the same missing thumbnail trigger one render"""
+        renders = []
+
+        async def fake_render(key, operation, params, output_key, publish):
+            renders.append(output_key)
+            await asyncio.sleep(0.05)
+            mock_s3_client.objects[output_key] = (b"thumb", "image/jpeg")
+
+        async def run():
+            cache = DerivativeCache(s3_service, processing_engine)
+            with patch.object(processing_engine, "render", side_effect=fake_render):
+                results = await asyncio.gather(*(
+                    cache.get_thumbnail_url("photos/cat.png", width=64) for _ in range(5)
+                ))
+            return cache, results
+
+        cache, results = asyncio.run(run())
+
+        assert len(renders) == 1
+        assert {result["key"] for result in results} == {renders[0]}
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["coalesced"] == 4
+        assert cache.stats()["in_flight"] == 0
+
+
+class TestDerivativeCleanup:
+    """Test derivative removal when the source is deleted"""
+
+    def test_deleting_source_deletes_derivatives(self, client, mock_s3_client):
+        """delete_object removes everything under the source's derivative folder"""
+        prefix = S3Service.derivative_prefix("photos/cat.png")
+        mock_s3_client.list_objects_v2.return_value = {
+            "Contents": [{"Key": f"{prefix}etag-v1-thumbnail-256.png"}, {"Key": f"{prefix}old-thumbnail-64.png"}]
+        }
+        mock_s3_client.delete_objects.return_value = {}
+
+        response = client.delete("/media/files/photos/cat.png")
+
+        assert response.status_code == 200
+        assert mock_s3_client.list_objects_v2.call_args.kwargs["Prefix"] == prefix
+        deleted = mock_s3_client.delete_objects.call_args.kwargs["Delete"]["Objects"]
+        assert [obj["Key"] for obj in deleted] == [
+            f"{prefix}etag-v1-thumbnail-256.png", f"{prefix}old-thumbnail-64.png"
+        ]
+
+    def test_deleting_a_derivative_does_not_list(self, client, mock_s3_client):
+        """Derivatives have no derivatives of their own"""
+        client.delete(f"/media/files/{S3Service.derivative_prefix('photos/cat.png')}x.png")
+
+        mock_s3_client.list_objects_v2.assert_not_called()
+
+    def test_cleanup_failure_does_not_fail_delete(self, client, mock_s3_client):
+        """The source delete succeeds even if listing derivatives fails"""
+        mock_s3_client.list_objects_v2.side_effect = ClientError(
+            {"Error": {"Code": "AccessDenied", "Message": "Denied"}}, "ListObjectsV2"
+        )
+
+        assert client.delete("/media/files/photos/cat.png").status_code == 200
+
+
+class TestDerivativesStayHidden:
+    """Test that rendered thumbnails never show up as user files, against a moto bucket"""
+
+    def test_listings_after_render_show_only_sources(self, endpoint_url, emulated):
+        """Paged and streamed listings and the reconciled catalog skip the derivative folder"""
+        service, cache = emulated(endpoint_url)
+
+        async def render_then_list():
+            for key in SOURCES[:2]:
+                for width in (8, 16):
+                    await cache.get_thumbnail_url(key, width)
+            first = await service.list_page(limit=2)
+            second = await service.list_page(limit=2, continuation_token=first["next_continuation_token"])
+            streamed = [obj["key"] async for obj in service.stream_objects()]
+            return first, second, streamed
+
+        first, second, streamed = asyncio.run(render_then_list())
+        reconciled = asyncio.run(CatalogReconciler(service, service.catalog, 0, 3600).reconcile())
+
+        assert cache.stats()["misses"] == 4
+        assert [obj["key"] for obj in first["objects"]] == SOURCES[:2] and first["is_truncated"]
+        assert [obj["key"] for obj in second["objects"]] == SOURCES[2:] and not second["is_truncated"]
+        assert streamed == SOURCES
+        assert reconciled["listed"] == 3 and service.catalog.stats()["objects"] == 3
+        derivatives = asyncio.run(service.list_page(prefix=settings.DERIVATIVE_PREFIX))
+        assert derivatives["count"] == 4
+
+    def test_renders_and_cleanup_are_not_published(self, endpoint_url, emulated):
+        """Writing and deleting thumbnails emits no change events and leaves the catalog alone"""
+        service, cache = emulated(endpoint_url)
+        start = service.change_feed.cursor()
+
+        asyncio.run(cache.get_thumbnail_url(SOURCES[0], 8))
+        service.delete_object(SOURCES[0])
+
+        events = service.change_feed.changes(start, 100)["events"]
+        assert [(event["type"], event["key"]) for event in events] == [("deleted", SOURCES[0])]
+        assert service.catalog.stats()["objects"] == 2
+        assert asyncio.run(service.list_page(prefix=S3Service.derivative_prefix(SOURCES[0])))["count"] == 0
+
+    def test_bulk_deletes_remove_derivatives(self, endpoint_url, emulated):
+        """Deleting sources by keys or by prefix also deletes their thumbnails"""
+        service, cache = emulated(endpoint_url)
+
+        async def render_then_delete():
+            for key in SOURCES:
+                await cache.get_thumbnail_url(key, 8)
+            by_keys = await service.bulk_delete(SOURCES[:1])
+            by_prefix = await service.delete_prefix("photos/")
+            return by_keys, by_prefix
+
+        by_keys, by_prefix = asyncio.run(render_then_delete())
+
+        assert by_keys["deleted"] == 1 and by_prefix["deleted"] == 2
+        assert asyncio.run(service.list_page(prefix=settings.DERIVATIVE_PREFIX))["count"] == 0
@@ -0,0 +1,190 @@
+"""
+Tests for key layouts and listing, streaming and deleting across shards
+"""
+import asyncio
+import uuid
+import pytest
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from main import app
+from services.key_layout import HashedKeyLayout, KeyLayout, create_key_layout
+from services.s3_service import s3_service
+
+DAY = "uploads/2024-03-09/"
+
+
+@pytest.fixture
+def client():
+    """Create test client for FastAPI app"""
+    return TestClient(app)
+
+
+@pytest.fixture
+def hashed():
+    """Switch the service to a 16-shard hashed layout"""
+    with patch.object(s3_service, "key_layout", HashedKeyLayout(16)) as layout:
+        yield layout
+
+
+@pytest.fixture
+def bucket():
+    """
+    Mock S3 client serving ListObjectsV2 from a sorted list of keys, so
+    Prefix, StartAfter and MaxKeys behave like S3.
+    """
+    keys = []
+
+    def list_objects_v2(Bucket, Prefix="", StartAfter="", MaxKeys=1000, ContinuationToken=None):
+        after = ContinuationToken or StartAfter
+        matching = [key for key in sorted(keys) if key.startswith(Prefix) and key > after]
+        page = matching[:MaxKeys]
+        return {
+            "Contents": [
+                {"Key": key, "Size": 1, "ETag": '"1"', "LastModified": datetime(2024, 3, 9, tzinfo=timezone.utc)}
+                for key in page
+            ],
+            "IsTruncated": len(matching) > MaxKeys,
+            "NextContinuationToken": page[-1] if len(matching) > MaxKeys else None
+        }
+
+    def paginate(**params):
+        params.setdefault("StartAfter", "")
+        while True:
+            page = list_objects_v2(**params)
+            yield page
+            if not page["IsTruncated"]:
+                return
+            params["ContinuationToken"] = page["NextContinuationToken"]
+
+    s3_service.warm_up()
+    with patch.object(s3_service, "client") as mock_client:
+        mock_client.list_objects_v2.side_effect = list_objects_v2
+        mock_client.get_paginator.return_value.paginate.side_effect = paginate
+        mock_client.delete_objects.return_value = {}
+        yield keys
+
+
+def upload_keys(layout, count, day="2024-03-09"):
+    """Keys of ``count`` uploads on one day under a layout"""
+    return [layout.build(f"file-{i}.jpg", day, uuid.uuid4()) for i in range(count)]
+
+
+class TestKeyLayouts:
+    """Test building keys and expanding prefixes"""
+
+    def test_date_layout(self):
+        """The default layout keeps the day folder directly under uploads/"""
+        unique_id = uuid.UUID("abcdef00-0000-4000-8000-000000000000")
+
+        assert KeyLayout().build("a.jpg", "2024-03-09", unique_id) == f"{DAY}{unique_id}-a.jpg"
+        assert KeyLayout().expand_prefix(DAY) == [DAY]
+
+    def test_hashed_layout_shards_by_uuid(self):
+        """The shard folder is the leading hex digits of the upload's uuid"""
+        unique_id = uuid.UUID("abcdef00-0000-4000-8000-000000000000")
+
+        assert HashedKeyLayout(16).build("a.jpg", "2024-03-09", unique_id) == f"uploads/a/2024-03-09/{unique_id}-a.jpg"
+        assert HashedKeyLayout(256).build("a.jpg", "2024-03-09", unique_id).startswith("uploads/ab/2024-03-09/")
+
+    def test_date_prefix_expands_to_every_shard(self):
+        """A day prefix covers each shard plus unsharded keys, in key order"""
+        prefixes = HashedKeyLayout(16).expand_prefix(DAY)
+
+        assert len(prefixes) == 17 and prefixes == sorted(prefixes)
+        assert DAY in prefixes and "uploads/f/2024-03-09/" in prefixes
+
+    @pytest.mark.parametrize("prefix", [None, "", "uploads/", "uploads/a/", "uploads/a/2024-03-09/", "uploads/2", "thumbnails/"])
+    def test_physical_and_ambiguous_prefixes_pass_through(self, prefix):
+        """Prefixes naming a shard, too short to tell, or outside uploads/ are listed as is"""
+        assert HashedKeyLayout(16).expand_prefix(prefix) == [prefix]
+
+    def test_invalid_settings_are_rejected(self):
+        """Unknown layouts and shard counts fail fast"""
+        with pytest.raises(ValueError):
+            create_key_layout("reversed", 16)
+        with pytest.raises(ValueError):
+            create_key_layout("hashed", 10)
+
+    def test_upload_urls_use_the_layout(self, hashed):
+        """New upload keys land in a shard folder"""
+        s3_service.warm_up()
+        with patch.object(s3_service, "client") as mock_client:
+            mock_client.generate_presigned_url.return_value = "https://example.com/upload"
+            key = s3_service.generate_upload_url("a.jpg", "image/jpeg")["key"]
+
+        assert hashed.expand_prefix(key.rsplit("/", 2)[0] + "/") == [key.rsplit("/", 2)[0] + "/"]
+        assert key.split("/")[1] in hashed.shards()
+
+
+class TestShardedListing:
+    """Test listing, streaming and deleting a day across shards"""
+
+    def test_pages_merge_shards_in_key_order(self, hashed, bucket):
+        """Paging through a day returns every key of every shard exactly once, sorted"""
+        bucket.extend(upload_keys(hashed, 60) + upload_keys(KeyLayout(), 5) + upload_keys(hashed, 5, "2024-03-10"))
+
+        async def walk():
+            listed, token = [], None
+            while True:
+                page = await s3_service.list_page(DAY, 7, token)
+                listed.extend(obj["key"] for obj in page["objects"])
+                token = page["next_continuation_token"]
+                if not page["is_truncated"]:
+                    return listed
+
+        listed = asyncio.run(walk())
+
+        assert listed == sorted(key for key in bucket if "/2024-03-09/" in key)
+
+    def test_start_after_skips_earlier_shards(self, hashed, bucket):
+        """Shards entirely before start_after are not listed"""
+        bucket.extend(upload_keys(hashed, 40))
+        after = sorted(bucket)[20]
+
+        page = asyncio.run(s3_service.list_page(DAY, 1000, start_after=after))
+
+        assert [obj["key"] for obj in page["objects"]] == sorted(bucket)[21:]
+        listed_prefixes = {call.kwargs["Prefix"] for call in s3_service.client.list_objects_v2.call_args_list}
+        assert listed_prefixes and all(prefix >= after.rsplit("/", 1)[0] + "/" for prefix in listed_prefixes)
+
+    def test_foreign_continuation_token_is_rejected(self, hashed, bucket, client):
+        """S3 continuation tokens cannot resume a merged listing"""
+        response = client.get(f"/media/files?prefix={DAY}&continuation_token=opaque")
+
+        assert response.status_code == 400
+
+    def test_stream_covers_every_shard(self, hashed, bucket, client):
+        """The NDJSON stream of a day walks all shards in key order"""
+        bucket.extend(upload_keys(hashed, 30) + upload_keys(KeyLayout(), 3))
+
+        response = client.get(f"/media/files?prefix={DAY}&stream=true")
+
+        assert [line.split('"key":"')[1].split('"')[0] for line in response.text.splitlines()] == sorted(bucket)
+
+    def test_delete_by_date_covers_every_shard(self, hashed, bucket):
+        """Deleting a day removes its keys from every shard and leaves other days"""
+        today = upload_keys(hashed, 30) + upload_keys(KeyLayout(), 3)
+        bucket.extend(today + upload_keys(hashed, 3, "2024-03-10"))
+
+        result = asyncio.run(s3_service.delete_prefix(DAY))
+
+        deleted = [
+            obj["Key"]
+            for call in s3_service.client.delete_objects.call_args_list
+            for obj in call.kwargs["Delete"]["Objects"]
+        ]
+        assert sorted(deleted) == sorted(today)
+        assert result["deleted"] == len(today)
+
+    def test_catalog_prefix_covers_every_shard(self, hashed, client):
+        """Catalog queries filter a day across all shards"""
+        keys = upload_keys(hashed, 10) + upload_keys(hashed, 2, "2024-03-10")
+        s3_service.catalog.record_present([
+            {"key": key, "size": 1, "etag": '"1"', "last_modified": "2024-03-09T00:00:00+00:00"} for key in keys
+        ])
+
+        response = client.get(f"/media/files?prefix={DAY}&sort=key")
+
+        assert [obj["key"] for obj in response.json()["objects"]] == sorted(keys[:10])
@@ -2,8 +2,13 @@
 Backend API Tests for Media Processing App
 """
 import pytest
+import asyncio
+import time
+import httpx
+import json
+from datetime import datetime, timezone
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 import os
 import sys
 
@@ -11,6 +16,8 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from main import app
+from services.health import health_prober
+from services.s3_service import s3_service
 
 @pytest.fixture
 def client():
@@ -20,17 +27,31 @@ def client():
 @pytest.fixture
 def mock_s3_client():
     """Mock S3 client for testing"""
-    with patch('main.get_s3_client') as mock_get_client:
-        mock_client = MagicMock()
-        mock_get_client.return_value = mock_client
+    # Build the real presigner first, as application startup would
+    s3_service.warm_up()
+    with patch.object(s3_service, 'client') as mock_client:
         yield mock_client
 
+@pytest.fixture(autouse=True)
+def reset_health_cache():
+    """Start every test without a cached S3 health status"""
+    health_prober.reset()
+    yield
+    health_prober.reset()
+
+@pytest.fixture
+def mock_presigner():
+    """Mock the fast presigner so URLs are predictable"""
+    with patch.object(s3_service.presigner, 'presign') as mock_presign:
+        mock_presign.side_effect = lambda method, key, expires_in, **kwargs: f"https://signed/{key}"
+        yield mock_presign
+
 class TestHealthEndpoint:
     """Test health check endpoint"""
 
     def test_health_endpoint_success(self, client, mock_s3_client):
         """Test health endpoint with successful S3 connection"""
-        mock_s3_client.list_objects_v2.return_value = {}
+        mock_s3_client.get_bucket_location.return_value = {"LocationConstraint": None}
 
         response = client.get("/health")
 
@@ -43,8 +64,8 @@ class TestHealthEndpoint:
     def test_health_endpoint_s3_failure(self, client, mock_s3_client):
         """Test health endpoint when S3 connection fails"""
         from botocore.exceptions import ClientError
-        mock_s3_client.list_objects_v2.side_effect = ClientError(
-            {"Error": {"Code": "AccessDenied"}}, "ListObjectsV2"
+        mock_s3_client.get_bucket_location.side_effect = ClientError(
+            {"Error": {"Code": "AccessDenied"}}, "GetBucketLocation"
         )
 
         response = client.get("/health")
@@ -54,6 +75,62 @@ class TestHealthEndpoint:
         assert data["status"] == "unhealthy"
         assert "S3 connection failed" in data["message"]
 
+    def test_health_endpoint_uses_cache(self, client, mock_s3_client):
+        """Repeated health checks are answered from the cached probe"""
+        mock_s3_client.get_bucket_location.return_value = {"LocationConstraint": "eu-west-1"}
+
+        responses = [client.get("/health") for _ in range(5)]
+
+        assert all(r.json()["bucket_region"] == "eu-west-1" for r in responses)
+        assert mock_s3_client.get_bucket_location.call_count == 1
+
+    def test_live_endpoint_performs_no_io(self, client, mock_s3_client):
+        """Liveness never touches S3"""
+        response = client.get("/live")
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "alive"}
+        mock_s3_client.get_bucket_location.assert_not_called()
+
+    def test_ready_endpoint_reports_cached_status(self, client, mock_s3_client):
+        """Readiness returns 200 with the probe age when S3 is reachable"""
+        mock_s3_client.get_bucket_location.return_value = {"LocationConstraint": None}
+
+        response = client.get("/ready")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert data["s3"]["bucket_region"] == "us-east-1"
+        assert "age_seconds" in data["s3"] and "latency_ms" in data["s3"]
+
+    def test_ready_endpoint_unavailable_when_s3_fails(self, client, mock_s3_client):
+        """Readiness returns 503 when the last probe failed"""
+        from botocore.exceptions import ClientError
+        mock_s3_client.get_bucket_location.side_effect = ClientError(
+            {"Error": {"Code": "AccessDenied"}}, "GetBucketLocation"
+        )
+
+        response = client.get("/ready")
+
+        assert response.status_code == 503
+        assert response.json()["status"] == "not_ready"
+
+    def test_background_prober_refreshes_status(self, mock_s3_client):
+        """The lifespan-started prober keeps probing on its interval"""
+        mock_s3_client.get_bucket_location.return_value = {"LocationConstraint": None}
+
+        async def run_prober():
+            with patch.object(health_prober, "interval", 0.01):
+                health_prober.start()
+                await asyncio.sleep(0.1)
+                await health_prober.stop()
+
+        asyncio.run(run_prober())
+
+        assert mock_s3_client.get_bucket_location.call_count >= 3
+        assert not health_prober.running
+
 class TestPresignedUrls:
     """Test presigned URL generation endpoints"""
 
@@ -61,7 +138,7 @@ class TestPresignedUrls:
         """Test successful upload URL generation"""
         mock_s3_client.generate_presigned_url.return_value = "https://presigned-url.com"
 
-        response = client.post("/generate-upload-url?filename=test.jpg")
+        response = client.post("/media/upload-url", json={"filename": "test.jpg"})
 
         assert response.status_code == 200
         data = response.json()
@@ -74,21 +151,64 @@ class TestPresignedUrls:
         """Test successful download URL generation"""
         mock_s3_client.generate_presigned_url.return_value = "https://presigned-url.com"
 
-        response = client.post("/generate-download-url?key=test-key")
+        response = client.get("/media/download-url/test-key")
 
         assert response.status_code == 200
         data = response.json()
         assert "download_url" in data
         assert data["key"] == "test-key"
 
-    def test_generate_upload_url_s3_error(self, client, mock_s3_client):
+    def test_generate_upload_urls_batch(self, client, mock_presigner):
+        """Test that a multi-file drop gets every upload URL in one request"""
+        files = [{"filename": "a.jpg", "content_type": "image/jpeg"}, {"filename": "b.mp4"}]
+
+        response = client.post("/media/upload-urls", json={"files": files})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 2
+        keys = [u["key"] for u in data["uploads"]]
+        assert keys[0].startswith("uploads/") and keys[0].endswith("-a.jpg")
+        assert keys[1].endswith("-b.mp4")
+        assert len(set(keys)) == 2
+        assert mock_presigner.call_args_list[0].kwargs["content_type"] == "image/jpeg"
+        assert mock_presigner.call_args_list[1].kwargs["content_type"] == "application/octet-stream"
+
+    def test_generate_upload_urls_rejects_oversized_batch(self, client, mock_presigner):
+        """Test that batches above the configured maximum are rejected"""
+        files = [{"filename": f"{i}.jpg"} for i in range(3)]
+
+        with patch("routers.media.settings.PRESIGN_BATCH_MAX", 2):
+            response = client.post("/media/upload-urls", json={"files": files})
+
+        assert response.status_code == 400
+        mock_presigner.assert_not_called()
+
+    def test_generate_download_urls_batch(self, client, mock_presigner):
+        """Test that many keys are presigned in a single request"""
+
+        response = client.post("/media/download-urls", json={"keys": ["a.jpg", "b/c.png"]})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 2
+        assert [u["key"] for u in data["urls"]] == ["a.jpg", "b/c.png"]
+        assert data["urls"][1]["download_url"] == "https://signed/b/c.png"
+
+    def test_generate_download_urls_rejects_empty_batch(self, client, mock_s3_client):
+        """Test that an empty batch is rejected"""
+        response = client.post("/media/download-urls", json={"keys": []})
+
+        assert response.status_code == 400
+
+    def test_generate_upload_url_s3_error(self, client, mock_presigner):
         """Test upload URL generation with S3 error"""
         from botocore.exceptions import ClientError
-        mock_s3_client.generate_presigned_url.side_effect = ClientError(
+        mock_presigner.side_effect = ClientError(
             {"Error": {"Code": "InvalidAccessKeyId"}}, "GeneratePresignedUrl"
         )
 
-        response = client.post("/generate-upload-url?filename=test.jpg")
+        response = client.post("/media/upload-url", json={"filename": "test.jpg"})
 
         assert response.status_code == 500
         data = response.json()
@@ -103,13 +223,13 @@ class TestObjectOperations:
             {
                 "Key": "uploads/2024-01-01/test.jpg",
                 "Size": 1024,
-                "LastModified": MagicMock(__class__=type('datetime', (), {'isoformat': lambda self: '2024-01-01T10:00:00'})()),
+                "LastModified": datetime(2024, 1, 1, 10, 0, tzinfo=timezone.utc),
                 "ETag": '"etag123"'
             }
         ]
         mock_s3_client.list_objects_v2.return_value = {"Contents": mock_objects}
 
-        response = client.get("/list-objects")
+        response = client.get("/media/files")
 
         assert response.status_code == 200
         data = response.json()
@@ -122,18 +242,76 @@ class TestObjectOperations:
         """Test object listing when bucket is empty"""
         mock_s3_client.list_objects_v2.return_value = {}
 
-        response = client.get("/list-objects")
+        response = client.get("/media/files")
 
         assert response.status_code == 200
         data = response.json()
         assert data["objects"] == []
         assert data["count"] == 0
 
+    def test_list_objects_pagination(self, client, mock_s3_client):
+        """Test that pagination parameters and continuation token are passed through"""
+        mock_s3_client.list_objects_v2.return_value = {
+            "Contents": [
+                {
+                    "Key": "uploads/2024-01-01/a.jpg",
+                    "Size": 1,
+                    "LastModified": datetime(2024, 1, 1, tzinfo=timezone.utc),
+                    "ETag": '"a"'
+                }
+            ],
+            "IsTruncated": True,
+            "NextContinuationToken": "token-2"
+        }
+
+        response = client.get("/media/files?prefix=uploads/&limit=1&continuation_token=token-1")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 1
+        assert data["is_truncated"] is True
+        assert data["next_continuation_token"] == "token-2"
+        mock_s3_client.list_objects_v2.assert_called_once_with(
+            Bucket=s3_service.bucket_name, Prefix="uploads/", MaxKeys=1, ContinuationToken="token-1"
+        )
+
+    def test_list_objects_include_urls(self, client, mock_s3_client, mock_presigner):
+        """Test that listing can embed presigned download URLs"""
+        mock_s3_client.list_objects_v2.return_value = {
+            "Contents": [
+                {"Key": "a.jpg", "Size": 1, "LastModified": datetime(2024, 1, 1, tzinfo=timezone.utc), "ETag": '"a"'}
+            ]
+        }
+
+        response = client.get("/media/files?include_urls=true")
+
+        assert response.status_code == 200
+        assert response.json()["objects"][0]["download_url"] == "https://signed/a.jpg"
+
+    def test_list_objects_stream(self, client, mock_s3_client):
+        """Test that stream mode walks every page and emits NDJSON"""
+        modified = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        pages = [
+            {"Contents": [{"Key": f"k{i}", "Size": i, "LastModified": modified, "ETag": '"e"'} for i in range(3)]},
+            {"Contents": [{"Key": "k3", "Size": 3, "LastModified": modified, "ETag": '"e"'}]},
+        ]
+        mock_s3_client.get_paginator.return_value.paginate.return_value = iter(pages)
+
+        response = client.get("/media/files?stream=true&prefix=k")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [obj["key"] for obj in lines] == ["k0", "k1", "k2", "k3"]
+        mock_s3_client.get_paginator.return_value.paginate.assert_called_once_with(
+            Bucket=s3_service.bucket_name, Prefix="k"
+        )
+
     def test_delete_object_success(self, client, mock_s3_client):
         """Test successful object deletion"""
         mock_s3_client.delete_object.return_value = {}
 
-        response = client.delete("/delete-object?key=test-key")
+        response = client.delete("/media/files/test-key")
 
         assert response.status_code == 200
         data = response.json()
@@ -144,15 +322,198 @@ class TestObjectOperations:
         """Test object deletion with S3 error"""
         from botocore.exceptions import ClientError
         mock_s3_client.delete_object.side_effect = ClientError(
-            {"Error": {"Code": "NoSuchKey"}}, "DeleteObject"
+            {"Error": {"Code": "AccessDenied"}}, "DeleteObject"
         )
 
-        response = client.delete("/delete-object?key=nonexistent-key")
+        response = client.delete("/media/files/protected-key")
 
         assert response.status_code == 500
         data = response.json()
         assert "error" in data
 
+    def test_delete_object_missing_key(self, client, mock_s3_client):
+        """S3 error codes reach the router, so NoSuchKey maps to 404"""
+        from botocore.exceptions import ClientError
+        mock_s3_client.delete_object.side_effect = ClientError(
+            {"Error": {"Code": "NoSuchKey"}}, "DeleteObject"
+        )
+
+        response = client.delete("/media/files/nonexistent-key")
+
+        assert response.status_code == 404
+
+class TestMultipartUpload:
+    """Test multipart upload orchestration"""
+
+    def test_create_multipart_upload_plans_parts(self, client, mock_s3_client):
+        """Part size and count are derived from the declared size and the key layout is unchanged"""
+        mock_s3_client.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+        file_size = 20 * 1024 * 1024 + 1
+
+        response = client.post(
+            "/media/multipart-uploads",
+            json={"filename": "movie.mp4", "content_type": "video/mp4", "file_size": file_size}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["upload_id"] == "upload-1"
+        assert data["key"].startswith("uploads/") and data["key"].endswith("-movie.mp4")
+        assert data["part_size"] == 8 * 1024 * 1024
+        assert data["part_count"] == 3
+        mock_s3_client.create_multipart_upload.assert_called_once_with(
+            Bucket=s3_service.bucket_name, Key=data["key"], ContentType="video/mp4"
+        )
+
+    def test_create_multipart_upload_rejects_invalid_size(self, client, mock_s3_client):
+        """Files of zero bytes or above the S3 object limit are rejected"""
+        response = client.post("/media/multipart-uploads", json={"filename": "x", "file_size": 0})
+
+        assert response.status_code == 400
+        mock_s3_client.create_multipart_upload.assert_not_called()
+
+    def test_generate_part_urls(self, client, mock_presigner):
+        """Many part URLs are presigned in one call with the multipart query parameters"""
+        response = client.post(
+            "/media/multipart-uploads/parts",
+            json={"key": "uploads/k", "upload_id": "upload-1", "part_numbers": [1, 2, 3]}
+        )
+
+        assert response.status_code == 200
+        assert [p["part_number"] for p in response.json()["parts"]] == [1, 2, 3]
+        assert mock_presigner.call_args_list[2].kwargs["params"] == [("uploadId", "upload-1"), ("partNumber", "3")]
+
+    def test_generate_part_urls_rejects_out_of_range(self, client, mock_presigner):
+        """Part numbers must be within the S3 range"""
+        response = client.post(
+            "/media/multipart-uploads/parts",
+            json={"key": "uploads/k", "upload_id": "upload-1", "part_numbers": [0, 10001]}
+        )
+
+        assert response.status_code == 400
+
+    def test_complete_multipart_upload_orders_parts(self, client, mock_s3_client):
+        """Parts are sent to S3 in part-number order"""
+        mock_s3_client.complete_multipart_upload.return_value = {"ETag": '"final-3"'}
+        parts = [{"part_number": 2, "etag": '"b"'}, {"part_number": 1, "etag": '"a"'}]
+
+        response = client.post(
+            "/media/multipart-uploads/complete",
+            json={"key": "uploads/k", "upload_id": "upload-1", "parts": parts}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"key": "uploads/k", "etag": '"final-3"'}
+        sent = mock_s3_client.complete_multipart_upload.call_args.kwargs["MultipartUpload"]["Parts"]
+        assert [p["PartNumber"] for p in sent] == [1, 2]
+
+    def test_abort_multipart_upload(self, client, mock_s3_client):
+        """Aborting discards the upload"""
+        response = client.post("/media/multipart-uploads/abort", json={"key": "uploads/k", "upload_id": "upload-1"})
+
+        assert response.status_code == 200
+        mock_s3_client.abort_multipart_upload.assert_called_once_with(
+            Bucket=s3_service.bucket_name, Key="uploads/k", UploadId="upload-1"
+        )
+
+class TestBulkDelete:
+    """Test bulk delete via DeleteObjects"""
+
+    def test_bulk_delete_keys_batches_and_reports_errors(self, client, mock_s3_client):
+        """Keys are grouped into batches of 1000 and per-key failures are reported"""
+        keys = [f"uploads/2024-01-01/{i}.jpg" for i in range(2500)]
+
+        def delete_objects(Bucket, Delete):
+            batch = [obj["Key"] for obj in Delete["Objects"]]
+            assert Delete["Quiet"] is True
+            assert len(batch) <= 1000
+            if keys[0] in batch:
+                return {"Errors": [{"Key": keys[0], "Code": "AccessDenied", "Message": "Access Denied"}]}
+            return {}
+
+        mock_s3_client.delete_objects.side_effect = delete_objects
+
+        response = client.post("/media/files/bulk-delete", json={"keys": keys})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["deleted"] == 2499
+        assert data["errors"] == [{"key": keys[0], "code": "AccessDenied", "message": "Access Denied"}]
+        assert mock_s3_client.delete_objects.call_count == 3
+
+    def test_bulk_delete_prefix_streams_listing(self, client, mock_s3_client):
+        """Each listing page becomes one DeleteObjects call"""
+        modified = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        pages = [
+            {"Contents": [{"Key": f"uploads/2024-01-01/{i}", "Size": 1, "LastModified": modified, "ETag": '"e"'} for i in range(1000)]},
+            {"Contents": [{"Key": "uploads/2024-01-01/last", "Size": 1, "LastModified": modified, "ETag": '"e"'}]},
+        ]
+        mock_s3_client.get_paginator.return_value.paginate.return_value = iter(pages)
+        mock_s3_client.delete_objects.return_value = {}
+
+        response = client.post("/media/files/bulk-delete", json={"prefix": "uploads/2024-01-01/"})
+
+        assert response.status_code == 200
+        assert response.json() == {"deleted": 1001, "errors": []}
+        assert mock_s3_client.delete_objects.call_count == 2
+        mock_s3_client.get_paginator.return_value.paginate.assert_called_once_with(
+            Bucket=s3_service.bucket_name, Prefix="uploads/2024-01-01/"
+        )
+
+    def test_bulk_delete_failed_batch_reports_every_key(self, client, mock_s3_client):
+        """A batch rejected as a whole is reported per key"""
+        from botocore.exceptions import ClientError
+        mock_s3_client.delete_objects.side_effect = ClientError(
+            {"Error": {"Code": "SlowDown", "Message": "Please reduce your request rate."}}, "DeleteObjects"
+        )
+
+        response = client.post("/media/files/bulk-delete", json={"keys": ["a", "b"]})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["deleted"] == 0
+        assert [e["key"] for e in data["errors"]] == ["a", "b"]
+        assert data["errors"][0]["code"] == "SlowDown"
+
+    @pytest.mark.parametrize("body", [{}, {"keys": ["a"], "prefix": "b"}, {"prefix": ""}, {"keys": []}])
+    def test_bulk_delete_rejects_invalid_requests(self, client, mock_s3_client, body):
+        """Exactly one non-empty selector is required"""
+        response = client.post("/media/files/bulk-delete", json=body)
+
+        assert response.status_code == 400
+        mock_s3_client.delete_objects.assert_not_called()
+
+class TestAsyncExecution:
+    """Test that S3 calls are offloaded from the event loop"""
+
+    def test_concurrent_requests_overlap(self, mock_s3_client):
+        """Slow S3 calls from concurrent requests run in parallel, not one after another"""
+        delay = 0.2
+        concurrency = 5
+
+        def slow_list_objects_v2(**kwargs):
+            time.sleep(delay)
+            return {}
+
+        mock_s3_client.list_objects_v2.side_effect = slow_list_objects_v2
+        mock_s3_client.get_bucket_location.return_value = {"LocationConstraint": None}
+
+        async def fire_requests():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+                # Distinct prefixes so the listings are not coalesced into one call
+                requests = [async_client.get(f"/media/files?prefix=p{i}") for i in range(concurrency)]
+                requests.append(async_client.get("/health"))
+                return await asyncio.gather(*requests)
+
+        start = time.perf_counter()
+        responses = asyncio.run(fire_requests())
+        elapsed = time.perf_counter() - start
+
+        assert all(r.status_code == 200 for r in responses)
+        # Serial execution would take concurrency * delay seconds
+        assert elapsed < delay * concurrency / 2
+
 class TestRootEndpoint:
     """Test root endpoint"""
 
@@ -0,0 +1,167 @@
+"""
+Tests for the object metadata endpoint and its HEAD cache
+"""
+import pytest
+from botocore.exceptions import ClientError
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from main import app
+from services.metadata_cache import ObjectMetadataCache
+from services.s3_service import s3_service
+
+LAST_MODIFIED = datetime(2024, 3, 9, 12, 0, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def client():
+    """Create test client for FastAPI app"""
+    return TestClient(app)
+
+
+@pytest.fixture
+def mock_s3_client():
+    """Mock S3 client answering HEAD for 'photo.jpg' and 404 for anything else"""
+    s3_service.warm_up()
+
+    def head_object(Bucket, Key):
+        if Key == "photo.jpg":
+            return {
+                "ContentLength": 2048,
+                "ContentType": "image/jpeg",
+                "ETag": '"abc123"',
+                "LastModified": LAST_MODIFIED,
+            }
+        raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+
+    with patch.object(s3_service, "client") as mock_client:
+        mock_client.head_object.side_effect = head_object
+        yield mock_client
+
+
+class TestObjectMetadataCache:
+    """Test the cache itself"""
+
+    def test_entries_expire_after_ttl(self):
+        """Metadata is reused until its TTL has passed"""
+        cache = ObjectMetadataCache(max_entries=10, ttl=60, negative_ttl=5)
+
+        with patch("services.metadata_cache.time.monotonic", return_value=100.0):
+            cache.put("a", {"key": "a"})
+        with patch("services.metadata_cache.time.monotonic", return_value=159.0):
+            assert cache.get("a") == (True, {"key": "a"})
+        with patch("services.metadata_cache.time.monotonic", return_value=161.0):
+            assert cache.get("a") == (False, None)
+
+    def test_missing_keys_use_negative_ttl(self):
+        """Missing keys are remembered for the shorter negative TTL"""
+        cache = ObjectMetadataCache(max_entries=10, ttl=60, negative_ttl=5)
+
+        with patch("services.metadata_cache.time.monotonic", return_value=100.0):
+            cache.put("gone", None)
+        with patch("services.metadata_cache.time.monotonic", return_value=104.0):
+            assert cache.get("gone") == (True, None)
+        with patch("services.metadata_cache.time.monotonic", return_value=106.0):
+            assert cache.get("gone") == (False, None)
+
+        assert cache.stats()["negative_hits"] == 1
+
+    def test_cache_is_bounded(self):
+        """The least recently used key is evicted when full"""
+        cache = ObjectMetadataCache(max_entries=2, ttl=60, negative_ttl=5)
+        cache.put("a", {"key": "a"})
+        cache.put("b", {"key": "b"})
+        cache.put("c", {"key": "c"})
+
+        assert cache.get("a") == (False, None)
+        assert cache.stats()["size"] == 2
+
+
+class TestMetadataEndpoint:
+    """Test GET /media/files/{key}/metadata"""
+
+    def test_returns_object_metadata(self, client, mock_s3_client):
+        """Size, content type, ETag and last-modified come from HEAD"""
+        response = client.get("/media/files/photo.jpg/metadata")
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "key": "photo.jpg",
+            "size": 2048,
+            "content_type": "image/jpeg",
+            "etag": '"abc123"',
+            "last_modified": LAST_MODIFIED.isoformat(),
+        }
+
+    def test_repeated_lookups_use_cache(self, client, mock_s3_client):
+        """Only the first lookup of a key issues a HEAD request"""
+        for _ in range(3):
+            client.get("/media/files/photo.jpg/metadata")
+
+        assert mock_s3_client.head_object.call_count == 1
+
+    def test_missing_key_returns_404_and_is_cached(self, client, mock_s3_client):
+        """Missing keys return 404 and are negatively cached"""
+        responses = [client.get("/media/files/missing/key.jpg/metadata") for _ in range(3)]
+
+        assert [r.status_code for r in responses] == [404, 404, 404]
+        assert mock_s3_client.head_object.call_count == 1
+
+    def test_other_errors_are_not_cached(self, client, mock_s3_client):
+        """Errors other than not-found return 500 and are retried next time"""
+        mock_s3_client.head_object.side_effect = ClientError(
+            {"Error": {"Code": "AccessDenied", "Message": "Denied"}}, "HeadObject"
+        )
+
+        responses = [client.get("/media/files/photo.jpg/metadata") for _ in range(2)]
+
+        assert [r.status_code for r in responses] == [500, 500]
+        assert mock_s3_client.head_object.call_count == 2
+
+
+class TestDownloadURLExistence:
+    """Test existence checks for download URLs"""
+
+    def test_missing_object_returns_404(self, client, mock_s3_client):
+        """The download URL endpoint returns a real 404 for missing keys"""
+        response = client.get("/media/download-url/missing.jpg")
+
+        assert response.status_code == 404
+
+    def test_existence_check_reuses_cache(self, client, mock_s3_client):
+        """Repeated download URL requests cost a single HEAD request"""
+        for _ in range(3):
+            assert client.get("/media/download-url/photo.jpg").status_code == 200
+
+        assert mock_s3_client.head_object.call_count == 1
+
+    def test_delete_marks_key_missing(self, client, mock_s3_client):
+        """After a delete the key is known missing without another HEAD"""
+        client.get("/media/files/photo.jpg/metadata")
+        client.delete("/media/files/photo.jpg")
+
+        response = client.get("/media/download-url/photo.jpg")
+
+        assert response.status_code == 404
+        assert mock_s3_client.head_object.call_count == 1
+
+    def test_completed_multipart_upload_is_visible(self, client, mock_s3_client):
+        """Completing a multipart upload forgets a cached miss for its key"""
+        client.get("/media/files/photo.jpg/metadata")
+        s3_service.metadata_cache.put("photo.jpg", None)
+        mock_s3_client.complete_multipart_upload.return_value = {"ETag": '"abc123"'}
+
+        client.post("/media/multipart-uploads/complete", json={
+            "key": "photo.jpg", "upload_id": "upload-1", "parts": [{"part_number": 1, "etag": '"p1"'}]
+        })
+
+        assert client.get("/media/files/photo.jpg/metadata").status_code == 200
+
+    def test_verification_can_be_disabled(self, client, mock_s3_client):
+        """With DOWNLOAD_URL_VERIFY_EXISTS off no HEAD request is made"""
+        with patch("routers.media.settings.DOWNLOAD_URL_VERIFY_EXISTS", False):
+            response = client.get("/media/download-url/missing.jpg")
+
+        assert response.status_code == 200
+        mock_s3_client.head_object.assert_not_called()
@@ -0,0 +1,145 @@
+"""
+Tests for Prometheus request and S3Service metrics
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import pytest
+from botocore.exceptions import ClientError
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from unittest.mock import patch
+
+from main import app
+from services.s3_service import s3_service
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def client():
+    """Create test client for FastAPI app"""
+    return TestClient(app)
+
+
+def sample(name, **labels):
+    """Current value of a metric sample, 0 if it was never recorded"""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestRequestMetrics:
+    """Test per-route request metrics"""
+
+    def test_metrics_endpoint_exposes_prometheus_text(self, client):
+        """The scrape endpoint returns the text exposition format"""
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "http_request_duration_seconds" in response.text
+        assert "s3_service_calls_total" in response.text
+
+    def test_requests_are_labelled_by_route_template(self, client):
+        """Different keys share one series keyed by the route template"""
+        labels = {"method": "GET", "route": "/media/download-url/{key:path}", "status": "200"}
+        before = sample("http_request_duration_seconds_count", **labels)
+
+        with patch.object(s3_service.presigner, "presign", return_value="https://signed"), \
+                patch.object(s3_service, "client"):
+            client.get("/media/download-url/a/b.jpg")
+            client.get("/media/download-url/c.png")
+
+        assert sample("http_request_duration_seconds_count", **labels) == before + 2
+
+    def test_unknown_paths_share_unmatched_label(self, client):
+        """Paths that match no route do not create new series"""
+        labels = {"method": "GET", "route": "unmatched", "status": "404"}
+        before = sample("http_request_duration_seconds_count", **labels)
+
+        client.get("/no/such/path-1")
+        client.get("/no/such/path-2")
+
+        assert sample("http_request_duration_seconds_count", **labels) == before + 2
+
+    def test_in_progress_gauge_returns_to_zero(self, client):
+        """The in-flight gauge is decremented once the request completes"""
+        client.get("/live")
+
+        assert sample("http_requests_in_progress", method="GET", route="/live") == 0
+
+    def test_error_responses_record_status(self, client):
+        """Failing requests are recorded with their status code"""
+        labels = {"method": "DELETE", "route": "/media/files/{key:path}", "status": "500"}
+        before = sample("http_request_duration_seconds_count", **labels)
+
+        with patch.object(s3_service, "client") as mock_client:
+            mock_client.delete_object.side_effect = RuntimeError("boom")
+            client.delete("/media/files/test.jpg")
+
+        assert sample("http_request_duration_seconds_count", **labels) == before + 1
+
+
+class TestS3ServiceMetrics:
+    """Test per-method S3Service metrics"""
+
+    def test_calls_are_counted_and_timed(self):
+        """Each service call increments the counter and the latency histogram"""
+        calls = sample("s3_service_calls_total", method="generate_download_url")
+        observed = sample("s3_service_call_duration_seconds_count", method="generate_download_url")
+        batch_calls = sample("s3_service_calls_total", method="generate_download_urls")
+
+        s3_service.generate_download_url("some/key.jpg")
+
+        assert sample("s3_service_calls_total", method="generate_download_url") == calls + 1
+        assert sample("s3_service_call_duration_seconds_count", method="generate_download_url") == observed + 1
+        assert sample("s3_service_calls_total", method="generate_download_urls") == batch_calls
+
+    def test_errors_are_counted_by_type(self):
+        """Failed calls are counted with the exception class"""
+        labels = {"method": "delete_objects", "error": "ClientError"}
+        before = sample("s3_service_errors_total", **labels)
+
+        with patch.object(s3_service, "client") as mock_client:
+            mock_client.delete_objects.side_effect = ClientError(
+                {"Error": {"Code": "SlowDown"}}, "DeleteObjects"
+            )
+            with pytest.raises(ClientError):
+                s3_service.delete_objects(["a"])
+
+        assert sample("s3_service_errors_total", **labels) == before + 1
+
+    def test_async_methods_are_instrumented(self):
+        """Coroutine methods are timed until they complete"""
+        before = sample("s3_service_calls_total", method="bulk_delete")
+
+        with patch.object(s3_service, "client") as mock_client:
+            mock_client.delete_objects.return_value = {"Deleted": [{"Key": "a"}]}
+            result = asyncio.run(s3_service.bulk_delete(["a"]))
+
+        assert result["deleted"] == 1
+        assert sample("s3_service_calls_total", method="bulk_delete") == before + 1
+
+
+class TestMultiprocessMetrics:
+    """Test metric aggregation across uvicorn workers"""
+
+    def test_samples_from_all_workers_are_aggregated(self, tmp_path):
+        """Counters written by separate worker processes are summed on scrape"""
+        env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+        worker = (
+            "from services.metrics import S3_CALLS; "
+            "S3_CALLS.labels(method='list_objects').inc(3)"
+        )
+        scrape = (
+            "from services.metrics import render_metrics; "
+            "print(render_metrics()[0].decode())"
+        )
+
+        for _ in range(2):
+            subprocess.run([sys.executable, "-c", worker], cwd=BACKEND_DIR, env=env, check=True)
+        output = subprocess.run(
+            [sys.executable, "-c", scrape], cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True
+        ).stdout
+
+        assert 's3_service_calls_total{method="list_objects"} 6.0' in output
@@ -0,0 +1,264 @@
+"""
+Tests for server-side media processing jobs
+"""
+import asyncio
+import io
+import multiprocessing
+import os
+import time
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from botocore.exceptions import ClientError
+from fastapi.testclient import TestClient
+from PIL import Image
+from unittest.mock import patch
+
+from main import app
+from services import image_ops
+from services.processing import ProcessingEngine
+from services.s3_service import s3_service
+
+
+def encode_image(width, height, fmt="PNG", mode="RGB"):
+    """Encode a solid image of the given size"""
+    output = io.BytesIO()
+    Image.new(mode, (width, height), "red").save(output, fmt)
+    return output.getvalue()
+
+
+def decode_size(data):
+    """Width and height of an encoded image"""
+    return Image.open(io.BytesIO(data)).size
+
+
+class FakeBody:
+    """In-memory stand-in for botocore's StreamingBody"""
+
+    def __init__(self, data):
+        self.data = data
+        self.closed = False
+
+    def read(self, amt=None):
+        return self.data
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def mock_s3_client():
+    """Mock S3 client serving a 400x200 PNG at 'photos/cat.png' and storing puts"""
+    s3_service.warm_up()
+    source = encode_image(400, 200)
+    stored = {}
+
+    def get_object(Bucket, Key):
+        if Key == "photos/cat.png":
+            return {"Body": FakeBody(source), "ContentLength": len(source)}
+        raise ClientError({"Error": {"Code": "NoSuchKey", "Message": "Missing"}}, "GetObject")
+
+    def put_object(Bucket, Key, Body, ContentType):
+        stored[Key] = (Body, ContentType)
+        return {"ETag": '"derivative"'}
+
+    with patch.object(s3_service, "client") as mock_client:
+        mock_client.get_object.side_effect = get_object
+        mock_client.put_object.side_effect = put_object
+        mock_client.stored = stored
+        yield mock_client
+
+
+def run_jobs(jobs, max_source_bytes=1024 * 1024):
+    """Run jobs on a fresh two-worker engine and return their final status"""
+    async def run():
+        engine = ProcessingEngine(s3_service, max_workers=2, max_source_bytes=max_source_bytes, history=100)
+        try:
+            submitted = [engine.submit(*job) for job in jobs]
+            await engine.wait()
+            return [engine.get(job["job_id"]) for job in submitted]
+        finally:
+            await engine.shutdown()
+    return asyncio.run(run())
+
+
+class TestImageOps:
+    """Test the image transforms run by the workers"""
+
+    def test_resize_keeps_aspect_ratio(self):
+        """A single dimension scales the other proportionally"""
+        params = image_ops.validate_params("resize", {"width": 100})
+
+        output, content_type = image_ops.process_image(encode_image(400, 200), "resize", params, "png")
+
+        assert decode_size(output) == (100, 50)
+        assert content_type == "image/png"
+
+    def test_exact_resize_ignores_aspect_ratio(self):
+        """With keep_aspect off the image is stretched to the exact box"""
+        params = image_ops.validate_params("resize", {"width": 100, "height": 100, "keep_aspect": False})
+
+        output, _ = image_ops.process_image(encode_image(400, 200), "resize", params, "png")
+
+        assert decode_size(output) == (100, 100)
+
+    def test_thumbnail_never_upscales(self):
+        """Thumbnails fit the box but small images keep their size"""
+        params = image_ops.validate_params("thumbnail", {"size": 128})
+
+        large, content_type = image_ops.process_image(encode_image(400, 200), "thumbnail", params, "jpeg")
+        small, _ = image_ops.process_image(encode_image(40, 20), "thumbnail", params, "jpeg")
+
+        assert decode_size(large) == (128, 64)
+        assert decode_size(small) == (40, 20)
+        assert content_type == "image/jpeg"
+
+    def test_transparent_image_converts_to_jpeg(self):
+        """Images with alpha are flattened for JPEG output"""
+        params = image_ops.validate_params("thumbnail", {})
+
+        output, _ = image_ops.process_image(encode_image(50, 50, mode="RGBA"), "thumbnail", params, "jpeg")
+
+        assert Image.open(io.BytesIO(output)).mode == "RGB"
+
+    def test_unreadable_data_raises_value_error(self):
+        """Non-image sources fail with a clear error"""
+        params = image_ops.validate_params("thumbnail", {})
+
+        with pytest.raises(ValueError, match="not a readable image"):
+            image_ops.process_image(b"not an image", "thumbnail", params, "jpeg")
+
+    @pytest.mark.parametrize("operation,params", [
+        ("crop", {}),
+        ("resize", {}),
+        ("resize", {"width": 0}),
+        ("resize", {"width": "100"}),
+        ("thumbnail", {"format": "gif"}),
+    ])
+    def test_invalid_params_are_rejected(self, operation, params):
+        """Unknown operations and bad parameters raise ValueError"""
+        with pytest.raises(ValueError):
+            image_ops.validate_params(operation, params)
+
+    def test_derivative_key_sits_next_to_source(self):
+        """Derivatives share the source's prefix and name"""
+        resize = image_ops.validate_params("resize", {"width": 800})
+        thumbnail = image_ops.validate_params("thumbnail", {"size": 128, "format": "webp"})
+
+        assert image_ops.derivative_key("uploads/2024-03-09/abc-photo.jpg", "resize", resize) == \
+            "uploads/2024-03-09/abc-photo.resize-800xauto.jpg"
+        assert image_ops.derivative_key("uploads/2024-03-09/abc-photo.jpg", "thumbnail", thumbnail) == \
+            "uploads/2024-03-09/abc-photo.thumbnail-128.webp"
+
+
+class TestProcessingEngine:
+    """Test jobs running on the process pool"""
+
+    def test_jobs_write_derivatives(self, mock_s3_client):
+        """Jobs read the source, process it in a worker and store the result"""
+        resize, thumbnail = run_jobs([
+            ("photos/cat.png", "resize", {"height": 100}),
+            ("photos/cat.png", "thumbnail", {"size": 64}),
+        ])
+
+        assert resize["status"] == "succeeded"
+        assert thumbnail["status"] == "succeeded"
+        body, content_type = mock_s3_client.stored["photos/cat.resize-autox100.png"]
+        assert decode_size(body) == (200, 100)
+        assert content_type == "image/png"
+        body, content_type = mock_s3_client.stored["photos/cat.thumbnail-64.jpg"]
+        assert decode_size(body) == (64, 32)
+        assert content_type == "image/jpeg"
+
+    def test_missing_source_fails_job(self, mock_s3_client):
+        """A missing source object marks the job failed"""
+        [job] = run_jobs([("photos/missing.png", "thumbnail", {})])
+
+        assert job["status"] == "failed"
+        assert job["error"] == "Source object not found"
+        assert job["finished_at"] is not None
+
+    def test_oversized_source_is_not_downloaded(self, mock_s3_client):
+        """Sources above the size limit fail before their body is read"""
+        [job] = run_jobs([("photos/cat.png", "thumbnail", {})], max_source_bytes=10)
+
+        assert job["status"] == "failed"
+        assert "larger than" in job["error"]
+        assert mock_s3_client.stored == {}
+
+    def test_finished_jobs_are_trimmed_to_history(self, mock_s3_client):
+        """Only the most recent finished jobs are kept"""
+        async def run():
+            engine = ProcessingEngine(s3_service, max_workers=1, max_source_bytes=1024, history=2)
+            jobs = [engine.submit("photos/missing.png", "thumbnail", {}) for _ in range(4)]
+            await engine.wait()
+            await engine.shutdown()
+            return engine, jobs
+
+        engine, jobs = asyncio.run(run())
+
+        assert [engine.get(job["job_id"]) is not None for job in jobs] == [False, False, True, True]
+        assert engine.stats()["failed"] == 2
+
+    def test_broken_pool_is_shut_down_and_replaced(self, mock_s3_client):
+        """A crashed worker fails its job, the broken pool is shut down and the next job gets a new one"""
+        broken = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        with pytest.raises(Exception):
+            broken.submit(os._exit, 1).result()
+
+        async def run():
+            engine = ProcessingEngine(s3_service, max_workers=1, max_source_bytes=1024 * 1024, history=10)
+            engine._pool = broken
+            try:
+                crashed = engine.submit("photos/cat.png", "thumbnail", {})
+                await engine.wait()
+                replaced = engine._pool
+                retried = engine.submit("photos/cat.png", "thumbnail", {})
+                await engine.wait()
+                return engine.get(crashed["job_id"]), replaced, engine.get(retried["job_id"])
+            finally:
+                await engine.shutdown()
+
+        with patch.object(broken, "shutdown", wraps=broken.shutdown) as shutdown:
+            crashed, replaced, retried = asyncio.run(run())
+
+        assert crashed["status"] == "failed" and crashed["error"] == "Processing worker crashed"
+        assert replaced is None
+        shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+        assert retried["status"] == "succeeded"
+
+
+class TestProcessingEndpoints:
+    """Test POST /media/jobs and GET /media/jobs/{job_id}"""
+
+    def test_job_can_be_polled_until_done(self, mock_s3_client):
+        """A queued job reports its output key and finishes in the background"""
+        with TestClient(app) as client:
+            response = client.post("/media/jobs", json={
+                "key": "photos/cat.png", "operation": "thumbnail", "params": {"size": 32}
+            })
+            assert response.status_code == 202
+            job = response.json()
+            assert job["status"] == "queued"
+            assert job["output_key"] == "photos/cat.thumbnail-32.jpg"
+
+            deadline = time.monotonic() + 30
+            while job["status"] in ("queued", "running") and time.monotonic() < deadline:
+                time.sleep(0.05)
+                job = client.get(f"/media/jobs/{job['job_id']}").json()
+
+        assert job["status"] == "succeeded"
+        assert "photos/cat.thumbnail-32.jpg" in mock_s3_client.stored
+
+    def test_invalid_operation_returns_400(self, mock_s3_client):
+        """Unsupported operations are rejected before queueing"""
+        client = TestClient(app)
+
+        response = client.post("/media/jobs", json={"key": "photos/cat.png", "operation": "crop"})
+
+        assert response.status_code == 400
+
+    def test_unknown_job_returns_404(self):
+        """Unknown job IDs return 404"""
+        client = TestClient(app)
+
+        assert client.get("/media/jobs/does-not-exist").status_code == 404
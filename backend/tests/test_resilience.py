@@ -0,0 +1,175 @@
+"""
+Tests for the S3 retry budget, circuit breaker and connection guard
+"""
+import time
+import pytest
+import boto3
+from botocore.config import Config
+from botocore.stub import Stubber
+from fastapi.testclient import TestClient
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from main import app
+from services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    RetryBudgetExhaustedError,
+    S3ConnectionGuard,
+)
+from services.s3_service import s3_service
+
+
+@pytest.fixture
+def guarded_client():
+    """A real boto3 client with a stubbed transport and a connection guard attached"""
+    client = boto3.client(
+        "s3",
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+        region_name="us-east-1",
+        config=Config(signature_version="s3v4"),
+    )
+    guard = S3ConnectionGuard(RetryBudget(0.1, 0, 10), CircuitBreaker(3, 30), pool_size=4)
+    guard.attach(client)
+    with Stubber(client) as stubber:
+        yield client, stubber, guard
+
+
+class TestRetryBudget:
+    """Test the global retry budget"""
+
+    def test_retries_are_limited_to_ratio_of_requests(self):
+        """Each request earns a fraction of a retry"""
+        budget = RetryBudget(ratio=0.5, min_per_second=0, capacity=10)
+        budget._tokens = 0
+
+        for _ in range(4):
+            budget.record_request()
+
+        assert [budget.try_acquire() for _ in range(3)] == [True, True, False]
+        assert budget.stats()["retries_denied"] == 1
+
+    def test_budget_refills_over_time(self):
+        """The steady refill allows retries during low traffic"""
+        budget = RetryBudget(ratio=0, min_per_second=1000, capacity=1)
+        budget._tokens = 0
+
+        time.sleep(0.01)
+
+        assert budget.try_acquire() is True
+
+    def test_guard_refuses_retry_when_budget_is_empty(self):
+        """A retry attempt raises instead of reaching S3 once the budget is spent"""
+        guard = S3ConnectionGuard(RetryBudget(0, 0, 1), CircuitBreaker(5, 30), pool_size=1)
+        retry = SimpleNamespace(context={"retries": {"attempt": 2}})
+
+        guard._request_created(request=retry)
+
+        with pytest.raises(RetryBudgetExhaustedError):
+            guard._request_created(request=retry)
+
+
+class TestCircuitBreaker:
+    """Test circuit breaker state transitions"""
+
+    def test_opens_after_consecutive_failures_and_recovers(self):
+        """The breaker opens, fails fast, then lets one trial call through"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+        breaker.record_failure()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        time.sleep(0.06)
+        breaker.before_call()  # trial call admitted
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()  # only one trial at a time
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_trial_reopens(self):
+        """A failing trial call opens the circuit again"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.stats()["state"] == CircuitBreaker.OPEN
+
+
+class TestConnectionGuard:
+    """Test the guard attached to a real boto3 client"""
+
+    def test_degraded_responses_open_the_breaker(self, guarded_client):
+        """Repeated 503 SlowDown responses make later calls fail fast"""
+        client, stubber, guard = guarded_client
+        for _ in range(3):
+            stubber.add_client_error("list_objects_v2", "SlowDown", http_status_code=503)
+        stubber.add_response("list_objects_v2", {"Contents": []})
+
+        for _ in range(3):
+            with pytest.raises(Exception):
+                client.list_objects_v2(Bucket="bucket")
+
+        with pytest.raises(CircuitOpenError):
+            client.list_objects_v2(Bucket="bucket")
+        # The last stubbed response was never consumed: S3 was not called
+        with pytest.raises(AssertionError):
+            stubber.assert_no_pending_responses()
+        assert guard.stats()["circuit_breaker"]["rejected"] == 1
+
+    def test_client_errors_do_not_trip_the_breaker(self, guarded_client):
+        """4xx responses mean S3 is healthy and reset the failure count"""
+        client, stubber, guard = guarded_client
+        for _ in range(5):
+            stubber.add_client_error("head_object", "404", http_status_code=404)
+
+        for _ in range(5):
+            with pytest.raises(Exception):
+                client.head_object(Bucket="bucket", Key="missing")
+
+        assert guard.stats()["circuit_breaker"]["state"] == CircuitBreaker.CLOSED
+
+    def test_pool_utilization_is_tracked(self, guarded_client):
+        """In-flight calls are counted against the pool size"""
+        client, stubber, guard = guarded_client
+        stubber.add_response("list_objects_v2", {"Contents": []})
+
+        client.list_objects_v2(Bucket="bucket")
+
+        pool = guard.stats()["pool"]
+        assert pool == {"size": 4, "in_use": 0, "peak_in_use": 1, "utilization": 0.0}
+
+
+class TestUnavailableResponses:
+    """Test how refused S3 calls surface to API clients"""
+
+    def test_open_circuit_returns_503_with_retry_after(self):
+        """Endpoints fail fast with 503 and Retry-After while the circuit is open"""
+        client = TestClient(app)
+        with patch.object(s3_service, "client") as mock_client:
+            mock_client.list_objects_v2.side_effect = CircuitOpenError("S3 circuit breaker is open", retry_after=7)
+
+            response = client.get("/media/files")
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "7"
+        assert "circuit breaker" in response.json()["error"]
+
+    def test_health_reports_connection_stats(self):
+        """Pool utilization and breaker state are exposed for monitoring"""
+        client = TestClient(app)
+        with patch.object(s3_service, "client") as mock_client:
+            mock_client.get_bucket_location.return_value = {"LocationConstraint": None}
+
+            data = client.get("/health").json()
+
+        assert set(data["s3_connections"]) == {"pool", "circuit_breaker", "retry_budget", "coalescing"}
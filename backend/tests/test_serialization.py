@@ -0,0 +1,160 @@
+"""
+Tests for fast listing serialization, field projection and gzip
+"""
+import gzip
+import json
+import pytest
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from main import app
+from routers.media import ListObjectsResponse
+from services.s3_service import s3_service
+from services.serialization import accepts_gzip, parse_fields
+
+LAST_MODIFIED = datetime(2024, 3, 9, 12, 0, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def client():
+    """Create test client for FastAPI app"""
+    return TestClient(app)
+
+
+@pytest.fixture
+def mock_s3_client():
+    """Mock S3 client listing `count` objects (3 by default)"""
+    s3_service.warm_up()
+
+    def listing(count=3):
+        return {
+            "Contents": [
+                {"Key": f"photos/{i:05d}.jpg", "Size": i, "LastModified": LAST_MODIFIED, "ETag": f'"e{i}"'}
+                for i in range(count)
+            ],
+            "IsTruncated": False,
+        }
+
+    with patch.object(s3_service, "client") as mock_client:
+        mock_client.list_objects_v2.return_value = listing()
+        mock_client.listing = listing
+        yield mock_client
+
+
+def raw_get(client, url, accept_encoding):
+    """GET without letting the client decode the body"""
+    with client.stream("GET", url, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+class TestFieldParsing:
+    """Test ?fields= parsing and Accept-Encoding negotiation"""
+
+    def test_fields_keep_canonical_order(self):
+        """Requested fields are returned in listing order, duplicates removed"""
+        assert parse_fields("size, key,size") == ("key", "size")
+        assert parse_fields(None) == ("key", "size", "last_modified", "etag", "download_url")
+
+    def test_unknown_field_raises(self):
+        """Unknown field names are rejected"""
+        with pytest.raises(ValueError, match="owner"):
+            parse_fields("key,owner")
+
+    @pytest.mark.parametrize("header,expected", [
+        ("gzip, deflate, br", True),
+        ("br;q=1.0, gzip;q=0.8", True),
+        ("gzip;q=0", False),
+        ("identity", False),
+        (None, False),
+    ])
+    def test_accepts_gzip(self, header, expected):
+        """gzip is used only when the client allows it"""
+        assert accepts_gzip(header) is expected
+
+
+class TestListingPage:
+    """Test GET /media/files page responses"""
+
+    def test_response_matches_model(self, client, mock_s3_client):
+        """The fast path produces the documented ListObjectsResponse shape"""
+        response = client.get("/media/files")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert ListObjectsResponse(**body).model_dump(exclude_unset=True) == body
+        assert body["objects"][0] == {
+            "key": "photos/00000.jpg", "size": 0, "last_modified": LAST_MODIFIED.isoformat(),
+            "etag": '"e0"', "download_url": None
+        }
+
+    def test_fields_projection(self, client, mock_s3_client):
+        """?fields= trims every object to the named fields"""
+        response = client.get("/media/files?fields=key,size")
+
+        assert response.json()["objects"] == [
+            {"key": "photos/00000.jpg", "size": 0},
+            {"key": "photos/00001.jpg", "size": 1},
+            {"key": "photos/00002.jpg", "size": 2},
+        ]
+        assert response.json()["count"] == 3
+
+    def test_unknown_field_returns_400(self, client, mock_s3_client):
+        """Unknown fields are rejected before listing"""
+        assert client.get("/media/files?fields=owner").status_code == 400
+        mock_s3_client.list_objects_v2.assert_not_called()
+
+    def test_large_response_is_gzipped(self, client, mock_s3_client):
+        """Bodies above the threshold are compressed for gzip clients"""
+        mock_s3_client.list_objects_v2.return_value = mock_s3_client.listing(500)
+
+        response, raw = raw_get(client, "/media/files", "gzip")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert json.loads(gzip.decompress(raw))["count"] == 500
+
+    def test_small_response_is_not_gzipped(self, client, mock_s3_client):
+        """Bodies below the threshold are sent as is"""
+        with patch("routers.media.settings.LISTING_GZIP_MIN_BYTES", 10 ** 6):
+            response, raw = raw_get(client, "/media/files", "gzip")
+
+        assert "content-encoding" not in response.headers
+        assert json.loads(raw)["count"] == 3
+
+    def test_no_gzip_without_accept_encoding(self, client, mock_s3_client):
+        """Clients that do not accept gzip get plain JSON"""
+        mock_s3_client.list_objects_v2.return_value = mock_s3_client.listing(500)
+
+        response, raw = raw_get(client, "/media/files", "identity")
+
+        assert "content-encoding" not in response.headers
+        assert json.loads(raw)["count"] == 500
+
+
+class TestListingStream:
+    """Test GET /media/files?stream=true"""
+
+    @pytest.fixture
+    def paginator(self, mock_s3_client):
+        """Two listing pages served through the paginator"""
+        pages = [mock_s3_client.listing(2), {"Contents": [
+            {"Key": "videos/a.mp4", "Size": 9, "LastModified": LAST_MODIFIED, "ETag": '"v"'}
+        ]}]
+        mock_s3_client.get_paginator.return_value.paginate.return_value = pages
+        return mock_s3_client
+
+    def test_stream_is_projected(self, client, paginator):
+        """Each NDJSON line carries only the requested fields"""
+        response = client.get("/media/files?stream=true&fields=key")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines == [{"key": "photos/00000.jpg"}, {"key": "photos/00001.jpg"}, {"key": "videos/a.mp4"}]
+
+    def test_stream_is_gzipped(self, client, paginator):
+        """Streams are gzip-encoded for gzip clients and decode to every line"""
+        response, raw = raw_get(client, "/media/files?stream=true", "gzip")
+
+        assert response.headers["content-encoding"] == "gzip"
+        lines = gzip.decompress(raw).decode().splitlines()
+        assert [json.loads(line)["key"] for line in lines] == ["photos/00000.jpg", "photos/00001.jpg", "videos/a.mp4"]
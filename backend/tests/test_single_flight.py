@@ -0,0 +1,234 @@
+"""
+Tests for single-flight coalescing of identical S3 reads
+"""
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+from botocore.exceptions import ClientError
+from unittest.mock import patch
+
+from main import app
+from services.executor import S3Executor
+from services.metrics import S3_CALLS_COALESCED
+from services.s3_service import s3_service
+from services.single_flight import SingleFlight
+
+CONCURRENCY = 8
+
+
+@pytest.fixture
+def flight():
+    """A fresh single-flight group on the service"""
+    with patch.object(s3_service, "single_flight", SingleFlight()) as group:
+        yield group
+
+
+@pytest.fixture
+def mock_s3_client():
+    """Mock S3 client for testing"""
+    s3_service.warm_up()
+    with patch.object(s3_service, "client") as mock_client:
+        yield mock_client
+
+
+def wait_for_followers(flight, count, timeout=5.0):
+    """Block until `count` callers are waiting on the in-flight call"""
+    deadline = time.monotonic() + timeout
+    while flight.coalesced < count and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def fire(paths):
+    """Send requests concurrently through the ASGI app"""
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get(path) for path in paths))
+    return asyncio.run(run())
+
+
+class TestSingleFlight:
+    """Test the single-flight group"""
+
+    def test_error_is_shared(self):
+        """Callers that joined a failing call receive its exception"""
+        group = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def failing():
+            release.wait()
+            raise RuntimeError("boom")
+
+        def call():
+            try:
+                group.do("key", failing)
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        wait_for_followers(group, 2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 3
+        assert group.stats()["calls"] == 1
+
+    def test_follower_wait_is_bounded(self):
+        """A follower on a thread makes its own call once the wait timeout passes"""
+        group = SingleFlight(wait_timeout=0.05)
+        release = threading.Event()
+        leader = threading.Thread(target=group.do, args=("key", release.wait))
+        leader.start()
+
+        result = group.do("key", lambda: "own")
+        release.set()
+        leader.join()
+
+        assert result == ("own", False)
+
+    def test_sequential_calls_are_not_cached(self):
+        """Only overlapping calls are coalesced"""
+        group = SingleFlight()
+
+        assert group.do("key", lambda: 1) == (1, False)
+        assert group.do("key", lambda: 2) == (2, False)
+        assert group.stats()["coalesced"] == 0
+
+
+class TestCoalescedReads:
+    """Test coalescing through the API"""
+
+    def test_concurrent_listings_make_one_upstream_call(self, flight, mock_s3_client):
+        """N identical GET /media/files requests share one list_objects_v2 call"""
+        def list_objects_v2(**kwargs):
+            wait_for_followers(flight, CONCURRENCY - 1)
+            return {"Contents": [], "IsTruncated": False}
+
+        mock_s3_client.list_objects_v2.side_effect = list_objects_v2
+        before = S3_CALLS_COALESCED.labels("list_objects")._value.get()
+
+        responses = fire(["/media/files?limit=50"] * CONCURRENCY)
+
+        assert [r.status_code for r in responses] == [200] * CONCURRENCY
+        assert mock_s3_client.list_objects_v2.call_count == 1
+        assert flight.stats()["coalesced"] == CONCURRENCY - 1
+        assert S3_CALLS_COALESCED.labels("list_objects")._value.get() - before == CONCURRENCY - 1
+
+    def test_upstream_error_is_shared(self, flight, mock_s3_client):
+        """Every coalesced request receives the error of the shared call"""
+        def list_objects_v2(**kwargs):
+            wait_for_followers(flight, CONCURRENCY - 1)
+            raise ClientError({"Error": {"Code": "InternalError", "Message": "Boom"}}, "ListObjectsV2")
+
+        mock_s3_client.list_objects_v2.side_effect = list_objects_v2
+
+        responses = fire(["/media/files"] * CONCURRENCY)
+
+        assert [r.status_code for r in responses] == [500] * CONCURRENCY
+        assert mock_s3_client.list_objects_v2.call_count == 1
+
+    def test_different_parameters_are_not_coalesced(self, flight, mock_s3_client):
+        """Listings with different parameters each reach S3"""
+        mock_s3_client.list_objects_v2.return_value = {"Contents": []}
+
+        fire([f"/media/files?prefix=p{i}" for i in range(4)])
+
+        assert mock_s3_client.list_objects_v2.call_count == 4
+        assert flight.stats()["coalesced"] == 0
+
+    def test_concurrent_metadata_misses_make_one_head_call(self, flight, mock_s3_client):
+        """Concurrent metadata lookups for the same uncached key share one HEAD"""
+        def head_object(Bucket, Key):
+            wait_for_followers(flight, CONCURRENCY - 1)
+            raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+
+        mock_s3_client.head_object.side_effect = head_object
+
+        responses = fire(["/media/files/photo.jpg/metadata"] * CONCURRENCY)
+
+        assert [r.status_code for r in responses] == [404] * CONCURRENCY
+        assert mock_s3_client.head_object.call_count == 1
+
+    def test_positional_and_keyword_calls_share_a_key(self, flight, mock_s3_client):
+        """Arguments are normalized, so equivalent calls are identical"""
+        release = threading.Event()
+
+        def list_objects_v2(**kwargs):
+            release.wait()
+            return {"Contents": []}
+
+        mock_s3_client.list_objects_v2.side_effect = list_objects_v2
+
+        async def run():
+            first = asyncio.ensure_future(s3_service.run(s3_service.list_objects, "a/"))
+            second = asyncio.ensure_future(s3_service.run(s3_service.list_objects, prefix="a/", limit=1000))
+            await asyncio.get_running_loop().run_in_executor(None, wait_for_followers, flight, 1)
+            release.set()
+            return await asyncio.gather(first, second)
+
+        asyncio.run(run())
+
+        assert mock_s3_client.list_objects_v2.call_count == 1
+
+    def test_followers_do_not_hold_executor_threads(self, flight, mock_s3_client):
+        """Callers waiting on a slow call leave executor threads free for other work"""
+        release = threading.Event()
+
+        def list_objects_v2(**kwargs):
+            release.wait()
+            return {"Contents": []}
+
+        mock_s3_client.list_objects_v2.side_effect = list_objects_v2
+        mock_s3_client.get_bucket_location.return_value = {"LocationConstraint": "eu-west-1"}
+
+        async def run():
+            waiting = [asyncio.ensure_future(s3_service.run(s3_service.list_objects, "a/")) for _ in range(CONCURRENCY)]
+            await asyncio.get_running_loop().run_in_executor(None, wait_for_followers, flight, CONCURRENCY - 1)
+            try:
+                return await asyncio.wait_for(s3_service.run(s3_service.get_bucket_location), 5)
+            finally:
+                release.set()
+                await asyncio.gather(*waiting)
+
+        with patch.object(s3_service, "executor", S3Executor(2)):
+            region = asyncio.run(run())
+
+        assert region == "eu-west-1"
+        assert mock_s3_client.list_objects_v2.call_count == 1
+
+    def test_cancelled_leader_does_not_fail_followers(self, flight, mock_s3_client):
+        """A leader whose client went away still hands its result to the others"""
+        release = threading.Event()
+
+        def list_objects_v2(**kwargs):
+            release.wait()
+            return {"Contents": []}
+
+        mock_s3_client.list_objects_v2.side_effect = list_objects_v2
+
+        async def run():
+            leader = asyncio.ensure_future(s3_service.run(s3_service.list_objects, "a/"))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(s3_service.run(s3_service.list_objects, "a/"))
+            await asyncio.get_running_loop().run_in_executor(None, wait_for_followers, flight, 1)
+            leader.cancel()
+            release.set()
+            return await follower
+
+        assert asyncio.run(run())["objects"] == []
+        assert mock_s3_client.list_objects_v2.call_count == 1
+
+    def test_coalescing_can_be_disabled(self, mock_s3_client):
+        """Without a single-flight group every call reaches S3"""
+        mock_s3_client.list_objects_v2.return_value = {"Contents": []}
+
+        with patch.object(s3_service, "single_flight", None):
+            fire(["/media/files"] * 3)
+
+        assert mock_s3_client.list_objects_v2.call_count == 3
@@ -0,0 +1,150 @@
+"""
+Tests for lazy application startup and the import-time budget
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+
+from config import settings
+from services.health import HealthProber
+from services.s3_service import S3Service
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds `import main` may take on top of the web framework itself
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "0.5"))
+
+COLD_IMPORT = """
+import json, sys, time
+start = time.perf_counter()
+import fastapi, pydantic, starlette
+framework = time.perf_counter()
+import main
+done = time.perf_counter()
+print(json.dumps({
+    "framework_s": framework - start,
+    "app_s": done - framework,
+    "boto3_loaded": "boto3" in sys.modules,
+    "client_built": "client" in main.s3_service.__dict__,
+}))
+"""
+
+
+def cold_import(env_overrides=None, drop=()):
+    """Import main:app in a fresh interpreter and return its timings"""
+    env = {key: value for key, value in os.environ.items() if key not in drop}
+    env.update(env_overrides or {})
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_IMPORT], cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)
+
+
+class TestColdStart:
+    """Test the cost of importing the application"""
+
+    def test_import_is_within_budget(self):
+        """Importing main:app stays within the budget on top of FastAPI"""
+        timings = min((cold_import() for _ in range(3)), key=lambda t: t["app_s"])
+
+        assert timings["app_s"] < IMPORT_BUDGET_SECONDS, (
+            f"import main took {timings['app_s']:.3f}s beyond the framework "
+            f"(budget {IMPORT_BUDGET_SECONDS}s)"
+        )
+
+    def test_import_does_not_build_s3_client(self):
+        """boto3 is neither imported nor used while importing main"""
+        timings = cold_import()
+
+        assert not timings["boto3_loaded"]
+        assert not timings["client_built"]
+
+    def test_import_succeeds_without_credentials(self):
+        """Tests and CLI tools can import the app without AWS credentials"""
+        timings = cold_import(drop=("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"))
+
+        assert not timings["client_built"]
+
+
+class TestLazyClient:
+    """Test lazy construction of the S3 client"""
+
+    def test_client_is_built_on_first_use(self):
+        """The client and presigner are built on first access only"""
+        service = S3Service()
+        assert "client" not in service.__dict__
+
+        service.warm_up()
+
+        assert "client" in service.__dict__
+        assert "presigner" in service.__dict__
+
+    def test_concurrent_first_use_builds_one_client(self):
+        """Threads racing on first use share a single client"""
+        service = S3Service()
+        clients = []
+        barrier = threading.Barrier(8)
+
+        def first_use():
+            barrier.wait()
+            clients.append(service.client)
+
+        threads = [threading.Thread(target=first_use) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len({id(client) for client in clients}) == 1
+
+    def test_missing_credentials_fail_on_first_use(self):
+        """Credential validation happens when the client is built"""
+        service = S3Service()
+
+        with patch.object(settings, "AWS_ACCESS_KEY_ID", None):
+            with pytest.raises(ValueError, match="AWS credentials not found"):
+                service.client
+
+
+class TestBackgroundWarmUp:
+    """Test warm-up before the worker reports ready"""
+
+    def test_not_ready_until_warm_up_and_first_probe(self):
+        """The prober reports warming up until the client is built and S3 answered"""
+        release = threading.Event()
+        service = MagicMock()
+        service.warm_up.side_effect = lambda: release.wait(5)
+        service.get_bucket_location.return_value = "us-east-1"
+        service.buckets = ["test-bucket"]
+
+        async def run(func, *args):
+            return await asyncio.to_thread(func, *args)
+
+        service.run = run
+        prober = HealthProber(service, interval=60, timeout=5)
+
+        async def scenario():
+            prober.start()
+            await asyncio.sleep(0.05)
+            warming = await prober.status()
+            release.set()
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if prober.age() != float("inf"):
+                    break
+            ready = await prober.status()
+            await prober.stop()
+            return warming, ready
+
+        warming, ready = asyncio.run(scenario())
+
+        assert warming["healthy"] is False
+        assert warming["error"] == "S3 client is warming up"
+        assert ready["healthy"] is True
+        service.warm_up.assert_called_once()
@@ -0,0 +1,207 @@
+"""
+Tests for the range-aware streaming download proxy
+"""
+import asyncio
+import threading
+import pytest
+from botocore.exceptions import ClientError
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from main import app
+from services.s3_service import s3_service
+
+LAST_MODIFIED = datetime(2024, 3, 9, 12, 0, 0, tzinfo=timezone.utc)
+
+
+class FakeBody:
+    """In-memory stand-in for botocore's StreamingBody"""
+
+    def __init__(self, data):
+        self.data = data
+        self.position = 0
+        self.read_sizes = []
+        self.closed = False
+
+    def read(self, amt=None):
+        self.read_sizes.append(amt)
+        end = len(self.data) if amt is None else self.position + amt
+        chunk = self.data[self.position:end]
+        self.position += len(chunk)
+        return chunk
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def client():
+    """Create test client for FastAPI app"""
+    return TestClient(app)
+
+
+@pytest.fixture
+def mock_s3_client():
+    """Mock S3 client for testing"""
+    with patch.object(s3_service, "client") as mock_client:
+        yield mock_client
+
+
+def object_response(data, content_range=None):
+    """A get_object response for the given body"""
+    response = {
+        "Body": FakeBody(data),
+        "ContentLength": len(data),
+        "ContentType": "video/mp4",
+        "ETag": '"abc123"',
+        "LastModified": LAST_MODIFIED,
+    }
+    if content_range:
+        response["ContentRange"] = content_range
+    return response
+
+
+class TestStreamEndpoint:
+    """Test GET /media/stream/{key}"""
+
+    def test_streams_whole_object_in_chunks(self, client, mock_s3_client):
+        """The body is relayed chunk by chunk with content headers"""
+        data = bytes(range(256)) * 40
+        response_data = object_response(data)
+        mock_s3_client.get_object.return_value = response_data
+
+        with patch("routers.media.settings.STREAM_CHUNK_SIZE", 1024):
+            response = client.get("/media/stream/videos/clip.mp4")
+
+        assert response.status_code == 200
+        assert response.content == data
+        assert response.headers["content-type"] == "video/mp4"
+        assert response.headers["content-length"] == str(len(data))
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["etag"] == '"abc123"'
+        assert response.headers["last-modified"] == "Sat, 09 Mar 2024 12:00:00 GMT"
+        assert set(response_data["Body"].read_sizes) == {1024}
+        assert response_data["Body"].closed
+
+    def test_range_request_returns_partial_content(self, client, mock_s3_client):
+        """A single byte range is forwarded to S3 and answered with 206"""
+        mock_s3_client.get_object.return_value = object_response(b"x" * 100, "bytes 100-199/5000")
+
+        response = client.get("/media/stream/clip.mp4", headers={"Range": "bytes=100-199"})
+
+        assert response.status_code == 206
+        assert response.headers["content-range"] == "bytes 100-199/5000"
+        assert response.headers["content-length"] == "100"
+        assert mock_s3_client.get_object.call_args.kwargs["Range"] == "bytes=100-199"
+
+    def test_multi_range_is_served_in_full(self, client, mock_s3_client):
+        """Ranges S3 cannot serve are ignored rather than rejected"""
+        mock_s3_client.get_object.return_value = object_response(b"data")
+
+        response = client.get("/media/stream/clip.mp4", headers={"Range": "bytes=0-1,5-6"})
+
+        assert response.status_code == 200
+        assert "Range" not in mock_s3_client.get_object.call_args.kwargs
+
+    def test_matching_etag_returns_not_modified(self, client, mock_s3_client):
+        """If-None-Match is forwarded and a match returns 304"""
+        mock_s3_client.get_object.side_effect = ClientError(
+            {"Error": {"Code": "304", "Message": "Not Modified"}}, "GetObject"
+        )
+
+        response = client.get("/media/stream/clip.mp4", headers={"If-None-Match": '"abc123"'})
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == '"abc123"'
+        assert mock_s3_client.get_object.call_args.kwargs["IfNoneMatch"] == '"abc123"'
+
+    def test_missing_object_returns_404(self, client, mock_s3_client):
+        """Missing keys return 404"""
+        mock_s3_client.get_object.side_effect = ClientError(
+            {"Error": {"Code": "NoSuchKey", "Message": "Missing"}}, "GetObject"
+        )
+
+        assert client.get("/media/stream/missing.mp4").status_code == 404
+
+    def test_unsatisfiable_range_returns_416(self, client, mock_s3_client):
+        """Ranges beyond the object return 416"""
+        mock_s3_client.get_object.side_effect = ClientError(
+            {"Error": {"Code": "InvalidRange", "Message": "Bad range"}}, "GetObject"
+        )
+
+        response = client.get("/media/stream/clip.mp4", headers={"Range": "bytes=9000-"})
+
+        assert response.status_code == 416
+
+
+class TestStreamConcurrency:
+    """Test the concurrent stream cap"""
+
+    def test_streams_beyond_cap_are_rejected(self, client, mock_s3_client):
+        """When every slot is taken the request fails fast with 503"""
+        with patch("routers.media._stream_slots", asyncio.Semaphore(0)):
+            response = client.get("/media/stream/clip.mp4")
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        mock_s3_client.get_object.assert_not_called()
+
+    def test_slots_are_released(self, client, mock_s3_client):
+        """Completed, failed and not-modified streams all free their slot"""
+        slots = asyncio.Semaphore(1)
+        mock_s3_client.get_object.side_effect = [
+            object_response(b"data"),
+            ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject"),
+            ClientError({"Error": {"Code": "304"}}, "GetObject"),
+            object_response(b"data"),
+        ]
+
+        with patch("routers.media._stream_slots", slots):
+            statuses = [
+                client.get("/media/stream/clip.mp4", headers={"If-None-Match": '"abc123"'}).status_code
+                for _ in range(4)
+            ]
+
+        assert statuses == [200, 404, 304, 200]
+        assert not slots.locked()
+
+
+class TestBodyStream:
+    """Test closing object bodies around reads in progress"""
+
+    def test_disconnect_mid_read_closes_after_the_read(self):
+        """A body abandoned during a read is closed, and its slot released, only once the read returns"""
+        started, unblock = threading.Event(), threading.Event()
+        body = FakeBody(b"x" * 10)
+        original_read = body.read
+
+        def slow_read(amt=None):
+            started.set()
+            unblock.wait(5)
+            assert not body.closed
+            return original_read(amt)
+
+        body.read = slow_read
+        released = []
+
+        async def run():
+            stream = s3_service.stream_body(body, 4, on_close=lambda: released.append(True))
+            consumer = asyncio.ensure_future(stream.chunks().__anext__())
+            await asyncio.to_thread(started.wait, 5)
+            consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+            stream.close()
+            during_read = (body.closed, list(released))
+            unblock.set()
+            for _ in range(100):
+                if released:
+                    break
+                await asyncio.sleep(0.01)
+            return during_read
+
+        during_read = asyncio.run(run())
+
+        assert during_read == (False, [])
+        assert body.closed and released == [True]
+        assert body.read_sizes == [4]
@@ -0,0 +1,173 @@
+"""
+Tests for streaming server-side uploads
+"""
+import asyncio
+import re
+import threading
+import time
+import pytest
+from botocore.exceptions import ClientError
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from main import app
+from services.s3_service import s3_service
+from services.streaming_upload import StreamingUpload, UploadTooLargeError
+
+PART_SIZE = 5 * 1024 * 1024
+
+
+@pytest.fixture
+def client():
+    """Create test client for FastAPI app"""
+    return TestClient(app)
+
+
+@pytest.fixture
+def mock_s3_client():
+    """Mock S3 client that records uploaded parts"""
+    s3_service.warm_up()
+    parts = {}
+
+    def upload_part(Bucket, Key, UploadId, PartNumber, Body):
+        parts[PartNumber] = Body
+        return {"ETag": f'"part-{PartNumber}"'}
+
+    with patch.object(s3_service, "client") as mock_client:
+        mock_client.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+        mock_client.upload_part.side_effect = upload_part
+        mock_client.complete_multipart_upload.return_value = {"ETag": '"final-3"'}
+        mock_client.put_object.return_value = {"ETag": '"small"'}
+        mock_client.parts = parts
+        yield mock_client
+
+
+def post_file(client, data, filename="clip.mp4", field="file", content_type="video/mp4"):
+    """Post a file as multipart/form-data"""
+    return client.post("/media/upload", files={field: (filename, data, content_type)})
+
+
+class TestUploadEndpoint:
+    """Test POST /media/upload"""
+
+    def test_small_file_uses_single_put(self, client, mock_s3_client):
+        """Files smaller than one part are stored without a multipart upload"""
+        response = post_file(client, b"hello world", filename="notes.txt", content_type="text/plain")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["size"] == 11
+        assert body["etag"] == '"small"'
+        assert body["parts"] == 1
+        assert body["content_type"] == "text/plain"
+        assert re.fullmatch(r"uploads/\d{4}-\d{2}-\d{2}/[0-9a-f-]{36}-notes\.txt", body["key"])
+        assert mock_s3_client.put_object.call_args.kwargs["Body"] == b"hello world"
+        mock_s3_client.create_multipart_upload.assert_not_called()
+
+    def test_large_file_is_uploaded_in_parts(self, client, mock_s3_client):
+        """Large files are split into parts and reassembled in order"""
+        data = bytes(range(256)) * (PART_SIZE * 2 // 256) + b"tail"
+
+        with patch("routers.media.settings.UPLOAD_PART_SIZE", PART_SIZE):
+            response = post_file(client, data)
+
+        assert response.status_code == 200
+        assert response.json()["parts"] == 3
+        assert response.json()["size"] == len(data)
+        assert b"".join(mock_s3_client.parts[n] for n in sorted(mock_s3_client.parts)) == data
+        completed = mock_s3_client.complete_multipart_upload.call_args.kwargs["MultipartUpload"]["Parts"]
+        assert [part["PartNumber"] for part in completed] == [1, 2, 3]
+        mock_s3_client.put_object.assert_not_called()
+
+    def test_client_path_is_stripped_from_filename(self, client, mock_s3_client):
+        """Only the base name of the uploaded file is used in the key"""
+        response = post_file(client, b"data", filename="C:\\Users\\me\\photo.jpg")
+
+        assert response.json()["key"].endswith("-photo.jpg")
+
+    def test_missing_file_field_returns_400(self, client, mock_s3_client):
+        """A form without the file field is rejected"""
+        response = post_file(client, b"data", field="attachment")
+
+        assert response.status_code == 400
+        mock_s3_client.put_object.assert_not_called()
+
+    def test_non_multipart_body_returns_400(self, client, mock_s3_client):
+        """Bodies that are not multipart/form-data are rejected"""
+        response = client.post("/media/upload", json={"file": "data"})
+
+        assert response.status_code == 400
+
+    def test_failed_part_aborts_upload(self, client, mock_s3_client):
+        """A failing part aborts the multipart upload and returns 500"""
+        mock_s3_client.upload_part.side_effect = ClientError(
+            {"Error": {"Code": "InternalError", "Message": "Boom"}}, "UploadPart"
+        )
+
+        with patch("routers.media.settings.UPLOAD_PART_SIZE", PART_SIZE):
+            response = post_file(client, b"x" * (PART_SIZE * 2))
+
+        assert response.status_code == 500
+        mock_s3_client.abort_multipart_upload.assert_called_once_with(
+            Bucket=s3_service.bucket_name, Key=mock_s3_client.create_multipart_upload.call_args.kwargs["Key"],
+            UploadId="upload-1"
+        )
+        mock_s3_client.complete_multipart_upload.assert_not_called()
+
+
+class TestStreamingUpload:
+    """Test StreamingUpload concurrency and memory bounds"""
+
+    def test_parts_in_flight_are_bounded(self, mock_s3_client):
+        """No more than `concurrency` parts upload at once, but they do overlap"""
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+
+        def slow_upload_part(Bucket, Key, UploadId, PartNumber, Body):
+            with lock:
+                in_flight.append(PartNumber)
+                peak.append(len(in_flight))
+            time.sleep(0.02)
+            with lock:
+                in_flight.remove(PartNumber)
+            return {"ETag": f'"part-{PartNumber}"'}
+
+        mock_s3_client.upload_part.side_effect = slow_upload_part
+
+        async def upload():
+            stream = StreamingUpload(s3_service, "big.bin", "application/octet-stream",
+                                     part_size=1024, concurrency=3)
+            for _ in range(40):
+                await stream.write(b"x" * 256)
+            return await stream.finish()
+
+        result = asyncio.run(upload())
+
+        assert result["parts"] == 10
+        assert max(peak) == 3
+
+    def test_buffer_never_exceeds_one_part(self, mock_s3_client):
+        """Writes are sliced into parts as soon as a part is complete"""
+        async def upload():
+            stream = StreamingUpload(s3_service, "big.bin", "application/octet-stream",
+                                     part_size=1024, concurrency=2)
+            sizes = []
+            for _ in range(20):
+                await stream.write(b"x" * 700)
+                sizes.append(len(stream._buffer))
+            await stream.finish()
+            return sizes
+
+        assert max(asyncio.run(upload())) < 1024
+
+    def test_too_many_parts_raises(self, mock_s3_client):
+        """Files that need more than S3's part limit are refused"""
+        async def upload():
+            stream = StreamingUpload(s3_service, "big.bin", "application/octet-stream",
+                                     part_size=1, concurrency=2)
+            with patch("services.streaming_upload.MULTIPART_MAX_PARTS", 3):
+                await stream.write(b"abcd")
+
+        with pytest.raises(UploadTooLargeError):
+            asyncio.run(upload())
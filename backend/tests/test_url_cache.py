@@ -0,0 +1,151 @@
+"""
+Tests for the presigned download URL cache
+"""
+import pytest
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from main import app
+from services.s3_service import s3_service
+from services.url_cache import PresignedURLCache
+
+SIGNED_AT = datetime(2024, 3, 9, 12, 0, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def client():
+    """Create test client for FastAPI app"""
+    return TestClient(app)
+
+
+@pytest.fixture
+def counting_presigner():
+    """Presigner mock that issues a distinct URL per signature, over a mocked S3 client"""
+    issued = []
+
+    def presign(method, key, expires_in, **kwargs):
+        issued.append(key)
+        return f"https://signed/{key}?n={len(issued)}"
+
+    with patch.object(s3_service.presigner, "presign", side_effect=presign) as mock_presign:
+        with patch.object(s3_service, "client") as mock_client:
+            mock_client.head_object.return_value = {
+                "ContentLength": 1, "ETag": '"etag"', "LastModified": SIGNED_AT
+            }
+            yield mock_presign
+
+
+def frozen_now(now):
+    """Freeze the service clock used for signing"""
+    return patch("services.s3_service.datetime", **{"now.return_value": now})
+
+
+class TestPresignedURLCache:
+    """Test the cache itself"""
+
+    def test_url_is_reused_with_remaining_lifetime(self):
+        """A cached URL is returned with the lifetime it has left"""
+        cache = PresignedURLCache(max_entries=10, expires_in=3600, reuse_fraction=0.5)
+        cache.put("a.jpg", "https://signed/a", SIGNED_AT)
+
+        assert cache.get("a.jpg", SIGNED_AT + timedelta(seconds=90.4)) == ("https://signed/a", 3509)
+
+    def test_url_is_not_reused_after_reuse_window(self):
+        """Once the reuse fraction of the lifetime has passed the key is re-signed"""
+        cache = PresignedURLCache(max_entries=10, expires_in=3600, reuse_fraction=0.5)
+        cache.put("a.jpg", "https://signed/a", SIGNED_AT)
+
+        assert cache.get("a.jpg", SIGNED_AT + timedelta(seconds=1800)) is None
+        assert cache.stats()["size"] == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """The cache never grows beyond max_entries"""
+        cache = PresignedURLCache(max_entries=2, expires_in=3600, reuse_fraction=0.5)
+        cache.put("a", "url-a", SIGNED_AT)
+        cache.put("b", "url-b", SIGNED_AT)
+        cache.get("a", SIGNED_AT)
+        cache.put("c", "url-c", SIGNED_AT)
+
+        assert cache.get("b", SIGNED_AT) is None
+        assert cache.get("a", SIGNED_AT) is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_zero_size_disables_cache(self):
+        """With max_entries 0 nothing is cached"""
+        cache = PresignedURLCache(max_entries=0, expires_in=3600, reuse_fraction=0.5)
+        cache.put("a", "url-a", SIGNED_AT)
+
+        assert cache.get("a", SIGNED_AT) is None
+
+    def test_stats_count_hits_and_misses(self):
+        """Hit and miss counters are reported with the hit ratio"""
+        cache = PresignedURLCache(max_entries=10, expires_in=3600, reuse_fraction=0.5)
+        cache.get("a", SIGNED_AT)
+        cache.put("a", "url-a", SIGNED_AT)
+        cache.get("a", SIGNED_AT)
+        cache.get("a", SIGNED_AT)
+
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.667
+
+
+class TestServiceDownloadURLCache:
+    """Test download URL caching in S3Service and the API"""
+
+    def test_repeated_requests_return_same_url(self, client, counting_presigner):
+        """The same key keeps its URL and reports a shrinking expires_in"""
+        with frozen_now(SIGNED_AT):
+            first = client.get("/media/download-url/photos/a.jpg").json()
+        with frozen_now(SIGNED_AT + timedelta(seconds=60)):
+            second = client.get("/media/download-url/photos/a.jpg").json()
+
+        assert first["download_url"] == second["download_url"]
+        assert first["expires_in"] == 3600
+        assert second["expires_in"] == 3540
+        assert counting_presigner.call_count == 1
+
+    def test_batch_requests_share_the_cache(self, client, counting_presigner):
+        """Batch download URLs reuse cached URLs and sign only the misses"""
+        single = client.get("/media/download-url/a.jpg").json()
+
+        response = client.post("/media/download-urls", json={"keys": ["a.jpg", "b.jpg"]})
+
+        urls = response.json()["urls"]
+        assert urls[0]["download_url"] == single["download_url"]
+        assert counting_presigner.call_count == 2
+
+    def test_delete_invalidates_cached_url(self, client, counting_presigner):
+        """Deleting an object forgets its cached URL"""
+        first = client.get("/media/download-url/a.jpg").json()
+        client.delete("/media/files/a.jpg")
+
+        assert client.get("/media/download-url/a.jpg").status_code == 404
+        second = s3_service.generate_download_url("a.jpg")
+        assert first["download_url"] != second["download_url"]
+        assert counting_presigner.call_count == 2
+
+    def test_bulk_delete_invalidates_deleted_keys_only(self, counting_presigner):
+        """Keys that failed to delete keep their cached URL"""
+        s3_service.generate_download_urls(["a.jpg", "b.jpg"])
+
+        s3_service.client.delete_objects.return_value = {
+            "Errors": [{"Key": "b.jpg", "Code": "AccessDenied", "Message": "Denied"}]
+        }
+        s3_service.delete_objects(["a.jpg", "b.jpg"])
+
+        s3_service.generate_download_urls(["a.jpg", "b.jpg"])
+        assert counting_presigner.call_count == 3
+
+    def test_health_exposes_cache_counters(self, client, counting_presigner):
+        """Hit and miss counters are reported by the health endpoint"""
+        client.get("/media/download-url/a.jpg")
+        client.get("/media/download-url/a.jpg")
+
+        s3_service.client.get_bucket_location.return_value = {"LocationConstraint": None}
+        stats = client.get("/health").json()["download_url_cache"]
+
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
@@ -1,8 +1,9 @@
 import React, { useEffect, useRef } from 'react';
 import type { CloudFile } from '../types';
 import {
-  generateUploadUrl,
+  generateUploadUrls,
   generateDownloadUrl,
+  confirmUpload,
   deleteFileApi,
   uploadFileToS3,
   downloadFileFromS3,
@@ -32,6 +33,7 @@ export const CloudStorageGallery: React.FC<CloudStorageGalleryProps> = ({ active
     setFiles,
     setShowUploadModal,
     loadFiles,
+    syncChanges,
     startUpload,
     updateUploadProgress,
     finishUpload,
@@ -73,19 +75,26 @@ export const CloudStorageGallery: React.FC<CloudStorageGalleryProps> = ({ active
     startUpload(filesToUpload);
 
     try {
+      // Generate every upload URL up front in batched requests
+      let uploadResponses;
+      try {
+        uploadResponses = await generateUploadUrls(
+          filesToUpload.map((file) => ({ filename: file.name, contentType: file.type }))
+        );
+      } catch (error) {
+        filesToUpload.forEach((_, i) => updateUploadProgress(i, { status: 'error' }));
+        addToast('Failed to prepare uploads', 'error');
+        return;
+      }
+
       for (let i = 0; i < filesToUpload.length; i++) {
         const file = filesToUpload[i];
+        const uploadResponse = uploadResponses[i];
 
         // Update status to uploading
         updateUploadProgress(i, { status: 'uploading' });
 
         try {
-          // Generate upload URL
-          const uploadResponse = await generateUploadUrl({
-            filename: file.name,
-            contentType: file.type
-          });
-
           // Upload to S3
           await uploadFileToS3(
             file,
@@ -99,6 +108,9 @@ export const CloudStorageGallery: React.FC<CloudStorageGalleryProps> = ({ active
           updateUploadProgress(i, { status: 'completed', progress: 100 });
           addToast(`${file.name} uploaded successfully`, 'success');
 
+          // Announce the upload; if this fails the server's listing diff picks it up later
+          await confirmUpload(uploadResponse.key).catch(() => undefined);
+
         } catch (error) {
           // Mark as error
           updateUploadProgress(i, { status: 'error' });
@@ -106,8 +118,8 @@ export const CloudStorageGallery: React.FC<CloudStorageGalleryProps> = ({ active
         }
       }
 
-      // Refresh file list after all uploads are complete
-      await loadFiles(true); // Force refresh to get latest data
+      // Apply the new files from the change feed instead of reloading the full listing
+      await syncChanges();
 
     } finally {
       finishUpload();
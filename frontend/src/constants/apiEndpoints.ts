@@ -10,6 +10,10 @@ export const API_ENDPOINTS = {
   // Media endpoints
   listFiles: '/media/files',
   uploadUrl: '/media/upload-url',
+  uploadUrls: '/media/upload-urls',
   downloadUrl: (key: string) => `/media/download-url/${encodeURIComponent(key)}`,
+  downloadUrls: '/media/download-urls',
   deleteFile: (key: string) => `/media/files/${encodeURIComponent(key)}`,
+  confirmUpload: (key: string) => `/media/files/${encodeURIComponent(key)}/confirm`,
+  changes: '/media/changes',
 } as const;
@@ -1,5 +1,5 @@
-import { useState, useCallback } from 'react';
-import type { CloudFile, ProgressStatus } from '../types';
+import { useState, useCallback, useRef } from 'react';
+import type { ChangeEvent, CloudFile, ProgressStatus } from '../types';
 import { updateProgressByIndex, updateProgressByPredicate } from '../utils/progress';
 
 interface UploadProgress {
@@ -41,6 +41,7 @@ interface CloudStorageActions {
   setLoading: React.Dispatch<React.SetStateAction<boolean>>;
   loadFiles: (forceRefresh?: boolean) => Promise<void>;
   refreshFiles: () => Promise<void>;
+  syncChanges: () => Promise<void>;
   shouldLoadFiles: () => boolean;
 
   // Upload actions
@@ -71,6 +72,8 @@ export const useCloudStorageState = (): CloudStorageState & CloudStorageActions
   const [loading, setLoading] = useState(false);
   const [filesLoaded, setFilesLoaded] = useState(false);
   const [lastLoaded, setLastLoaded] = useState<number | null>(null);
+  // Change feed position matching the loaded files
+  const changeCursor = useRef<string | null>(null);
 
   // Cache TTL: 5 minutes
   const CACHE_TTL = 5 * 60 * 1000; // 5 minutes in milliseconds
@@ -146,26 +149,15 @@ export const useCloudStorageState = (): CloudStorageState & CloudStorageActions
     setLoading(true);
     try {
       // Import fetchFiles dynamically to avoid circular dependency
-      const { fetchFiles } = await import('../services/api');
-      const cloudFiles = await fetchFiles();
-
-      // Generate preview URLs for media files
-      const filesWithPreviews = await Promise.all(
-        cloudFiles.map(async (file) => {
-          const { isMediaFile } = await import('../services/api');
-          const { generateDownloadUrl } = await import('../services/api');
-
-          if (isMediaFile(file.key)) {
-            try {
-              const downloadResponse = await generateDownloadUrl(file.key);
-              return { ...file, previewUrl: downloadResponse.download_url };
-            } catch (error) {
-              console.warn(`Failed to generate preview URL for ${file.key}:`, error);
-              return file;
-            }
-          }
-          return file;
-        })
+      const { fetchChanges, fetchFiles, isMediaFile } = await import('../services/api');
+      // Take the cursor before listing so no change between the two is missed
+      const { cursor } = await fetchChanges();
+      // Presigned URLs come embedded in the listing, so previews need no extra requests
+      const cloudFiles = await fetchFiles(true);
+      changeCursor.current = cursor;
+
+      const filesWithPreviews = cloudFiles.map((file) =>
+        isMediaFile(file.key) && file.download_url ? { ...file, previewUrl: file.download_url } : file
       );
 
       setFiles(filesWithPreviews);
@@ -183,6 +175,55 @@ export const useCloudStorageState = (): CloudStorageState & CloudStorageActions
     await loadFiles(true); // Force refresh
   }, [loadFiles]);
 
+  // Apply changes since the last load instead of downloading the whole listing again
+  const syncChanges = useCallback(async () => {
+    if (!changeCursor.current) {
+      await loadFiles(true);
+      return;
+    }
+
+    const { fetchChanges, generateDownloadUrls, isMediaFile } = await import('../services/api');
+    const events: ChangeEvent[] = [];
+    let cursor = changeCursor.current;
+    let hasMore = true;
+    while (hasMore) {
+      const changes = await fetchChanges(cursor);
+      if (changes.reset) {
+        // Events were missed (buffer overflow or another server); reload once
+        await loadFiles(true);
+        return;
+      }
+      events.push(...changes.events);
+      cursor = changes.cursor;
+      hasMore = changes.has_more;
+    }
+
+    // Keep only the latest event per key
+    const latest = new Map<string, ChangeEvent>();
+    events.forEach((event) => latest.set(event.key, event));
+    const created = Array.from(latest.values()).filter((event) => event.type === 'created');
+    const mediaKeys = created.filter((event) => isMediaFile(event.key)).map((event) => event.key);
+    const previews = new Map<string, string>();
+    if (mediaKeys.length > 0) {
+      (await generateDownloadUrls(mediaKeys)).forEach((url) => previews.set(url.key, url.download_url));
+    }
+
+    setFiles((prev) => {
+      const kept = prev.filter((file) => !latest.has(file.key));
+      const added: CloudFile[] = created.map((event) => ({
+        key: event.key,
+        size: event.size ?? 0,
+        lastModified: event.last_modified ?? event.at,
+        etag: event.etag ?? '',
+        download_url: previews.get(event.key),
+        previewUrl: previews.get(event.key),
+      }));
+      return [...kept, ...added].sort((a, b) => a.key.localeCompare(b.key));
+    });
+    changeCursor.current = cursor;
+    setLastLoaded(Date.now());
+  }, [loadFiles]);
+
   // Delete confirmation helpers
   const showDeleteConfirm = useCallback((file: CloudFile) => {
     setDeleteConfirm({ show: true, file });
@@ -211,6 +252,7 @@ export const useCloudStorageState = (): CloudStorageState & CloudStorageActions
     setLoading,
     loadFiles,
     refreshFiles,
+    syncChanges,
     shouldLoadFiles,
     setUploading,
     setShowUploadModal,
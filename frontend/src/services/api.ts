@@ -3,8 +3,11 @@ import type {
   CloudFile,
   UploadURLRequest,
   UploadURLResponse,
+  UploadURLsResponse,
   DownloadURLResponse,
+  DownloadURLsResponse,
   ListFilesResponse,
+  ChangesResponse,
   DeleteResponse
 } from '../types';
 import { API_BASE_URL } from '../constants/env';
@@ -23,10 +26,14 @@ export const apiEndpoints = API_ENDPOINTS;
 
 /**
  * Fetch all files from the S3 bucket
+ * When includeUrls is set, each file carries a presigned download_url so no
+ * per-file download URL request is needed
  */
-export const fetchFiles = async (): Promise<CloudFile[]> => {
+export const fetchFiles = async (includeUrls = false): Promise<CloudFile[]> => {
   try {
-    const response = await api.get<ListFilesResponse>(apiEndpoints.listFiles);
+    const response = await api.get<ListFilesResponse>(apiEndpoints.listFiles, {
+      params: includeUrls ? { include_urls: true } : undefined,
+    });
     return response.data.objects;
   } catch (error) {
     console.error('Error fetching files:', error);
@@ -34,6 +41,35 @@ export const fetchFiles = async (): Promise<CloudFile[]> => {
   }
 };
 
+/**
+ * Fetch object changes after a cursor
+ * Without a cursor, returns the current cursor to start from; with wait, the
+ * request is held up to that many seconds until a change happens
+ */
+export const fetchChanges = async (since?: string, wait = 0): Promise<ChangesResponse> => {
+  try {
+    const response = await api.get<ChangesResponse>(apiEndpoints.changes, {
+      params: { since, wait: wait || undefined },
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching changes:', error);
+    throw new Error('Failed to fetch changes from cloud storage');
+  }
+};
+
+/**
+ * Tell the API a presigned upload finished so the file is listed at once
+ */
+export const confirmUpload = async (key: string): Promise<void> => {
+  try {
+    await api.post(apiEndpoints.confirmUpload(key));
+  } catch (error) {
+    console.error('Error confirming upload:', error);
+    throw new Error('Failed to confirm upload');
+  }
+};
+
 /**
  * Generate a presigned upload URL for a file
  */
@@ -50,6 +86,32 @@ export const generateUploadUrl = async (request: UploadURLRequest): Promise<Uplo
   }
 };
 
+// Number of files per upload URL batch request, kept below the backend maximum
+const UPLOAD_URL_BATCH_SIZE = 500;
+
+/**
+ * Generate presigned upload URLs for many files with as few requests as possible
+ */
+export const generateUploadUrls = async (requests: UploadURLRequest[]): Promise<UploadURLResponse[]> => {
+  try {
+    const uploads: UploadURLResponse[] = [];
+    for (let i = 0; i < requests.length; i += UPLOAD_URL_BATCH_SIZE) {
+      const batch = requests.slice(i, i + UPLOAD_URL_BATCH_SIZE);
+      const response = await api.post<UploadURLsResponse>(apiEndpoints.uploadUrls, {
+        files: batch.map((request) => ({
+          filename: request.filename,
+          content_type: request.contentType || 'application/octet-stream',
+        })),
+      });
+      uploads.push(...response.data.uploads);
+    }
+    return uploads;
+  } catch (error) {
+    console.error('Error generating upload URLs:', error);
+    throw new Error('Failed to generate upload URLs');
+  }
+};
+
 /**
  * Generate a presigned download URL for a file
  */
@@ -63,6 +125,19 @@ export const generateDownloadUrl = async (key: string): Promise<DownloadURLRespo
   }
 };
 
+/**
+ * Generate presigned download URLs for many files in one request
+ */
+export const generateDownloadUrls = async (keys: string[]): Promise<DownloadURLResponse[]> => {
+  try {
+    const response = await api.post<DownloadURLsResponse>(apiEndpoints.downloadUrls, { keys });
+    return response.data.urls;
+  } catch (error) {
+    console.error('Error generating download URLs:', error);
+    throw new Error('Failed to generate download URLs');
+  }
+};
+
 /**
  * Delete a file from S3
  */
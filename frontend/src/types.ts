@@ -27,6 +27,7 @@ export interface CloudFile {
   size: number
   lastModified: string
   etag: string
+  download_url?: string
   previewUrl?: string
 }
 
@@ -41,17 +42,45 @@ export interface UploadURLResponse {
   expires_in: number
 }
 
+export interface UploadURLsResponse {
+  uploads: UploadURLResponse[]
+  count: number
+}
+
 export interface DownloadURLResponse {
   download_url: string
   key: string
   expires_in: number
 }
 
+export interface DownloadURLsResponse {
+  urls: DownloadURLResponse[]
+  count: number
+}
+
 export interface ListFilesResponse {
   objects: CloudFile[]
   count: number
 }
 
+export interface ChangeEvent {
+  cursor: string
+  type: 'created' | 'deleted'
+  at: string
+  key: string
+  size?: number
+  etag?: string
+  last_modified?: string
+  content_type?: string
+}
+
+export interface ChangesResponse {
+  events: ChangeEvent[]
+  cursor: string
+  has_more: boolean
+  reset: boolean
+}
+
 export interface DeleteResponse {
   message: string
   key: string